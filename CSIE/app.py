@@ -1,9 +1,16 @@
-from flask import Flask, render_template, jsonify, request
+import hashlib
+import os
+import random
+from flask import Flask, Response, g, render_template, jsonify, request, stream_with_context
+import step_stream
+import dp_steps
+import session_store
 import patricia_logic
 import rbtree_logic
 import knapsack_logic
 import steiner_logic
 import hill_climbing_logic
+import puzzle_search_logic
 import hungarian_logic
 import max_overlap_logic
 import rod_cutting_logic
@@ -29,9 +36,80 @@ import mst_reduce_weight_logic
 
 app = Flask(__name__)
 
-# Global state for the demo (not thread-safe, good for single user demo)
-HEAD = patricia_logic.Node(None, -1)
-RB_TREE = rbtree_logic.RBTree()
+# Per-session trees for the interactive structures (see session_store.py).
+# SESSION_STATE_DIR 設定後會把狀態存到磁碟，讓多個 gunicorn worker 共用同一棵樹。
+SESSION_COOKIE = 'csie_sid'
+SESSION_OPTIONS = dict(
+    max_sessions=int(os.environ.get('SESSION_MAX', 500)),
+    max_weight=int(os.environ.get('SESSION_MAX_NODES', 200000)),
+    ttl=int(os.environ.get('SESSION_TTL', 1800)),
+)
+_state_dir = os.environ.get('SESSION_STATE_DIR')
+PATRICIA_SESSIONS = session_store.SessionStore(
+    patricia_logic.PatriciaTree, weigher=patricia_logic.PatriciaTree.weight,
+    state_dir=os.path.join(_state_dir, 'patricia') if _state_dir else None, **SESSION_OPTIONS)
+RB_SESSIONS = session_store.SessionStore(
+    rbtree_logic.RBTree, weigher=len,
+    state_dir=os.path.join(_state_dir, 'rbtree') if _state_dir else None, **SESSION_OPTIONS)
+
+def session_id():
+    sid = request.cookies.get(SESSION_COOKIE)
+    if not session_store.valid_sid(sid):
+        sid = g.get('new_sid') or session_store.new_sid()
+        g.new_sid = sid
+    return sid
+
+@app.after_request
+def set_session_cookie(response):
+    sid = g.get('new_sid')
+    if sid:
+        response.set_cookie(SESSION_COOKIE, sid, httponly=True, samesite='Lax')
+    return response
+
+STEP_PAGER = step_stream.StepPager()
+
+def steps_response(factory, wrap=False, seed=None, **extra):
+    """回傳 solver 的步驟。
+
+    factory() 要回傳一個新的步驟 generator。
+    - Accept: application/x-ndjson：邊算邊送，一行一個步驟 (見 step_stream.ndjson_lines)
+    - 有帶 ?cursor= / ?limit=：只回傳該頁
+      {"steps": [...], "cursor": c, "next_cursor": n 或 null}
+    - 其他情況和以前一樣一次回傳整個 list。
+    wrap / extra 用來維持原本就包成 {"steps": ...} 的 API 格式；
+    隨機題目的 seed 會放進分頁回應，讓前端讀下一頁時帶回來。
+    """
+    cursor = request.args.get('cursor', type=int)
+    limit = request.args.get('limit', type=int)
+    if cursor is None and limit is None and wants_ndjson():
+        meta = dict(extra) if extra else None
+        lines = step_stream.ndjson_lines(factory(), meta)
+        return Response(stream_with_context(lines), mimetype=step_stream.NDJSON_MIMETYPE)
+    if cursor is None and limit is None:
+        steps = list(factory())
+        if wrap or extra:
+            return jsonify(dict(extra, steps=steps))
+        return jsonify(steps)
+
+    cursor = cursor or 0
+    if seed is not None:
+        extra["seed"] = seed
+    args = sorted((k, v) for k, v in request.args.items(multi=True) if k not in ('cursor', 'limit'))
+    key = hashlib.sha1(repr((request.path, args, seed)).encode() + request.get_data()).hexdigest()
+    steps, next_cursor = STEP_PAGER.page(key, factory, cursor, limit or step_stream.DEFAULT_PAGE_SIZE)
+    return jsonify(dict(extra, steps=steps, cursor=cursor, next_cursor=next_cursor))
+
+def wants_ndjson():
+    # */* (fetch 預設) 仍回傳 JSON，只有明確要求 NDJSON 才串流
+    best = request.accept_mimetypes.best_match(['application/json', step_stream.NDJSON_MIMETYPE])
+    return best == step_stream.NDJSON_MIMETYPE
+
+def random_seed():
+    # 隨機題目分頁時要重播同一組資料：第一頁由伺服器決定 seed，之後的頁由前端帶回來
+    seed = request.args.get('seed', type=int)
+    if seed is None:
+        seed = random.randrange(1 << 31)
+    return seed
 
 @app.route('/')
 def index():
@@ -89,34 +167,41 @@ def max_overlap_page():
 def currency_exchange_page():
     return render_template('currency_exchange.html')
 
+def tag_version(steps, version):
+    # Each step of an operation points at the tree version the operation produced
+    for step in steps:
+        step["version"] = version
+    return steps
+
 @app.route('/api/patricia/init', methods=['POST'])
 def init_tree():
-    global HEAD
-    HEAD = patricia_logic.Node(None, -1)
-    # Return initial empty state
-    steps = []
-    patricia_logic.push_step(steps, HEAD, "已初始化空樹。", canvas_msg="初始化完成")
+    with PATRICIA_SESSIONS.session(session_id()) as state:
+        state.value = patricia_logic.PatriciaTree()
+        # Return initial empty state
+        steps = []
+        patricia_logic.push_step(steps, state.value.head, "已初始化空樹。", canvas_msg="初始化完成")
+        tag_version(steps, state.value.versions.current)
     return jsonify(steps)
 
 @app.route('/api/rbtree/init', methods=['POST'])
 def init_rbtree():
-    global RB_TREE
-    RB_TREE = rbtree_logic.RBTree()
-    steps = []
-    rbtree_logic.push_step(steps, RB_TREE, "已初始化空紅黑樹。", highlight_node=None)
+    with RB_SESSIONS.session(session_id()) as state:
+        state.value = rbtree_logic.RBTree()
+        steps = []
+        rbtree_logic.push_step(steps, state.value, "已初始化空紅黑樹。", highlight_node=None)
     return jsonify(steps)
 
 @app.route('/api/patricia/insert', methods=['POST'])
 def insert_node():
-    global HEAD
     data = request.json
     key = data.get('key')
-    steps, HEAD = patricia_logic.insert_with_steps(HEAD, key)
+    with PATRICIA_SESSIONS.session(session_id()) as state:
+        steps, version = state.value.insert(key)
+        tag_version(steps, version)
     return jsonify(steps)
 
 @app.route('/api/rbtree/insert', methods=['POST'])
 def insert_rbtree_node():
-    global RB_TREE
     data = request.json
     key = data.get('key')
     # Convert key to int for RB Tree usually, but string is fine if comparable.
@@ -125,36 +210,290 @@ def insert_rbtree_node():
         val = int(key)
     except:
         val = key
-    steps = RB_TREE.insert(val)
+    with RB_SESSIONS.session(session_id()) as state:
+        steps = state.value.insert(val)
     return jsonify(steps)
 
 @app.route('/api/patricia/delete', methods=['POST'])
 def delete_node():
-    global HEAD
     data = request.json
     key = data.get('key')
-    steps, HEAD = patricia_logic.delete_with_steps(HEAD, key)
+    with PATRICIA_SESSIONS.session(session_id()) as state:
+        steps, version = state.value.delete(key)
+        tag_version(steps, version)
     return jsonify(steps)
 
+# A bulk load is stored twice (the tree and its snapshot version, see
+# PatriciaTree.bulk_weight), so an empty session fits at most max_weight // 2 keys
+PATRICIA_BULK_MAX = min(int(os.environ.get('PATRICIA_BULK_MAX', 200000)),
+                        PATRICIA_SESSIONS.max_weight // 2)
+PATRICIA_BULK_MAX_FRAMES = 50
+
+@app.route('/api/patricia/bulk_insert', methods=['POST'])
+def bulk_insert_nodes():
+    """批次插入：JSON {"keys": [...] 或以空白 / 逗號分隔的字串, "frames": n}，
+    或以 multipart 上傳檔案 (欄位 file，一行一個鍵值)。"""
+    upload = request.files.get('file')
+    if upload is not None:
+        text = upload.read().decode('utf-8', errors='replace')
+        keys = text.replace(',', ' ').split()
+        frames = request.form.get('frames', 0)
+    else:
+        data = request.get_json(silent=True) or {}
+        keys = data.get('keys', [])
+        if isinstance(keys, str):
+            keys = keys.replace(',', ' ').split()
+        keys = [str(k).strip() for k in keys]
+        frames = data.get('frames', 0)
+    try:
+        frames = max(0, min(int(frames), PATRICIA_BULK_MAX_FRAMES))
+    except (TypeError, ValueError):
+        frames = 0
+    if len(keys) > PATRICIA_BULK_MAX:
+        return jsonify({"error": f"一次最多插入 {PATRICIA_BULK_MAX} 個鍵值"}), 400
+
+    with PATRICIA_SESSIONS.session(session_id()) as state:
+        tree = state.value
+        # The new version copies the whole tree, so check against the store's
+        # limit instead of letting the session be evicted right after the load
+        if tree.bulk_weight(len(keys)) > PATRICIA_SESSIONS.max_weight:
+            return jsonify({"error": f"樹太大：目前 {tree.size} 個鍵值，再插入 {len(keys)} 個會超過上限"}), 400
+        steps, stats, version = tree.bulk_insert(keys, frames=frames)
+        tag_version(steps, version)
+    return jsonify({"steps": steps, "stats": stats})
+
+@app.route('/api/patricia/query', methods=['POST'])
+def query_patricia():
+    """查詢 (不改變樹)：{"type": "prefix" | "count" | "longest", "key": "...", "explain": bool}。
+
+    explain 為 true 時另外回傳教學用的步驟。
+    """
+    data = request.get_json(silent=True) or {}
+    kind = data.get('type', 'prefix')
+    key = str(data.get('key', '')).strip()
+    explain = bool(data.get('explain', False))
+    if kind not in ('prefix', 'count', 'longest'):
+        return jsonify({"error": f"不支援的查詢類型：{kind}"}), 400
+    valid = patricia_logic.valid_key(key) if kind == 'longest' else patricia_logic.valid_prefix(key)
+    if not valid:
+        return jsonify({"error": "鍵值只能包含 0 與 1"}), 400
+
+    steps = None
+    with PATRICIA_SESSIONS.session(session_id(), read_only=True) as state:
+        head = state.value.head
+        if kind == 'longest':
+            if explain:
+                steps, result = patricia_logic.longest_prefix_with_steps(head, key)
+            else:
+                result = patricia_logic.longest_prefix_match(head, key)
+        elif explain:
+            steps, result = patricia_logic.prefix_query_with_steps(head, key, count_only=(kind == 'count'))
+        elif kind == 'count':
+            result = patricia_logic.count_prefix(head, key)
+        else:
+            result = patricia_logic.keys_with_prefix(head, key)
+
+    response = {"type": kind, "key": key, "result": result}
+    if steps is not None:
+        response["steps"] = steps
+    return jsonify(response)
+
+@app.route('/api/patricia/history')
+def patricia_history():
+    with PATRICIA_SESSIONS.session(session_id(), read_only=True) as state:
+        versions = state.value.versions
+        return jsonify({"current": versions.current, "versions": list(versions.ops)})
+
+@app.route('/api/patricia/version/<int:version>')
+def patricia_version(version):
+    """回傳第 version 版的樹 (版面由伺服器端的快取產生)。"""
+    with PATRICIA_SESSIONS.session(session_id(), read_only=True) as state:
+        layout = state.value.versions.layout(version)
+    if layout is None:
+        return jsonify({"error": f"版本 {version} 不存在或已被清除"}), 404
+    return jsonify({"version": version, "layout": layout})
+
 @app.route('/api/rbtree/delete', methods=['POST'])
 def delete_rbtree_node():
-    global RB_TREE
     data = request.json
     key = data.get('key')
     try:
         val = int(key)
     except:
         val = key
-    steps = RB_TREE.delete(val)
+    with RB_SESSIONS.session(session_id()) as state:
+        steps = state.value.delete(val)
     return jsonify(steps)
 
+def rb_key(value):
+    # Same parsing as insert / delete: numbers when possible, otherwise strings
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+def rb_tracer(explain):
+    # Explained queries record their steps, the others run quietly
+    return rbtree_logic.recorder() if explain else rbtree_logic.QUIET
+
+def rb_key_error(tree, keys):
+    """keys 無法與樹中的鍵值 (或彼此) 比較 (例如數字和字串比大小) 時回傳 400 回應，否則回傳 None。
+
+    每個鍵值只和樹根、keys[0] 各比較一次，查詢本身的 TypeError 不會被當成
+    鍵值型別錯誤。tree 為 None 時只檢查 keys 彼此之間。
+    """
+    try:
+        for k in keys:
+            if tree is not None:
+                tree.check_comparable(k)
+            k < keys[0]
+    except TypeError:
+        return jsonify({"error": "鍵值型別與樹中的鍵值不同"}), 400
+    return None
+
+@app.route('/api/rbtree/select', methods=['POST'])
+def select_rbtree():
+    """第 i 小的鍵值 (1 起算)：{"i": 3, "explain": bool}。"""
+    data = request.get_json(silent=True) or {}
+    try:
+        i = int(data.get('i'))
+    except (TypeError, ValueError):
+        return jsonify({"error": "i 必須是整數"}), 400
+    tracer = rb_tracer(data.get('explain'))
+    with RB_SESSIONS.session(session_id(), read_only=True) as state:
+        node = state.value.select(i, tracer)
+        response = {"i": i, "key": None if node is None else node.key}
+    if tracer.enabled:
+        response["steps"] = tracer.steps
+    return jsonify(response)
+
+@app.route('/api/rbtree/rank', methods=['POST'])
+def rank_rbtree():
+    """鍵值的名次 (1 起算，不在樹中為 null)：{"key": 5, "explain": bool}。"""
+    data = request.get_json(silent=True) or {}
+    key = rb_key(data.get('key'))
+    tracer = rb_tracer(data.get('explain'))
+    with RB_SESSIONS.session(session_id(), read_only=True) as state:
+        error = rb_key_error(state.value, [key])
+        if error:
+            return error
+        response = {"key": key, "rank": state.value.rank_of(key, tracer)}
+    if tracer.enabled:
+        response["steps"] = tracer.steps
+    return jsonify(response)
+
+@app.route('/api/rbtree/range', methods=['POST'])
+def range_rbtree():
+    """lo <= key <= hi 的鍵值：{"lo": 1, "hi": 9, "count_only": bool, "explain": bool}。
+
+    count_only 時只回傳個數 (O(log n))，否則依序列出鍵值 (O(log n + k))。
+    """
+    data = request.get_json(silent=True) or {}
+    lo = rb_key(data.get('lo'))
+    hi = rb_key(data.get('hi'))
+    count_only = bool(data.get('count_only', False))
+    tracer = rb_tracer(data.get('explain'))
+    with RB_SESSIONS.session(session_id(), read_only=True) as state:
+        tree = state.value
+        error = rb_key_error(tree, [lo, hi])
+        if error:
+            return error
+        if count_only and not tracer.enabled:
+            response = {"lo": lo, "hi": hi, "count": tree.range_count(lo, hi)}
+        else:
+            keys = tree.range_keys(lo, hi, tracer)
+            response = {"lo": lo, "hi": hi, "count": len(keys)}
+            if not count_only:
+                response["keys"] = keys
+    if tracer.enabled:
+        response["steps"] = tracer.steps
+    return jsonify(response)
+
+# A bulk load can't make a tree larger than one session may hold
+RB_BULK_MAX = min(int(os.environ.get('RB_BULK_MAX', 200000)), RB_SESSIONS.max_weight)
+
+@app.route('/api/rbtree/bulk/<op>', methods=['POST'])
+def bulk_rbtree(op):
+    """批次操作，只回傳開始與結束兩個快照。
+
+    load:   {"keys": [...]} 清空後由鍵值直接建樹 (O(n))
+    union:  {"keys": [...]} 把鍵值併入目前的樹
+    delete: {"keys": [...]} 一次刪除多個鍵值
+    split:  {"key": k, "keep": "left" | "right"} 以 k 切開，留下 <= k 或 > k 的一半
+    keys 也可以是以空白 / 逗號分隔的字串。
+    """
+    if op not in ('load', 'union', 'delete', 'split'):
+        return jsonify({"error": f"不支援的批次操作：{op}"}), 400
+    data = request.get_json(silent=True) or {}
+    keys = data.get('keys', [])
+    if isinstance(keys, str):
+        keys = keys.replace(',', ' ').split()
+    if len(keys) > RB_BULK_MAX:
+        return jsonify({"error": f"一次最多處理 {RB_BULK_MAX} 個鍵值"}), 400
+    keys = [rb_key(k) for k in keys if k is not None and k != ""]
+    key = rb_key(data.get('key'))
+    keep = data.get('keep', 'left')
+    if op == 'split' and (key is None or key == "" or keep not in ('left', 'right')):
+        return jsonify({"error": "split 需要 key，keep 只能是 left 或 right"}), 400
+
+    tracer = rbtree_logic.recorder()
+    with RB_SESSIONS.session(session_id()) as state:
+        # load replaces the tree, so its keys only need to compare with each other
+        error = rb_key_error(None if op == 'load' else state.value, [key] if op == 'split' else keys)
+        if error:
+            return error
+        # Check the resulting size up front, otherwise the store evicts
+        # this session right after the request reports success
+        size = len(keys) if op == 'load' else state.value.size + len(keys)
+        if op in ('load', 'union') and size > RB_SESSIONS.max_weight:
+            return jsonify({"error": f"樹太大：最多 {RB_SESSIONS.max_weight} 個鍵值"}), 400
+        if op == 'load':
+            state.value = rbtree_logic.RBTree()
+        tree = state.value
+        if op in ('load', 'union'):
+            stats = {"inserted": tree.bulk_load(keys, tracer)}
+        elif op == 'delete':
+            stats = {"deleted": tree.bulk_delete(keys, tracer)}
+        else:
+            right = tree.split(key, tracer)
+            if keep == 'right':
+                state.value = right
+                tracer.step(right, f"留下 > {key} 的 {right.size} 個鍵值。", highlight_node=right.root, canvas_msg="留下右半", keyframe=True)
+            stats = {"left": tree.size, "right": right.size}
+        stats["size"] = state.value.size
+    return jsonify({"steps": tracer.steps, "stats": stats})
+
 @app.route('/api/knapsack/run', methods=['POST'])
 def knapsack_run():
     data = request.json
     capacity = data.get('capacity', 10)
     items = data.get('items', [])
-    steps = knapsack_logic.solve_knapsack(capacity, items)
-    return jsonify(steps)
+    encoding = data.get('encoding', 'full')
+    detail = data.get('detail', 'cell')
+    engine = data.get('engine', 'auto')
+    if engine not in knapsack_logic.ENGINES:
+        return jsonify({"error": f"不支援的引擎：{engine}"}), 400
+    variant = data.get('variant', '01')
+    volume = data.get('volume')
+    if variant not in knapsack_logic.VARIANTS:
+        return jsonify({"error": f"不支援的背包類型：{variant}"}), 400
+    # Check the items up front for every variant: the steps are generated
+    # lazily, and an error inside a stream that already started can't be a 400
+    if not isinstance(items, list):
+        return jsonify({"error": "items 必須是物品的陣列"}), 400
+    try:
+        capacity = int(capacity)
+        volume = None if volume is None else int(volume)
+    except (TypeError, ValueError):
+        return jsonify({"error": "容量與體積上限必須是整數"}), 400
+    try:
+        caps, dims = knapsack_logic.variant_dims(capacity, volume)
+        knapsack_logic.split_items(items, variant, caps, dims)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    return steps_response(lambda: knapsack_logic.iter_knapsack(capacity, items, encoding=encoding,
+                                                               detail=detail, engine=engine,
+                                                               variant=variant, volume=volume))
 
 @app.route('/api/steiner/run', methods=['POST'])
 def steiner_run():
@@ -162,8 +501,12 @@ def steiner_run():
     nodes = data.get('nodes', [])
     edges = data.get('edges', [])
     terminals = data.get('terminals', [])
-    steps = steiner_logic.solve_steiner(nodes, edges, terminals)
-    return jsonify(steps)
+    engine = data.get('engine', 'closure')
+    if engine not in steiner_logic.ENGINES:
+        return jsonify({"error": f"不支援的引擎：{engine}"}), 400
+    encoding = data.get('encoding', 'full')
+    return steps_response(lambda: steiner_logic.iter_steiner(nodes, edges, terminals, engine=engine,
+                                                             encoding=encoding))
 
 @app.route('/api/hill_climbing/simple', methods=['POST'])
 def hill_climbing_simple():
@@ -172,70 +515,91 @@ def hill_climbing_simple():
     edges = data.get('edges', [])
     start = data.get('start')
     goal = data.get('goal')
-    steps = hill_climbing_logic.solve_simple_graph(nodes, edges, start, goal)
-    return jsonify(steps)
+    return steps_response(lambda: hill_climbing_logic.iter_simple_graph(nodes, edges, start, goal))
+
+# Per-request search budget: enough for any 8-puzzle (the hardest needs under
+# 10000 expansions), about a second on a hard 15-puzzle before giving up.
+# puzzle_search_logic.MAX_EXPANSIONS (1M) is only for bench_puzzle.py
+PUZZLE_MAX_EXPANSIONS = int(os.environ.get('PUZZLE_MAX_EXPANSIONS', 50000))
 
 @app.route('/api/hill_climbing/puzzle', methods=['POST'])
 def hill_climbing_puzzle():
     data = request.json
     start = data.get('start')
     goal = data.get('goal')
-    steps = hill_climbing_logic.solve_8puzzle(start, goal)
-    return jsonify(steps)
+    engine = data.get('engine', 'hill_climbing')
+    if engine == 'hill_climbing':
+        if not isinstance(start, list) or len(start) != 3:
+            return jsonify({"error": "爬山法只支援 3x3 的 8-puzzle"}), 400
+        encoding = data.get('encoding', 'full')
+        return steps_response(lambda: hill_climbing_logic.iter_8puzzle(start, goal, encoding=encoding))
+    if engine not in puzzle_search_logic.ENGINES:
+        return jsonify({"error": f"不支援的引擎：{engine}"}), 400
+    try:
+        puzzle_search_logic.check_boards(start, goal)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    return steps_response(lambda: puzzle_search_logic.iter_puzzle_search(
+        start, goal, engine=engine, max_expansions=PUZZLE_MAX_EXPANSIONS))
 
 @app.route('/api/hungarian', methods=['POST'])
 def hungarian_run():
     data = request.json
     matrix = data.get('matrix', [])
     problem_type = data.get('problem_type', 'min')
-    steps = hungarian_logic.solve_hungarian(matrix, problem_type)
-    return jsonify(steps)
+    return steps_response(lambda: hungarian_logic.iter_hungarian(matrix, problem_type))
+
+def dp_encoded(steps, encoding, table_keys, static_keys=()):
+    # encoding="delta": tables once, then only the changed cells (see dp_steps.py)
+    if encoding == 'delta':
+        return dp_steps.delta_encode(steps, table_keys, static_keys)
+    return steps
 
 @app.route('/api/rod_cutting/run', methods=['POST'])
 def rod_cutting_run():
     data = request.json
     n = data.get('n', 5)
     prices = data.get('prices', [])
-    steps = rod_cutting_logic.solve_rod_cutting(n, prices)
-    return jsonify(steps)
+    return steps_response(lambda: rod_cutting_logic.iter_rod_cutting(n, prices))
 
 @app.route('/api/matrix_chain/run', methods=['POST'])
 def matrix_chain_run():
     data = request.json
     dims = data.get('dims', [])
-    steps = matrix_chain_logic.solve_matrix_chain(dims)
-    return jsonify(steps)
+    encoding = data.get('encoding', 'full')
+    return steps_response(lambda: dp_encoded(matrix_chain_logic.iter_matrix_chain(dims), encoding,
+                                             ("s_table", "c_table"), ("dims",)))
 
 @app.route('/api/lcs/run', methods=['POST'])
 def lcs_run():
     data = request.json
     text1 = data.get('text1', "")
     text2 = data.get('text2', "")
-    steps = lcs_logic.solve_lcs(text1, text2)
-    return jsonify(steps)
+    encoding = data.get('encoding', 'full')
+    return steps_response(lambda: dp_encoded(lcs_logic.iter_lcs(text1, text2), encoding,
+                                             ("c_table", "b_table"), ("text1", "text2")))
 
 @app.route('/api/lis_proof', methods=['GET'])
 def lis_proof_run():
-    steps = lis_logic.generate_lis_steps()
-    return jsonify(steps)
+    seed = random_seed()
+    return steps_response(lambda: lis_logic.iter_lis_steps(seed=seed), seed=seed)
 
 @app.route('/api/max_overlap', methods=['GET'])
 def max_overlap_run():
-    steps = max_overlap_logic.generate_proof_steps()
-    return jsonify(steps)
+    seed = random_seed()
+    return steps_response(lambda: max_overlap_logic.iter_proof_steps(seed=seed), seed=seed)
 
 @app.route('/api/currency_exchange', methods=['GET'])
 def currency_exchange_run():
-    steps = currency_exchange_logic.generate_proof_steps()
-    return jsonify(steps)
+    return steps_response(lambda: currency_exchange_logic.iter_proof_steps())
 
 @app.route('/api/obst', methods=['POST'])
 def obst_run():
     data = request.json
     p = data.get('p', [])
     q = data.get('q', None)
-    result = obst_logic.solve_obst(p, q)
-    return jsonify(result)
+    q = obst_logic.normalize_q(p, q)
+    return steps_response(lambda: obst_logic.iter_obst(p, q), n=len(p), p=p, q=q)
 
 @app.route('/algorithm/lps')
 def lps_page():
@@ -245,8 +609,7 @@ def lps_page():
 def lps_run():
     data = request.json
     text = data.get('text', "")
-    steps = lps_logic.solve_lps(text)
-    return jsonify({"steps": steps})
+    return steps_response(lambda: lps_logic.iter_lps(text), wrap=True)
 
 @app.route('/algorithm/dag_longest_path')
 def dag_longest_path_page():
@@ -254,8 +617,7 @@ def dag_longest_path_page():
 
 @app.route('/api/dag_longest_path', methods=['GET'])
 def dag_longest_path_run():
-    steps = dag_longest_path_logic.generate_proof_steps()
-    return jsonify(steps)
+    return steps_response(lambda: dag_longest_path_logic.iter_proof_steps())
 
 @app.route('/algorithm/bitonic_tsp')
 def bitonic_tsp_page():
@@ -263,8 +625,7 @@ def bitonic_tsp_page():
 
 @app.route('/api/bitonic_tsp', methods=['GET'])
 def bitonic_tsp_run():
-    steps = bitonic_tsp_logic.solve_bitonic_tsp()
-    return jsonify(steps)
+    return steps_response(lambda: bitonic_tsp_logic.iter_bitonic_tsp())
 
 @app.route('/algorithm/printing_neatly')
 def printing_neatly_page():
@@ -275,8 +636,7 @@ def printing_neatly_solve():
     data = request.get_json()
     text = data.get('text', '')
     M = int(data.get('M', 20))
-    steps = printing_neatly_logic.solve_printing_neatly(text, M)
-    return jsonify(steps)
+    return steps_response(lambda: printing_neatly_logic.iter_printing_neatly(text, M))
 
 @app.route('/algorithm/med')
 def med_page():
@@ -287,8 +647,8 @@ def med_solve():
     data = request.get_json()
     s1 = data.get('s1', '')
     s2 = data.get('s2', '')
-    steps = med_logic.solve_med(s1, s2)
-    return jsonify(steps)
+    encoding = data.get('encoding', 'full')
+    return steps_response(lambda: dp_encoded(med_logic.iter_med(s1, s2), encoding, ("dp",)))
 
 @app.route('/algorithm/viterbi')
 def viterbi_page():
@@ -296,8 +656,7 @@ def viterbi_page():
 
 @app.route('/api/viterbi', methods=['POST'])
 def viterbi_solve():
-    steps = viterbi_logic.solve_viterbi()
-    return jsonify(steps)
+    return steps_response(lambda: viterbi_logic.iter_viterbi())
 
 @app.route('/algorithm/seam_carving')
 def seam_carving_page():
@@ -305,8 +664,7 @@ def seam_carving_page():
 
 @app.route('/api/seam_carving', methods=['POST'])
 def seam_carving_solve():
-    steps = seam_carving_logic.solve_seam_carving()
-    return jsonify(steps)
+    return steps_response(lambda: seam_carving_logic.iter_seam_carving())
 
 @app.route('/algorithm/inventory_planning')
 def inventory_planning_page():
@@ -314,8 +672,7 @@ def inventory_planning_page():
 
 @app.route('/api/inventory_planning', methods=['POST'])
 def inventory_planning_solve():
-    steps = inventory_planning_logic.solve_inventory_planning()
-    return jsonify(steps)
+    return steps_response(lambda: inventory_planning_logic.iter_inventory_planning())
 
 @app.route('/proof/spanning_tree')
 def spanning_tree_proof_page():
@@ -323,8 +680,7 @@ def spanning_tree_proof_page():
 
 @app.route('/api/spanning_tree_proof', methods=['POST'])
 def spanning_tree_proof_solve():
-    steps = spanning_tree_proof_logic.solve_spanning_tree_proof()
-    return jsonify(steps)
+    return steps_response(lambda: spanning_tree_proof_logic.iter_spanning_tree_proof())
 
 @app.route('/algorithm/bit_reversed_counter')
 def bit_reversed_counter_page():
@@ -332,8 +688,7 @@ def bit_reversed_counter_page():
 
 @app.route('/api/bit_reversed_counter', methods=['POST'])
 def bit_reversed_counter_solve():
-    steps = bit_reversed_counter_logic.solve_bit_reversed_counter()
-    return jsonify(steps)
+    return steps_response(lambda: bit_reversed_counter_logic.iter_bit_reversed_counter())
 
 @app.route('/proof/unique_mst')
 def unique_mst_page():
@@ -341,8 +696,7 @@ def unique_mst_page():
 
 @app.route('/api/unique_mst', methods=['POST'])
 def unique_mst_solve():
-    steps = unique_mst_logic.solve_unique_mst()
-    return jsonify(steps)
+    return steps_response(lambda: unique_mst_logic.iter_unique_mst())
 
 @app.route('/proof/min_weight_subset')
 def min_weight_subset_page():
@@ -350,8 +704,7 @@ def min_weight_subset_page():
 
 @app.route('/api/min_weight_subset', methods=['POST'])
 def min_weight_subset_solve():
-    steps = min_weight_subset_logic.solve_min_weight_subset()
-    return jsonify(steps)
+    return steps_response(lambda: min_weight_subset_logic.iter_min_weight_subset())
 
 @app.route('/proof/mst_subgraph')
 def mst_subgraph_page():
@@ -359,8 +712,7 @@ def mst_subgraph_page():
 
 @app.route('/api/mst_subgraph', methods=['POST'])
 def mst_subgraph_solve():
-    steps = mst_subgraph_logic.solve_mst_subgraph()
-    return jsonify(steps)
+    return steps_response(lambda: mst_subgraph_logic.iter_mst_subgraph())
 
 @app.route('/proof/mst_reduce_weight')
 def mst_reduce_weight_page():
@@ -368,8 +720,7 @@ def mst_reduce_weight_page():
 
 @app.route('/api/mst_reduce_weight', methods=['POST'])
 def mst_reduce_weight_solve():
-    steps = mst_reduce_weight_logic.solve_mst_reduce_weight()
-    return jsonify(steps)
+    return steps_response(lambda: mst_reduce_weight_logic.iter_mst_reduce_weight())
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
@@ -1,41 +1,39 @@
-def solve_bit_reversed_counter():
+def iter_bit_reversed_counter():
     k = 4
     n = 1 << k
-    steps = []
-    
     # Initial array
     arr = list(range(n))
     
-    steps.append({
+    yield {
         "type": "init",
         "k": k,
         "n": n,
         "arr": arr[:],
         "msg": f"初始化陣列 A，長度 n = 2^{k} = {n}。索引為 0 到 {n-1}。"
-    })
+    }
     
     # Bit-reversed counter value
     y = 0
     
     for x in range(n):
         # Current state
-        steps.append({
+        yield {
             "type": "check",
             "x": x,
             "y": y,
             "arr": arr[:],
             "msg": f"當前索引 x = {x} (二進位 {format(x, '0'+str(k)+'b')})。<br>Bit-reversed 計數器 y = {y} (二進位 {format(y, '0'+str(k)+'b')})。"
-        })
+        }
         
         if y > x:
             arr[x], arr[y] = arr[y], arr[x]
-            steps.append({
+            yield {
                 "type": "swap",
                 "x": x,
                 "y": y,
                 "arr": arr[:],
                 "msg": f"因為 y ({y}) > x ({x})，交換 A[{x}] 與 A[{y}]。"
-            })
+            }
         
         # Increment y (Bit-reversed increment)
         if x < n - 1:
@@ -62,20 +60,22 @@ def solve_bit_reversed_counter():
                 curr_scan_y |= (1 << i)
                 scan_steps.append({"bit": i, "action": "flip_to_1", "current_val": curr_scan_y})
             
-            steps.append({
+            yield {
                 "type": "increment",
                 "prev_y": y,
                 "new_y": curr_scan_y,
                 "scan_steps": scan_steps,
                 "msg": f"更新 y: 執行 BIT-REVERSED-INCREMENT。<br>從最高位 (Bit {k-1}) 往低位掃描，將連續的 1 翻轉為 0，直到遇到 0 將其翻轉為 1。"
-            })
+            }
             
             y = curr_scan_y
 
-    steps.append({
+    yield {
         "type": "finish",
         "arr": arr[:],
         "msg": "完成 Bit-reversal Permutation。"
-    })
+    }
             
-    return steps
+
+def solve_bit_reversed_counter():
+    return list(iter_bit_reversed_counter())
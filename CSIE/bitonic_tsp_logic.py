@@ -1,6 +1,6 @@
 import math
 
-def solve_bitonic_tsp():
+def iter_bitonic_tsp():
     # Define 7 points sorted by x-coordinate
     points = [
         {'id': 1, 'x': 50, 'y': 200, 'label': 'p1'},
@@ -24,12 +24,10 @@ def solve_bitonic_tsp():
     # To reconstruct the path: choice[i][j] stores 'k' when i = j-1
     choice = [[0] * (n + 1) for _ in range(n + 1)]
 
-    steps = []
-    
     # Base case: B[1, 2] = d(1, 2)
     B[1][2] = dist(1, 2)
     
-    steps.append({
+    yield {
         "msg": "初始化: B[1, 2] = d(p1, p2)",
         "points": points,
         "current_i": 1,
@@ -37,7 +35,7 @@ def solve_bitonic_tsp():
         "val": B[1][2],
         "highlight_edges": [{"from": 1, "to": 2}],
         "type": "init"
-    })
+    }
 
     # DP Loop
     for j in range(3, n + 1):
@@ -46,7 +44,7 @@ def solve_bitonic_tsp():
             val = B[i][j-1] + dist(j-1, j)
             B[i][j] = val
             
-            steps.append({
+            yield {
                 "msg": f"計算 B[{i}, {j}]。因為 i ({i}) < j-1 ({j-1})，這是「簡單延伸」情況。路徑直接從 p{j-1} 延伸到 p{j}。B[{i}, {j}] = B[{i}, {j-1}] + dist({j-1}, {j}) = {B[i][j-1]:.2f} + {dist(j-1, j):.2f} = {val:.2f}",
                 "points": points,
                 "current_i": i,
@@ -55,7 +53,7 @@ def solve_bitonic_tsp():
                 "highlight_edges": [{"from": j-1, "to": j}],
                 "type": "simple",
                 "prev_state": {"i": i, "j": j-1}
-            })
+            }
 
         # Case 2: i = j-1
         # B[j-1, j] = min_{1<=k<j-1} { B[k, j-1] + d(k, j) }
@@ -75,7 +73,7 @@ def solve_bitonic_tsp():
         B[j-1][j] = min_val
         choice[j-1][j] = best_k
         
-        steps.append({
+        yield {
             "msg": f"計算 B[{j-1}, {j}]。因為 i ({j-1}) = j-1 ({j-1})，這是「分岔點選擇」情況。我們必須嘗試所有可能的 k (1 <= k < {j-1}) 作為 p{j} 的前驅點，找出使總長度最小的 k。最佳選擇是 k=p{best_k}，成本為 {min_val:.2f}。",
             "points": points,
             "current_i": j-1,
@@ -84,7 +82,7 @@ def solve_bitonic_tsp():
             "highlight_edges": [{"from": best_k, "to": j}],
             "candidates": candidates,
             "type": "complex"
-        })
+        }
 
     # Final Step: Optimal Tour
     # Cost = B[n-1, n] + d(n-1, n)
@@ -119,7 +117,7 @@ def solve_bitonic_tsp():
     # Base case edge
     edges.append({"from": 1, "to": 2})
     
-    steps.append({
+    yield {
         "msg": f"計算完成。最佳 Bitonic Tour 總長度: {final_cost:.2f}",
         "points": points,
         "current_i": -1,
@@ -127,6 +125,8 @@ def solve_bitonic_tsp():
         "val": final_cost,
         "highlight_edges": edges,
         "type": "final"
-    })
+    }
     
-    return steps
+
+def solve_bitonic_tsp():
+    return list(iter_bitonic_tsp())
@@ -1,10 +1,8 @@
 
-def generate_proof_steps():
-    steps = []
-    
+def iter_proof_steps():
     # Phase 1: Optimal Substructure (ck = 0)
     # We use a conceptual graph here, not specific numbers
-    steps.append({
+    yield {
         "phase": "1",
         "step": 1,
         "title": "情況一：無手續費 (ck = 0)",
@@ -21,9 +19,9 @@ def generate_proof_steps():
             ]
         },
         "math": r"P^* : 1 \xrightarrow{P_1} i \xrightarrow{P_2} n"
-    })
+    }
 
-    steps.append({
+    yield {
         "phase": "1",
         "step": 2,
         "title": "最佳子結構證明",
@@ -41,9 +39,9 @@ def generate_proof_steps():
             ]
         },
         "math": r"\prod_{(u \to v) \in P'_1} r_{uv} > \prod_{(u \to v) \in P_1} r_{uv}"
-    })
+    }
 
-    steps.append({
+    yield {
         "phase": "1",
         "step": 3,
         "title": "矛盾產生",
@@ -60,7 +58,7 @@ def generate_proof_steps():
             ]
         },
         "math": r"\text{Total}(P'_1 + P_2) > \text{Total}(P^*) \implies \text{Contradiction!}"
-    })
+    }
 
     # Phase 2: Counterexample (ck arbitrary)
     # Graph: 1 -> 2 (2), 1 -> 3 (10), 3 -> 2 (10), 2 -> 4 (2)
@@ -82,17 +80,17 @@ def generate_proof_steps():
 
     commissions = "c1=0, c2=0, c3=200"
 
-    steps.append({
+    yield {
         "phase": "2",
         "step": 1,
         "title": "情況二：有手續費 (ck 任意)",
         "msg": f"考慮反例：手續費 {commissions}。目標是從 1 換到 4。",
         "graph": {"nodes": nodes, "edges": edges},
         "math": r"\text{Value} = d \cdot (\prod r_{ij}) - c_k"
-    })
+    }
 
     # Path P: 1->2->4
-    steps.append({
+    yield {
         "phase": "2",
         "step": 2,
         "title": "計算路徑 P: 1 -> 2 -> 4",
@@ -100,10 +98,10 @@ def generate_proof_steps():
         "graph": {"nodes": nodes, "edges": edges},
         "highlight_path": [1, 2, 4],
         "math": r"1 \cdot 2 \cdot 2 - c_2 = 4 - 0 = 4"
-    })
+    }
 
     # Path Q: 1->3->2->4
-    steps.append({
+    yield {
         "phase": "2",
         "step": 3,
         "title": "計算路徑 Q: 1 -> 3 -> 2 -> 4",
@@ -111,9 +109,9 @@ def generate_proof_steps():
         "graph": {"nodes": nodes, "edges": edges},
         "highlight_path": [1, 3, 2, 4],
         "math": r"1 \cdot 10 \cdot 10 \cdot 2 - c_3 = 200 - 200 = 0"
-    })
+    }
 
-    steps.append({
+    yield {
         "phase": "2",
         "step": 4,
         "title": "整體最佳解",
@@ -121,10 +119,10 @@ def generate_proof_steps():
         "graph": {"nodes": nodes, "edges": edges},
         "highlight_path": [1, 2, 4],
         "math": r"P^* = 1 \to 2 \to 4"
-    })
+    }
 
     # Subproblem 1->2
-    steps.append({
+    yield {
         "phase": "2",
         "step": 5,
         "title": "檢查子問題: 1 到 2",
@@ -132,9 +130,9 @@ def generate_proof_steps():
         "graph": {"nodes": nodes, "edges": edges},
         "highlight_path": [1, 2],
         "math": r"\text{Sub-path}: 1 \to 2"
-    })
+    }
 
-    steps.append({
+    yield {
         "phase": "2",
         "step": 6,
         "title": "子問題比較",
@@ -142,9 +140,9 @@ def generate_proof_steps():
         "graph": {"nodes": nodes, "edges": edges},
         "highlight_path": [1, 3, 2],
         "math": r"1 \to 2: 1 \cdot 2 - c_1 = 2 \\ 1 \to 3 \to 2: 1 \cdot 10 \cdot 10 - c_2 = 100"
-    })
+    }
 
-    steps.append({
+    yield {
         "phase": "2",
         "step": 7,
         "title": "結論",
@@ -152,6 +150,7 @@ def generate_proof_steps():
         "graph": {"nodes": nodes, "edges": edges},
         "highlight_path": [1, 3, 2],
         "math": r"\text{Optimal}(1 \to 2) \not\subset \text{Optimal}(1 \to 4)"
-    })
+    }
 
-    return steps
+def generate_proof_steps():
+    return list(iter_proof_steps())
@@ -0,0 +1,116 @@
+# Shared step contract for the DP visualisers (also used by Steiner and
+# hill climbing, which only need the lists below).
+#
+# knapsack_logic builds delta streams itself; the lcs / matrix_chain / med
+# routes take encoding="delta" and convert their full streams with
+# delta_encode (app.dp_encoded).
+#
+# A "full" step stream repeats every table in every step. A "delta" stream
+# sends the tables once in a keyframe and afterwards only the cells that
+# changed, so the client (static/js/step_codec.js) can rebuild any frame.
+#
+#   keyframe: {"v": 1, "kind": "key", "tables": {name: 2D list}, ...fields}
+#   delta:    {"kind": "delta", "cells": {name: [[r, c, value], ...]}, ...fields}
+#
+# Fields listed as static (e.g. items / capacity) only appear in the keyframe
+# and carry over to every later frame. A keyframe may name them in
+# {"static": [name, ...]}; its other fields then belong to that frame only.
+# Without "static", every keyframe field carries over.
+#
+# Collections that grow one element at a time (tree edges, search nodes) are
+# "lists": the keyframe may carry {"lists": {name: [...]}} and a delta may
+# carry {"pop": {name: count}} and {"append": {name: [...]}} (pop applies
+# first). Elements are never modified once sent, so a frame can share them.
+
+STEP_FORMAT_VERSION = 1
+
+
+def keyframe(tables, lists=None, static=None, **fields):
+    step = {"v": STEP_FORMAT_VERSION, "kind": "key",
+            "tables": {name: [row[:] for row in t] for name, t in tables.items()}}
+    if lists:
+        step["lists"] = {name: list(items) for name, items in lists.items()}
+    if static is not None:
+        step["static"] = list(static)
+    step.update(fields)
+    return step
+
+
+def delta(cells, append=None, pop=None, **fields):
+    step = {"kind": "delta", "cells": cells}
+    if pop:
+        step["pop"] = pop
+    if append:
+        step["append"] = append
+    step.update(fields)
+    return step
+
+
+def delta_encode(steps, table_keys, static_keys=()):
+    """把完整快照的步驟序列轉成 keyframe + delta 序列。
+
+    steps 可以是 list 或 generator；只保留上一個表格狀態，
+    所以記憶體用量與表格大小成正比，而不是步驟數 x 表格大小。
+    """
+    prev = None
+    for step in steps:
+        rest = {k: v for k, v in step.items() if k not in table_keys}
+        if prev is None:
+            prev = {name: [row[:] for row in step[name]] for name in table_keys}
+            yield keyframe(prev, static=static_keys, **rest)
+            continue
+
+        for k in static_keys:
+            rest.pop(k, None)
+        cells = {}
+        for name in table_keys:
+            changed = []
+            old_t = prev[name]
+            for r, row in enumerate(step[name]):
+                old_row = old_t[r]
+                if row == old_row:
+                    continue
+                for c, val in enumerate(row):
+                    if val != old_row[c]:
+                        changed.append([r, c, val])
+                        old_row[c] = val
+            if changed:
+                cells[name] = changed
+        yield delta(cells, **rest)
+
+
+def delta_decode(steps, static_keys=None):
+    """delta_encode 的反函式：逐步還原出完整快照 (與 step_codec.js 相同)。
+
+    static_keys 指定 keyframe 的哪些欄位要帶到之後的每一步；None 表示依
+    keyframe 的 "static"，keyframe 沒有 "static" 時全部帶到 (例如 knapsack 的 items / capacity)。
+    """
+    tables = None
+    lists = {}
+    static = {}
+    for step in steps:
+        if step.get("kind") == "key":
+            if step.get("v") != STEP_FORMAT_VERSION:
+                raise ValueError(f"unsupported step format version: {step.get('v')}")
+            tables = {name: [row[:] for row in t] for name, t in step["tables"].items()}
+            lists = {name: list(items) for name, items in step.get("lists", {}).items()}
+            fields = {k: v for k, v in step.items() if k not in ("v", "kind", "tables", "lists", "static")}
+            keys = step.get("static") if static_keys is None else static_keys
+            static = fields if keys is None else {k: fields[k] for k in keys if k in fields}
+            frame = dict(fields)
+        else:
+            for name, changed in step["cells"].items():
+                t = tables[name]
+                for r, c, val in changed:
+                    t[r][c] = val
+            for name, count in step.get("pop", {}).items():
+                del lists[name][len(lists[name]) - count:]
+            for name, items in step.get("append", {}).items():
+                lists[name].extend(items)
+            frame = dict(static)
+            frame.update((k, v) for k, v in step.items() if k not in ("kind", "cells", "pop", "append"))
+        for name, t in tables.items():
+            frame[name] = [row[:] for row in t]
+        for name, items in lists.items():
+            frame[name] = items[:]
+        yield frame
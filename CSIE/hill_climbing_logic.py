@@ -1,4 +1,4 @@
-import copy
+import dp_steps
 
 def get_misplaced_tiles_details(board, goal):
     count = 0
@@ -39,15 +39,48 @@ def get_neighbors(board):
 def board_to_tuple(board):
     return tuple(tuple(row) for row in board)
 
-def solve_8puzzle(start_board, goal_board):
-    steps = []
-    
+def iter_8puzzle(start_board, goal_board, encoding="full"):
+    # encoding: "delta" 搜尋樹的節點、已拜訪節點、堆疊都以 dp_steps 的 lists 傳送：
+    #           每一步只送新產生的節點與堆疊的 pop / push (格式見 dp_steps.py)；
+    #           "full" 每一步都是完整快照 (tree_nodes / stack)，
+    #           每個節點帶 status (stack / current / visited / goal)
+    steps = puzzle_steps(start_board, goal_board)
+    if encoding == "delta":
+        yield from steps
+    else:
+        yield from full_frames(steps)
+
+def full_frames(steps):
+    # Re-derive each node's status from the "visited" list of the delta stream.
+    # A node's status changes at most three times, so the tagged copies are
+    # cached and shared between frames instead of copied for every step.
+    tagged = {}
+    for frame in dp_steps.delta_decode(steps):
+        visited = set(frame.pop("visited"))
+        current = frame["current_node"]
+        nodes = []
+        for node in frame["tree_nodes"]:
+            if node["id"] == current and frame["phase"] in ("pop", "goal"):
+                status = "current" if frame["phase"] == "pop" else "goal"
+            elif node["id"] in visited:
+                status = "visited"
+            else:
+                status = "stack"
+            key = (node["id"], status)
+            if key not in tagged:
+                tagged[key] = dict(node, status=status)
+            nodes.append(tagged[key])
+        frame["tree_nodes"] = nodes
+        yield frame
+
+def puzzle_steps(start_board, goal_board):
     # Algorithm: Hill Climbing (DFS with Heuristic Ordering)
     # 1. Stack
     stack = []
     # State: (board, path, depth)
     # We need to track the tree structure for visualization
     # Node ID: unique string
+    # Nodes never change once sent; which ones are visited is the "visited" list
     
     node_counter = 0
     def get_id():
@@ -64,24 +97,16 @@ def solve_8puzzle(start_board, goal_board):
         "parent_id": None,
         "h": root_h,
         "h_detail": root_detail,
-        "depth": 0,
-        "status": "stack" # stack, visited, current
+        "depth": 0
     }
     
     stack.append(root_node)
     visited_boards = set()
     visited_boards.add(board_to_tuple(start_board))
     
-    # For visualization, we keep a list of all nodes generated so far
-    all_nodes = [root_node]
-    
-    steps.append({
-        "msg": f"初始狀態：將起始節點 {root_id} 加入堆疊。\n起始節點 h={root_h}。\n計算細節：{root_detail}",
-        "stack": [n["id"] for n in stack],
-        "current_node": None,
-        "tree_nodes": copy.deepcopy(all_nodes),
-        "phase": "init"
-    })
+    yield dp_steps.keyframe({}, lists={"tree_nodes": [root_node], "visited": [], "stack": [root_id]}, static=(),
+                            msg=f"初始狀態：將起始節點 {root_id} 加入堆疊。\n起始節點 h={root_h}。\n計算細節：{root_detail}",
+                            current_node=None, phase="init")
     
     max_steps = 100 # Safety break
     step_count = 0
@@ -89,48 +114,23 @@ def solve_8puzzle(start_board, goal_board):
     while stack:
         step_count += 1
         if step_count > max_steps:
-            steps.append({
-                "msg": "超過最大步數限制，停止搜尋。",
-                "stack": [],
-                "current_node": None,
-                "tree_nodes": copy.deepcopy(all_nodes),
-                "phase": "limit"
-            })
+            yield dp_steps.delta({}, pop={"stack": len(stack)},
+                                 msg="超過最大步數限制，停止搜尋。", current_node=None, phase="limit")
             break
             
         # 2. Check stack top
-        current = stack[-1] # Peek? Algorithm says "Visit and check... then remove".
-        # Usually "Visit" implies popping in DFS loop, or peeking.
-        # Step 3 says "Remove stack top". So Step 2 is Peek.
-        
-        # Let's Pop immediately to follow "Remove stack top" in Step 3, 
-        # but Step 2 says "Check if goal".
-        
+        # Step 3 says "Remove stack top", so pop immediately and check it here
         current = stack.pop()
-        current["status"] = "current"
         
         # Update visualization for "Processing node"
         h_detail_str = current.get('h_detail', '無')
-        steps.append({
-            "msg": f"從堆疊頂端取出節點 {current['id']} (h={current['h']})。\n計算細節：{h_detail_str}\n這是目前堆疊中 h 值最小（最優）的節點。",
-            "stack": [n["id"] for n in stack],
-            "current_node": current["id"],
-            "tree_nodes": copy.deepcopy(all_nodes),
-            "phase": "pop"
-        })
+        yield dp_steps.delta({}, pop={"stack": 1},
+                             msg=f"從堆疊頂端取出節點 {current['id']} (h={current['h']})。\n計算細節：{h_detail_str}\n這是目前堆疊中 h 值最小（最優）的節點。",
+                             current_node=current["id"], phase="pop")
         
         if current["h"] == 0: # Goal reached (h=0)
-            current["status"] = "goal"
-            steps.append({
-                "msg": f"找到目標節點！解答完成。",
-                "stack": [n["id"] for n in stack],
-                "current_node": current["id"],
-                "tree_nodes": copy.deepcopy(all_nodes),
-                "phase": "goal"
-            })
-            return steps
-        
-        current["status"] = "visited"
+            yield dp_steps.delta({}, msg=f"找到目標節點！解答完成。", current_node=current["id"], phase="goal")
+            return
         
         # 3. Expand
         neighbors = get_neighbors(current["board"])
@@ -147,20 +147,13 @@ def solve_8puzzle(start_board, goal_board):
                     "parent_id": current["id"],
                     "h": child_h,
                     "h_detail": child_detail,
-                    "depth": current["depth"] + 1,
-                    "status": "generated"
+                    "depth": current["depth"] + 1
                 }
                 children.append(child_node)
-                all_nodes.append(child_node)
         
         if not children:
-            steps.append({
-                "msg": "無可擴展的新子節點 (Dead End)。",
-                "stack": [n["id"] for n in stack],
-                "current_node": current["id"],
-                "tree_nodes": copy.deepcopy(all_nodes),
-                "phase": "dead_end"
-            })
+            yield dp_steps.delta({}, append={"visited": [current["id"]]},
+                                 msg="無可擴展的新子節點 (Dead End)。", current_node=current["id"], phase="dead_end")
             continue
             
         # Sort children by priority (Evaluation Function)
@@ -168,6 +161,7 @@ def solve_8puzzle(start_board, goal_board):
         # We want HIGH priority (LOW h value) to be at the TOP of the stack.
         # So we push High h -> Low h.
         # Sort by h descending.
+        tree_order = children[:]
         children.sort(key=lambda x: x["h"], reverse=True)
         
         msg_detail = f"擴展節點 {current['id']} 的子節點：\n"
@@ -182,7 +176,6 @@ def solve_8puzzle(start_board, goal_board):
         msg_detail += "加入堆疊順序 (h 大先入，h 小後入)：\n"
         
         for child in children:
-            child["status"] = "stack"
             stack.append(child)
             msg_detail += f"Push 節點 {child['id']} (h={child['h']})\n"
             
@@ -190,31 +183,21 @@ def solve_8puzzle(start_board, goal_board):
             best_child = children[-1]
             msg_detail += f"堆疊頂端現在是節點 {best_child['id']} (h={best_child['h']})，將是下一步拜訪對象。"
             
-        steps.append({
-            "msg": msg_detail,
-            "stack": [n["id"] for n in stack],
-            "current_node": current["id"],
-            "tree_nodes": copy.deepcopy(all_nodes),
-            "phase": "expand"
-        })
+        yield dp_steps.delta({}, append={"tree_nodes": tree_order, "visited": [current["id"]],
+                                         "stack": [child["id"] for child in children]},
+                             msg=msg_detail, current_node=current["id"], phase="expand")
         
     if not stack:
-        steps.append({
-            "msg": "堆疊為空，無解答。",
-            "stack": [],
-            "current_node": None,
-            "tree_nodes": copy.deepcopy(all_nodes),
-            "phase": "fail"
-        })
+        yield dp_steps.delta({}, msg="堆疊為空，無解答。", current_node=None, phase="fail")
         
-    return steps
 
-def solve_simple_graph(nodes, edges, start_id, goal_id):
+def solve_8puzzle(start_board, goal_board, encoding="full"):
+    return list(iter_8puzzle(start_board, goal_board, encoding=encoding))
+
+def iter_simple_graph(nodes, edges, start_id, goal_id):
     # nodes: list of {id, x, y, h}
     # edges: list of {u, v}
     
-    steps = []
-    
     # Build adj
     adj = {n['id']: [] for n in nodes}
     for e in edges:
@@ -236,47 +219,47 @@ def solve_simple_graph(nodes, edges, start_id, goal_id):
     # For simple graph, we just highlight the graph nodes.
     # We don't build a separate tree, we traverse the graph.
     
-    steps.append({
+    yield {
         "msg": f"初始狀態：將起始節點 {start_id} 加入堆疊。",
         "stack": [start_id],
         "current_node": None,
         "visited": list(visited),
         "phase": "init"
-    })
+    }
     
     while stack:
         current_id = stack.pop()
         
-        steps.append({
+        yield {
             "msg": f"從堆疊頂端取出節點 {current_id}。",
             "stack": list(stack),
             "current_node": current_id,
             "visited": list(visited),
             "phase": "pop"
-        })
+        }
         
         if current_id == goal_id:
-            steps.append({
+            yield {
                 "msg": f"找到目標節點 {goal_id}！",
                 "stack": list(stack),
                 "current_node": current_id,
                 "visited": list(visited),
                 "phase": "goal"
-            })
-            return steps
+            }
+            return
             
         # Expand
         neighbors = adj[current_id]
         unvisited_neighbors = [nid for nid in neighbors if nid not in visited]
         
         if not unvisited_neighbors:
-             steps.append({
+             yield {
                 "msg": "無未拜訪的鄰居。",
                 "stack": list(stack),
                 "current_node": current_id,
                 "visited": list(visited),
                 "phase": "dead_end"
-            })
+            }
              continue
              
         # Sort by heuristic (h value)
@@ -303,19 +286,21 @@ def solve_simple_graph(nodes, edges, start_id, goal_id):
             best_nid = unvisited_neighbors[-1]
             msg_detail += f"堆疊頂端：節點 {best_nid} (h={node_map[best_nid]['h']})。"
             
-        steps.append({
+        yield {
             "msg": msg_detail,
             "stack": list(stack),
             "current_node": current_id,
             "visited": list(visited),
             "phase": "expand"
-        })
+        }
         
-    steps.append({
+    yield {
         "msg": "堆疊為空，無解答。",
         "stack": [],
         "current_node": None,
         "visited": list(visited),
         "phase": "fail"
-    })
-    return steps
+    }
+
+def solve_simple_graph(nodes, edges, start_id, goal_id):
+    return list(iter_simple_graph(nodes, edges, start_id, goal_id))
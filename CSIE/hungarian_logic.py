@@ -1,25 +1,24 @@
 import copy
 
-def solve_hungarian(matrix, problem_type='min'):
-    steps = []
+def iter_hungarian(matrix, problem_type='min'):
     n = len(matrix)
     
     # Deep copy for processing
     m = [row[:] for row in matrix]
     original_m = [row[:] for row in matrix]
     
-    # Helper to record step
-    def add_step(phase, msg, current_m, lines=None, highlights=None, assignment=None):
-        steps.append({
+    # Helper to build a step
+    def make_step(phase, msg, current_m, lines=None, highlights=None, assignment=None):
+        return {
             "phase": phase,
             "msg": msg,
             "matrix": [row[:] for row in current_m],
             "lines": lines or {"rows": [], "cols": []},
             "highlights": highlights or [],
             "assignment": assignment or []
-        })
+        }
 
-    add_step("init", "初始矩陣 (Initial Matrix)", m)
+    yield make_step("init", "初始矩陣 (Initial Matrix)", m)
 
     # Step 0: Maximization Conversion (if needed)
     if problem_type == 'max':
@@ -29,7 +28,7 @@ def solve_hungarian(matrix, problem_type='min'):
             for c in range(n):
                 m[r][c] = max_val - m[r][c]
                 highlights.append({"r": r, "c": c, "type": "sub", "val": max_val})
-        add_step("max_convert", f"步驟 0: 最大化問題轉換 (Maximization Conversion)。\n找出最大值 {max_val}，將所有元素改為 {max_val} - 元素值。", m, highlights=highlights)
+        yield make_step("max_convert", f"步驟 0: 最大化問題轉換 (Maximization Conversion)。\n找出最大值 {max_val}，將所有元素改為 {max_val} - 元素值。", m, highlights=highlights)
 
     # Helper for Covering (Min Lines)
     def get_min_lines(current_m):
@@ -103,12 +102,12 @@ def solve_hungarian(matrix, problem_type='min'):
                 m[r][c] -= row_min
                 highlights.append({"r": r, "c": c, "type": "sub", "val": row_min})
     
-    add_step("row_reduce", "步驟 1: 列減法 (Row Reduction) - 每列減去該列最小值。", m, highlights=highlights)
+    yield make_step("row_reduce", "步驟 1: 列減法 (Row Reduction) - 每列減去該列最小值。", m, highlights=highlights)
 
     # Step 2: Check Lines (After Row Reduce)
     cov_rows, cov_cols, match_r_to_c = get_min_lines(m)
     num_lines = len(cov_rows) + len(cov_cols)
-    add_step("cover_row", f"步驟 2: 計算覆蓋 0 的最少直線數。\n直線數 = {num_lines} (Rows: {cov_rows}, Cols: {cov_cols})", 
+    yield make_step("cover_row", f"步驟 2: 計算覆蓋 0 的最少直線數。\n直線數 = {num_lines} (Rows: {cov_rows}, Cols: {cov_cols})", 
              m, lines={"rows": cov_rows, "cols": cov_cols})
 
     if num_lines == n:
@@ -119,9 +118,9 @@ def solve_hungarian(matrix, problem_type='min'):
             c = match_r_to_c[r]
             final_assignment.append({"r": r, "c": c})
             total_cost += original_m[r][c]
-        add_step("optimize", f"步驟 6: 直線數 ({num_lines}) 等於矩陣大小 ({n})，找到最佳解！\n{'最大' if problem_type == 'max' else '最小'}成本 = {total_cost}", 
+        yield make_step("optimize", f"步驟 6: 直線數 ({num_lines}) 等於矩陣大小 ({n})，找到最佳解！\n{'最大' if problem_type == 'max' else '最小'}成本 = {total_cost}", 
                  m, lines={"rows": cov_rows, "cols": cov_cols}, assignment=final_assignment)
-        return steps
+        return
 
     # Step 3: Column Reduction
     highlights = []
@@ -133,7 +132,7 @@ def solve_hungarian(matrix, problem_type='min'):
                 m[r][c] -= col_min
                 highlights.append({"r": r, "c": c, "type": "sub", "val": col_min})
     
-    add_step("col_reduce", "步驟 3: 行減法 (Column Reduction) - 每行減去該行最小值。", m, highlights=highlights)
+    yield make_step("col_reduce", "步驟 3: 行減法 (Column Reduction) - 每行減去該行最小值。", m, highlights=highlights)
 
     # Loop for covering and augmenting
     max_iterations = 20
@@ -146,7 +145,7 @@ def solve_hungarian(matrix, problem_type='min'):
         cov_rows, cov_cols, match_r_to_c = get_min_lines(m)
         num_lines = len(cov_rows) + len(cov_cols)
         
-        add_step("cover", f"步驟 4: 計算覆蓋 0 的最少直線數。\n直線數 = {num_lines} (Rows: {cov_rows}, Cols: {cov_cols})", 
+        yield make_step("cover", f"步驟 4: 計算覆蓋 0 的最少直線數。\n直線數 = {num_lines} (Rows: {cov_rows}, Cols: {cov_cols})", 
                  m, lines={"rows": cov_rows, "cols": cov_cols})
         
         if num_lines == n:
@@ -156,9 +155,9 @@ def solve_hungarian(matrix, problem_type='min'):
                 c = match_r_to_c[r]
                 final_assignment.append({"r": r, "c": c})
                 total_cost += original_m[r][c]
-            add_step("optimize", f"步驟 6: 直線數 ({num_lines}) 等於矩陣大小 ({n})，找到最佳解！\n{'最大' if problem_type == 'max' else '最小'}成本 = {total_cost}", 
+            yield make_step("optimize", f"步驟 6: 直線數 ({num_lines}) 等於矩陣大小 ({n})，找到最佳解！\n{'最大' if problem_type == 'max' else '最小'}成本 = {total_cost}", 
                      m, lines={"rows": cov_rows, "cols": cov_cols}, assignment=final_assignment)
-            return steps
+            return
         
         # Step 5: Augment
         min_val = float('inf')
@@ -185,6 +184,7 @@ def solve_hungarian(matrix, problem_type='min'):
                     m[r][c] += min_val
                     highlights.append({"r": r, "c": c, "type": "add_augment", "val": min_val})
                     
-        add_step("augment", msg_augment, m, lines={"rows": cov_rows, "cols": cov_cols}, highlights=highlights)
+        yield make_step("augment", msg_augment, m, lines={"rows": cov_rows, "cols": cov_cols}, highlights=highlights)
 
-    return steps
+def solve_hungarian(matrix, problem_type='min'):
+    return list(iter_hungarian(matrix, problem_type=problem_type))
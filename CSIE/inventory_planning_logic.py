@@ -1,6 +1,6 @@
 import math
 
-def solve_inventory_planning():
+def iter_inventory_planning():
     # Default parameters for demonstration
     n = 3
     m = 2 # Regular production capacity
@@ -13,8 +13,6 @@ def solve_inventory_planning():
 
     D = sum(demands)
     
-    steps = []
-    
     # DP table f[i][j]
     # i: 0 to n (months)
     # j: 0 to D (inventory)
@@ -25,7 +23,7 @@ def solve_inventory_planning():
     # Initialization
     f[0][0] = 0
     
-    steps.append({
+    yield {
         "type": "init",
         "n": n,
         "m": m,
@@ -34,18 +32,18 @@ def solve_inventory_planning():
         "D": D,
         "f": [[(val if val != float('inf') else None) for val in row] for row in f],
         "msg": f"初始化: $n={n}$ 個月, 總需求 $D={D}$。<br>正常產能 $m={m}$, 加班費 $c={c}$。<br>設定 $f[0][0]=0$，其餘為 $\\infty$。"
-    })
+    }
     
     for i in range(1, n + 1):
         d_i = demands[i-1]
         
-        steps.append({
+        yield {
             "type": "start_month",
             "i": i,
             "d_i": d_i,
             "f": [[(val if val != float('inf') else None) for val in row] for row in f],
             "msg": f"<strong>開始計算第 {i} 個月</strong> (需求 $d_{i} = {d_i}$)<br>計算所有可能的月底庫存 $j$ (0 到 {D})。"
-        })
+        }
         
         for j in range(D + 1):
             # Calculate f[i][j]
@@ -101,7 +99,7 @@ def solve_inventory_planning():
                 
                 msg = f"計算 $f[{i}][{j}]$:<br>" + "<br>".join(cand_msgs) + f"<br>→ 最小值: {best_cand['total_cost']} (來自 s={best_cand['s']})"
                 
-                steps.append({
+                yield {
                     "type": "calc_cell",
                     "i": i,
                     "j": j,
@@ -110,7 +108,7 @@ def solve_inventory_planning():
                     "best_s": best_cand['s'],
                     "f": [[(val if val != float('inf') else None) for val in row] for row in f],
                     "msg": msg
-                })
+                }
             else:
                 # No valid s leads to j
                 pass
@@ -136,20 +134,22 @@ def solve_inventory_planning():
         
         path_str = " -> ".join([f"M{p['month']}:造{p['production']}" for p in path])
         
-        steps.append({
+        yield {
             "type": "result",
             "min_cost": min_cost,
             "path": path,
             "f": [[(val if val != float('inf') else None) for val in row] for row in f],
             "msg": f"計算完成。第 {n} 個月月底庫存為 0 的最小成本為 {min_cost}。<br>生產計畫: {path_str}"
-        })
+        }
     else:
-        steps.append({
+        yield {
             "type": "result",
             "min_cost": -1,
             "path": [],
             "f": [[(val if val != float('inf') else None) for val in row] for row in f],
             "msg": "無法達成目標 (無解)。"
-        })
+        }
         
-    return steps
+
+def solve_inventory_planning():
+    return list(iter_inventory_planning())
@@ -1,21 +1,76 @@
+import itertools
 
-def solve_knapsack(capacity, items):
+import dp_steps
+
+try:
+    import numpy as np
+except ImportError:  # row mode falls back to plain lists
+    np = None
+
+TAKE_COLOR = "#aaffaa"
+PATH_COLOR = "#ffcc88"
+
+# Engines: "table" = the (n+1) x (capacity+1) DP table that the page draws,
+# "value" = min weight per total value, "pareto" = merged (weight, value) frontiers
+ENGINES = ("auto", "table", "value", "pareto")
+# Item multiplicity: "01" = at most once, "bounded" = at most item['count'] times,
+# "unbounded" = any number of times. Items may also carry a volume 'vol'
+VARIANTS = ("01", "bounded", "unbounded")
+TABLE_MAX_CELLS = 250000
+VALUE_MAX_CELLS = 50000000 if np is not None else 2000000
+FRONTIER_PREVIEW = 20  # pairs sent from each end of a frontier
+
+
+def pick_engine(capacity, items):
+    """依輸入大小選擇引擎：表格夠小就畫表格；總價值小於容量時用價值索引；否則用 Pareto 清單。"""
+    n = len(items)
+    if (n + 1) * (capacity + 1) <= TABLE_MAX_CELLS:
+        return "table"
+    total_value = sum(max(int(item['v']), 0) for item in items)
+    if total_value < capacity and n * (total_value + 1) <= VALUE_MAX_CELLS:
+        return "value"
+    return "pareto"
+
+
+def iter_knapsack(capacity, items, encoding="full", detail="cell", engine="table",
+                  variant="01", volume=None):
     # items: list of {'w': int, 'v': int}
     # dp table size: (len(items) + 1) x (capacity + 1)
+    # encoding: "full" 每一步附上整張表格；"delta" 只送一次表格，之後每步只送變動的格子
+    #           (格式見 dp_steps.py)
+    # detail: "cell" 每一格一步；"row" 每個物品一步 (整列一次算完，適合大表格)
+    # engine: 見 ENGINES；"value" / "pareto" 不建表格，每個物品一步，顯示 Pareto 前緣
+    # variant / volume: 見 VARIANTS；有限 / 無限個數或有體積上限 volume 時改用 iter_knapsack_variant
+    if variant != "01" or volume is not None:
+        yield from iter_knapsack_variant(capacity, items, variant, volume=volume, encoding=encoding)
+        return
+    if engine == "auto":
+        engine = pick_engine(capacity, items)
+    if engine in ("value", "pareto"):
+        yield from iter_knapsack_sparse(capacity, items, engine, encoding=encoding)
+        return
+    if detail == "row":
+        yield from iter_knapsack_rows(capacity, items, encoding=encoding)
+        return
     n = len(items)
     # Initialize DP table with 0
     dp = [[0] * (capacity + 1) for _ in range(n + 1)]
-    steps = []
-
-    # Initial empty state (all zeros)
-    steps.append({
-        "table": [row[:] for row in dp],
-        "items": items,
-        "capacity": capacity,
-        "current": None,
-        "highlights": [],
-        "msg": "初始化 DP 表格，大小為 (物品數+1) x (容量+1)，所有值設為 0。"
-    })
+    use_delta = (encoding == "delta")
+
+    init_msg = "初始化 DP 表格，大小為 (物品數+1) x (容量+1)，所有值設為 0。"
+    if use_delta:
+        yield dp_steps.keyframe({"table": dp}, items=items, capacity=capacity,
+                                       current=None, highlights=[], msg=init_msg)
+    else:
+        # Initial empty state (all zeros)
+        yield {
+            "table": [row[:] for row in dp],
+            "items": items,
+            "capacity": capacity,
+            "current": None,
+            "highlights": [],
+            "msg": init_msg
+        }
 
     for i in range(1, n + 1):
         item = items[i-1]
@@ -54,22 +109,551 @@ def solve_knapsack(capacity, items):
                     dp[i][w] = val_exclude
                     msg = f"物品 {i} (重:{w_item}, 價:{v_item}) 可以放入。\n比較：\n不放 = {val_exclude}\n放入 = {v_item} + dp[{i-1}][{w-w_item}] = {val_include}\n因為 {val_exclude} >= {val_include}，選擇不放。"
 
-            steps.append({
-                "table": [row[:] for row in dp], # Copy
-                "items": items,
-                "capacity": capacity,
-                "current": current_cell,
-                "highlights": highlight_cells,
-                "msg": msg
-            })
-            
-    steps.append({
-        "table": [row[:] for row in dp],
-        "items": items,
-        "capacity": capacity,
-        "current": None,
-        "highlights": [],
-        "msg": f"計算完成。最大價值為 {dp[n][capacity]}。"
-    })
+            if use_delta:
+                yield dp_steps.delta({"table": [[i, w, dp[i][w]]]}, current=current_cell,
+                                            highlights=highlight_cells, msg=msg)
+            else:
+                yield {
+                    "table": [row[:] for row in dp], # Copy
+                    "items": items,
+                    "capacity": capacity,
+                    "current": current_cell,
+                    "highlights": highlight_cells,
+                    "msg": msg
+                }
+
+    done_msg = f"計算完成。最大價值為 {dp[n][capacity]}。"
+    if use_delta:
+        yield dp_steps.delta({}, current=None, highlights=[], msg=done_msg)
+    else:
+        yield {
+            "table": [row[:] for row in dp],
+            "items": items,
+            "capacity": capacity,
+            "current": None,
+            "highlights": [],
+            "msg": done_msg
+        }
     
-    return steps
+
+def new_dp(caps):
+    """各維容量 caps 的滾動陣列，全部為 0：NumPy 多維陣列，沒有 NumPy 時是攤平的 list。"""
+    if np is not None:
+        return np.zeros(tuple(c + 1 for c in caps), dtype=np.int64)
+    size = 1
+    for c in caps:
+        size *= c + 1
+    return [0] * size
+
+
+def flat_strides(caps):
+    # Row-major strides, the same order as ndarray.ravel()
+    strides = [1] * len(caps)
+    for d in range(len(caps) - 2, -1, -1):
+        strides[d] = strides[d + 1] * (caps[d + 1] + 1)
+    return strides
+
+
+def dp_cell(dp, caps, cell):
+    if np is not None:
+        return int(dp[tuple(cell)])
+    return dp[sum(x * s for x, s in zip(cell, flat_strides(caps)))]
+
+
+def dp_row(dp, caps, weights, value, start=None):
+    """所有背包變形共用的核心：把一份 0/1 物品併入滾動陣列 dp (就地更新)。
+
+    weights 是各維的重量，start 是各維開始更新的位置 (預設等於重量)。
+    有 NumPy 時整個陣列是一次向量運算 max(prev, shift(prev, weights) + value)。
+    回傳 keep 位元集合：第 k 位 (dp 攤平後的索引) 為 1 表示該格放入了這份物品。
+    """
+    start = weights if start is None else start
+    if any(s > c for s, c in zip(start, caps)):
+        return 0
+    if np is not None:
+        dst = tuple(slice(s, None) for s in start)
+        src = tuple(slice(s - w, c + 1 - w) for s, w, c in zip(start, weights, caps))
+        include = dp[src] + value
+        take = np.zeros(dp.shape, dtype=bool)
+        take[dst] = include > dp[dst]
+        np.maximum(dp[dst], include, out=dp[dst])
+        return int.from_bytes(np.packbits(take.ravel(), bitorder="little").tobytes(), "little")
+    strides = flat_strides(caps)
+    offset = sum(w * st for w, st in zip(weights, strides))
+    prev = dp[:]
+    keep = 0
+    # The last dimension is contiguous in the flat list, walk it as one run
+    for cell in itertools.product(*(range(s, c + 1) for s, c in zip(start[:-1], caps[:-1]))):
+        base = sum(x * st for x, st in zip(cell, strides))
+        for k in range(base + start[-1], base + caps[-1] + 1):
+            val_include = prev[k - offset] + value
+            if val_include > prev[k]:
+                dp[k] = val_include
+                keep |= 1 << k
+    return keep
+
+
+def knapsack_rows(capacity, items):
+    """逐列計算 0/1 背包：每個物品 yield (row, keep)。
+
+    row 是 dp[i][0..capacity] (只保留一條滾動陣列，下一次 yield 前就會被改寫)，
+    keep 是一個整數位元集合，第 w 位為 1 表示 dp[i][w] 選擇放入物品 i。
+    """
+    caps = (capacity,)
+    dp = new_dp(caps)
+    for item in items:
+        w_item = int(item['w'])
+        # Column 0 always stays 0, as in the cell-by-cell loop
+        yield dp, dp_row(dp, caps, (w_item,), int(item['v']), start=(max(w_item, 1),))
+
+
+def chosen_items(capacity, items, keep):
+    """由 keep 位元矩陣往回推出選到的物品 (1-based 編號，由小到大) 與經過的格子。"""
+    chosen = []
+    path = []
+    w = capacity
+    for i in range(len(items), 0, -1):
+        path.append((i, w))
+        if keep[i - 1] >> w & 1:
+            chosen.append(i)
+            w -= int(items[i - 1]['w'])
+    path.append((0, w))
+    chosen.reverse()
+    return chosen, path
+
+
+def knapsack_best(capacity, items):
+    """不產生步驟，只回傳 (最大價值, 選到的物品編號)。記憶體只需一列 + 每列 capacity 位元。"""
+    keep = []
+    best = 0
+    for row, bits in knapsack_rows(capacity, items):
+        keep.append(bits)
+        best = int(row[capacity])
+    return best, chosen_items(capacity, items, keep)[0]
+
+
+def iter_knapsack_rows(capacity, items, encoding="full"):
+    """每個物品一步的版本：整列 dp[i][*] 一次算完，標出選擇放入的格子，最後回推選到的物品。"""
+    n = len(items)
+    use_delta = (encoding == "delta")
+    # Full snapshots need the whole table; delta steps only send the new row
+    table = [[0] * (capacity + 1) for _ in range(n + 1)] if not use_delta else None
+
+    def step(i, row, highlights, msg, **extra):
+        current = None if i is None else {"r": i, "c": None}
+        if use_delta:
+            # The row starts out as zeros, so only the non-zero cells change
+            cells = {"table": [[i, w, val] for w, val in enumerate(row) if val]} if row is not None else {}
+            return dp_steps.delta(cells, current=current, highlights=highlights, msg=msg, **extra)
+        if row is not None:
+            table[i] = row
+        return {"table": [r[:] for r in table], "items": items, "capacity": capacity,
+                "current": current, "highlights": highlights, "msg": msg, **extra}
+
+    init_msg = "初始化 DP 表格，大小為 (物品數+1) x (容量+1)，所有值設為 0。逐列計算：每一步算完一個物品。"
+    if use_delta:
+        yield dp_steps.keyframe({"table": [[0] * (capacity + 1) for _ in range(n + 1)]}, items=items,
+                                capacity=capacity, current=None, highlights=[], msg=init_msg)
+    else:
+        yield step(None, None, [], init_msg)
+
+    keep = []
+    for i, (row, bits) in enumerate(knapsack_rows(capacity, items), 1):
+        keep.append(bits)
+        w_item = int(items[i - 1]['w'])
+        v_item = int(items[i - 1]['v'])
+        taken = [w for w, b in enumerate(reversed(bin(bits)[2:])) if b == "1"] if bits else []
+        highlights = [{"r": i, "c": w, "color": TAKE_COLOR, "label": "放入"} for w in taken]
+        msg = (f"物品 {i} (重:{w_item}, 價:{v_item})：整列一次計算\n"
+               f"dp[{i}][w] = max(dp[{i-1}][w], dp[{i-1}][w-{w_item}] + {v_item})\n"
+               f"其中 {len(taken)} 格選擇放入 (綠色)。")
+        yield step(i, row.tolist() if np is not None else row[:], highlights, msg)
+
+    best = int(row[capacity]) if n else 0
+    chosen, path = chosen_items(capacity, items, keep)
+    highlights = [{"r": r, "c": c, "color": PATH_COLOR, "label": "回推"} for r, c in path]
+    names = "、".join(str(i) for i in chosen) or "無"
+    done_msg = f"計算完成。最大價值為 {best}。\n由 dp[{n}][{capacity}] 往回推，選到的物品：{names}。"
+    yield step(None, None, highlights, done_msg, chosen=chosen)
+
+
+def value_rows(capacity, items):
+    """以價值為索引的 DP：每個物品 yield (row, keep)。
+
+    row[v] 是湊出總價值 v 的最小重量 (超過 capacity 的一律記成 capacity + 1)，
+    keep 的第 v 位為 1 表示 row[v] 放入了這個物品。表格寬度是總價值而不是容量，
+    所以價值小、容量大 (例如上百萬) 時很省。
+    """
+    total_value = sum(max(int(item['v']), 0) for item in items)
+    over = capacity + 1
+    if np is not None:
+        dp = np.full(total_value + 1, over, dtype=np.int64)
+    else:
+        dp = [over] * (total_value + 1)
+    dp[0] = 0
+    for item in items:
+        w_item = int(item['w'])
+        v_item = int(item['v'])
+        if v_item <= 0 or w_item > capacity:
+            yield dp, 0
+            continue
+        if np is not None:
+            include = np.minimum(dp[:total_value + 1 - v_item] + w_item, over)
+            take = include < dp[v_item:]
+            np.minimum(dp[v_item:], include, out=dp[v_item:])
+            bits = np.packbits(take, bitorder="little").tobytes()
+            yield dp, int.from_bytes(bits, "little") << v_item
+        else:
+            prev = dp[:]
+            keep = 0
+            for v in range(v_item, total_value + 1):
+                w_include = min(prev[v - v_item] + w_item, over)
+                if w_include < prev[v]:
+                    dp[v] = w_include
+                    keep |= 1 << v
+            yield dp, keep
+
+
+def value_frontier(row, capacity):
+    """從價值索引的一列取出 Pareto 前緣 [(重量, 價值), ...] (重量、價值都遞增)。"""
+    # A value is on the frontier if it is lighter than every higher value
+    if np is not None:
+        lighter = np.append(np.minimum.accumulate(row[::-1])[::-1][1:], capacity + 1)
+        vs = np.nonzero(row < lighter)[0]
+        return list(zip(row[vs].tolist(), vs.tolist()))
+    frontier = []
+    lightest = capacity + 1
+    for v in range(len(row) - 1, -1, -1):
+        if row[v] < lightest:
+            frontier.append((row[v], v))
+            lightest = row[v]
+    frontier.reverse()
+    return frontier
+
+
+def value_traceback(items, keep, best):
+    """由 value_rows 的 keep 位元往回推出湊成價值 best 的物品 (1-based 編號)。"""
+    chosen = []
+    v = best
+    for i in range(len(items), 0, -1):
+        if keep[i - 1] >> v & 1:
+            chosen.append(i)
+            v -= int(items[i - 1]['v'])
+    chosen.reverse()
+    return chosen
+
+
+def pareto_rows(capacity, items):
+    """Pareto 清單版本：每個物品 yield 一次目前的前緣 [(重量, 價值, 選擇鏈), ...]。
+
+    前緣依重量遞增、價值嚴格遞增；新前緣 = 舊前緣 與 (舊前緣 + 物品) 合併後
+    刪掉被支配的組合 (較重卻沒有較高價值)。選擇鏈是 (物品編號, 上一個鏈) 的共用串列。
+    """
+    frontier = [(0, 0, None)]
+    for i, item in enumerate(items, 1):
+        w_item = int(item['w'])
+        v_item = int(item['v'])
+        shifted = [(w + w_item, v + v_item, (i, chain)) for w, v, chain in frontier
+                   if w + w_item <= capacity]
+        merged = []
+        a = b = 0
+        # Merge by weight; on equal weights the old pair goes first, so ties keep "not taken"
+        while a < len(frontier) or b < len(shifted):
+            if b == len(shifted) or (a < len(frontier) and frontier[a][0] <= shifted[b][0]):
+                pair = frontier[a]
+                a += 1
+            else:
+                pair = shifted[b]
+                b += 1
+            if not merged or pair[1] > merged[-1][1]:
+                if merged and merged[-1][0] == pair[0]:
+                    merged[-1] = pair
+                else:
+                    merged.append(pair)
+        frontier = merged
+        yield frontier
+
+
+def chain_items(chain):
+    chosen = []
+    while chain is not None:
+        i, chain = chain
+        chosen.append(i)
+    chosen.reverse()
+    return chosen
+
+
+def knapsack_best_sparse(capacity, items, engine="pareto"):
+    """不建 (n+1) x (capacity+1) 表格的解法，回傳 (最大價值, 選到的物品編號)。"""
+    frontier = [(0, 0, None)]
+    if engine == "value":
+        keep = []
+        for row, bits in value_rows(capacity, items):
+            keep.append(bits)
+        if items:
+            frontier = value_frontier(row, capacity)
+        best = frontier[-1][1]
+        return best, value_traceback(items, keep, best)
+    for frontier in pareto_rows(capacity, items):
+        pass
+    _, best, chain = frontier[-1]
+    return best, chain_items(chain)
+
+
+def iter_knapsack_sparse(capacity, items, engine, encoding="full"):
+    """value / pareto 引擎的步驟：每個物品一步，顯示目前的 Pareto 前緣 (重量, 價值)。
+
+    前緣太長時只送前後各 FRONTIER_PREVIEW 組，frontier_size 是完整長度。
+    """
+    use_delta = (encoding == "delta")
+    name = "價值索引 DP" if engine == "value" else "Pareto 清單"
+
+    def step(**fields):
+        if use_delta:
+            return dp_steps.delta({}, **fields)
+        return dict(fields, items=items, capacity=capacity, engine=engine)
+
+    def preview(frontier):
+        # Returns (head, tail): the whole frontier, or both ends of a long one
+        pairs = [[w, v] for w, v, *_ in frontier]
+        if len(pairs) > 2 * FRONTIER_PREVIEW:
+            return pairs[:FRONTIER_PREVIEW], pairs[-FRONTIER_PREVIEW:]
+        return pairs, []
+
+    init_msg = (f"容量 {capacity}，使用{name}：不建 (物品數+1) x (容量+1) 的表格，"
+                f"只保留互不支配的 (重量, 價值) 組合。一開始只有 (0, 0)。")
+    fields = dict(current=None, frontier=[[0, 0]], frontier_tail=[], frontier_size=1, msg=init_msg)
+    if use_delta:
+        yield dp_steps.keyframe({}, items=items, capacity=capacity, engine=engine, **fields)
+    else:
+        yield step(**fields)
+
+    frontier = [(0, 0, None)]
+    keep = []
+    if engine == "value":
+        rows = value_rows(capacity, items)
+    else:
+        rows = ((row, None) for row in pareto_rows(capacity, items))
+    for i, (row, bits) in enumerate(rows, 1):
+        if engine == "value":
+            keep.append(bits)
+            frontier = value_frontier(row, capacity)
+        else:
+            frontier = row
+        head, tail = preview(frontier)
+        w_item = int(items[i - 1]['w'])
+        v_item = int(items[i - 1]['v'])
+        msg = (f"物品 {i} (重:{w_item}, 價:{v_item})：把每個組合加上此物品後與原本的合併，\n"
+               f"刪掉較重但價值沒有較高的組合，剩下 {len(frontier)} 組。\n"
+               f"目前最佳：重量 {frontier[-1][0]}，價值 {frontier[-1][1]}。")
+        yield step(current={"r": i, "c": None}, frontier=head, frontier_tail=tail,
+                   frontier_size=len(frontier), msg=msg)
+
+    best = frontier[-1][1]
+    if engine == "value":
+        chosen = value_traceback(items, keep, best)
+    else:
+        chosen = chain_items(frontier[-1][2])
+    names = "、".join(str(i) for i in chosen) or "無"
+    done_msg = f"計算完成。最大價值為 {best}。\n選到的物品：{names}。"
+    yield step(current=None, best=best, chosen=chosen, msg=done_msg)
+
+
+def split_items(items, variant, caps, dims):
+    """把物品拆成 0/1 的「份」，讓所有變形都用 dp_row 計算。
+
+    有限個數 (bounded) 用二進位拆分：count 個拆成 1, 2, 4, ..., 剩下的，
+    任何 0..count 的個數都能由其中幾份湊出；無限個數 (unbounded) 的個數上限
+    是每一維 容量 // 重量 的最小值。回傳 [{"item", "count", 各維重量, "v"}, ...]。
+    """
+    pieces = []
+    for i, item in enumerate(items, 1):
+        try:
+            weights = [int(item.get(d, 0)) for d in dims]
+            value = int(item['v'])
+        except (TypeError, ValueError, KeyError, AttributeError):
+            raise ValueError(f"物品 {i} 的重量與價值必須是整數")
+        if any(w < 0 for w in weights):
+            raise ValueError(f"物品 {i} 的重量不能是負的")
+        if variant == "unbounded":
+            if value <= 0:
+                continue
+            if not any(weights):
+                raise ValueError(f"物品 {i} 沒有重量卻有價值，無限背包沒有最大值")
+            count = min(c // w for c, w in zip(caps, weights) if w > 0)
+        elif variant == "bounded":
+            try:
+                count = int(item.get('count', 1))
+            except (TypeError, ValueError):
+                raise ValueError(f"物品 {i} 的個數必須是整數")
+            if count < 0:
+                raise ValueError(f"物品 {i} 的個數不能是負的")
+        else:
+            count = 1
+        size = 1
+        while count > 0:
+            size = min(size, count)
+            piece = {"item": i, "count": size, "v": value * size}
+            piece.update((d, w * size) for d, w in zip(dims, weights))
+            pieces.append(piece)
+            count -= size
+            size *= 2
+    return pieces
+
+
+def variant_dims(capacity, volume):
+    if volume is None:
+        return (capacity,), ("w",)
+    return (capacity, volume), ("w", "vol")
+
+
+def variant_rows(caps, dims, pieces):
+    """每一份 yield (dp, keep)；dp 是共用的滾動陣列 (一維，或 重量 x 體積 的二維)。"""
+    dp = new_dp(caps)
+    for piece in pieces:
+        yield dp, dp_row(dp, caps, tuple(piece[d] for d in dims), piece['v'])
+
+
+def variant_traceback(caps, dims, pieces, keep):
+    """從滿容量的格子往回推，回傳 (選到的份的索引, 經過的格子)。"""
+    strides = flat_strides(caps)
+    cell = list(caps)
+    chosen = []
+    path = [tuple(cell)]
+    for p in range(len(pieces) - 1, -1, -1):
+        if keep[p] >> sum(x * st for x, st in zip(cell, strides)) & 1:
+            chosen.append(p)
+            cell = [x - pieces[p][d] for x, d in zip(cell, dims)]
+            path.append(tuple(cell))
+    chosen.reverse()
+    return chosen, path
+
+
+def piece_counts(pieces, chosen):
+    # {item number: how many copies} for the chosen pieces
+    counts = {}
+    for p in chosen:
+        counts[pieces[p]['item']] = counts.get(pieces[p]['item'], 0) + pieces[p]['count']
+    return dict(sorted(counts.items()))
+
+
+def knapsack_best_variant(capacity, items, variant="bounded", volume=None):
+    """不產生步驟的變形背包，回傳 (最大價值, {物品編號: 個數})。"""
+    caps, dims = variant_dims(capacity, volume)
+    pieces = split_items(items, variant, caps, dims)
+    keep = []
+    dp = new_dp(caps)
+    for dp, bits in variant_rows(caps, dims, pieces):
+        keep.append(bits)
+    chosen, _ = variant_traceback(caps, dims, pieces, keep)
+    return dp_cell(dp, caps, caps), piece_counts(pieces, chosen)
+
+
+def iter_knapsack_variant(capacity, items, variant, volume=None, encoding="full"):
+    """有限 / 無限個數、重量 + 體積 背包的步驟，每一份物品一步，欄位與 iter_knapsack_rows 相同。
+
+    只有重量時表格的每一列是一份物品 (和 0/1 逐列模式一樣)；有體積時表格是
+    重量 x 體積 的滾動陣列本身，每一步顯示加入一份物品後的整個陣列。
+    row_labels / col_labels 是表格的列、欄標題。
+    表格超過 TABLE_MAX_CELLS 格時不畫表格，只回傳一步結果 (見 iter_knapsack_variant_summary)。
+    """
+    caps, dims = variant_dims(capacity, volume)
+    pieces = split_items(items, variant, caps, dims)
+    use_delta = (encoding == "delta")
+    two_d = volume is not None
+
+    if two_d:
+        shape = (capacity + 1, volume + 1)
+    else:
+        shape = (len(pieces) + 1, capacity + 1)
+    if shape[0] * shape[1] > TABLE_MAX_CELLS:
+        yield from iter_knapsack_variant_summary(capacity, items, variant, volume, encoding, shape)
+        return
+    if two_d:
+        row_labels = [f"w={w}" for w in range(capacity + 1)]
+        col_labels = [str(u) for u in range(volume + 1)]
+    else:
+        row_labels = ["0"] + [f"{p['item']}×{p['count']} (w:{p['w']}, v:{p['v']})" for p in pieces]
+        col_labels = [str(w) for w in range(capacity + 1)]
+    # Full snapshots need the whole table; delta steps are built from the rolling dp alone
+    table = [[0] * shape[1] for _ in range(shape[0])] if not use_delta else None
+
+    def step(current, changed, highlights, msg, **extra):
+        if use_delta:
+            return dp_steps.delta({"table": changed} if changed else {}, current=current,
+                                  highlights=highlights, msg=msg, **extra)
+        for r, c, val in changed:
+            table[r][c] = val
+        return {"table": [r[:] for r in table], "items": items, "capacity": shape[1] - 1,
+                "row_labels": row_labels, "col_labels": col_labels,
+                "current": current, "highlights": highlights, "msg": msg, **extra}
+
+    kind = {"01": "0/1", "bounded": "有限個數", "unbounded": "無限個數"}[variant]
+    limit = f"容量 {capacity}" + (f"、體積上限 {volume}" if two_d else "")
+    init_msg = (f"{kind}背包，{limit}。把物品以二進位拆成 {len(pieces)} 份 (1, 2, 4, ... 個)，"
+                f"每一份當成 0/1 物品併入同一個滾動陣列。")
+    if use_delta:
+        yield dp_steps.keyframe({"table": [[0] * shape[1] for _ in range(shape[0])]},
+                                items=items, capacity=shape[1] - 1,
+                                row_labels=row_labels, col_labels=col_labels,
+                                current=None, highlights=[], msg=init_msg)
+    else:
+        yield step(None, [], [], init_msg)
+
+    keep = []
+    dp = new_dp(caps)
+    for p, (dp, bits) in enumerate(variant_rows(caps, dims, pieces), 1):
+        keep.append(bits)
+        flat = dp.ravel().tolist() if np is not None else dp
+        taken = [k for k, b in enumerate(reversed(bin(bits)[2:])) if b == "1"] if bits else []
+        piece = pieces[p - 1]
+        size = " + ".join(f"{d}:{piece[d]}" for d in dims)
+        msg = (f"第 {p} 份：物品 {piece['item']} × {piece['count']} ({size}, v:{piece['v']})\n"
+               f"dp[x] = max(dp[x], dp[x - 重量] + {piece['v']})，其中 {len(taken)} 格選擇放入 (綠色)。")
+        if two_d:
+            cells = [divmod(k, shape[1]) for k in taken]
+            changed = [[r, c, flat[r * shape[1] + c]] for r, c in cells]
+            current = None
+        else:
+            cells = [(p, k) for k in taken]
+            # New rows start as zeros: send the non-zero cells
+            changed = [[p, w, val] for w, val in enumerate(flat) if val]
+            current = {"r": p, "c": None}
+        highlights = [{"r": r, "c": c, "color": TAKE_COLOR, "label": "放入"} for r, c in cells]
+        yield step(current, changed, highlights, msg)
+
+    best = dp_cell(dp, caps, caps)
+    chosen, path = variant_traceback(caps, dims, pieces, keep)
+    counts = piece_counts(pieces, chosen)
+    if two_d:
+        cells = path
+    else:
+        cells = chosen_items(capacity, pieces, keep)[1]
+    highlights = [{"r": r, "c": c, "color": PATH_COLOR, "label": "回推"} for r, c in cells]
+    names = "、".join(f"物品 {i} × {n}" for i, n in counts.items()) or "無"
+    done_msg = f"計算完成。最大價值為 {best}。\n選到：{names}。"
+    yield step(None, [], highlights, done_msg,
+               chosen=[{"item": i, "count": n} for i, n in counts.items()])
+
+
+def iter_knapsack_variant_summary(capacity, items, variant, volume, encoding, shape):
+    """表格太大 (shape 超過 TABLE_MAX_CELLS 格) 的變形背包：不建表格，只送一步結果。
+
+    欄位與 value / pareto 引擎的最後一步相同 (best / chosen)，chosen 是 [{"item", "count"}, ...]。
+    """
+    best, counts = knapsack_best_variant(capacity, items, variant, volume=volume)
+    chosen = [{"item": i, "count": n} for i, n in counts.items()]
+    names = "、".join(f"物品 {i} × {n}" for i, n in counts.items()) or "無"
+    msg = (f"表格有 {shape[0]} x {shape[1]} 格，超過 {TABLE_MAX_CELLS} 格，不逐步顯示。\n"
+           f"計算完成。最大價值為 {best}。\n選到：{names}。")
+    fields = dict(current=None, best=best, chosen=chosen, msg=msg)
+    if encoding == "delta":
+        yield dp_steps.keyframe({}, items=items, capacity=capacity, **fields)
+    else:
+        yield dict(fields, items=items, capacity=capacity)
+
+
+def solve_knapsack(capacity, items, encoding="full", detail="cell", engine="table",
+                   variant="01", volume=None):
+    return list(iter_knapsack(capacity, items, encoding=encoding, detail=detail, engine=engine,
+                              variant=variant, volume=volume))
@@ -1,5 +1,5 @@
 
-def solve_lcs(text1, text2):
+def iter_lcs(text1, text2):
     m = len(text1)
     n = len(text2)
     
@@ -8,10 +8,8 @@ def solve_lcs(text1, text2):
     c = [[0] * (n + 1) for _ in range(m + 1)]
     b = [[""] * (n + 1) for _ in range(m + 1)]
     
-    steps = []
-    
     # Initial state
-    steps.append({
+    yield {
         "c_table": [row[:] for row in c],
         "b_table": [row[:] for row in b],
         "text1": text1,
@@ -19,7 +17,7 @@ def solve_lcs(text1, text2):
         "current": None,
         "highlights": [],
         "msg": "初始化 LCS 表格，大小為 (len(X)+1) x (len(Y)+1)，第一列與第一行設為 0。"
-    })
+    }
     
     for i in range(1, m + 1):
         for j in range(1, n + 1):
@@ -57,7 +55,7 @@ def solve_lcs(text1, text2):
                 highlight_cells.append({"r": i, "c": j-1, "color": "#aaddff", "label": f"c[{i}][{j-1}]"})
                 msg = f"X[{i}] ('{x_char}') != Y[{j}] ('{y_char}')\n比較上方與左方：\n上方 c[{i-1}][{j}] = {c[i-1][j]}\n左方 c[{i}][{j-1}] = {c[i][j-1]}\n取較大者 (左方)。\nc[{i}][{j}] = {val}，箭頭指向左方 (←)。"
 
-            steps.append({
+            yield {
                 "c_table": [row[:] for row in c],
                 "b_table": [row[:] for row in b],
                 "text1": text1,
@@ -65,7 +63,7 @@ def solve_lcs(text1, text2):
                 "current": current_cell,
                 "highlights": highlight_cells,
                 "msg": msg
-            })
+            }
 
     # Backtracking to find LCS path for final highlight
     path_highlights = []
@@ -84,7 +82,7 @@ def solve_lcs(text1, text2):
     
     lcs_result = "".join(reversed(lcs_str))
     
-    steps.append({
+    yield {
         "c_table": [row[:] for row in c],
         "b_table": [row[:] for row in b],
         "text1": text1,
@@ -92,6 +90,8 @@ def solve_lcs(text1, text2):
         "current": None,
         "highlights": path_highlights,
         "msg": f"計算完成。\nLCS 長度為 {c[m][n]}。\n最長共同子序列為: {lcs_result}"
-    })
+    }
     
-    return steps
+
+def solve_lcs(text1, text2):
+    return list(iter_lcs(text1, text2))
@@ -1,25 +1,25 @@
 
 import random
 
-def generate_lis_steps():
+def iter_lis_steps(seed=None):
+    # seed: 固定亂數種子，讓分頁讀取時可以重播出同一組資料
+    rng = random.Random(seed)
     # Generate random sequence
     n = 10
-    a = [random.randint(1, 50) for _ in range(n)]
-    
-    steps = []
+    a = [rng.randint(1, 50) for _ in range(n)]
     
     # tails[i] stores the index k of the smallest ending element of an increasing subsequence of length i+1.
     tails = [] # stores indices
     pred = [-1] * n
     
-    steps.append({
+    yield {
         "a": a,
         "tails_values": [],
         "tails_indices": [],
-        "pred": pred,
+        "pred": pred[:],
         "msg": "初始化: 產生隨機數列 a。準備 tails 陣列 (儲存 index) 與 pred 陣列 (儲存前驅 index)。",
         "highlight": {}
-    })
+    }
     
     for k in range(n):
         val = a[k]
@@ -46,14 +46,14 @@ def generate_lis_steps():
         else:
             msg_search += f"所有 tails 元素都 < {val} (或 tails 為空)。"
             
-        steps.append({
+        yield {
             "a": a,
             "tails_values": current_tails_values,
             "tails_indices": tails[:],
             "pred": pred[:],
             "msg": msg_search,
             "highlight": {"type": "search", "index": k, "target_idx": idx}
-        })
+        }
         
         # Update logic
         if idx < len(tails):
@@ -74,14 +74,14 @@ def generate_lis_steps():
         else:
             pred[k] = -1
             
-        steps.append({
+        yield {
             "a": a,
             "tails_values": [a[i] for i in tails],
             "tails_indices": tails[:],
             "pred": pred[:],
             "msg": msg_update,
             "highlight": {"type": "update", "index": k, "tail_idx": idx}
-        })
+        }
 
     # Backtracking
     if tails:
@@ -95,31 +95,33 @@ def generate_lis_steps():
         path.reverse()
         lis_vals = [a[i] for i in path]
         
-        steps.append({
+        yield {
             "a": a,
             "tails_values": [a[i] for i in tails],
             "tails_indices": tails[:],
             "pred": pred[:],
             "msg": f"掃描結束。LIS 長度為 {lis_len}。\n從 tails 最後一個元素 (index {tails[-1]}) 開始，沿著 pred 回朔找出完整序列。",
             "highlight": {"type": "backtrack", "path": path}
-        })
+        }
         
-        steps.append({
+        yield {
             "a": a,
             "tails_values": [a[i] for i in tails],
             "tails_indices": tails[:],
             "pred": pred[:],
             "msg": f"最終 LIS: {lis_vals}",
             "highlight": {"type": "final", "path": path}
-        })
+        }
     else:
-        steps.append({
+        yield {
             "a": a,
             "tails_values": [],
             "tails_indices": [],
             "pred": pred[:],
             "msg": "序列為空。",
             "highlight": {}
-        })
+        }
     
-    return steps
+
+def generate_lis_steps(seed=None):
+    return list(iter_lis_steps(seed=seed))
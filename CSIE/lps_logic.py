@@ -1,6 +1,6 @@
 import copy
 
-def solve_lps(text):
+def iter_lps(text):
     n = len(text)
     
     # L table for lengths
@@ -17,21 +17,19 @@ def solve_lps(text):
     
     path = [[""] * n for _ in range(n)]
     
-    steps = []
-    
     # Initial state: Base cases L[i][i] = 1
     for i in range(n):
         L[i][i] = 1
         path[i][i] = "base"
         
-    steps.append({
+    yield {
         "L_table": [row[:] for row in L],
         "path_table": [row[:] for row in path],
         "text": text,
         "current": None,
         "highlights": [{"r": i, "c": i, "color": "#e0e0e0", "label": "1"} for i in range(n)],
         "msg": "初始化: 對於所有 i，L[i, i] = 1 (單個字元本身就是長度為 1 的回文)。"
-    })
+    }
     
     # Fill the table
     # length is the length of substring
@@ -80,14 +78,14 @@ def solve_lps(text):
                     highlight_cells.append({"r": i, "c": j-1, "color": "#aaddff", "label": f"L[{i}][{j-1}]"})
                     msg = f"text[{i}] ('{char_i}') != text[{j}] ('{char_j}')\n比較 L[{i+1}, {j}] ({val_down}) 與 L[{i}, {j-1}] ({val_left})。\n取較大者 (左方)。\nL[{i}, {j}] = {val_left}。"
 
-            steps.append({
+            yield {
                 "L_table": [row[:] for row in L],
                 "path_table": [row[:] for row in path],
                 "text": text,
                 "current": current_cell,
                 "highlights": highlight_cells,
                 "msg": msg
-            })
+            }
 
     # Backtracking to find the palindrome
     # We start from L[0][n-1]
@@ -118,13 +116,15 @@ def solve_lps(text):
                 
     lps_result = "".join(left_part) + "".join(reversed(right_part))
     
-    steps.append({
+    yield {
         "L_table": [row[:] for row in L],
         "path_table": [row[:] for row in path],
         "text": text,
         "current": None,
         "highlights": path_highlights,
         "msg": f"計算完成。\nLPS 長度為 {L[0][n-1]}。\n最長回文子序列為: {lps_result}"
-    })
+    }
     
-    return steps
+
+def solve_lps(text):
+    return list(iter_lps(text))
@@ -1,4 +1,4 @@
-def solve_matrix_chain(dims):
+def iter_matrix_chain(dims):
     # dims: list of integers [p0, p1, ..., pn]
     # n is number of matrices
     n = len(dims) - 1
@@ -10,17 +10,15 @@ def solve_matrix_chain(dims):
     s_table = [[0] * (n + 1) for _ in range(n + 1)]
     c_table = [[0] * (n + 1) for _ in range(n + 1)]
     
-    steps = []
-    
     # Initial state
-    steps.append({
+    yield {
         "s_table": [row[:] for row in s_table],
         "c_table": [row[:] for row in c_table],
         "dims": dims,
         "msg": "初始化表格 s (最小運算量) 與 c (最佳切割點)。對角線 s[i][i] = 0。",
         "highlight": [],
         "parens": get_optimal_parens(c_table, 1, n) if n > 0 else ""
-    })
+    }
     
     # l is chain length
     for l in range(2, n + 1):
@@ -81,7 +79,7 @@ def solve_matrix_chain(dims):
                             safe_row.append(val)
                     safe_s.append(safe_row)
 
-                steps.append({
+                yield {
                     "s_table": safe_s,
                     "c_table": [row[:] for row in c_table],
                     "dims": dims,
@@ -91,7 +89,7 @@ def solve_matrix_chain(dims):
                     "msg": msg,
                     "highlight": highlight,
                     "parens": "計算中..."
-                })
+                }
                 
     # Prepare safe_s for reconstruction
     safe_s = []
@@ -118,25 +116,25 @@ def solve_matrix_chain(dims):
             return "".join([f"A{x}" for x in range(i, j+1)])
 
     # Initial Recon Step
-    steps.append({
+    yield {
         "s_table": safe_s,
         "c_table": [row[:] for row in c_table],
         "dims": dims,
         "msg": "DP 表格填寫完成。準備開始回溯最佳切割方式。",
         "highlight": [],
         "parens": generate_parens(1, n)
-    })
+    }
     
     def add_recon_steps(i, j):
         if i == j:
-            steps.append({
+            yield {
                 "s_table": safe_s,
                 "c_table": [row[:] for row in c_table],
                 "dims": dims,
                 "msg": f"子問題 A{i}: 長度為 1 (葉節點)。",
                 "highlight": [{"r": i, "c": j, "type": "leaf"}],
                 "parens": generate_parens(1, n)
-            })
+            }
             return
         
         k = c_table[i][j]
@@ -145,31 +143,33 @@ def solve_matrix_chain(dims):
         visited_splits.add((i, j))
         current_parens = generate_parens(1, n)
         
-        steps.append({
+        yield {
             "s_table": safe_s,
             "c_table": [row[:] for row in c_table],
             "dims": dims,
             "msg": f"查詢 c[{i}][{j}] = {k}。將 A{i}...A{j} 切割為 (A{i}...A{k}) 與 (A{k+1}...A{j})。",
             "highlight": [{"r": i, "c": j, "type": "split"}],
             "parens": current_parens
-        })
+        }
         
-        add_recon_steps(i, k)
-        add_recon_steps(k+1, j)
+        yield from add_recon_steps(i, k)
+        yield from add_recon_steps(k+1, j)
 
-    add_recon_steps(1, n)
+    yield from add_recon_steps(1, n)
 
     final_parens = generate_parens(1, n)
-    steps.append({
+    yield {
         "s_table": safe_s,
         "c_table": [row[:] for row in c_table],
         "dims": dims,
         "msg": f"回溯完成。最佳括號方式為: {final_parens}\n最小運算量為 {s_table[1][n]}。",
         "highlight": [{"r": 1, "c": n, "type": "final"}],
         "parens": final_parens
-    })
+    }
     
-    return steps
+
+def solve_matrix_chain(dims):
+    return list(iter_matrix_chain(dims))
 
 def get_optimal_parens(c, i, j):
     if i > j: return ""
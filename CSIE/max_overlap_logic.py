@@ -1,8 +1,8 @@
 import random
 
-def generate_proof_steps():
-    steps = []
-    
+def iter_proof_steps(seed=None):
+    # seed: 固定亂數種子，讓分頁讀取時可以重播出同一組資料
+    rng = random.Random(seed)
     # 1. Generate random intervals
     # We want a nice distribution to show overlaps
     intervals = []
@@ -11,8 +11,8 @@ def generate_proof_steps():
     max_val = 90
     
     for i in range(num_intervals):
-        start = random.randint(min_val, max_val - 20)
-        length = random.randint(10, 30)
+        start = rng.randint(min_val, max_val - 20)
+        length = rng.randint(10, 30)
         end = start + length
         intervals.append({"id": i, "start": start, "end": end, "y": i * 20 + 50}) # y for visualization layout
         
@@ -62,66 +62,68 @@ def generate_proof_steps():
     # Let's assume standard interpretation: at point x, how many intervals [s, e] contain x.
     
     # Step 1: Show Intervals
-    steps.append({
+    yield {
         "phase": "1",
         "msg": "1. 把所有區間畫在數線上。想像「同時覆蓋某一點的區間數量」是一個隨 $x$ 變化的函數 $f(x)$。",
         "intervals": intervals,
         "endpoints": [],
         "fx": [],
         "highlight": None
-    })
+    }
     
     # Step 2: Show Endpoints
-    steps.append({
+    yield {
         "phase": "2",
         "msg": "2. 標記出所有區間的端點 (Start/End)。函數 $f(x)$ 只會在這些端點處改變。",
         "intervals": intervals,
         "endpoints": endpoints,
         "fx": [],
         "highlight": None
-    })
+    }
     
     # Step 3: Show f(x)
-    steps.append({
+    yield {
         "phase": "3",
         "msg": "3. 繪製 $f(x)$。在任何兩個相鄰端點之間，覆蓋的區間集合完全一樣，所以 $f(x)$ 是常數。",
         "intervals": intervals,
         "endpoints": endpoints,
         "fx": fx_segments,
         "highlight": None
-    })
+    }
     
     # Step 4: Highlight Max Regions
     max_segments = [s for s in fx_segments if s["count"] == max_overlap]
-    steps.append({
+    yield {
         "phase": "4",
         "msg": f"4. 尋找最大值。圖中 $f(x)$ 的最大值為 {max_overlap}。它出現在某些區間段 $(e_j, e_{{j+1}})$ 上。",
         "intervals": intervals,
         "endpoints": endpoints,
         "fx": fx_segments,
         "highlight": {"type": "max_regions", "segments": max_segments}
-    })
+    }
     
     # Step 5: Move to Endpoint
     # Pick one max segment
     target_seg = max_segments[0]
-    steps.append({
+    yield {
         "phase": "5",
         "msg": f"5. 若最大值出現在開區間 $(e_j, e_{{j+1}})$ 裡，我們可以把點往左移到端點 $e_j$ (或往右移到 $e_{{j+1}}$)。",
         "intervals": intervals,
         "endpoints": endpoints,
         "fx": fx_segments,
         "highlight": {"type": "move_demo", "segment": target_seg}
-    })
+    }
     
     # Step 6: Conclusion
-    steps.append({
+    yield {
         "phase": "6",
         "msg": "6. 移動過程中，覆蓋它的區間集合完全沒變，所以 $f(e_j)$ 也同樣是最大值。因此，一定存在一個最大重疊點，它是某個區間的端點。",
         "intervals": intervals,
         "endpoints": endpoints,
         "fx": fx_segments,
         "highlight": {"type": "conclusion", "points": [target_seg["start"], target_seg["end"]]}
-    })
+    }
     
-    return steps
+
+def generate_proof_steps(seed=None):
+    return list(iter_proof_steps(seed=seed))
@@ -1,4 +1,4 @@
-def solve_med(s1, s2):
+def iter_med(s1, s2):
     n = len(s1)
     m = len(s2)
     
@@ -7,8 +7,6 @@ def solve_med(s1, s2):
     # op[i][j] stores the operation used: 'M' (Match), 'S' (Sub), 'I' (Insert), 'D' (Delete)
     op = [[None] * (m + 1) for _ in range(n + 1)]
     
-    steps = []
-    
     # Initialization
     for i in range(n + 1):
         dp[i][0] = i
@@ -19,13 +17,13 @@ def solve_med(s1, s2):
         
     op[0][0] = 'M' # Base case
         
-    steps.append({
+    yield {
         "type": "init",
         "dp": [row[:] for row in dp],
         "s1": s1,
         "s2": s2,
         "msg": f"初始化 DP 表格。<br>列 (Row) 代表字串 1: '{s1}'<br>行 (Col) 代表字串 2: '{s2}'<br>Base cases: dp[i][0] = i (全刪除), dp[0][j] = j (全插入)"
-    })
+    }
     
     # Fill DP table
     for i in range(1, n + 1):
@@ -65,7 +63,7 @@ def solve_med(s1, s2):
                 
             op[i][j] = current_op
             
-            steps.append({
+            yield {
                 "type": "step",
                 "i": i,
                 "j": j,
@@ -73,7 +71,7 @@ def solve_med(s1, s2):
                 "op": current_op,
                 "dp": [row[:] for row in dp], # Snapshot
                 "msg": f"<strong>計算 dp[{i}][{j}] (s1[{i-1}]='{char1}', s2[{j-1}]='{char2}')</strong><br>{explanation}"
-            })
+            }
             
     # Backtrack to find path
     path = []
@@ -107,12 +105,14 @@ def solve_med(s1, s2):
     path.append((0, 0))
     path.reverse()
     
-    steps.append({
+    yield {
         "type": "finish",
         "dp": dp,
         "path": path,
         "result": dp[n][m],
         "msg": f"計算完成。最小編輯距離為 {dp[n][m]}。<br>紅色路徑顯示最佳操作序列。"
-    })
+    }
     
-    return steps
+
+def solve_med(s1, s2):
+    return list(iter_med(s1, s2))
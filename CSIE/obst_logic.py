@@ -1,10 +1,6 @@
 import copy
 
-def solve_obst(p, q=None):
-    """
-    Solves the Optimal Binary Search Tree problem.
-    Returns a list of steps for visualization.
-    """
+def normalize_q(p, q=None):
     n = len(p)
     
     if q is None:
@@ -15,6 +11,15 @@ def solve_obst(p, q=None):
         q.extend([0.0] * (n + 1 - len(q)))
     else:
         q = q[:n+1]
+    return q
+
+def iter_obst(p, q=None):
+    """
+    Solves the Optimal Binary Search Tree problem.
+    Yields the steps for visualization one at a time.
+    """
+    n = len(p)
+    q = normalize_q(p, q)
 
     # Tables: size (n+2) x (n+2) to handle 1-based indexing and boundary conditions easily
     # e[i][j]: expected cost of searching an optimal binary search tree containing keys ki...kj
@@ -25,8 +30,6 @@ def solve_obst(p, q=None):
     w = [[0.0] * (n + 2) for _ in range(n + 2)]
     root = [[0] * (n + 2) for _ in range(n + 2)]
     
-    steps = []
-    
     # Helper to create a step object
     def create_step(msg, highlight=[], tree_nodes=[], tree_edges=[]):
         # Convert inf to -1 for JSON serialization safety
@@ -57,7 +60,7 @@ def solve_obst(p, q=None):
         e[i][i-1] = val
         w[i][i-1] = val
     
-    steps.append(create_step("初始化表格。設定邊界條件 e[i, i-1] = q[i-1] 與 w[i, i-1] = q[i-1]。", []))
+    yield create_step("初始化表格。設定邊界條件 e[i, i-1] = q[i-1] 與 w[i, i-1] = q[i-1]。", [])
 
     # Main DP Loop
     for l in range(1, n + 1): # length l
@@ -92,13 +95,13 @@ def solve_obst(p, q=None):
                 else:
                     msg += f"\n未小於當前最小值 {e[i][j]:.2f}，不更新。"
                 
-                steps.append(create_step(msg, highlight))
+                yield create_step(msg, highlight)
 
     # Reconstruction Phase
     current_tree_nodes = []
     current_tree_edges = []
     
-    steps.append(create_step("DP 表格計算完成。開始依照 root 表格建構最佳二元搜尋樹。", [], current_tree_nodes, current_tree_edges))
+    yield create_step("DP 表格計算完成。開始依照 root 表格建構最佳二元搜尋樹。", [], current_tree_nodes, current_tree_edges)
     
     # Recursive function to build tree and generate steps
     # We need to pass the current state of nodes/edges to the step
@@ -132,7 +135,7 @@ def solve_obst(p, q=None):
             msg = f"區間 [{i}, {j}] 為空 (i > j)。\n建立虛擬節點 d{dummy_idx} (機率 {q[dummy_idx]})。"
             # Highlight the boundary condition cell e[i][j] (which is e[j+1][j] effectively? No, it's e[i][i-1])
             # In our table, we access e[i][j].
-            steps.append(create_step(msg, [{"r": i, "c": j, "type": "leaf"}], current_tree_nodes, current_tree_edges))
+            yield create_step(msg, [{"r": i, "c": j, "type": "leaf"}], current_tree_nodes, current_tree_edges)
             return
 
         r = root[i][j]
@@ -153,25 +156,27 @@ def solve_obst(p, q=None):
             current_tree_edges.append({"from": parent_id, "to": node_id})
             
         msg = f"查詢 root[{i}][{j}] = {r}。\n區間 [{i}, {j}] 的根節點為 k{r}。"
-        steps.append(create_step(msg, [{"r": i, "c": j, "type": "root"}], current_tree_nodes, current_tree_edges))
+        yield create_step(msg, [{"r": i, "c": j, "type": "root"}], current_tree_nodes, current_tree_edges)
         
         # Recurse Left
         # Left child range: [i, r-1]
-        build_tree(i, r - 1, node_id, x_range_start, mid_x, y + 60, level + 1)
+        yield from build_tree(i, r - 1, node_id, x_range_start, mid_x, y + 60, level + 1)
         
         # Recurse Right
         # Right child range: [r+1, j]
-        build_tree(r + 1, j, node_id, mid_x, x_range_end, y + 60, level + 1)
+        yield from build_tree(r + 1, j, node_id, mid_x, x_range_end, y + 60, level + 1)
 
     # Start building tree
     # Assume canvas width is roughly 800-1000 units for calculation
-    build_tree(1, n, None, 0, 1000, 50, 0)
-    
-    steps.append(create_step("最佳二元搜尋樹建構完成。", [], current_tree_nodes, current_tree_edges))
+    yield from build_tree(1, n, None, 0, 1000, 50, 0)
     
+    yield create_step("最佳二元搜尋樹建構完成。", [], current_tree_nodes, current_tree_edges)
+
+def solve_obst(p, q=None):
+    q = normalize_q(p, q)
     return {
-        "n": n,
+        "n": len(p),
         "p": p,
         "q": q,
-        "steps": steps
+        "steps": list(iter_obst(p, q))
     }
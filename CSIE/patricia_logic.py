@@ -1,42 +1,148 @@
 import json
+import time
+from collections import OrderedDict
+
+from tracer import QUIET, Tracer
 
 # ------------- Patricia 結構（Weiss） -------------
 
 class Node:
-    __slots__ = ("key", "bit", "left", "right")
-    def __init__(self, key: str, bit: int):
+    __slots__ = ("key", "bit", "left", "right", "layout")
+    def __init__(self, key: "BitKey", bit: int):
         self.key = key
         self.bit = bit
         self.left = self
         self.right = self
+        # 只有 Head 會用到：push_step 的版面快取 (LayoutCache)
+        self.layout = None
 
-def bit_at(s: str, i: int) -> int:
-    if i == 0: return 0 
-    idx = i - 1
-    return 0 if idx < 0 or idx >= len(s) else (1 if s[idx] == "1" else 0)
+    def __getstate__(self):
+        # The layout cache is rebuilt on demand, don't pickle it with the session
+        return (None, {"key": self.key, "bit": self.bit, "left": self.left,
+                       "right": self.right, "layout": None})
 
-def first_diff_bit(a: str, b: str) -> int:
-    m = max(len(a), len(b))
-    for i in range(m):
-        if bit_at(a, i+1) != bit_at(b, i+1):
-            return i + 1
-    return m + 1
+class BitKey:
+    """以 int 存放的 0/1 鍵值：value 是位元內容 (第 1 位是最高位)，length 是位數。
 
-# ------------- 產生步驟（快照） -------------
+    "0101" 這類字串只在進出 API 時轉換；str(key) 會還原成原本的字串。
+    """
+    __slots__ = ("value", "length")
 
-def push_step(steps, head, msg, highlight_node=None, highlight_bit=None, key=None, check_idx=None, canvas_msg=None):
-    # We will process the snapshot immediately to include layout info
-    snap = export_tree(head, highlight_node)
-    layout_data = get_draw_data(snap)
-    
-    steps.append({
-        "layout": layout_data,
-        "msg": msg,
-        "hl_bit": highlight_bit,
-        "key": key,
-        "check_idx": check_idx,
-        "canvas_msg": canvas_msg
-    })
+    def __init__(self, value: int, length: int):
+        self.value = value
+        self.length = length
+
+    @classmethod
+    def from_str(cls, s: str):
+        return cls(int(s, 2) if s else 0, len(s))
+
+    def __str__(self):
+        return format(self.value, "0%db" % self.length) if self.length else ""
+
+    def __repr__(self):
+        return "BitKey(%r)" % str(self)
+
+    def __format__(self, spec):
+        return format(str(self), spec)
+
+    def __len__(self):
+        return self.length
+
+    def __eq__(self, other):
+        if not isinstance(other, BitKey):
+            return NotImplemented
+        return self.value == other.value and self.length == other.length
+
+    def __hash__(self):
+        return hash((self.value, self.length))
+
+def as_key(key):
+    return key if isinstance(key, BitKey) else BitKey.from_str(key)
+
+def valid_key(key) -> bool:
+    if isinstance(key, BitKey):
+        return key.length > 0
+    # strip() leaves something behind only if there is a character other than 0/1
+    return isinstance(key, str) and bool(key) and not key.strip("01")
+
+def bit_at(k: BitKey, i: int) -> int:
+    """鍵值的第 i 位 (1-based)。
+
+    第 length + 1 位是結束標記，讀作 1，再之後都是 0：
+    等於把每個鍵值看成「位元 + 1 + 000…」，這樣 "1" 與 "10" 這種
+    只差在尾端 0 的巢狀前綴也會在某一位分岔，不會互相蓋掉。
+    """
+    if i <= 0:
+        return 0
+    if i > k.length:
+        return 1 if i == k.length + 1 else 0
+    return (k.value >> (k.length - i)) & 1
+
+def first_diff_bit(a: BitKey, b: BitKey) -> int:
+    # Append the end marker (see bit_at) and pad the shorter key with 0s,
+    # then the highest set bit of a ^ b is the first difference
+    m = max(a.length, b.length) + 1
+    diff = (((a.value << 1) | 1) << (m - a.length - 1)) ^ (((b.value << 1) | 1) << (m - b.length - 1))
+    if not diff:
+        return m + 1
+    return m - diff.bit_length() + 1
+
+def count_keys(head):
+    """樹中的鍵值數 (= 節點數)，只沿著真子樹走。"""
+    if head.key is None:
+        return 0
+    count = 0
+    stack = [head]
+    while stack:
+        x = stack.pop()
+        count += 1
+        if x.left.bit > x.bit:
+            stack.append(x.left)
+        if x.right.bit > x.bit:
+            stack.append(x.right)
+    return count
+
+def validate(head):
+    """檢查 Patricia 的結構，回傳發現的問題 (空串列 = 正確)。
+
+    Head 的 bit 為 0 且左指標指向自己；真子節點的 bit 嚴格變大，每個節點只被一條真邊走到；
+    子樹裡每個鍵值在父節點的 bit 上與走的方向一致；執行緒只指回樹中的節點，
+    而且沿著每個鍵值搜尋都會停在它自己。
+    """
+    if head.key is None:
+        return []
+    errors = []
+    if head.bit != 0 or head.left is not head:
+        errors.append("Head 的 bit 必須是 0，左指標指向自己")
+    seen = {head}
+    keys = set()
+    order = []
+    # (node, [(bit, side)] the real edges above it took)
+    stack = [(head, ())]
+    while stack:
+        x, above = stack.pop()
+        order.append(x)
+        if x.key in keys:
+            errors.append(f"鍵值「{x.key}」出現兩次")
+        keys.add(x.key)
+        for b, side in above:
+            if bit_at(x.key, b) != side:
+                errors.append(f"鍵值「{x.key}」在 bit {b} 走錯方向")
+                break
+        for c, side in ((x.left, 1), (x.right, 0)):
+            if c.bit > x.bit:
+                if c in seen:
+                    errors.append(f"節點「{c.key}」被兩個父節點當成真子節點")
+                    continue
+                seen.add(c)
+                stack.append((c, above + ((x.bit, side),)))
+    for x in order:
+        for c in (x.left, x.right):
+            if c.bit <= x.bit and c not in seen:
+                errors.append(f"節點「{x.key}」的執行緒指向樹外的節點")
+        if pat_search(head, x.key) is not x:
+            errors.append(f"搜尋「{x.key}」沒有停在它自己")
+    return errors
 
 # ------------- 匯出 + 版面計算 -------------
 
@@ -46,7 +152,10 @@ LEVEL_GAP = 95
 BASE_HGAP = 160
 
 def export_tree(head, highlight_node=None):
-    """輸出可視樹（只含真子樹）＋每個節點的兩個指標終點，用來畫執行緒弧線。"""
+    """輸出可視樹（只含真子樹）＋每個節點的兩個指標終點，用來畫執行緒弧線。
+
+    全部以明確的堆疊走訪，長鍵值造成的深樹也不會碰到遞迴上限。
+    """
     if head.key is None:
         return {"head_has_root": False}
 
@@ -54,36 +163,33 @@ def export_tree(head, highlight_node=None):
     
     id_of = {}
     rev = {}
-    counter = [0]
 
     def gid(x):
         if x in id_of: return id_of[x]
-        i = counter[0]; counter[0] += 1
+        i = len(id_of)
         id_of[x] = i; rev[i] = x
         return i
 
-    def touch(x):
+    # Preorder ids (node, left subtree, right subtree), as the recursive walk gave
+    order = []
+    stack = [root]
+    while stack:
+        x = stack.pop()
         gid(x)
-        # Left
-        if x.left and x.left.bit > x.bit:
-            touch(x.left)
-        # Right
+        order.append(x)
         if x.right and x.right.bit > x.bit:
-            touch(x.right)
-            
-    touch(root)
-
-    def pack(x):
-        d = {"id": gid(x), "key": x.key, "bit": x.bit,
-             "ptrL": gid(x.left) if x.left else None, 
-             "ptrR": gid(x.right) if x.right else None,
-             "left": None, "right": None}
-        
+            stack.append(x.right)
         if x.left and x.left.bit > x.bit:
-            d["left"] = pack(x.left)
-        if x.right and x.right.bit > x.bit:
-            d["right"] = pack(x.right)
-        return d
+            stack.append(x.left)
+
+    # Pack children before parents (reverse preorder), then link them up
+    packed = {}
+    for x in reversed(order):
+        packed[x] = {"id": gid(x), "key": str(x.key), "bit": x.bit,
+                     "ptrL": gid(x.left) if x.left else None,
+                     "ptrR": gid(x.right) if x.right else None,
+                     "left": packed[x.left] if x.left and x.left.bit > x.bit else None,
+                     "right": packed[x.right] if x.right and x.right.bit > x.bit else None}
 
     hl_id = id_of.get(highlight_node) if highlight_node else None
 
@@ -91,7 +197,7 @@ def export_tree(head, highlight_node=None):
         "head_has_root": True, 
         "root_id": gid(root), 
         "nodes": rev, 
-        "tree": pack(root),
+        "tree": packed[root],
         "highlight_id": hl_id
     }
 
@@ -101,19 +207,18 @@ def layout_tree(snap):
     pos = {}
     xcur = MARGIN_X
 
-    def inorder(n, depth):
-        nonlocal xcur
-        if n["left"]:
-            inorder(n["left"], depth + 1)
-        
-        # Visit
+    # In-order: x from the visit order, y from the depth
+    stack = []
+    n, depth = snap["tree"], 0
+    while stack or n:
+        while n:
+            stack.append((n, depth))
+            n, depth = n["left"], depth + 1
+        n, depth = stack.pop()
         pos[n["id"]] = (xcur, MARGIN_Y + depth * LEVEL_GAP)
         xcur += BASE_HGAP
-        
-        if n["right"]:
-            inorder(n["right"], depth + 1)
+        n, depth = n["right"], depth + 1
 
-    inorder(snap["tree"], 0)
     return pos, snap["root_id"]
 
 def get_draw_data(snap):
@@ -133,38 +238,26 @@ def get_draw_data(snap):
             "id": nid,
             "x": x,
             "y": y,
-            "key": node_obj.key,
+            "key": str(node_obj.key),
             "bit": node_obj.bit,
             "is_highlight": (nid == hl_id)
         })
         
-    # Build Edges
+    # Build Edges: a node's L edge, its left subtree, then its R edge and right subtree
     edges_list = []
-    
-    def traverse_edges(n_struct):
-        nid = n_struct["id"]
-        
-        # Left
-        lid = n_struct["ptrL"]
-        if lid is not None:
-            is_thread = True
-            if n_struct["left"]: is_thread = False # It's a real child
-            edges_list.append({
-                "u": nid, "v": lid, "type": "L", "is_thread": is_thread
-            })
-            if not is_thread: traverse_edges(n_struct["left"])
-            
-        # Right
-        rid = n_struct["ptrR"]
-        if rid is not None:
-            is_thread = True
-            if n_struct["right"]: is_thread = False
+    stack = [(snap["tree"], "L")]
+    while stack:
+        n_struct, side = stack.pop()
+        ptr = n_struct["ptrL"] if side == "L" else n_struct["ptrR"]
+        child = n_struct["left"] if side == "L" else n_struct["right"]
+        if side == "L":
+            stack.append((n_struct, "R"))
+        if ptr is not None:
             edges_list.append({
-                "u": nid, "v": rid, "type": "R", "is_thread": is_thread
+                "u": n_struct["id"], "v": ptr, "type": side, "is_thread": not child
             })
-            if not is_thread: traverse_edges(n_struct["right"])
-
-    traverse_edges(snap["tree"])
+            if child:
+                stack.append((child, "L"))
     
     return {
         "nodes": nodes_list,
@@ -173,67 +266,350 @@ def get_draw_data(snap):
         "highlight_id": hl_id
     }
 
+# ------------- 產生步驟（快照） -------------
+
 def push_step(steps, head, msg, highlight_node=None, highlight_bit=None, key=None, check_idx=None, canvas_msg=None):
-    # We will process the snapshot immediately to include layout info
-    snap = export_tree(head, highlight_node)
-    layout_data = get_draw_data(snap)
+    # 版面資料來自 Head 上的快取，結構沒變的步驟 (例如搜尋過程) 不用重算
+    layout_data = layout_cache(head).draw_data(head, highlight_node)
     
     steps.append({
         "layout": layout_data,
         "msg": msg,
         "hl_bit": highlight_bit,
-        "key": key,
+        "key": None if key is None else str(key),
         "check_idx": check_idx,
         "canvas_msg": canvas_msg
     })
 
+# ------------- 增量版面快取 -------------
+
+def is_real_child(parent, child):
+    return child.bit > parent.bit
+
+class LayoutCache:
+    """push_step 用的版面快取，掛在 Head 上。
+
+    order 是可視樹的中序節點串列，x 座標 = 在 order 中的位置 (pos)；depth 決定 y。
+    插入 / 刪除只拼接一個節點時呼叫 spliced_in / spliced_out 就地更新，
+    其他變動 (改 key、改執行緒) 呼叫 changed(節點...)，無法就地處理的情況 invalidate()
+    整棵重排。下次快照只重做位置有變的節點 (dirty_from 之後) 與 dirty 節點的紀錄，
+    其餘沿用；結構沒變時整份 nodes / edges 都直接沿用。
+    """
+
+    def __init__(self):
+        self.order = None       # None = 下次快照時整棵重排
+        self.shared = False     # 有節點被兩個父節點當成真子節點 (刪除後的損壞樹)，不做增量更新
+        self.depth = {}
+        self.pos = {}           # node -> 在 order 中的位置
+        self.dirty_from = 0     # order 從這個位置開始有變動 (之後的 x 座標都要重算)
+        self.dirty = set()      # 深度、key 或指標變了的節點
+        self.ids = {}           # node -> 穩定的 id
+        self.next_id = 0
+        self.node_recs = {}     # node -> (key, 繪圖紀錄)，is_highlight 固定為 False
+        self.edge_recs = {}     # node -> (left, right, [邊紀錄])
+        self.version = 0
+        self.built_version = -1
+        self.nodes_list = []
+        self.edges_list = []
+        self.index = {}         # node -> nodes_list 中的位置
+
+    def invalidate(self):
+        self.order = None
+        self.version += 1
+
+    def changed(self, *nodes):
+        # nodes: the nodes whose key or pointers changed
+        self.version += 1
+        self.dirty.update(nodes)
+
+    def place(self, i, z):
+        self.order.insert(i, z)
+        self.renumber(i)
+
+    def renumber(self, i):
+        # Everything from i on moved by one place
+        order = self.order
+        pos = self.pos
+        for k in range(i, len(order)):
+            pos[order[k]] = k
+        self.dirty_from = min(self.dirty_from, i)
+
+    def node_id(self, node):
+        nid = self.ids.get(node)
+        if nid is None:
+            nid = self.ids[node] = self.next_id
+            self.next_id += 1
+        return nid
+
+    def subtree(self, x):
+        stack = [x]
+        while stack:
+            n = stack.pop()
+            yield n
+            if is_real_child(n, n.left):
+                stack.append(n.left)
+            if is_real_child(n, n.right):
+                stack.append(n.right)
+
+    def spliced_in(self, p, z):
+        """z 剛被接在 p 與 p 原本的子節點 x 之間。"""
+        if self.order is None:
+            return
+        x = z.right if z.left is z else z.left
+        # 樹已損壞時 (x 不在目前的樹上，或 x 變成孤立節點) 直接重建
+        orphaned = not is_real_child(z, x) and x is not z and x.bit > p.bit and x in self.depth
+        if self.shared or orphaned or (is_real_child(z, x) and x not in self.depth):
+            self.invalidate()
+            return
+        moved = list(self.subtree(x)) if is_real_child(z, x) else []
+        if any(n not in self.depth for n in moved):
+            self.invalidate()
+            return
+        self.version += 1
+        if moved:
+            # x 的子樹整個下移一層，z 排在它的最左邊之前或最右邊之後
+            for n in moved:
+                self.depth[n] += 1
+            self.dirty.update(moved)
+            anchor = x
+            if z.left is z:
+                while is_real_child(anchor, anchor.left):
+                    anchor = anchor.left
+                self.place(self.pos[anchor], z)
+            else:
+                while is_real_child(anchor, anchor.right):
+                    anchor = anchor.right
+                self.place(self.pos[anchor] + 1, z)
+        else:
+            # x 是執行緒：z 成為 p 的新葉節點，緊鄰在 p 的左邊或右邊
+            i = self.pos[p]
+            self.place(i if p.left is z else i + 1, z)
+        self.depth[z] = self.depth[p] + 1
+        self.dirty.add(p)
+
+    def spliced_out(self, u, parent, child):
+        """parent 原本指向 u 的指標已改指 child，u 從樹中移除。"""
+        if self.order is None:
+            return
+        moved = list(self.subtree(child)) if is_real_child(parent, child) else []
+        # u 另一側若還掛著真子節點，那棵子樹會變成孤立的 (損壞樹)
+        orphans = [c for c in (u.left, u.right) if c is not child and c is not u and is_real_child(u, c)]
+        if (self.shared or orphans or parent.left is u or parent.right is u or
+                not is_real_child(parent, u) or u not in self.depth or
+                any(n not in self.depth for n in moved)):
+            self.invalidate()
+            return
+        self.version += 1
+        i = self.pos.pop(u)
+        del self.order[i]
+        self.renumber(i)
+        del self.depth[u]
+        self.node_recs.pop(u, None)
+        self.edge_recs.pop(u, None)
+        for n in moved:
+            self.depth[n] -= 1
+        self.dirty.update(moved)
+        self.dirty.add(parent)
+
+    def rebuild_order(self, head):
+        # Iterative in-order walk over the real (non-thread) children
+        order = []
+        depth = {}
+        shared = False
+        stack = [(head, 0, False)]
+        while stack:
+            n, d, visited = stack.pop()
+            if visited:
+                order.append(n)
+                continue
+            shared = shared or n in depth
+            depth[n] = d
+            if is_real_child(n, n.right):
+                stack.append((n.right, d + 1, False))
+            stack.append((n, d, True))
+            if is_real_child(n, n.left):
+                stack.append((n.left, d + 1, False))
+        self.order = order
+        self.pos = {n: i for i, n in enumerate(order)}
+        self.depth = depth
+        self.shared = shared
+
+    def node_rec(self, n, i):
+        x = MARGIN_X + i * BASE_HGAP
+        y = MARGIN_Y + self.depth[n] * LEVEL_GAP
+        key, rec = self.node_recs.get(n, (None, None))
+        if rec is None or key is not n.key:
+            rec = {"id": self.node_id(n), "x": x, "y": y, "key": str(n.key), "bit": n.bit,
+                   "is_highlight": False}
+        elif rec["x"] != x or rec["y"] != y:
+            # Only moved (the shifted tail after a splice): copy, older steps keep the old one
+            rec = dict(rec, x=x, y=y)
+        else:
+            return rec
+        self.node_recs[n] = (n.key, rec)
+        return rec
+
+    def edge_pair(self, n):
+        cached = self.edge_recs.get(n)
+        if cached is None or cached[0] is not n.left or cached[1] is not n.right:
+            nid = self.node_id(n)
+            cached = self.edge_recs[n] = (n.left, n.right, [
+                {"u": nid, "v": self.node_id(n.left), "type": "L",
+                 "is_thread": not is_real_child(n, n.left)},
+                {"u": nid, "v": self.node_id(n.right), "type": "R",
+                 "is_thread": not is_real_child(n, n.right)},
+            ])
+        return cached[2]
+
+    def rebuild_records(self):
+        nodes_list = []
+        edges_list = []
+        index = {}
+        for i, n in enumerate(self.order):
+            rec = self.node_rec(n, i)
+            if n in index:
+                # Same node reached twice (damaged tree): keep one record, last position wins
+                nodes_list[index[n]] = rec
+            else:
+                index[n] = len(nodes_list)
+                nodes_list.append(rec)
+            edges_list.extend(self.edge_pair(n))
+
+        self.node_recs = {n: self.node_recs[n] for n in index}
+        self.edge_recs = {n: self.edge_recs[n] for n in index}
+        # Forget ids of nodes that left the tree (unless a thread still points at them)
+        live = set(index)
+        for n, (l, r, _) in self.edge_recs.items():
+            live.add(l)
+            live.add(r)
+        for n in [n for n in self.ids if n not in live]:
+            del self.ids[n]
+
+        self.finish(nodes_list, edges_list, index)
+
+    def update_records(self):
+        """只重做 dirty_from 之後 (x 座標變了) 與 dirty 節點的紀錄。
+
+        步驟會保留舊的 nodes / edges 串列，所以複製一份再改，不動原本的。
+        spliced_out 移除的節點 id 留到下次整棵重建時才清掉。
+        """
+        order = self.order
+        start = min(self.dirty_from, len(order))
+        nodes_list = self.nodes_list[:start]
+        edges_list = self.edges_list[:2 * start]
+        for n in self.dirty:
+            i = self.pos.get(n)
+            if i is not None and i < start:
+                nodes_list[i] = self.node_rec(n, i)
+                edges_list[2 * i:2 * i + 2] = self.edge_pair(n)
+        for i in range(start, len(order)):
+            n = order[i]
+            nodes_list.append(self.node_rec(n, i))
+            edges_list.extend(self.edge_pair(n))
+        self.finish(nodes_list, edges_list, self.pos)
+
+    def finish(self, nodes_list, edges_list, index):
+        self.nodes_list = nodes_list
+        self.edges_list = edges_list
+        self.index = index
+        self.dirty_from = len(self.order)
+        self.dirty = set()
+        self.built_version = self.version
+
+    def draw_data(self, head, highlight_node=None):
+        if head.key is None:
+            return {"nodes": [], "edges": [], "root_id": None}
+        if self.order is None:
+            self.rebuild_order(head)
+            self.rebuild_records()
+        elif self.built_version != self.version:
+            # A damaged tree lists some node twice, so positions are not list indexes there
+            if self.shared:
+                self.rebuild_records()
+            else:
+                self.update_records()
+
+        nodes = self.nodes_list
+        hl_id = None
+        i = self.index.get(highlight_node) if highlight_node is not None else None
+        if i is not None:
+            nodes = list(nodes)
+            nodes[i] = dict(nodes[i], is_highlight=True)
+            hl_id = nodes[i]["id"]
+        return {
+            "nodes": nodes,
+            "edges": self.edges_list,
+            "root_id": self.node_recs[head][1]["id"],
+            "highlight_id": hl_id
+        }
+
+def layout_cache(head):
+    cache = head.layout
+    if cache is None:
+        cache = head.layout = LayoutCache()
+    return cache
+
+def skip_layout(head, tracer):
+    # A quiet run draws nothing: drop the layout cache up front so the splice
+    # updates below are no-ops; the next recorded step rebuilds it once
+    if not tracer.enabled and head.layout is not None:
+        head.layout.invalidate()
+
+def recorder():
+    """記錄步驟的 tracer (tracer.steps 就是要回傳給前端的步驟)。"""
+    return Tracer(push_step)
 
 # ------------- 搜尋 / 插入 / 刪除 -------------
 
-def pat_search(head: Node, key: str, steps=None, explain=False):
+def pat_search(head: Node, key: BitKey, tracer=QUIET, path=None):
+    # path (list) collects the nodes walked through real edges, head first,
+    # so callers get each node's physical parent without scanning the tree
     p = head
+    if path is not None:
+        path.append(p)
     b = bit_at(key, head.bit)
     # Modified Logic: 0 -> Right, 1 -> Left (Based on User Feedback)
     x = head.left if b else head.right
     
-    if steps is not None and explain:
+    if tracer.enabled:
         direction = "左 (1)" if b == 1 else "右 (0)"
-        push_step(steps, head, f"【搜尋開始】\n目標：{key}\n起點：Head ({head.key}, bit={head.bit})\n"
-                               f"檢查 Key 第 {head.bit} 位元：'{b}' → 往{direction}走。",
-                  highlight_node=head, highlight_bit=head.bit, key=key, check_idx=head.bit,
-                  canvas_msg=f"檢查 Bit {head.bit}：{b} → 往{direction[0]}")
+        tracer.step(head, f"【搜尋開始】\n目標：{key}\n起點：Head ({head.key}, bit={head.bit})\n"
+                          f"檢查 Key 第 {head.bit} 位元：'{b}' → 往{direction}走。",
+                    highlight_node=head, highlight_bit=head.bit, key=key, check_idx=head.bit,
+                    canvas_msg=f"檢查 Bit {head.bit}：{b} → 往{direction[0]}")
     
     while p.bit < x.bit:
         p = x
+        if path is not None:
+            path.append(p)
         idx = x.bit
         bit_val = bit_at(key, idx)
         
-        # Modified Logic: 0 -> Right, 1 -> Left
-        direction = "左 (1)" if bit_val == 1 else "右 (0)"
-        
-        if steps is not None and explain:
-            push_step(steps, head, 
-                      f"【搜尋中】\n"
-                      f"當前節點：{p.key} (bit={p.bit})\n"
-                      f"動作：檢查 Key 的第 {idx} 位元\n"
-                      f"數值：{key} 的第 {idx} 位是 '{bit_val}'\n"
-                      f"決定：因為是 {bit_val}，所以往{direction}走。",
-                      highlight_node=p, highlight_bit=p.bit, key=key, check_idx=idx,
-                      canvas_msg=f"檢查 Bit {idx}：{bit_val} → 往{direction[0]}")
+        if tracer.enabled:
+            # Modified Logic: 0 -> Right, 1 -> Left
+            direction = "左 (1)" if bit_val == 1 else "右 (0)"
+            tracer.step(head, 
+                        f"【搜尋中】\n"
+                        f"當前節點：{p.key} (bit={p.bit})\n"
+                        f"動作：檢查 Key 的第 {idx} 位元\n"
+                        f"數值：{key} 的第 {idx} 位是 '{bit_val}'\n"
+                        f"決定：因為是 {bit_val}，所以往{direction}走。",
+                        highlight_node=p, highlight_bit=p.bit, key=key, check_idx=idx,
+                        canvas_msg=f"檢查 Bit {idx}：{bit_val} → 往{direction[0]}")
         
         x = x.left if bit_val else x.right
     
-    if steps is not None and explain:
-        push_step(steps, head, 
-                  f"【搜尋結束】\n"
-                  f"原因：下一個節點的 bit ({x.bit}) 沒有大於當前節點 ({p.bit})，\n"
-                  f"      代表這是一條「執行緒 (Thread)」連結。\n"
-                  f"停在：{x.key}",
-                  highlight_node=x, key=key,
-                  canvas_msg=f"搜尋結束，停在 {x.key}")
+    if tracer.enabled:
+        tracer.step(head, 
+                    f"【搜尋結束】\n"
+                    f"原因：下一個節點的 bit ({x.bit}) 沒有大於當前節點 ({p.bit})，\n"
+                    f"      代表這是一條「執行緒 (Thread)」連結。\n"
+                    f"停在：{x.key}",
+                    highlight_node=x, key=key,
+                    canvas_msg=f"搜尋結束，停在 {x.key}")
     return x
 
-def find_parent_for_bit(head: Node, key: str, newbit: int):
+def find_parent_for_bit(head: Node, key: BitKey, newbit: int):
     p = head
     b = bit_at(key, head.bit)
     # Modified: 0->Right, 1->Left
@@ -245,55 +621,66 @@ def find_parent_for_bit(head: Node, key: str, newbit: int):
         x = x.left if b else x.right
     return p, x
 
-def insert_with_steps(head: Node, key: str):
-    steps = []
-    if not key or any(c not in "01" for c in key):
-        return steps, head
+def insert_with_steps(head: Node, key: str, tracer=None):
+    if tracer is None:
+        tracer = recorder()
+    skip_layout(head, tracer)
+    if not valid_key(key):
+        return tracer.steps, head
+    key = as_key(key)
 
     if head.key is None:
         head.key = key
         head.bit = 0
         head.left = head
         head.right = head
-        push_step(steps, head, f"空樹：建立 Head 節點「{key}」，bit=0。\nLeft->Self, Right->Self。",
-                  canvas_msg="空樹：建立 Head 節點")
-        return steps, head
+        layout_cache(head).invalidate()
+        if tracer.enabled:
+            tracer.step(head, f"空樹：建立 Head 節點「{key}」，bit=0。\nLeft->Self, Right->Self。",
+                        canvas_msg="空樹：建立 Head 節點")
+        return tracer.steps, head
 
-    push_step(steps, head, f"準備插入「{key}」。\n第一步：先執行搜尋，看看這個 Key 是否已存在，或應該在哪裡停止。",
-              canvas_msg=f"準備插入 {key}")
+    if tracer.enabled:
+        tracer.step(head, f"準備插入「{key}」。\n第一步：先執行搜尋，看看這個 Key 是否已存在，或應該在哪裡停止。",
+                    canvas_msg=f"準備插入 {key}")
 
-    t = pat_search(head, key, steps, explain=True)
+    t = pat_search(head, key, tracer)
     
     if t.key == key:
-        push_step(steps, head, f"結果：鍵「{key}」已存在於樹中，不需插入。",
-                  canvas_msg=f"鍵 {key} 已存在")
-        return steps, head
+        if tracer.enabled:
+            tracer.step(head, f"結果：鍵「{key}」已存在於樹中，不需插入。",
+                        canvas_msg=f"鍵 {key} 已存在")
+        return tracer.steps, head
 
     d = first_diff_bit(t.key, key)
     newbit = d
     t_bit_val = bit_at(t.key, d)
     k_bit_val = bit_at(key, d)
     
-    push_step(steps, head, 
-              f"【計算差異】\n"
-              f"搜尋停在：{t.key}\n"
-              f"輸入鍵值：{key}\n"
-              f"比較兩者：\n"
-              f"  {t.key}\n"
-              f"  {key}\n"
-              f"  {' '*(d-1 if d>0 else 0)}^\n"
-              f"發現第一個不同的位元在第 {d} 位 (1-based)。\n"
-              f"  {t.key}[{d}] = {t_bit_val}\n"
-              f"  {key}[{d}] = {k_bit_val}\n"
-              f"結論：新節點的 bit 設為 {newbit}。",
-              key=key, check_idx=d,
-              canvas_msg=f"比較 {t.key} 與 {key}，差異在 Bit {d}")
-
-    push_step(steps, head, f"【定位插入點】\n"
-                           f"目標：找到一個父節點 p，滿足 p.bit < {newbit} 且 p 的子節點 bit >= {newbit}。\n"
-                           f"方法：再次從 Head 開始搜尋，但只使用 Key 的前 {newbit-1} 位。",
-                           key=key,
-                           canvas_msg=f"重新搜尋，定位插入點 (Bit < {newbit})")
+    if tracer.enabled:
+        tracer.step(head, 
+                    f"【計算差異】\n"
+                    f"搜尋停在：{t.key}\n"
+                    f"輸入鍵值：{key}\n"
+                    f"比較兩者：\n"
+                    f"  {t.key}\n"
+                    f"  {key}\n"
+                    f"  {' '*(d-1 if d>0 else 0)}^\n"
+                    f"發現第一個不同的位元在第 {d} 位 (1-based)。\n"
+                    f"  {t.key}[{d}] = {t_bit_val}\n"
+                    f"  {key}[{d}] = {k_bit_val}\n" +
+                    (f"(超過鍵值長度的第一位是結束標記，讀作 1，之後都是 0)\n"
+                     if d > min(t.key.length, key.length) else "") +
+                    f"結論：新節點的 bit 設為 {newbit}。",
+                    key=key, check_idx=d,
+                    canvas_msg=f"比較 {t.key} 與 {key}，差異在 Bit {d}")
+
+    if tracer.enabled:
+        tracer.step(head, f"【定位插入點】\n"
+                          f"目標：找到一個父節點 p，滿足 p.bit < {newbit} 且 p 的子節點 bit >= {newbit}。\n"
+                          f"方法：再次從 Head 開始搜尋，但只使用 Key 的前 {newbit-1} 位。",
+                          key=key,
+                          canvas_msg=f"重新搜尋，定位插入點 (Bit < {newbit})")
                            
     p, x = find_parent_for_bit(head, key, newbit)
     
@@ -314,17 +701,18 @@ def insert_with_steps(head: Node, key: str):
                       f"因此，我們將 z 插入到 p 與 x 中間，\n"
                       f"讓 p 指向 z，再讓 z 指向 x。")
 
-    push_step(steps, head, f"【找到插入位置】\n"
-                           f"父節點 p：{p.key} (bit={p.bit})\n"
-                           f"原路徑子節點 x：{x_desc}\n"
-                           f"新節點 z 的 bit：{newbit}\n\n"
-                           f"插入邏輯解析：\n"
-                           f"1. 找到 p 是最後一個 bit 小於 {newbit} 的節點。\n"
-                           f"2. p 原本往{direction_str}指向 x。\n"
-                           f"3. {reason_str}\n"
-                           f"動作：將 p 的{direction_str}指標改指向新節點 z，再讓 z 連接 x。",
-                           highlight_node=p, key=key,
-                           canvas_msg=f"將插入在 {p.key} 與 {x.key} 之間")
+    if tracer.enabled:
+        tracer.step(head, f"【找到插入位置】\n"
+                          f"父節點 p：{p.key} (bit={p.bit})\n"
+                          f"原路徑子節點 x：{x_desc}\n"
+                          f"新節點 z 的 bit：{newbit}\n\n"
+                          f"插入邏輯解析：\n"
+                          f"1. 找到 p 是最後一個 bit 小於 {newbit} 的節點。\n"
+                          f"2. p 原本往{direction_str}指向 x。\n"
+                          f"3. {reason_str}\n"
+                          f"動作：將 p 的{direction_str}指標改指向新節點 z，再讓 z 連接 x。",
+                          highlight_node=p, key=key,
+                          canvas_msg=f"將插入在 {p.key} 與 {x.key} 之間")
     
     z = Node(key, newbit)
     z_bit_val = bit_at(key, newbit)
@@ -348,80 +736,187 @@ def insert_with_steps(head: Node, key: str):
     else:
         p.left = z
         p_side = "左 (1)"
+    layout_cache(head).spliced_in(p, z)
         
-    push_step(steps, head, f"【插入完成】\n"
-                           f"1. 建立新節點 z ({key}, bit={newbit})。\n"
-                           f"   - 決定 z 的左右指標：\n"
-                           f"     檢查 z 的第 {newbit} 位元，值為 {z_bit_val}。\n"
-                           f"     (1) 因為值是 {z_bit_val}，所以 z 的{z_dir_str}指標指向自己 (Self-Loop)，表示這是新鍵值的落腳處。\n"
-                           f"     (2) 相對地，原本的子樹 x 在這一位的值與 z 相反，所以 z 的{x_dir_str}指標指向 x。\n"
-                           f"2. 更新父節點 p ({p.key})：\n"
-                           f"   - p 的第 {p.bit} 位是 {p_bit_val}，所以將 p 的{p_side}指標截斷，改指向 z。\n"
-                           f"   - 這樣就形成了 p → z → x 的結構 (或 z 指向自己)。",
-                           highlight_node=z, key=key,
-                           canvas_msg=f"插入完成：p→z，z 分岔出 x 與自己")
+    if tracer.enabled:
+        tracer.step(head, f"【插入完成】\n"
+                          f"1. 建立新節點 z ({key}, bit={newbit})。\n"
+                          f"   - 決定 z 的左右指標：\n"
+                          f"     檢查 z 的第 {newbit} 位元，值為 {z_bit_val}。\n"
+                          f"     (1) 因為值是 {z_bit_val}，所以 z 的{z_dir_str}指標指向自己 (Self-Loop)，表示這是新鍵值的落腳處。\n"
+                          f"     (2) 相對地，原本的子樹 x 在這一位的值與 z 相反，所以 z 的{x_dir_str}指標指向 x。\n"
+                          f"2. 更新父節點 p ({p.key})：\n"
+                          f"   - p 的第 {p.bit} 位是 {p_bit_val}，所以將 p 的{p_side}指標截斷，改指向 z。\n"
+                          f"   - 這樣就形成了 p → z → x 的結構 (或 z 指向自己)。",
+                          highlight_node=z, key=key,
+                          canvas_msg=f"插入完成：p→z，z 分岔出 x 與自己")
     
-    return steps, head
+    return tracer.steps, head
 
-def find_physical_parent(root, target):
-    if root is None or target is None: return None
-    stack = [root]
-    visited = {id(root)}
-    while stack:
-        curr = stack.pop()
-        if curr.left:
-            if curr.left == target: return curr
-            if curr.left.bit > curr.bit and id(curr.left) not in visited:
-                visited.add(id(curr.left))
-                stack.append(curr.left)
-        if curr.right:
-            if curr.right == target: return curr
-            if curr.right.bit > curr.bit and id(curr.right) not in visited:
-                visited.add(id(curr.right))
-                stack.append(curr.right)
-    return None
-
-def delete_with_steps(head: Node, key: str):
+def insert_key(head: Node, key: str):
+    """不產生步驟的插入 (批次載入用)。回傳 True 表示有插入新鍵值。"""
+    key = as_key(key)
+    if head.key is None:
+        head.key = key
+        head.bit = 0
+        head.left = head
+        head.right = head
+    else:
+        t = pat_search(head, key)
+        if t.key == key:
+            return False
+        newbit = first_diff_bit(t.key, key)
+        p, x = find_parent_for_bit(head, key, newbit)
+        z = Node(key, newbit)
+        # Same wiring as insert_with_steps: 0 -> Right, 1 -> Left
+        if bit_at(key, newbit):
+            z.left = z
+            z.right = x
+        else:
+            z.right = z
+            z.left = x
+        if bit_at(key, p.bit):
+            p.left = z
+        else:
+            p.right = z
+    if head.layout is not None:
+        head.layout.invalidate()
+    return True
+
+def bulk_insert(head: Node, keys, frames=0):
+    """一次插入大量鍵值，只在最後 (以及 frames 個取樣點) 拍快照。
+
+    回傳 (steps, head, stats)；stats 含插入 / 重複 / 不合法的數量與 keys/sec。
+    """
     steps = []
-    if not key: return steps, head
+    keys = list(keys)
+    every = max(1, len(keys) // frames) if frames > 0 else 0
+    inserted = duplicates = invalid = 0
+    start = time.perf_counter()
+    for i, key in enumerate(keys, 1):
+        if not valid_key(key):
+            invalid += 1
+        elif insert_key(head, key):
+            inserted += 1
+        else:
+            duplicates += 1
+        if every and i % every == 0 and i < len(keys):
+            push_step(steps, head, f"批次插入中：已處理 {i} / {len(keys)} 個鍵值。",
+                      canvas_msg=f"已處理 {i} 個鍵值")
+    elapsed = time.perf_counter() - start
+
+    stats = {
+        "inserted": inserted,
+        "duplicates": duplicates,
+        "invalid": invalid,
+        "seconds": round(elapsed, 6),
+        "keys_per_sec": round(len(keys) / elapsed) if elapsed > 0 else None,
+    }
+    push_step(steps, head, f"批次插入完成：新增 {inserted} 個鍵值，"
+                           f"重複 {duplicates} 個，不合法 {invalid} 個。",
+              canvas_msg=f"批次插入完成 ({inserted} 個)")
+    return steps, head, stats
+
+def delete_key(head: Node, key: str):
+    """不產生步驟的刪除 (與 delete_with_steps 同樣的做法)。回傳 True 表示有刪除。
+
+    父節點都從搜尋路徑上取得，所以是 O(鍵值長度)，不需要掃描整棵樹。
+    """
+    if head.key is None:
+        return False
+    key = as_key(key)
+    path = []
+    p = pat_search(head, key, path=path)
+    if p.key != key:
+        return False
+
+    if p is head and head.right is head:
+        # Only node: the tree becomes empty
+        head.key = None
+        head.bit = -1
+    elif p is not head and (p.left is p or p.right is p):
+        pp = path[-2]
+        child = p.right if p.left is p else p.left
+        if pp.left is p:
+            pp.left = child
+        else:
+            pp.right = child
+    else:
+        curr, qp = p, None
+        while True:
+            nxt = curr.left if bit_at(p.key, curr.bit) else curr.right
+            if nxt is p:
+                q = curr
+                break
+            curr, qp = nxt, curr
+        r_path = []
+        pat_search(head, q.key, path=r_path)
+        r = r_path[-1]
+        p.key = q.key
+        if r.left is q:
+            r.left = p
+        else:
+            r.right = p
+        q_child = q.right if q.left is p else q.left
+        if qp.left is q:
+            qp.left = q_child
+        else:
+            qp.right = q_child
+    if head.layout is not None:
+        head.layout.invalidate()
+    return True
+
+def delete_with_steps(head: Node, key: str, tracer=None):
+    if tracer is None:
+        tracer = recorder()
+    skip_layout(head, tracer)
+    if not valid_key(key): return tracer.steps, head
+    key = as_key(key)
     
     if head.key is None:
-        push_step(steps, head, "空樹無法刪除。", canvas_msg="空樹無法刪除")
-        return steps, head
+        if tracer.enabled:
+            tracer.step(head, "空樹無法刪除。", canvas_msg="空樹無法刪除")
+        return tracer.steps, head
 
-    push_step(steps, head, f"準備刪除「{key}」。\n第一步：搜尋該鍵值是否存在。", canvas_msg=f"準備刪除 {key}")
+    if tracer.enabled:
+        tracer.step(head, f"準備刪除「{key}」。\n第一步：搜尋該鍵值是否存在。", canvas_msg=f"準備刪除 {key}")
 
-    y = pat_search(head, key, steps, explain=True)
+    path = []
+    y = pat_search(head, key, tracer, path=path)
     
     if y.key != key:
-        push_step(steps, head, f"搜尋結果停在 {y.key}，與目標 {key} 不符。\n結論：鍵值不存在，無法刪除。",
-                  highlight_node=y, canvas_msg="鍵值不存在")
-        return steps, head
+        if tracer.enabled:
+            tracer.step(head, f"搜尋結果停在 {y.key}，與目標 {key} 不符。\n結論：鍵值不存在，無法刪除。",
+                        highlight_node=y, canvas_msg="鍵值不存在")
+        return tracer.steps, head
         
     p = y 
-    push_step(steps, head, f"找到目標節點 p：{p.key} (bit={p.bit})。\n準備執行刪除邏輯。",
-              highlight_node=p, canvas_msg=f"找到目標 {p.key}")
+    if tracer.enabled:
+        tracer.step(head, f"找到目標節點 p：{p.key} (bit={p.bit})。\n準備執行刪除邏輯。",
+                    highlight_node=p, canvas_msg=f"找到目標 {p.key}")
 
-    has_self = (p.left == p or p.right == p)
+    # head.left always points back to head, so for head only the right side counts
+    has_self = (p.right == p) if p is head else (p.left == p or p.right == p)
     
     if has_self:
-        push_step(steps, head, f"【刪除 Case 1】\n節點 p ({p.key}) 擁有指向自己的指標 (Self-Pointer)。\n"
-                               f"處理方式：直接移除 p，並將父節點指向 p 的另一側子節點。",
-                  highlight_node=p, canvas_msg="Case 1: 有 Self-Pointer")
+        if tracer.enabled:
+            tracer.step(head, f"【刪除 Case 1】\n節點 p ({p.key}) 擁有指向自己的指標 (Self-Pointer)。\n"
+                              f"處理方式：直接移除 p，並將父節點指向 p 的另一側子節點。",
+                        highlight_node=p, canvas_msg="Case 1: 有 Self-Pointer")
         
         if p == head and p.left == p and p.right == p:
              head = Node(None, -1)
-             push_step(steps, head, "p 是唯一的節點 (Head)。\n刪除後樹變為空。", canvas_msg="刪除完成：樹已空")
-             return steps, head
+             if tracer.enabled:
+                 tracer.step(head, "p 是唯一的節點 (Head)。\n刪除後樹變為空。", canvas_msg="刪除完成：樹已空")
+             return tracer.steps, head
              
-        pp = find_physical_parent(head, p)
+        # The search reached p through a real edge and then took p's self-pointer,
+        # so p's physical parent is the node right before it on the path
+        pp = path[-2] if len(path) >= 2 and path[-1] is p else None
         if not pp:
-             if p == head:
-                 head = Node(None, -1)
-                 push_step(steps, head, "p 是 Head。\n刪除後樹變為空。", canvas_msg="刪除完成")
-                 return steps, head
-             push_step(steps, head, "錯誤：找不到 p 的父節點。", canvas_msg="錯誤")
-             return steps, head
+             if tracer.enabled:
+                 tracer.step(head, "錯誤：找不到 p 的父節點。", canvas_msg="錯誤")
+             return tracer.steps, head
              
         child = p.right if p.left == p else p.left
         child_desc = f"{child.key}" if child else "None"
@@ -432,24 +927,28 @@ def delete_with_steps(head: Node, key: str):
         else:
             pp.right = child
             side = "右"
+        layout_cache(head).spliced_out(p, pp, child)
             
-        push_step(steps, head, f"【執行刪除】\n"
-                               f"1. p 的父節點是 {pp.key}。\n"
-                               f"2. p 指向自己的指標被移除。\n"
-                               f"3. p 的另一側子節點是 {child_desc}。\n"
-                               f"4. 更新 {pp.key} 的{side}指標，改指向 {child_desc}。",
-                  highlight_node=pp, canvas_msg=f"父節點 {pp.key} 改指 {child_desc}")
+        if tracer.enabled:
+            tracer.step(head, f"【執行刪除】\n"
+                              f"1. p 的父節點是 {pp.key}。\n"
+                              f"2. p 指向自己的指標被移除。\n"
+                              f"3. p 的另一側子節點是 {child_desc}。\n"
+                              f"4. 更新 {pp.key} 的{side}指標，改指向 {child_desc}。",
+                        highlight_node=pp, canvas_msg=f"父節點 {pp.key} 改指 {child_desc}")
                   
     else:
-        push_step(steps, head, f"【刪除 Case 2】\n節點 p ({p.key}) 沒有指向自己的指標。\n"
-                               f"這表示 p 是某個回溯連結 (Thread) 的目標。\n"
-                               f"步驟：\n"
-                               f"1. 找到指向 p 的節點 q (Back-Edge Source)。\n"
-                               f"2. 找到指向 q 的節點 r。\n"
-                               f"3. 用 q 的資料取代 p，然後刪除 q。",
-                  highlight_node=p, canvas_msg="Case 2: 無 Self-Pointer")
+        if tracer.enabled:
+            tracer.step(head, f"【刪除 Case 2】\n節點 p ({p.key}) 沒有指向自己的指標。\n"
+                              f"這表示 p 是某個回溯連結 (Thread) 的目標。\n"
+                              f"步驟：\n"
+                              f"1. 找到指向 p 的節點 q (Back-Edge Source)。\n"
+                              f"2. 找到指向 q 的節點 r。\n"
+                              f"3. 用 q 的資料取代 p，然後刪除 q。",
+                        highlight_node=p, canvas_msg="Case 2: 無 Self-Pointer")
                   
-        curr = p
+        # Walk down from p with p.key; remember the parent of each node on the way
+        curr, qp = p, None
         while True:
             b = bit_at(p.key, curr.bit)
             # Modified: 1->Left, 0->Right
@@ -457,13 +956,18 @@ def delete_with_steps(head: Node, key: str):
             if nxt == p:
                 q = curr
                 break
-            curr = nxt
+            if nxt.bit <= curr.bit:
+                if tracer.enabled:
+                    tracer.step(head, "錯誤：找不到指向 p 的回溯連結。", canvas_msg="錯誤")
+                return tracer.steps, head
+            curr, qp = nxt, curr
             
-        push_step(steps, head, f"【尋找 q】\n"
-                               f"從 p 開始搜尋 {p.key}，最後會經由回溯連結回到 p。\n"
-                               f"發出該連結的節點即為 q。\n"
-                               f"找到 q：{q.key} (bit={q.bit})。",
-                  highlight_node=q, canvas_msg=f"找到 q: {q.key}")
+        if tracer.enabled:
+            tracer.step(head, f"【尋找 q】\n"
+                              f"從 p 開始搜尋 {p.key}，最後會經由回溯連結回到 p。\n"
+                              f"發出該連結的節點即為 q。\n"
+                              f"找到 q：{q.key} (bit={q.bit})。",
+                        highlight_node=q, canvas_msg=f"找到 q: {q.key}")
 
         r_curr = head
         b = bit_at(q.key, head.bit)
@@ -478,19 +982,22 @@ def delete_with_steps(head: Node, key: str):
             
         r = r_curr
         
-        push_step(steps, head, f"【尋找 r】\n"
-                               f"搜尋 q.key ({q.key})，會停在 q。\n"
-                               f"搜尋終止前的最後一個節點即為 r (指向 q 的來源)。\n"
-                               f"找到 r：{r.key} (bit={r.bit})。",
-                  highlight_node=r, canvas_msg=f"找到 r: {r.key}")
+        if tracer.enabled:
+            tracer.step(head, f"【尋找 r】\n"
+                              f"搜尋 q.key ({q.key})，會停在 q。\n"
+                              f"搜尋終止前的最後一個節點即為 r (指向 q 的來源)。\n"
+                              f"找到 r：{r.key} (bit={r.bit})。",
+                        highlight_node=r, canvas_msg=f"找到 r: {r.key}")
                   
         old_p_key = p.key
         p.key = q.key
+        layout_cache(head).changed(p)
         
-        push_step(steps, head, f"【取代資料】\n"
-                               f"將 q 的鍵值 ({q.key}) 複製到 p ({old_p_key})。\n"
-                               f"現在 p 變成了 {p.key}。",
-                  highlight_node=p, canvas_msg=f"p 變更為 {p.key}")
+        if tracer.enabled:
+            tracer.step(head, f"【取代資料】\n"
+                              f"將 q 的鍵值 ({q.key}) 複製到 p ({old_p_key})。\n"
+                              f"現在 p 變成了 {p.key}。",
+                        highlight_node=p, canvas_msg=f"p 變更為 {p.key}")
                   
         if r.left == q:
             r.left = p
@@ -498,14 +1005,15 @@ def delete_with_steps(head: Node, key: str):
         else:
             r.right = p
             r_side = "右"
+        layout_cache(head).changed(r)
             
-        push_step(steps, head, f"【更新 r】\n"
-                               f"r ({r.key}) 原本指向 q ({q.key})。\n"
-                               f"因為 q 即將被刪除 (且 p 已取代 q)，\n"
-                               f"將 r 的{r_side}指標改指向 p。",
-                  highlight_node=r, canvas_msg=f"r 改指 p")
+        if tracer.enabled:
+            tracer.step(head, f"【更新 r】\n"
+                              f"r ({r.key}) 原本指向 q ({q.key})。\n"
+                              f"因為 q 即將被刪除 (且 p 已取代 q)，\n"
+                              f"將 r 的{r_side}指標改指向 p。",
+                        highlight_node=r, canvas_msg=f"r 改指 p")
 
-        qp = find_physical_parent(head, q)
         q_child = q.right if q.left == p else q.left
         q_child_desc = f"{q_child.key}" if q_child else "None"
         
@@ -515,12 +1023,544 @@ def delete_with_steps(head: Node, key: str):
         else:
             qp.right = q_child
             qp_side = "右"
+        layout_cache(head).spliced_out(q, qp, q_child)
             
-        push_step(steps, head, f"【刪除 q】\n"
-                               f"1. q 的父節點是 {qp.key}。\n"
-                               f"2. q 指向 p 的指標被移除。\n"
-                               f"3. q 的另一側子節點是 {q_child_desc}。\n"
-                               f"4. 更新 {qp.key} 的{qp_side}指標，改指向 {q_child_desc}。",
-                  highlight_node=qp, canvas_msg=f"刪除 q，父節點連至 {q_child_desc}")
-
-    return steps, head
+        if tracer.enabled:
+            tracer.step(head, f"【刪除 q】\n"
+                              f"1. q 的父節點是 {qp.key}。\n"
+                              f"2. q 指向 p 的指標被移除。\n"
+                              f"3. q 的另一側子節點是 {q_child_desc}。\n"
+                              f"4. 更新 {qp.key} 的{qp_side}指標，改指向 {q_child_desc}。",
+                        highlight_node=qp, canvas_msg=f"刪除 q，父節點連至 {q_child_desc}")
+
+    return tracer.steps, head
+
+# ------------- 查詢：前綴列舉 / 前綴計數 / 最長前綴比對 -------------
+
+def valid_prefix(prefix) -> bool:
+    # Unlike keys, an empty prefix is fine (it matches every key)
+    return isinstance(prefix, str) and not prefix.strip("01")
+
+def has_prefix(k: BitKey, prefix: BitKey) -> bool:
+    m = prefix.length
+    return k.length >= m and (k.value >> (k.length - m)) == prefix.value
+
+def descend_prefix(head: Node, prefix: BitKey):
+    """沿 prefix 的位元往下走，停在第一個 bit > len(prefix) 的節點或執行緒。
+
+    回傳 (p, x)：x.bit > p.bit 時 x 的整棵子樹就是所有可能的答案，
+    否則 x 是執行緒指到的唯一候選鍵值。
+    """
+    p = head
+    x = head.left if bit_at(prefix, head.bit) else head.right
+    while p.bit < x.bit and x.bit <= prefix.length:
+        p = x
+        x = x.left if bit_at(prefix, x.bit) else x.right
+    return p, x
+
+def iter_subtree_keys(p: Node, x: Node):
+    """依鍵值由小到大列出 p → x 這條指標之下的所有鍵值節點 (執行緒的終點)。"""
+    if x.bit <= p.bit:
+        yield x
+        return
+    # Right (0) before left (1) gives ascending order; threads are the keys
+    stack = [x]
+    while stack:
+        n = stack.pop()
+        if isinstance(n, tuple):
+            yield n[0]
+            continue
+        for c in (n.left, n.right):
+            stack.append(c if c.bit > n.bit else (c,))
+
+def prefix_nodes(head: Node, prefix: BitKey):
+    if head.key is None:
+        return
+    p, x = descend_prefix(head, prefix)
+    seen = set()
+    for n in iter_subtree_keys(p, x):
+        # A damaged tree (see delete) can thread to the same node twice
+        if n not in seen and has_prefix(n.key, prefix):
+            seen.add(n)
+            yield n
+
+def keys_with_prefix(head: Node, prefix: str):
+    """所有以 prefix 開頭的鍵值 (由小到大)，O(len(prefix) + 輸出數量)。"""
+    # Threads come out in the trie's order, where "1" (read as 11000…) follows "10"
+    # (10100…); only keys nested in one another are out of place, so the sort is cheap
+    return sorted(str(n.key) for n in prefix_nodes(head, as_key(prefix)))
+
+def count_prefix(head: Node, prefix: str) -> int:
+    return sum(1 for _ in prefix_nodes(head, as_key(prefix)))
+
+def zero_descent(p: Node, x: Node):
+    # Follow 0 (right) pointers until a thread: where the 0s after an end marker lead
+    while p.bit < x.bit:
+        p = x
+        x = x.right
+    return x
+
+def longest_prefix_nodes(head: Node, key: BitKey):
+    """最長前綴比對的候選節點，依路徑由深到淺。
+
+    長度 l 的鍵值 K 若是 key 的前綴，K 的搜尋路徑在 bit <= l 的節點都跟 key 一樣，
+    在 bit = l + 1 的節點因為結束標記往 1 (左) 走，之後全部往 0 (右) 走。
+    所以對 key 路徑上的每個節點 r，候選是「從 r 開始一路往右」的終點；
+    key 在 r 往右走時這個終點跟下一個節點相同，不必重走。
+    另外 r.bit <= len(key) 而 key 在 r 往右走時，長度 r.bit - 1 的前綴會在 r 往左分岔，
+    候選是「從 r 往左一步再一路往右」的終點 (key 往左走時它就是下一個節點的候選)。
+    回傳 (候選節點, r, 在 r 走的方向)，搜尋終點的 r 與方向是 None。
+    """
+    path = []
+    p = head
+    x = head.left if bit_at(key, head.bit) else head.right
+    while p.bit < x.bit:
+        b = bit_at(key, x.bit)
+        path.append((x, b))
+        p = x
+        x = x.left if b else x.right
+
+    z = x
+    yield z, None, None
+    for r, b in reversed(path):
+        if b:
+            z = zero_descent(r, r.right)
+            yield z, r, 0
+        elif r.bit <= key.length:
+            yield zero_descent(r, r.left), r, 1
+
+def longest_prefix_match(head: Node, key: str):
+    """樹中是 key 前綴的鍵值裡最長的一個 (例如路由表查詢)，沒有則回傳 None。"""
+    if head.key is None:
+        return None
+    key = as_key(key)
+    best = None
+    for z, _, _ in longest_prefix_nodes(head, key):
+        if has_prefix(key, z.key) and (best is None or z.key.length > best.length):
+            best = z.key
+    return None if best is None else str(best)
+
+def prefix_query_with_steps(head: Node, prefix: str, count_only=False):
+    """keys_with_prefix / count_prefix 的教學版，回傳 (steps, result)。"""
+    tracer = recorder()
+    name = "前綴計數" if count_only else "前綴查詢"
+    if head.key is None:
+        tracer.step(head, "空樹：沒有任何鍵值。", canvas_msg="空樹")
+        return tracer.steps, 0 if count_only else []
+    pk = as_key(prefix)
+    m = pk.length
+    tracer.step(head, f"【{name}】\n目標：找出所有以「{prefix}」開頭的鍵值。\n"
+                      f"方法：只依前綴的 {m} 個位元往下走，走到第一個 bit > {m} 的節點，\n"
+                      f"那棵子樹裡 (執行緒指到的) 鍵值就是候選。",
+                key=pk, canvas_msg=f"{name}：{prefix}")
+
+    p = head
+    x = head.left if bit_at(pk, head.bit) else head.right
+    while p.bit < x.bit and x.bit <= m:
+        p = x
+        b = bit_at(pk, x.bit)
+        direction = "左 (1)" if b else "右 (0)"
+        tracer.step(head, f"【往下走】\n當前節點：{p.key} (bit={p.bit})\n"
+                          f"前綴第 {p.bit} 位是 '{b}'，往{direction}走。",
+                    highlight_node=p, highlight_bit=p.bit, key=pk, check_idx=p.bit,
+                    canvas_msg=f"檢查 Bit {p.bit}：{b} → 往{direction[0]}")
+        x = x.left if b else x.right
+
+    if x.bit <= p.bit:
+        tracer.step(head, f"【停止】\n遇到執行緒，只剩一個候選：{x.key}。",
+                    highlight_node=x, key=pk, canvas_msg=f"候選：{x.key}")
+    else:
+        tracer.step(head, f"【停止】\n節點 {x.key} 的 bit ({x.bit}) > 前綴長度 ({m})，\n"
+                          f"以它為根的子樹涵蓋所有可能的答案。",
+                    highlight_node=x, key=pk, canvas_msg=f"子樹根：{x.key}")
+
+    found = sorted(str(n.key) for n in prefix_nodes(head, pk))
+    result = len(found) if count_only else found
+    listing = "、".join(found[:20]) + (" …" if len(found) > 20 else "")
+    tracer.step(head, f"【結果】\n以「{prefix}」開頭的鍵值共 {len(found)} 個" +
+                      (f"：\n{listing}" if found else "。"),
+                key=pk, canvas_msg=f"共 {len(found)} 個")
+    return tracer.steps, result
+
+def longest_prefix_with_steps(head: Node, key: str):
+    """longest_prefix_match 的教學版，回傳 (steps, result)。"""
+    tracer = recorder()
+    if head.key is None:
+        tracer.step(head, "空樹：沒有任何鍵值。", canvas_msg="空樹")
+        return tracer.steps, None
+    k = as_key(key)
+    tracer.step(head, f"【最長前綴比對】\n目標：在樹中找出是「{key}」前綴的最長鍵值。\n"
+                      f"第一步：照一般搜尋走到底。",
+                key=k, canvas_msg=f"最長前綴比對：{key}")
+    pat_search(head, k, tracer)
+
+    best = None
+    for z, r, side in longest_prefix_nodes(head, k):
+        ok = has_prefix(k, z.key)
+        if r is None:
+            where = "搜尋終點"
+        elif side:
+            where = f"節點 {r.key} (bit={r.bit}) 往左 (1) 一步，再往右 (0) 一路走到底"
+        else:
+            where = f"節點 {r.key} (bit={r.bit}) 往右 (0) 一路走到底"
+        verdict = "是前綴" if ok else "不是前綴"
+        if ok and (best is None or z.key.length > best.key.length):
+            best = z
+        tracer.step(head, f"【檢查候選】\n來源：{where}\n候選鍵值：{z.key}\n"
+                          f"結果：{z.key} {verdict}。",
+                    highlight_node=z, key=k, canvas_msg=f"{z.key}：{verdict}")
+
+    if best is None:
+        tracer.step(head, f"【結果】\n樹中沒有任何鍵值是「{key}」的前綴。",
+                    key=k, canvas_msg="沒有符合的前綴")
+        return tracer.steps, None
+    tracer.step(head, f"【結果】\n最長的前綴是 {best.key} (長度 {best.key.length})。",
+                highlight_node=best, key=k, canvas_msg=f"最長前綴：{best.key}")
+    return tracer.steps, str(best.key)
+
+# ------------- 持久化版本 (copy-on-write) -------------
+#
+# PNode 建立後就不再修改。真子節點直接存 PNode，執行緒則只存目標的鍵值 (BitKey)：
+# 刪除 Case 2 把 q 的鍵值搬進 p 時，原本指向 q 的執行緒自然就指到 p，
+# 不必像可變版本那樣改 r。這樣每次插入 / 刪除只需複製 Head 到修改點這一條路徑，
+# 其餘節點由新舊版本共用。
+
+class PNode:
+    __slots__ = ("key", "bit", "left", "right")
+
+    def __init__(self, key, bit, left, right):
+        self.key = key
+        self.bit = bit
+        self.left = left
+        self.right = right
+
+def p_search(root: PNode, key: BitKey):
+    """回傳 (搜尋停下的鍵值, 經過的節點串列)。"""
+    path = [root]
+    x = root.left if bit_at(key, root.bit) else root.right
+    while isinstance(x, PNode):
+        path.append(x)
+        x = x.left if bit_at(key, x.bit) else x.right
+    return x, path
+
+def p_copy_path(path, key, child, new_key=None, holder=None):
+    """由下往上複製 path，每個節點在 key 走的那一側改指向 child。
+
+    holder 是 path 中要換成 new_key 的節點 (刪除 Case 2)。
+    """
+    for n in reversed(path):
+        k = new_key if n is holder else n.key
+        if bit_at(key, n.bit):
+            left, right = child, n.right
+        else:
+            left, right = n.left, child
+        if n.bit == 0:
+            left = k  # Head's left side always threads back to itself
+        child = PNode(k, n.bit, left, right)
+    return child
+
+def p_insert(root, key: BitKey):
+    """回傳 (新版本的根, 新建的節點數)；鍵值已存在時回傳原本的根。"""
+    if root is None:
+        return PNode(key, 0, key, key), 1
+    t, path = p_search(root, key)
+    if t == key:
+        return root, 0
+    d = first_diff_bit(t, key)
+    # Same spot as find_parent_for_bit: the last node on the search path with bit < d
+    i = len(path) - 1
+    while path[i].bit >= d:
+        i -= 1
+    p = path[i]
+    x = p.left if bit_at(key, p.bit) else p.right
+    if bit_at(key, d):
+        z = PNode(key, d, key, x)
+    else:
+        z = PNode(key, d, x, key)
+    return p_copy_path(path[:i + 1], key, z), i + 2
+
+def p_delete(root, key: BitKey):
+    """回傳 (新版本的根, 新建的節點數)；鍵值不存在時回傳原本的根。"""
+    if root is None:
+        return None, 0
+    t, path = p_search(root, key)
+    if t != key:
+        return root, 0
+    if len(path) == 1:
+        return None, 0  # Head was the only node
+    q = path[-1]
+    # q's other pointer (not the thread to key) takes q's place under its parent
+    other = q.right if bit_at(key, q.bit) else q.left
+    if q.key == key:
+        # Case 1: q holds key itself
+        return p_copy_path(path[:-1], key, other), len(path) - 1
+    # Case 2: move q's key into the node that holds key, then drop q
+    holder = next(n for n in path if n.key == key)
+    return p_copy_path(path[:-1], key, other, new_key=q.key, holder=holder), len(path) - 1
+
+def p_from_mutable(head: Node):
+    """把可變的樹整棵轉成 PNode (批次插入後用)。"""
+    if head.key is None:
+        return None
+
+    # Children are built before their parents: reverse preorder over real edges
+    order = []
+    stack = [head]
+    while stack:
+        n = stack.pop()
+        order.append(n)
+        for c in (n.left, n.right):
+            if c.bit > n.bit:
+                stack.append(c)
+    built = {}
+    for n in reversed(order):
+        left = n.key if n.bit == 0 else (built[n.left] if n.left.bit > n.bit else n.left.key)
+        right = built[n.right] if n.right.bit > n.bit else n.right.key
+        built[n] = PNode(n.key, n.bit, left, right)
+    return built[head]
+
+def p_count(root) -> int:
+    count = 0
+    stack = [root] if root is not None else []
+    while stack:
+        n = stack.pop()
+        count += 1
+        for c in (n.left, n.right):
+            if isinstance(c, PNode):
+                stack.append(c)
+    return count
+
+def p_draw_data(root):
+    """PNode 版本的 get_draw_data，輸出格式相同。"""
+    if root is None:
+        return {"nodes": [], "edges": [], "root_id": None}
+    order = []
+    stack = [(root, 0, False)]
+    while stack:
+        n, d, visited = stack.pop()
+        if visited:
+            order.append((n, d))
+            continue
+        if isinstance(n.right, PNode):
+            stack.append((n.right, d + 1, False))
+        stack.append((n, d, True))
+        if isinstance(n.left, PNode):
+            stack.append((n.left, d + 1, False))
+
+    ids = {n: i for i, (n, _) in enumerate(order)}
+    holder = {n.key: i for n, i in ids.items()}
+    nodes = []
+    edges = []
+    for i, (n, d) in enumerate(order):
+        nodes.append({"id": i, "x": MARGIN_X + i * BASE_HGAP, "y": MARGIN_Y + d * LEVEL_GAP,
+                      "key": str(n.key), "bit": n.bit, "is_highlight": False})
+        for side, c in (("L", n.left), ("R", n.right)):
+            if isinstance(c, PNode):
+                edges.append({"u": i, "v": ids[c], "type": side, "is_thread": False})
+            else:
+                edges.append({"u": i, "v": holder.get(c), "type": side, "is_thread": True})
+    return {"nodes": nodes, "edges": edges, "root_id": ids[root], "highlight_id": None}
+
+# ------------- 平面化 (pickle 用) -------------
+# pickle 會沿著物件參照遞迴，鍵值很長時樹很深會超過遞迴上限，
+# 所以 session 存檔時把節點攤平成 (key, bit, left, right) 的串列，指標改存索引。
+
+def flatten_nodes(head: Node):
+    index = {head: 0}
+    order = [head]
+    stack = [head]
+    while stack:
+        n = stack.pop()
+        for c in (n.left, n.right):
+            if c not in index:
+                index[c] = len(order)
+                order.append(c)
+                stack.append(c)
+    return [(n.key, n.bit, index[n.left], index[n.right]) for n in order]
+
+def unflatten_nodes(records):
+    nodes = [Node(key, bit) for key, bit, _, _ in records]
+    for n, (_, _, l, r) in zip(nodes, records):
+        n.left = nodes[l]
+        n.right = nodes[r]
+    return nodes[0]
+
+def p_flatten(roots):
+    """把各版本的 PNode 攤平 (共用的節點只存一次)；子節點在父節點之前。"""
+    index = {}
+    records = []
+    for root in roots:
+        if root is None or root in index:
+            continue
+        stack = [(root, False)]
+        while stack:
+            n, expanded = stack.pop()
+            if n in index:
+                continue
+            if expanded:
+                index[n] = len(records)
+                records.append((n.key, n.bit,
+                                index[n.left] if isinstance(n.left, PNode) else n.left,
+                                index[n.right] if isinstance(n.right, PNode) else n.right))
+                continue
+            stack.append((n, True))
+            for c in (n.left, n.right):
+                if isinstance(c, PNode) and c not in index:
+                    stack.append((c, False))
+    return records, [None if r is None else index[r] for r in roots]
+
+def p_unflatten(records, roots):
+    nodes = []
+    for key, bit, left, right in records:
+        # Real children are stored as ints (indexes), threads as BitKey
+        nodes.append(PNode(key, bit,
+                           nodes[left] if isinstance(left, int) else left,
+                           nodes[right] if isinstance(right, int) else right))
+    return [None if i is None else nodes[i] for i in roots]
+
+class PatriciaVersions:
+    """插入 / 刪除的歷史版本，各版本共用沒變動的節點。
+
+    版本編號從 0 (空樹) 開始遞增；超過 max_versions 時丟掉最舊的版本。
+    layout(v) 的結果放在最多 max_layouts 筆的 LRU 快取裡 (不會存進 session)。
+    """
+
+    def __init__(self, max_versions=1000, max_layouts=32):
+        self.max_versions = max_versions
+        self.max_layouts = max_layouts
+        self.base = 0              # version id of roots[0]
+        self.roots = [None]
+        self.ops = [{"version": 0, "op": "init", "key": None}]
+        self.created = [0]         # nodes each kept version added
+        self.nodes = 0             # sum of created: memory held by the history
+        self._layouts = OrderedDict()
+
+    def __getstate__(self):
+        # The layout cache is rebuilt on demand, don't pickle it with the session.
+        # Roots go out as flat records so deep versions don't hit pickle's recursion limit.
+        state = {k: v for k, v in self.__dict__.items() if k not in ("_layouts", "roots")}
+        state["roots"] = p_flatten(self.roots)
+        return state
+
+    def __setstate__(self, state):
+        state["roots"] = p_unflatten(*state["roots"])
+        self.__dict__.update(state)
+        self._layouts = OrderedDict()
+
+    @property
+    def current(self):
+        return self.base + len(self.roots) - 1
+
+    def root(self, v):
+        if v < self.base or v > self.current:
+            return None, False
+        return self.roots[v - self.base], True
+
+    def _push(self, root, op, key, created):
+        self.roots.append(root)
+        self.ops.append({"version": self.current, "op": op, "key": key})
+        self.created.append(created)
+        self.nodes += created
+        while len(self.roots) > self.max_versions:
+            self.roots.pop(0)
+            self.ops.pop(0)
+            self.nodes -= self.created.pop(0)
+            self.base += 1
+        return self.current
+
+    def insert(self, key):
+        key = as_key(key)
+        root = self.roots[-1]
+        new, created = p_insert(root, key)
+        if new is root:
+            return self.current
+        return self._push(new, "insert", str(key), created)
+
+    def delete(self, key):
+        key = as_key(key)
+        root = self.roots[-1]
+        new, created = p_delete(root, key)
+        if new is root:
+            return self.current
+        return self._push(new, "delete", str(key), created)
+
+    def snapshot(self, head: Node, op="bulk_insert"):
+        """從可變的樹整棵建立一個新版本 (不與舊版本共用節點)。"""
+        root = p_from_mutable(head)
+        return self._push(root, op, None, p_count(root))
+
+    def layout(self, v):
+        root, ok = self.root(v)
+        if not ok:
+            return None
+        data = self._layouts.get(v)
+        if data is None:
+            data = self._layouts[v] = p_draw_data(root)
+            while len(self._layouts) > self.max_layouts:
+                self._layouts.popitem(last=False)
+        else:
+            self._layouts.move_to_end(v)
+        return data
+
+class PatriciaTree:
+    """一個使用者的 Patricia：head 給教學步驟用，versions 記錄每次操作後的版本。
+
+    size 是 head 中的鍵值數，由 insert / delete / bulk_insert 維護，
+    所以 weight() 是 O(1)，不必每個請求都走一遍整棵樹。
+    insert / delete / bulk_insert 也會同時更新 versions，並回傳操作後的版本編號。
+    """
+    __slots__ = ("head", "versions", "size")
+
+    def __init__(self):
+        self.head = Node(None, -1)
+        self.versions = PatriciaVersions()
+        self.size = 0
+
+    def contains(self, key):
+        if self.head.key is None or not valid_key(key):
+            return False
+        key = as_key(key)
+        return pat_search(self.head, key).key == key
+
+    def insert(self, key):
+        """insert_with_steps 並更新 size 與 versions，回傳 (steps, 版本編號)。"""
+        before = self.contains(key)
+        steps, self.head = insert_with_steps(self.head, key)
+        if before or not self.contains(key):
+            return steps, self.versions.current
+        self.size += 1
+        return steps, self.versions.insert(key)
+
+    def delete(self, key):
+        """delete_with_steps 並更新 size 與 versions，回傳 (steps, 版本編號)。"""
+        before = self.contains(key)
+        steps, self.head = delete_with_steps(self.head, key)
+        if not before:
+            return steps, self.versions.current
+        self.size -= 1
+        return steps, self.versions.delete(key)
+
+    def bulk_insert(self, keys, frames=0):
+        """bulk_insert 並更新 size 與 versions，回傳 (steps, stats, 版本編號)。
+
+        有插入鍵值時整棵樹複製成一個新版本 (見 PatriciaVersions.snapshot)。
+        """
+        steps, self.head, stats = bulk_insert(self.head, keys, frames=frames)
+        if not stats["inserted"]:
+            return steps, stats, self.versions.current
+        self.size += stats["inserted"]
+        return steps, stats, self.versions.snapshot(self.head)
+
+    def weight(self):
+        return self.size + self.versions.nodes
+
+    def bulk_weight(self, count):
+        """插入 count 個新鍵值後 weight() 的上限：樹本身加上 snapshot 複製的整棵樹。"""
+        return 2 * (self.size + count) + self.versions.nodes
+
+    def __getstate__(self):
+        return (flatten_nodes(self.head), self.versions, self.size)
+
+    def __setstate__(self, state):
+        records, self.versions, self.size = state
+        self.head = unflatten_nodes(records)
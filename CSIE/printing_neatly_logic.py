@@ -1,6 +1,6 @@
 import math
 
-def solve_printing_neatly(text, M):
+def iter_printing_neatly(text, M):
     words = text.split()
     n = len(words)
     # lengths of words
@@ -14,8 +14,6 @@ def solve_printing_neatly(text, M):
     extras = [[0] * n for _ in range(n)]
     lc = [[0] * n for _ in range(n)]
     
-    steps = []
-    
     # Precompute extras and line costs
     for i in range(n):
         current_len = 0
@@ -34,12 +32,12 @@ def solve_printing_neatly(text, M):
             else:
                 lc[i][j] = rem ** 3
                 
-    steps.append({
+    yield {
         "type": "init",
         "msg": f"初始化: 計算所有可能的行成本 (Line Cost)。\nM = {M}, 單字數 = {n}",
         "words": words,
         "M": M
-    })
+    }
 
     # DP array
     # c[j] = min cost to arrange words 0..j-1 (first j words)
@@ -97,7 +95,7 @@ def solve_printing_neatly(text, M):
             msg += f"</ul>"
             msg += f"因此，我們選擇 $i={best_i}$ 作為最佳切分點，並記錄 $c[{j}] = {best_val}$。"
 
-        steps.append({
+        yield {
             "type": "dp_step",
             "j": j,
             "c": [val if val != float('inf') else "∞" for val in c],
@@ -105,7 +103,7 @@ def solve_printing_neatly(text, M):
             "best_i": best_i,
             "best_val": best_val if best_val != float('inf') else "∞",
             "msg": msg
-        })
+        }
 
     # Reconstruct
     lines = []
@@ -117,11 +115,13 @@ def solve_printing_neatly(text, M):
         lines.insert(0, " ".join(line_words))
         curr = start_node - 1
         
-    steps.append({
+    yield {
         "type": "result",
         "lines": lines,
         "final_cost": c[n],
         "msg": f"計算完成。最小總成本為 {c[n]}。"
-    })
+    }
     
-    return steps
+
+def solve_printing_neatly(text, M):
+    return list(iter_printing_neatly(text, M))
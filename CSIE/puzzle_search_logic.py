@@ -0,0 +1,341 @@
+import heapq
+
+# Boards are packed into one int, 4 bits per cell: cell i (row-major) keeps its
+# tile in bits 4i..4i+3 and 0 is the blank, so 8- and 15-puzzles both fit.
+#
+# "best_first": greedy best-first search, f = h (fast, path not optimal)
+# "astar":      A* with a heap-based open set, f = g + h (optimal)
+# "idastar":    IDA*, depth-first with an f bound (optimal, memory = path length)
+ENGINES = ("best_first", "astar", "idastar")
+SIZES = (3, 4)
+# Give up after this many expanded states (the web route passes a smaller budget)
+MAX_EXPANSIONS = 1000000
+# Sampled search steps per doubling of the expansion count
+SAMPLES_PER_DOUBLING = 32
+
+
+def pack(board):
+    code = 0
+    for i, tile in enumerate(t for row in board for t in row):
+        code |= tile << (4 * i)
+    return code
+
+
+def unpack(code, n):
+    return [[(code >> (4 * (r * n + c))) & 15 for c in range(n)] for r in range(n)]
+
+
+def check_boards(start, goal):
+    """檢查起始 / 目標盤面，回傳邊長 n；格式不對時丟出 ValueError。"""
+    boards = (("起始", start), ("目標", goal))
+    n = len(start) if isinstance(start, list) else 0
+    if n not in SIZES:
+        raise ValueError(f"只支援 {' / '.join(f'{s}x{s}' for s in SIZES)} 的盤面")
+    for name, board in boards:
+        if not isinstance(board, list) or len(board) != n or \
+                any(not isinstance(row, list) or len(row) != n for row in board):
+            raise ValueError(f"{name}盤面必須是 {n}x{n}")
+        tiles = [t for row in board for t in row]
+        # bool is an int subclass and 5.0 == 5; neither packs into a board
+        if any(type(t) is not int for t in tiles) or sorted(tiles) != list(range(n * n)):
+            raise ValueError(f"{name}盤面必須剛好包含 0 ~ {n * n - 1} 各一次 (0 代表空格)")
+    return n
+
+
+def solvable(start, goal, n):
+    """起始盤面能否滑到目標盤面。
+
+    每次移動都是空格和一個方塊交換 (奇置換)，而空格的曼哈頓距離奇偶也跟著翻轉，
+    所以兩者的奇偶必須相同。
+    """
+    flat_start = [t for row in start for t in row]
+    where = {t: i for i, t in enumerate(t for row in goal for t in row)}
+    perm = [where[t] for t in flat_start]
+    parity = 0
+    seen = [False] * len(perm)
+    for i in range(len(perm)):
+        if seen[i]:
+            continue
+        length = 0
+        while not seen[i]:
+            seen[i] = True
+            i = perm[i]
+            length += 1
+        parity ^= (length - 1) & 1
+    a = flat_start.index(0)
+    b = where[0]
+    blank = abs(a // n - b // n) + abs(a % n - b % n)
+    return parity == blank & 1
+
+
+def longest_increasing(seq):
+    # Length of the longest strictly increasing subsequence (n <= 4, so O(n^2) is fine)
+    best = [1] * len(seq)
+    for i in range(len(seq)):
+        for j in range(i):
+            if seq[j] < seq[i] and best[j] + 1 > best[i]:
+                best[i] = best[j] + 1
+    return max(best, default=0)
+
+
+class Heuristic:
+    """目標盤面固定後的 Manhattan 距離 + 線性衝突 (linear conflict)。
+
+    同一列 (行) 中、目標也在這一列 (行) 的方塊若順序顛倒，至少要有方塊離開再回來，
+    每個要移開的方塊多 2 步。h = Manhattan + 2 * 衝突數，可採納 (admissible)。
+    移動一個方塊只會改變兩條線的衝突數，所以 move() 只重算這兩條線 (有快取)。
+    搜尋時同時維護轉置後的盤面 (行優先)，讓每一行也是連續的 4n 個 bit。
+    """
+
+    def __init__(self, goal, n):
+        self.n = n
+        self.goal = pack(goal)
+        cells = n * n
+        goal_pos = [0] * cells
+        for i, t in enumerate(t for row in goal for t in row):
+            goal_pos[t] = i
+        goal_row = [p // n for p in goal_pos]
+        goal_col = [p % n for p in goal_pos]
+        # dist[t][p]: Manhattan distance of tile t at cell p from its goal cell
+        self.dist = [[0] * cells if t == 0 else
+                     [abs(p // n - goal_row[t]) + abs(p % n - goal_col[t]) for p in range(cells)]
+                     for t in range(cells)]
+        self.moves = [[q for q in (p - n, p + n, p - 1, p + 1)
+                       if 0 <= q < cells and (q // n == p // n or q % n == p % n)]
+                      for p in range(cells)]
+        self.transposed = [(p % n) * n + p // n for p in range(cells)]
+        self.mask = (1 << (4 * n)) - 1
+        # Line i of the board is row i; line i of the transposed board is column i
+        self.rows = [LineConflicts(i, goal_row, goal_col, n) for i in range(n)]
+        self.cols = [LineConflicts(i, goal_col, goal_row, n) for i in range(n)]
+
+    def transpose(self, code):
+        n = self.n
+        out = 0
+        for p in range(n * n):
+            out |= ((code >> (4 * p)) & 15) << (4 * self.transposed[p])
+        return out
+
+    def evaluate(self, code):
+        """從頭計算 (manhattan, conflicts)。"""
+        n = self.n
+        tcode = self.transpose(code)
+        width = 4 * n
+        md = sum(self.dist[(code >> (4 * p)) & 15][p] for p in range(n * n))
+        lc = sum(self.rows[i][(code >> (width * i)) & self.mask] +
+                 self.cols[i][(tcode >> (width * i)) & self.mask] for i in range(n))
+        return md, lc
+
+    def move(self, code, tcode, blank, to, md, lc):
+        """把 to 格的方塊滑進空格 blank，回傳 (新盤面, 新轉置盤面, manhattan, conflicts)。"""
+        n = self.n
+        tile = (code >> (4 * to)) & 15
+        new = code ^ (tile << (4 * to)) ^ (tile << (4 * blank))
+        t_to = self.transposed[to]
+        t_blank = self.transposed[blank]
+        tnew = tcode ^ (tile << (4 * t_to)) ^ (tile << (4 * t_blank))
+        md += self.dist[tile][blank] - self.dist[tile][to]
+        mask = self.mask
+        width = 4 * n
+        if to // n == blank // n:
+            # Horizontal move: the row keeps its order, two columns change
+            old, now, lines, a, b = tcode, tnew, self.cols, t_to // n, t_blank // n
+        else:
+            old, now, lines, a, b = code, new, self.rows, to // n, blank // n
+        la, lb = lines[a], lines[b]
+        sa, sb = width * a, width * b
+        lc += la[(now >> sa) & mask] + lb[(now >> sb) & mask] - la[(old >> sa) & mask] - lb[(old >> sb) & mask]
+        return new, tnew, md, lc
+
+
+class LineConflicts(dict):
+    """一條線 (4n 個 bit) -> 要移開幾個方塊才能消除線性衝突，第一次查到時才計算。"""
+
+    def __init__(self, line, major, minor, n):
+        super().__init__()
+        self.line = line
+        self.major = major
+        self.minor = minor
+        self.n = n
+
+    def __missing__(self, bits):
+        order = [self.minor[t] for t in ((bits >> (4 * k)) & 15 for k in range(self.n))
+                 if t and self.major[t] == self.line]
+        cost = self[bits] = len(order) - longest_increasing(order)
+        return cost
+
+
+def blank_of(code, n):
+    for p in range(n * n):
+        if (code >> (4 * p)) & 15 == 0:
+            return p
+    return -1
+
+
+def sample_due(expanded):
+    # Every expansion at first, then SAMPLES_PER_DOUBLING per doubling
+    stride = 1 << max(0, (expanded // SAMPLES_PER_DOUBLING).bit_length() - 1)
+    return expanded % stride == 0
+
+
+def search_step(heur, code, g, md, lc, expanded, msg, **fields):
+    step = {
+        "msg": msg,
+        "board": unpack(code, heur.n),
+        "g": g,
+        "h": md + 2 * lc,
+        "f": g + md + 2 * lc,
+        "expanded": expanded,
+        "phase": "search",
+    }
+    step.update(fields)
+    return step
+
+
+def solved_step(heur, path, expanded, engine):
+    n = heur.n
+    moves = len(path) - 1
+    note = "最佳解 (h 可採納)" if engine != "best_first" else "貪婪最佳優先不保證最短"
+    return {
+        "msg": f"找到解答！共 {moves} 步，展開了 {expanded} 個狀態。\n({note})",
+        "board": unpack(path[-1], n),
+        "path": [unpack(code, n) for code in path],
+        "moves": moves,
+        "expanded": expanded,
+        "phase": "solved",
+    }
+
+
+def limit_step(expanded):
+    return {"msg": f"展開超過 {expanded} 個狀態，停止搜尋。", "expanded": expanded, "phase": "limit"}
+
+
+def heap_search(heur, start, engine, max_expansions):
+    # A* (f = g + h) or greedy best-first (f = h) on a binary heap.
+    # Ties prefer the smaller h, then the older entry.
+    greedy = engine == "best_first"
+    n = heur.n
+    goal = heur.goal
+    md, lc = heur.evaluate(start)
+    h = md + 2 * lc
+    heap = [(h, h, 0, start, heur.transpose(start), blank_of(start, n), 0, md, lc)]
+    parent = {start: None}
+    best_g = {start: 0}
+    seq = 0
+    expanded = 0
+    while heap:
+        f, h, _, code, tcode, blank, g, md, lc = heapq.heappop(heap)
+        if g > best_g[code]:
+            continue
+        if code == goal:
+            path = []
+            while code is not None:
+                path.append(code)
+                code = parent[code]
+            path.reverse()
+            yield solved_step(heur, path, expanded, engine)
+            return
+        expanded += 1
+        if expanded > max_expansions:
+            yield limit_step(max_expansions)
+            return
+        if sample_due(expanded):
+            yield search_step(heur, code, g, md, lc, expanded,
+                              f"展開第 {expanded} 個狀態：g={g}, h={h}, f={f}。\nOpen set 還有 {len(heap)} 個狀態。",
+                              open_size=len(heap))
+        for to in heur.moves[blank]:
+            new, tnew, nmd, nlc = heur.move(code, tcode, blank, to, md, lc)
+            ng = g + 1
+            if greedy:
+                if new in parent:
+                    continue
+            elif ng >= best_g.get(new, ng + 1):
+                continue
+            best_g[new] = ng
+            parent[new] = code
+            nh = nmd + 2 * nlc
+            seq += 1
+            heapq.heappush(heap, (nh if greedy else ng + nh, nh, seq, new, tnew, to, ng, nmd, nlc))
+    yield {"msg": "Open set 為空，無解答。", "expanded": expanded, "phase": "fail"}
+
+
+def ida_search(heur, start, max_expansions):
+    # IDA*: depth-first search bounded by f; the next bound is the smallest f that
+    # exceeded the current one. Never steps straight back to the previous cell.
+    n = heur.n
+    goal = heur.goal
+    md, lc = heur.evaluate(start)
+    bound = md + 2 * lc
+    tstart = heur.transpose(start)
+    expanded = 0
+    if start == goal:
+        yield solved_step(heur, [start], expanded, "idastar")
+        return
+    while True:
+        yield {"msg": f"開始新一輪深度優先搜尋，f 上限 = {bound}。", "board": unpack(start, n),
+               "bound": bound, "expanded": expanded, "phase": "bound"}
+        next_bound = None
+        blank = blank_of(start, n)
+        stack = [(start, tstart, blank, md, lc, -1, iter(heur.moves[blank]))]
+        while stack:
+            code, tcode, blank, cmd, clc, prev, it = stack[-1]
+            for to in it:
+                if to == prev:
+                    continue
+                new, tnew, nmd, nlc = heur.move(code, tcode, blank, to, cmd, clc)
+                g = len(stack)
+                f = g + nmd + 2 * nlc
+                if f > bound:
+                    if next_bound is None or f < next_bound:
+                        next_bound = f
+                    continue
+                if new == goal:
+                    yield solved_step(heur, [frame[0] for frame in stack] + [new], expanded, "idastar")
+                    return
+                expanded += 1
+                if expanded > max_expansions:
+                    yield limit_step(max_expansions)
+                    return
+                if sample_due(expanded):
+                    yield search_step(heur, new, g, nmd, nlc, expanded,
+                                      f"展開第 {expanded} 個狀態：深度 {g}, h={nmd + 2 * nlc}, f={f} (上限 {bound})。",
+                                      bound=bound)
+                stack.append((new, tnew, to, nmd, nlc, blank, iter(heur.moves[to])))
+                break
+            else:
+                stack.pop()
+        if next_bound is None:
+            yield {"msg": "所有狀態都搜尋過了，無解答。", "expanded": expanded, "phase": "fail"}
+            return
+        bound = next_bound
+
+
+def iter_puzzle_search(start_board, goal_board, engine="astar", max_expansions=MAX_EXPANSIONS):
+    # start_board / goal_board: n x n list (n = 3 或 4)，0 代表空格
+    # engine: 見 ENGINES
+    # 只取樣部分搜尋過程 (見 sample_due)，不為每個狀態都產生一步
+    n = check_boards(start_board, goal_board)
+    heur = Heuristic(goal_board, n)
+    start = pack(start_board)
+    md, lc = heur.evaluate(start)
+    yield {
+        "msg": f"初始狀態 ({n * n - 1}-puzzle，引擎 {engine})。\n"
+               f"h = Manhattan 距離 {md} + 2 x 線性衝突 {lc} = {md + 2 * lc}",
+        "board": start_board,
+        "goal": goal_board,
+        "size": n,
+        "h": md + 2 * lc,
+        "phase": "init",
+    }
+    if not solvable(start_board, goal_board, n):
+        yield {"msg": "這個起始盤面無法滑到目標盤面 (置換奇偶與空格距離奇偶不同)，無解答。",
+               "phase": "unsolvable"}
+        return
+    if engine == "idastar":
+        yield from ida_search(heur, start, max_expansions)
+    else:
+        yield from heap_search(heur, start, engine, max_expansions)
+
+
+def solve_puzzle(start_board, goal_board, engine="astar", max_expansions=MAX_EXPANSIONS):
+    return list(iter_puzzle_search(start_board, goal_board, engine=engine, max_expansions=max_expansions))
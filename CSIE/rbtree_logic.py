@@ -1,29 +1,53 @@
-import enum
+from array import array
 
-class Color(enum.Enum):
-    RED = "RED"
-    BLACK = "BLACK"
+from tracer import QUIET, Tracer
+
+# Colors are plain ints: comparing them is much cheaper than Enum.__eq__
+RED = 0
+BLACK = 1
+COLOR_NAMES = ("RED", "BLACK")
 
 class Node:
-    def __init__(self, key, color=Color.BLACK, left=None, right=None, p=None):
+    __slots__ = ("key", "color", "left", "right", "p", "uid", "size")
+
+    def __init__(self, key, color=BLACK, left=None, right=None, p=None, uid=0, size=0):
         self.key = key
         self.color = color
         self.left = left
         self.right = right
         self.p = p
-        # Unique ID for frontend tracking
-        self.uid = id(self)
+        # Unique ID for frontend tracking (from the tree's counter, survives pickling)
+        self.uid = uid
+        # Number of nodes in this subtree (nil = 0), gives rank / select in O(log n)
+        self.size = size
 
 # ------------- Visualization Helpers -------------
 
-def push_step(steps, tree, msg, highlight_node=None, canvas_msg=None, rotation=None):
+# Every response starts with a full snapshot ("key"); after that a step only
+# carries the nodes whose color or children changed ("delta"), with a new
+# keyframe every KEYFRAME_EVERY steps. decode_snaps() / rbtree.js rebuild
+# the full tree (and its layout) from that.
+KEYFRAME_EVERY = 50
+
+def push_step(steps, tree, msg, highlight_node=None, canvas_msg=None, rotation=None, keyframe=False):
+    if keyframe or len(steps) % KEYFRAME_EVERY == 0:
+        snap = export_tree(tree, highlight_node)
+        snap["kind"] = "key"
+    else:
+        snap = export_delta(tree, highlight_node)
+    tree.dirty.clear()
+    tree.removed.clear()
     steps.append({
-        "snap": export_tree(tree, highlight_node),
+        "snap": snap,
         "msg": msg,
         "canvas_msg": canvas_msg,
         "rotation": rotation
     })
 
+def recorder():
+    """記錄步驟的 tracer (tracer.steps 就是要回傳給前端的步驟)。"""
+    return Tracer(push_step)
+
 def export_tree(tree, highlight_node=None):
     if tree.root == tree.nil:
         return {"root_id": None, "nodes": [], "edges": []}
@@ -36,21 +60,19 @@ def export_tree(tree, highlight_node=None):
     # Inorder traversal for X, Depth for Y.
     
     pos = {}
-    x_counter = [0]
     
-    def inorder(u, depth):
-        if u == tree.nil:
-            return
-        inorder(u.left, depth + 1)
-        
-        # Assign pos
-        # Shift Y down by 100px to make room for canvas_msg at the top
-        pos[u.uid] = {"x": x_counter[0] * 50 + 50, "y": depth * 60 + 150}
-        x_counter[0] += 1
-        
-        inorder(u.right, depth + 1)
-        
-    inorder(tree.root, 0)
+    # Iterative in-order walk (no recursion limit on big trees)
+    # Shift Y down by 100px to make room for canvas_msg at the top
+    stack = []
+    u, depth, x_counter = tree.root, 0, 0
+    while stack or u != tree.nil:
+        while u != tree.nil:
+            stack.append((u, depth))
+            u, depth = u.left, depth + 1
+        u, depth = stack.pop()
+        pos[u.uid] = {"x": x_counter * 50 + 50, "y": depth * 60 + 150}
+        x_counter += 1
+        u, depth = u.right, depth + 1
     
     # Generate nodes and edges list
     stack = [tree.root]
@@ -63,10 +85,12 @@ def export_tree(tree, highlight_node=None):
         nodes.append({
             "id": str(u.uid),
             "key": str(u.key),
-            "color": u.color.value,
+            "color": COLOR_NAMES[u.color],
             "x": p["x"],
             "y": p["y"],
-            "is_highlight": (u == highlight_node)
+            "is_highlight": (u == highlight_node),
+            "left": None if u.left == tree.nil else str(u.left.uid),
+            "right": None if u.right == tree.nil else str(u.right.uid)
         })
         
         if u.left != tree.nil:
@@ -79,17 +103,481 @@ def export_tree(tree, highlight_node=None):
             
     return {"root_id": str(tree.root.uid) if tree.root != tree.nil else None, "nodes": nodes, "edges": edges}
 
+def node_record(tree, u):
+    return {
+        "id": str(u.uid),
+        "key": str(u.key),
+        "color": COLOR_NAMES[u.color],
+        "left": None if u.left == tree.nil else str(u.left.uid),
+        "right": None if u.right == tree.nil else str(u.right.uid)
+    }
+
+def export_delta(tree, highlight_node=None):
+    """只輸出上次快照後顏色或子節點有變動的節點 (以及被刪掉的節點 id)。"""
+    return {
+        "kind": "delta",
+        "root_id": str(tree.root.uid) if tree.root != tree.nil else None,
+        "nodes": [node_record(tree, u) for u in tree.dirty if u is not tree.nil],
+        "removed": [str(u.uid) for u in tree.removed],
+        "highlight_id": str(highlight_node.uid) if highlight_node not in (None, tree.nil) else None
+    }
+
+def layout_snap(records, root_id, highlight_id=None):
+    """由 id -> 節點紀錄 算出與 export_tree 相同格式的快照 (中序決定 x，深度決定 y)。"""
+    if root_id is None:
+        return {"root_id": None, "nodes": [], "edges": []}
+    nodes = []
+    edges = []
+    rank = 0
+    stack = []
+    cur, depth = root_id, 0
+    while stack or cur is not None:
+        while cur is not None:
+            stack.append((cur, depth))
+            cur, depth = records[cur]["left"], depth + 1
+        cur, depth = stack.pop()
+        r = records[cur]
+        nodes.append({"id": cur, "key": r["key"], "color": r["color"],
+                      "x": rank * 50 + 50, "y": depth * 60 + 150,
+                      "is_highlight": cur == highlight_id,
+                      "left": r["left"], "right": r["right"]})
+        for c in (r["left"], r["right"]):
+            if c is not None:
+                edges.append({"u": cur, "v": c})
+        rank += 1
+        cur, depth = r["right"], depth + 1
+    return {"root_id": root_id, "nodes": nodes, "edges": edges}
+
+def decode_snaps(steps):
+    """把 keyframe + delta 的快照還原成完整快照 (與 rbtree.js 的做法相同)。"""
+    records = {}
+    for step in steps:
+        snap = step["snap"]
+        if snap.get("kind", "key") == "key":
+            records = {n["id"]: n for n in snap["nodes"]}
+            highlight_id = next((n["id"] for n in snap["nodes"] if n["is_highlight"]), None)
+        else:
+            for i in snap["removed"]:
+                records.pop(i, None)
+            for n in snap["nodes"]:
+                records[n["id"]] = n
+            highlight_id = snap["highlight_id"]
+        yield layout_snap(records, snap["root_id"], highlight_id)
+
+def sorted_unique(keys):
+    keys = list(keys)
+    if any(keys[i] >= keys[i + 1] for i in range(len(keys) - 1)):
+        keys = sorted(set(keys))
+    return keys
+
 class RBTree:
     def __init__(self):
-        self.nil = Node(key=None, color=Color.BLACK)
+        self.nil = Node(key=None, color=BLACK)
         self.nil.left = self.nil
         self.nil.right = self.nil
         self.root = self.nil
+        self.size = 0
+        self.next_uid = 1
+        self.dirty = set()      # nodes whose color / children changed since the last snapshot
+        self.removed = set()
+
+    def new_node(self, key, color=RED):
+        node = Node(key, color, self.nil, self.nil, self.nil, self.next_uid, 1)
+        self.next_uid += 1
+        return node
+
+    def touch(self, node):
+        if node is not self.nil:
+            self.dirty.add(node)
+
+    def paint(self, node, color):
+        node.color = color
+        self.touch(node)
+
+    def update_sizes(self, node):
+        # Recompute subtree sizes from node up to the root
+        while node is not self.nil:
+            node.size = node.left.size + node.right.size + 1
+            node = node.p
+
+    def drop(self, z, start):
+        # z has been unlinked; start is the lowest node whose subtree lost it
+        self.dirty.discard(z)
+        self.removed.add(z)
+        self.update_sizes(start)
+
+    # ------------- Order statistics / range queries -------------
+    # All of these only walk one root-to-leaf path (plus the k reported keys
+    # for range_keys) thanks to the subtree sizes.
+
+    def select(self, i, tracer=QUIET):
+        """第 i 小的節點 (1 起算，CLRS OS-SELECT)；超出範圍回傳 None。"""
+        if not 1 <= i <= self.root.size:
+            if tracer.enabled:
+                tracer.step(self, f"樹中只有 {self.root.size} 個節點，沒有第 {i} 小的鍵值。", canvas_msg="超出範圍")
+            return None
+        x = self.root
+        while True:
+            r = x.left.size + 1
+            if i == r:
+                if tracer.enabled:
+                    tracer.step(self, f"{x.key} 的左子樹有 {r - 1} 個節點，它正是第 {r} 小，找到了。", highlight_node=x, canvas_msg=f"找到 {x.key}")
+                return x
+            if i < r:
+                if tracer.enabled:
+                    tracer.step(self, f"{x.key} 在這棵子樹中排第 {r}，要找第 {i} 小 → 往左走。", highlight_node=x, canvas_msg=f"{i} < {r} → 左")
+                x = x.left
+            else:
+                if tracer.enabled:
+                    tracer.step(self, f"{x.key} 在這棵子樹中排第 {r}，要找第 {i} 小 → 往右走，改找右子樹中第 {i - r} 小。", highlight_node=x, canvas_msg=f"{i} > {r} → 右")
+                i -= r
+                x = x.right
+
+    def rank_of(self, key, tracer=QUIET):
+        """key 在樹中的名次 (1 起算，CLRS OS-RANK)；key 不在樹中回傳 None。"""
+        r = 0
+        x = self.root
+        while x != self.nil:
+            if key < x.key:
+                if tracer.enabled:
+                    tracer.step(self, f"{key} < {x.key}，往左走。", highlight_node=x, canvas_msg=f"{key} < {x.key} → 左")
+                x = x.left
+            elif key > x.key:
+                r += x.left.size + 1
+                if tracer.enabled:
+                    tracer.step(self, f"{key} > {x.key}：{x.key} 與它的左子樹 ({x.left.size} 個) 都比 {key} 小，累計 {r} 個，往右走。", highlight_node=x, canvas_msg=f"累計 {r} → 右")
+                x = x.right
+            else:
+                r += x.left.size + 1
+                if tracer.enabled:
+                    tracer.step(self, f"找到 {key}，再加上左子樹的 {x.left.size} 個節點，名次為 {r}。", highlight_node=x, canvas_msg=f"名次 {r}")
+                return r
+        if tracer.enabled:
+            tracer.step(self, f"找不到鍵值 {key}。", canvas_msg="找不到鍵值")
+        return None
+
+    def count_below(self, key, inclusive=False):
+        """樹中 < key (inclusive 時為 <= key) 的鍵值個數。"""
+        r = 0
+        x = self.root
+        while x != self.nil:
+            if key < x.key or (key == x.key and not inclusive):
+                x = x.left
+            else:
+                r += x.left.size + 1
+                x = x.right
+        return r
+
+    def range_count(self, lo, hi):
+        """lo <= key <= hi 的鍵值個數，O(log n)。"""
+        if hi < lo:
+            return 0
+        return self.count_below(hi, inclusive=True) - self.count_below(lo)
+
+    def range_keys(self, lo, hi, tracer=QUIET):
+        """依序列出 lo <= key <= hi 的鍵值，O(log n + k)。"""
+        keys = []
+        if hi < lo:
+            return keys
+        stack = []
+        x = self.root
+        while stack or x != self.nil:
+            while x != self.nil:
+                if x.key < lo:
+                    # x and its whole left subtree are below the range
+                    if tracer.enabled:
+                        tracer.step(self, f"{x.key} < {lo}，左子樹都不在範圍內，往右走。", highlight_node=x, canvas_msg=f"{x.key} < {lo} → 右")
+                    x = x.right
+                else:
+                    stack.append(x)
+                    x = x.left
+            if not stack:
+                break
+            x = stack.pop()
+            if x.key > hi:
+                if tracer.enabled:
+                    tracer.step(self, f"{x.key} > {hi}，之後的鍵值都超出範圍，結束。", highlight_node=x, canvas_msg=f"{x.key} > {hi} → 結束")
+                break
+            keys.append(x.key)
+            if tracer.enabled:
+                tracer.step(self, f"{x.key} 在範圍 [{lo}, {hi}] 內，輸出 (目前 {len(keys)} 個)。", highlight_node=x, canvas_msg=f"輸出 {x.key}")
+            x = x.right
+        return keys
+
+    def keys(self):
+        """中序 (由小到大) 列出所有鍵值。"""
+        out = []
+        stack = []
+        x = self.root
+        while stack or x != self.nil:
+            while x != self.nil:
+                stack.append(x)
+                x = x.left
+            x = stack.pop()
+            out.append(x.key)
+            x = x.right
+        return out
+
+    # ------------- Bulk operations (join-based) -------------
+    # join(l, k, r) glues two red-black trees and a middle node in
+    # O(|bh(l) - bh(r)|); split / union / difference are built from it.
+    # Subtrees are handled by their root node (root.p is nil, root is black).
+    # These run silently: the caller records one snapshot before and one after.
+
+    def black_height(self, t):
+        h = 0
+        while t != self.nil:
+            if t.color == BLACK:
+                h += 1
+            t = t.left
+        return h
+
+    def detach(self, t):
+        # Cut t off its parent; a red subtree root is simply painted black
+        if t != self.nil:
+            t.p = self.nil
+            if t.color == RED:
+                self.paint(t, BLACK)
+        return t
+
+    def join(self, l, k, r):
+        """以節點 k 接起 l 與 r (l 的鍵值 < k.key < r 的鍵值)，回傳新樹的根。"""
+        nil = self.nil
+        hl = self.black_height(l)
+        hr = self.black_height(r)
+        if hl == hr:
+            k.left, k.right, k.p = l, r, nil
+            if l != nil:
+                l.p = k
+            if r != nil:
+                r.p = k
+            self.paint(k, BLACK)
+            self.update_sizes(k)
+            return k
+
+        # Walk down the spine of the taller tree (right spine of l, left spine
+        # of r) to a black node c with the same black height as the other tree
+        taller_left = hl > hr
+        c, h, target = (l, hl, hr) if taller_left else (r, hr, hl)
+        root, parent = c, nil
+        while c.color == RED or h != target:
+            if c.color == BLACK:
+                h -= 1
+            parent = c
+            c = c.right if taller_left else c.left
+        if taller_left:
+            k.left, k.right = c, r
+            parent.right = k
+        else:
+            k.left, k.right = l, c
+            parent.left = k
+        k.p = parent
+        for child in (k.left, k.right):
+            if child != nil:
+                child.p = k
+        self.paint(k, RED)
+        self.update_sizes(k)
+        self.root = root
+        self.insert_fixup(k, QUIET)
+        return self.root
+
+    def check_comparable(self, key):
+        """key 無法與樹中的鍵值比較時丟出 TypeError。
+
+        split_at 在比較之前就先拆下子樹，所以批次操作要在改動樹之前先檢查。
+        """
+        if self.root != self.nil:
+            # Only the TypeError matters (e.g. str vs int), not the result
+            key < self.root.key
+            key > self.root.key
+
+    def split_at(self, t, key):
+        """把以 t 為根的樹切成 (< key 的樹, key 所在的節點或 None, > key 的樹)。"""
+        if t == self.nil:
+            return self.nil, None, self.nil
+        l = self.detach(t.left)
+        r = self.detach(t.right)
+        if key < t.key:
+            ll, m, lr = self.split_at(l, key)
+            return ll, m, self.join(lr, t, r)
+        if key > t.key:
+            rl, m, rr = self.split_at(r, key)
+            return self.join(l, t, rl), m, rr
+        return l, t, r
+
+    def split_first(self, t):
+        # (t without its smallest node, that node); t is not nil
+        if t.left == self.nil:
+            return self.detach(t.right), t
+        rest, m = self.split_first(self.detach(t.left))
+        return self.join(rest, t, self.detach(t.right)), m
+
+    def join2(self, l, r):
+        if r == self.nil:
+            return l
+        r, m = self.split_first(r)
+        return self.join(l, m, r)
+
+    def build(self, keys, lo, hi, depth, red_depth):
+        """由排好序的 keys[lo:hi] 建出平衡的樹；最深一層 (red_depth) 塗紅，其餘為黑，O(n)。"""
+        if lo >= hi:
+            return self.nil
+        mid = (lo + hi) // 2
+        node = self.new_node(keys[mid], RED if depth == red_depth else BLACK)
+        node.left = self.build(keys, lo, mid, depth + 1, red_depth)
+        node.right = self.build(keys, mid + 1, hi, depth + 1, red_depth)
+        if node.left != self.nil:
+            node.left.p = node
+        if node.right != self.nil:
+            node.right.p = node
+        node.size = hi - lo
+        return node
+
+    def build_sorted(self, keys, lo, hi):
+        n = hi - lo
+        # Median splits put every leaf on the last two levels; only the last one is red
+        root = self.build(keys, lo, hi, 0, n.bit_length() - 1 if n > 1 else -1)
+        if root != self.nil:
+            root.p = self.nil
+        return root
+
+    def union_sorted(self, t, keys, lo, hi):
+        """把排好序的 keys[lo:hi] 併入以 t 為根的樹，回傳新的根。"""
+        if lo >= hi:
+            return t
+        if t == self.nil:
+            return self.build_sorted(keys, lo, hi)
+        mid = (lo + hi) // 2
+        l, m, r = self.split_at(t, keys[mid])
+        if m is None:
+            m = self.new_node(keys[mid])
+        l = self.union_sorted(l, keys, lo, mid)
+        r = self.union_sorted(r, keys, mid + 1, hi)
+        return self.join(l, m, r)
+
+    def difference_sorted(self, t, keys, lo, hi):
+        """從以 t 為根的樹刪掉排好序的 keys[lo:hi]，回傳新的根。"""
+        if lo >= hi or t == self.nil:
+            return t
+        mid = (lo + hi) // 2
+        l, m, r = self.split_at(t, keys[mid])
+        l = self.difference_sorted(l, keys, lo, mid)
+        r = self.difference_sorted(r, keys, mid + 1, hi)
+        return self.join2(l, r)
+
+    def settle(self, root):
+        # Install root after a bulk operation
+        self.root = self.detach(root)
+        self.size = root.size
+        self.dirty.clear()
+        self.removed.clear()
+
+    def bulk_load(self, keys, tracer=QUIET):
+        """一次加入多個鍵值，回傳新加入的個數。
+
+        樹是空的時候直接由排好序的鍵值建出平衡的紅黑樹 (O(n))，
+        否則以 join 為基礎做聯集 (O(m log(n/m + 1)))。
+        """
+        keys = sorted_unique(keys)
+        for k in keys[:1] + keys[-1:]:
+            self.check_comparable(k)
+        before = self.size
+        if tracer.enabled:
+            tracer.step(self, f"批次插入 {len(keys)} 個鍵值。", canvas_msg="批次插入")
+        self.settle(self.union_sorted(self.root, keys, 0, len(keys)))
+        if tracer.enabled:
+            tracer.step(self, f"批次插入完成，新增 {self.size - before} 個鍵值，共 {self.size} 個。", highlight_node=self.root, canvas_msg="批次插入完成", keyframe=True)
+        return self.size - before
+
+    def union(self, other, tracer=QUIET):
+        """把另一棵 RBTree (或任意鍵值序列) 的鍵值併入這棵樹。"""
+        return self.bulk_load(other.keys() if isinstance(other, RBTree) else other, tracer)
+
+    def bulk_delete(self, keys, tracer=QUIET):
+        """一次刪除多個鍵值 (以 split / join 做差集)，回傳實際刪掉的個數。"""
+        keys = sorted_unique(keys)
+        for k in keys[:1] + keys[-1:]:
+            self.check_comparable(k)
+        before = self.size
+        if tracer.enabled:
+            tracer.step(self, f"批次刪除 {len(keys)} 個鍵值。", canvas_msg="批次刪除")
+        self.settle(self.difference_sorted(self.root, keys, 0, len(keys)))
+        if tracer.enabled:
+            tracer.step(self, f"批次刪除完成，刪掉 {before - self.size} 個鍵值，剩 {self.size} 個。", highlight_node=self.root, canvas_msg="批次刪除完成", keyframe=True)
+        return before - self.size
+
+    def split(self, key, tracer=QUIET):
+        """以 key 切開：這棵樹留下 <= key 的鍵值，> key 的鍵值成為回傳的新樹。
+
+        兩棵樹共用同一個 nil 哨兵，O(log n)。
+        """
+        self.check_comparable(key)
+        if tracer.enabled:
+            tracer.step(self, f"以 {key} 切開紅黑樹。", canvas_msg=f"切開 {key}")
+        l, m, r = self.split_at(self.root, key)
+        if m is not None:
+            l = self.join(l, m, self.nil)
+        other = RBTree.__new__(RBTree)
+        other.nil = self.nil
+        other.next_uid = self.next_uid
+        other.dirty = set()
+        other.removed = set()
+        other.settle(r)
+        self.settle(l)
+        if tracer.enabled:
+            tracer.step(self, f"切開完成：留下 {self.size} 個 <= {key} 的鍵值，{other.size} 個 > {key} 的鍵值分到另一棵樹。", highlight_node=self.root, canvas_msg="切開完成", keyframe=True)
+        return other
+
+    def validate(self):
+        """檢查紅黑樹性質、BST 順序、父指標與 size 欄位，回傳發現的問題 (空串列 = 正確)。"""
+        nil = self.nil
+        errors = []
+        if nil.color != BLACK or nil.size != 0:
+            errors.append("nil 必須是黑色且 size 為 0")
+        if self.root.color != BLACK:
+            errors.append("根節點不是黑色")
+        if self.root != nil and self.root.p != nil:
+            errors.append("根節點的父指標不是 nil")
+        # Post-order: a node is checked once both children have their black height
+        bh = {nil: 0}
+        stack = [(self.root, None, None, False)] if self.root != nil else []
+        while stack:
+            x, lo, hi, expanded = stack.pop()
+            if not expanded:
+                if (lo is not None and not lo < x.key) or (hi is not None and not x.key < hi):
+                    errors.append(f"節點 {x.key} 違反 BST 順序")
+                stack.append((x, lo, hi, True))
+                for c, clo, chi in ((x.left, lo, x.key), (x.right, x.key, hi)):
+                    if c != nil:
+                        if c.p is not x:
+                            errors.append(f"節點 {c.key} 的父指標沒有指向 {x.key}")
+                        stack.append((c, clo, chi, False))
+                continue
+            if x.color == RED and (x.left.color == RED or x.right.color == RED):
+                errors.append(f"紅色節點 {x.key} 有紅色子節點")
+            if bh[x.left] != bh[x.right]:
+                errors.append(f"節點 {x.key} 左右的黑高度不同 ({bh[x.left]} / {bh[x.right]})")
+            if x.size != x.left.size + x.right.size + 1:
+                errors.append(f"節點 {x.key} 的 size 欄位錯誤")
+            bh[x] = bh[x.left] + (x.color == BLACK)
+        if self.size != self.root.size:
+            errors.append(f"樹的 size ({self.size}) 與根的 size ({self.root.size}) 不同")
+        return errors
+
+    def finish(self, tracer):
+        if not tracer.enabled:
+            # No delta will be asked for: the next recorded response starts with a keyframe
+            self.dirty.clear()
+            self.removed.clear()
+        return tracer.steps
+
+    def __len__(self):
+        return self.size
 
     def get_root(self):
         return self.root
 
-    def left_rotate(self, x, steps=None):
+    def left_rotate(self, x, tracer=QUIET):
         y = x.right
         x.right = y.left
         if y.left != self.nil:
@@ -103,10 +591,15 @@ class RBTree:
             x.p.right = y
         y.left = x
         x.p = y
-        if steps is not None:
-            push_step(steps, self, f"左旋 (Left Rotate) 節點 {x.key}。\n{x.key} 變為 {y.key} 的左子節點。", highlight_node=x, canvas_msg=f"左旋 {x.key}", rotation={"type": "left", "id": str(x.uid)})
+        y.size = x.size
+        x.size = x.left.size + x.right.size + 1
+        self.touch(x)
+        self.touch(y)
+        self.touch(y.p)
+        if tracer.enabled:
+            tracer.step(self, f"左旋 (Left Rotate) 節點 {x.key}。\n{x.key} 變為 {y.key} 的左子節點。", highlight_node=x, canvas_msg=f"左旋 {x.key}", rotation={"type": "left", "id": str(x.uid)})
 
-    def right_rotate(self, y, steps=None):
+    def right_rotate(self, y, tracer=QUIET):
         x = y.left
         y.left = x.right
         if x.right != self.nil:
@@ -120,125 +613,149 @@ class RBTree:
             y.p.left = x
         x.right = y
         y.p = x
-        if steps is not None:
-            push_step(steps, self, f"右旋 (Right Rotate) 節點 {y.key}。\n{y.key} 變為 {x.key} 的右子節點。", highlight_node=y, canvas_msg=f"右旋 {y.key}", rotation={"type": "right", "id": str(y.uid)})
+        x.size = y.size
+        y.size = y.left.size + y.right.size + 1
+        self.touch(x)
+        self.touch(y)
+        self.touch(x.p)
+        if tracer.enabled:
+            tracer.step(self, f"右旋 (Right Rotate) 節點 {y.key}。\n{y.key} 變為 {x.key} 的右子節點。", highlight_node=y, canvas_msg=f"右旋 {y.key}", rotation={"type": "right", "id": str(y.uid)})
 
-    def insert(self, key):
-        steps = []
+    def insert(self, key, tracer=None):
+        """插入 key，回傳教學步驟；tracer 為 QUIET 時只做插入、不產生快照 (回傳 None)。"""
+        if tracer is None:
+            tracer = recorder()
         if key is None or key == "":
-            return steps
+            return tracer.steps
             
-        z = Node(key, color=Color.RED)
-        z.left = self.nil
-        z.right = self.nil
+        z = self.new_node(key)
         
         y = self.nil
         x = self.root
         
-        push_step(steps, self, f"準備插入 {key}。\n從根節點開始尋找插入位置。", highlight_node=x if x != self.nil else None, canvas_msg=f"準備插入 {key}")
+        if tracer.enabled:
+            tracer.step(self, f"準備插入 {key}。\n從根節點開始尋找插入位置。", highlight_node=x if x != self.nil else None, canvas_msg=f"準備插入 {key}")
 
         while x != self.nil:
             y = x
             if z.key < x.key:
                 x = x.left
-                push_step(steps, self, f"{z.key} < {y.key}，往左走。", highlight_node=y, canvas_msg=f"{z.key} < {y.key} → 左")
+                if tracer.enabled:
+                    tracer.step(self, f"{z.key} < {y.key}，往左走。", highlight_node=y, canvas_msg=f"{z.key} < {y.key} → 左")
             elif z.key > x.key:
                 x = x.right
-                push_step(steps, self, f"{z.key} > {y.key}，往右走。", highlight_node=y, canvas_msg=f"{z.key} > {y.key} → 右")
+                if tracer.enabled:
+                    tracer.step(self, f"{z.key} > {y.key}，往右走。", highlight_node=y, canvas_msg=f"{z.key} > {y.key} → 右")
             else:
-                push_step(steps, self, f"鍵值 {key} 已存在，不執行插入。", highlight_node=y, canvas_msg="鍵值已存在")
-                return steps # Duplicate
+                if tracer.enabled:
+                    tracer.step(self, f"鍵值 {key} 已存在，不執行插入。", highlight_node=y, canvas_msg="鍵值已存在")
+                return tracer.steps # Duplicate
 
         z.p = y
+        self.touch(z)
+        self.touch(y)
         if y == self.nil:
             self.root = z
-            push_step(steps, self, f"樹為空，{key} 成為根節點 (設為黑色)。", highlight_node=z, canvas_msg="樹空，設為根節點")
+            if tracer.enabled:
+                tracer.step(self, f"樹為空，{key} 成為根節點 (設為黑色)。", highlight_node=z, canvas_msg="樹空，設為根節點")
         elif z.key < y.key:
             y.left = z
-            push_step(steps, self, f"到達葉節點，{key} 插入在 {y.key} 的左邊 (紅色)。", highlight_node=z, canvas_msg=f"插入 {y.key} 左側")
+            if tracer.enabled:
+                tracer.step(self, f"到達葉節點，{key} 插入在 {y.key} 的左邊 (紅色)。", highlight_node=z, canvas_msg=f"插入 {y.key} 左側")
         else:
             y.right = z
-            push_step(steps, self, f"到達葉節點，{key} 插入在 {y.key} 的右邊 (紅色)。", highlight_node=z, canvas_msg=f"插入 {y.key} 右側")
+            if tracer.enabled:
+                tracer.step(self, f"到達葉節點，{key} 插入在 {y.key} 的右邊 (紅色)。", highlight_node=z, canvas_msg=f"插入 {y.key} 右側")
             
-        z.color = Color.RED
+        z.color = RED
+        self.size += 1
+        self.update_sizes(y)
         
-        self.insert_fixup(z, steps)
-        return steps
+        self.insert_fixup(z, tracer)
+        return self.finish(tracer)
 
-    def insert_fixup(self, z, steps):
-        push_step(steps, self, "開始修正 (Fixup) 紅黑樹性質。", highlight_node=z, canvas_msg="開始修正")
+    def insert_fixup(self, z, tracer):
+        if tracer.enabled:
+            tracer.step(self, "開始修正 (Fixup) 紅黑樹性質。", highlight_node=z, canvas_msg="開始修正")
         
-        while z.p.color == Color.RED:
+        while z.p.color == RED:
             if z.p == z.p.p.left:
                 y = z.p.p.right
-                if y.color == Color.RED:
+                if y.color == RED:
                     # Case 1
-                    z.p.color = Color.BLACK
-                    y.color = Color.BLACK
-                    z.p.p.color = Color.RED
-                    push_step(steps, self, 
-                              f"【Case 1: 叔叔是紅色】\n"
-                              f"父節點 ({z.p.key}) 與叔叔 ({y.key}) 都是紅色。\n"
-                              f"動作：將父與叔叔設為黑色，祖父 ({z.p.p.key}) 設為紅色。\n"
-                              f"關注點上移至祖父。", 
-                              highlight_node=z.p.p, canvas_msg="Case 1: 叔叔紅 -> 變色")
+                    self.paint(z.p, BLACK)
+                    self.paint(y, BLACK)
+                    self.paint(z.p.p, RED)
+                    if tracer.enabled:
+                        tracer.step(self, 
+                                    f"【Case 1: 叔叔是紅色】\n"
+                                    f"父節點 ({z.p.key}) 與叔叔 ({y.key}) 都是紅色。\n"
+                                    f"動作：將父與叔叔設為黑色，祖父 ({z.p.p.key}) 設為紅色。\n"
+                                    f"關注點上移至祖父。", 
+                                    highlight_node=z.p.p, canvas_msg="Case 1: 叔叔紅 -> 變色")
                     z = z.p.p
                 else:
                     if z == z.p.right:
                         # Case 2
                         z = z.p
-                        push_step(steps, self, 
-                                  f"【Case 2: 叔叔黑，三角形 (LR)】\n"
-                                  f"叔叔是黑色，且當前節點 ({z.right.key}) 是父節點 ({z.key}) 的右子 (LR 型)。\n"
-                                  f"動作：對父節點 ({z.key}) 進行左旋，轉成直線型 (Case 3)。", 
-                                  highlight_node=z, canvas_msg="Case 2: LR -> 左旋", rotation={"type": "left", "id": str(z.uid)})
-                        self.left_rotate(z, steps)
+                        if tracer.enabled:
+                            tracer.step(self, 
+                                        f"【Case 2: 叔叔黑，三角形 (LR)】\n"
+                                        f"叔叔是黑色，且當前節點 ({z.right.key}) 是父節點 ({z.key}) 的右子 (LR 型)。\n"
+                                        f"動作：對父節點 ({z.key}) 進行左旋，轉成直線型 (Case 3)。", 
+                                        highlight_node=z, canvas_msg="Case 2: LR -> 左旋", rotation={"type": "left", "id": str(z.uid)})
+                        self.left_rotate(z, tracer)
                     # Case 3
-                    z.p.color = Color.BLACK
-                    z.p.p.color = Color.RED
-                    push_step(steps, self, 
-                              f"【Case 3: 叔叔黑，直線 (LL)】\n"
-                              f"叔叔是黑色，且當前節點 ({z.key}) 是父節點 ({z.p.key}) 的左子 (LL 型)。\n"
-                              f"動作：父節點設黑，祖父設紅，對祖父 ({z.p.p.key}) 進行右旋。", 
-                              highlight_node=z.p, canvas_msg="Case 3: LL -> 右旋+變色", rotation={"type": "right", "id": str(z.p.p.uid)})
-                    self.right_rotate(z.p.p, steps)
+                    self.paint(z.p, BLACK)
+                    self.paint(z.p.p, RED)
+                    if tracer.enabled:
+                        tracer.step(self, 
+                                    f"【Case 3: 叔叔黑，直線 (LL)】\n"
+                                    f"叔叔是黑色，且當前節點 ({z.key}) 是父節點 ({z.p.key}) 的左子 (LL 型)。\n"
+                                    f"動作：父節點設黑，祖父設紅，對祖父 ({z.p.p.key}) 進行右旋。", 
+                                    highlight_node=z.p, canvas_msg="Case 3: LL -> 右旋+變色", rotation={"type": "right", "id": str(z.p.p.uid)})
+                    self.right_rotate(z.p.p, tracer)
             else:
                 # Mirror of above
                 y = z.p.p.left
-                if y.color == Color.RED:
+                if y.color == RED:
                     # Case 1
-                    z.p.color = Color.BLACK
-                    y.color = Color.BLACK
-                    z.p.p.color = Color.RED
-                    push_step(steps, self, 
-                              f"【Case 1: 叔叔是紅色】\n"
-                              f"父節點 ({z.p.key}) 與叔叔 ({y.key}) 都是紅色。\n"
-                              f"動作：將父與叔叔設為黑色，祖父 ({z.p.p.key}) 設為紅色。\n"
-                              f"關注點上移至祖父。", 
-                              highlight_node=z.p.p, canvas_msg="Case 1: 叔叔紅 -> 變色")
+                    self.paint(z.p, BLACK)
+                    self.paint(y, BLACK)
+                    self.paint(z.p.p, RED)
+                    if tracer.enabled:
+                        tracer.step(self, 
+                                    f"【Case 1: 叔叔是紅色】\n"
+                                    f"父節點 ({z.p.key}) 與叔叔 ({y.key}) 都是紅色。\n"
+                                    f"動作：將父與叔叔設為黑色，祖父 ({z.p.p.key}) 設為紅色。\n"
+                                    f"關注點上移至祖父。", 
+                                    highlight_node=z.p.p, canvas_msg="Case 1: 叔叔紅 -> 變色")
                     z = z.p.p
                 else:
                     if z == z.p.left:
                         # Case 2
                         z = z.p
-                        push_step(steps, self, 
-                                  f"【Case 2: 叔叔黑，三角形 (RL)】\n"
-                                  f"叔叔是黑色，且當前節點 ({z.left.key}) 是父節點 ({z.key}) 的左子 (RL 型)。\n"
-                                  f"動作：對父節點 ({z.key}) 進行右旋，轉成直線型 (Case 3)。", 
-                                  highlight_node=z, canvas_msg="Case 2: RL -> 右旋", rotation={"type": "right", "id": str(z.uid)})
-                        self.right_rotate(z, steps)
+                        if tracer.enabled:
+                            tracer.step(self, 
+                                        f"【Case 2: 叔叔黑，三角形 (RL)】\n"
+                                        f"叔叔是黑色，且當前節點 ({z.left.key}) 是父節點 ({z.key}) 的左子 (RL 型)。\n"
+                                        f"動作：對父節點 ({z.key}) 進行右旋，轉成直線型 (Case 3)。", 
+                                        highlight_node=z, canvas_msg="Case 2: RL -> 右旋", rotation={"type": "right", "id": str(z.uid)})
+                        self.right_rotate(z, tracer)
                     # Case 3
-                    z.p.color = Color.BLACK
-                    z.p.p.color = Color.RED
-                    push_step(steps, self, 
-                              f"【Case 3: 叔叔黑，直線 (RR)】\n"
-                              f"叔叔是黑色，且當前節點 ({z.key}) 是父節點 ({z.p.key}) 的右子 (RR 型)。\n"
-                              f"動作：父節點設黑，祖父設紅，對祖父 ({z.p.p.key}) 進行左旋。", 
-                              highlight_node=z.p, canvas_msg="Case 3: RR -> 左旋+變色", rotation={"type": "left", "id": str(z.p.p.uid)})
-                    self.left_rotate(z.p.p, steps)
+                    self.paint(z.p, BLACK)
+                    self.paint(z.p.p, RED)
+                    if tracer.enabled:
+                        tracer.step(self, 
+                                    f"【Case 3: 叔叔黑，直線 (RR)】\n"
+                                    f"叔叔是黑色，且當前節點 ({z.key}) 是父節點 ({z.p.key}) 的右子 (RR 型)。\n"
+                                    f"動作：父節點設黑，祖父設紅，對祖父 ({z.p.p.key}) 進行左旋。", 
+                                    highlight_node=z.p, canvas_msg="Case 3: RR -> 左旋+變色", rotation={"type": "left", "id": str(z.p.p.uid)})
+                    self.left_rotate(z.p.p, tracer)
                     
-        self.root.color = Color.BLACK
-        push_step(steps, self, "修正結束，確保根節點為黑色。", highlight_node=self.root, canvas_msg="修正結束")
+        self.paint(self.root, BLACK)
+        if tracer.enabled:
+            tracer.step(self, "修正結束，確保根節點為黑色。", highlight_node=self.root, canvas_msg="修正結束")
 
     def transplant(self, u, v):
         if u.p == self.nil:
@@ -248,14 +765,17 @@ class RBTree:
         else:
             u.p.right = v
         v.p = u.p
+        self.touch(u.p)
 
     def tree_minimum(self, x):
         while x.left != self.nil:
             x = x.left
         return x
 
-    def delete(self, key):
-        steps = []
+    def delete(self, key, tracer=None):
+        """刪除 key，回傳教學步驟；tracer 為 QUIET 時只做刪除、不產生快照 (回傳 None)。"""
+        if tracer is None:
+            tracer = recorder()
         z = self.root
         while z != self.nil:
             if key == z.key:
@@ -266,10 +786,13 @@ class RBTree:
                 z = z.right
         
         if z == self.nil:
-            push_step(steps, self, f"找不到鍵值 {key}，無法刪除。", canvas_msg="找不到鍵值")
-            return steps
+            if tracer.enabled:
+                tracer.step(self, f"找不到鍵值 {key}，無法刪除。", canvas_msg="找不到鍵值")
+            return tracer.steps
             
-        push_step(steps, self, f"找到節點 {key}，準備刪除。", highlight_node=z, canvas_msg=f"找到 {key}")
+        if tracer.enabled:
+            tracer.step(self, f"找到節點 {key}，準備刪除。", highlight_node=z, canvas_msg=f"找到 {key}")
+        self.size -= 1
         
         y = z
         y_original_color = y.color
@@ -278,11 +801,15 @@ class RBTree:
         if z.left == self.nil:
             x = z.right
             self.transplant(z, z.right)
-            push_step(steps, self, f"{z.key} 沒有左子節點，直接用右子節點取代。", highlight_node=x, canvas_msg="無左子，右子取代")
+            self.drop(z, x.p)
+            if tracer.enabled:
+                tracer.step(self, f"{z.key} 沒有左子節點，直接用右子節點取代。", highlight_node=x, canvas_msg="無左子，右子取代")
         elif z.right == self.nil:
             x = z.left
             self.transplant(z, z.left)
-            push_step(steps, self, f"{z.key} 沒有右子節點，直接用左子節點取代。", highlight_node=x, canvas_msg="無右子，左子取代")
+            self.drop(z, x.p)
+            if tracer.enabled:
+                tracer.step(self, f"{z.key} 沒有右子節點，直接用左子節點取代。", highlight_node=x, canvas_msg="無右子，左子取代")
         else:
             y = self.tree_minimum(z.right)
             y_original_color = y.color
@@ -297,122 +824,428 @@ class RBTree:
             self.transplant(z, y)
             y.left = z.left
             y.left.p = y
-            y.color = z.color
-            push_step(steps, self, f"{z.key} 有兩個子節點，用後繼者 {y.key} 取代。", highlight_node=y, canvas_msg=f"用後繼 {y.key} 取代")
+            self.paint(y, z.color)
+            self.drop(z, x.p)
+            if tracer.enabled:
+                tracer.step(self, f"{z.key} 有兩個子節點，用後繼者 {y.key} 取代。", highlight_node=y, canvas_msg=f"用後繼 {y.key} 取代")
 
-        if y_original_color == Color.BLACK:
-            push_step(steps, self, f"被刪除或移動的節點是黑色，需要修正 (Fixup)。", highlight_node=x, canvas_msg="刪除黑色 -> 修正")
-            self.delete_fixup(x, steps)
+        if y_original_color == BLACK:
+            if tracer.enabled:
+                tracer.step(self, f"被刪除或移動的節點是黑色，需要修正 (Fixup)。", highlight_node=x, canvas_msg="刪除黑色 -> 修正")
+            self.delete_fixup(x, tracer)
         else:
-            push_step(steps, self, f"被刪除或移動的節點是紅色，不破壞性質，無需修正。", canvas_msg="刪除紅色 -> 無需修正")
+            if tracer.enabled:
+                tracer.step(self, f"被刪除或移動的節點是紅色，不破壞性質，無需修正。", canvas_msg="刪除紅色 -> 無需修正")
             
-        return steps
+        return self.finish(tracer)
 
-    def delete_fixup(self, x, steps):
-        while x != self.root and x.color == Color.BLACK:
+    def delete_fixup(self, x, tracer):
+        while x != self.root and x.color == BLACK:
             if x == x.p.left:
                 w = x.p.right
-                if w.color == Color.RED:
+                if w.color == RED:
                     # Case 1
-                    w.color = Color.BLACK
-                    x.p.color = Color.RED
-                    push_step(steps, self, 
-                              f"【Case 1: 兄弟是紅色】\n"
-                              f"兄弟節點 w ({w.key}) 是紅色。\n"
-                              f"動作：兄弟設黑，父設紅，對父節點 ({x.p.key}) 左旋。\n"
-                              f"目的：將情況轉為兄弟是黑色的 Case 2, 3, 或 4。", 
-                              highlight_node=w, canvas_msg="Case 1: 兄弟紅 -> 左旋", rotation={"type": "left", "id": str(x.p.uid)})
-                    self.left_rotate(x.p, steps)
+                    self.paint(w, BLACK)
+                    self.paint(x.p, RED)
+                    if tracer.enabled:
+                        tracer.step(self, 
+                                    f"【Case 1: 兄弟是紅色】\n"
+                                    f"兄弟節點 w ({w.key}) 是紅色。\n"
+                                    f"動作：兄弟設黑，父設紅，對父節點 ({x.p.key}) 左旋。\n"
+                                    f"目的：將情況轉為兄弟是黑色的 Case 2, 3, 或 4。", 
+                                    highlight_node=w, canvas_msg="Case 1: 兄弟紅 -> 左旋", rotation={"type": "left", "id": str(x.p.uid)})
+                    self.left_rotate(x.p, tracer)
                     w = x.p.right
                 
-                if w.left.color == Color.BLACK and w.right.color == Color.BLACK:
+                if w.left.color == BLACK and w.right.color == BLACK:
                     # Case 2
-                    w.color = Color.RED
+                    self.paint(w, RED)
                     x = x.p
-                    push_step(steps, self, 
-                              f"【Case 2: 兄弟黑，姪子全黑】\n"
-                              f"兄弟 w ({w.key}) 是黑色，且兩個姪子都是黑色。\n"
-                              f"動作：將兄弟設為紅色，將雙重黑色 (Double Black) 上移給父節點。\n"
-                              f"關注點上移至父節點 ({x.key})。", 
-                              highlight_node=x, canvas_msg="Case 2: 姪子全黑 -> 兄弟變紅")
+                    if tracer.enabled:
+                        tracer.step(self, 
+                                    f"【Case 2: 兄弟黑，姪子全黑】\n"
+                                    f"兄弟 w ({w.key}) 是黑色，且兩個姪子都是黑色。\n"
+                                    f"動作：將兄弟設為紅色，將雙重黑色 (Double Black) 上移給父節點。\n"
+                                    f"關注點上移至父節點 ({x.key})。", 
+                                    highlight_node=x, canvas_msg="Case 2: 姪子全黑 -> 兄弟變紅")
                 else:
-                    if w.right.color == Color.BLACK:
+                    if w.right.color == BLACK:
                         # Case 3
-                        w.left.color = Color.BLACK
-                        w.color = Color.RED
-                        push_step(steps, self, 
-                                  f"【Case 3: 兄弟黑，近姪子紅】\n"
-                                  f"兄弟 w ({w.key}) 是黑色，左姪子 (近) 是紅色，右姪子 (遠) 是黑色。\n"
-                                  f"動作：左姪子設黑，兄弟設紅，對兄弟 ({w.key}) 右旋。\n"
-                                  f"目的：轉成 Case 4。", 
-                                  highlight_node=w, canvas_msg="Case 3: 近姪子紅 -> 右旋", rotation={"type": "right", "id": str(w.uid)})
-                        self.right_rotate(w, steps)
+                        self.paint(w.left, BLACK)
+                        self.paint(w, RED)
+                        if tracer.enabled:
+                            tracer.step(self, 
+                                        f"【Case 3: 兄弟黑，近姪子紅】\n"
+                                        f"兄弟 w ({w.key}) 是黑色，左姪子 (近) 是紅色，右姪子 (遠) 是黑色。\n"
+                                        f"動作：左姪子設黑，兄弟設紅，對兄弟 ({w.key}) 右旋。\n"
+                                        f"目的：轉成 Case 4。", 
+                                        highlight_node=w, canvas_msg="Case 3: 近姪子紅 -> 右旋", rotation={"type": "right", "id": str(w.uid)})
+                        self.right_rotate(w, tracer)
                         w = x.p.right
                     
                     # Case 4
-                    w.color = x.p.color
-                    x.p.color = Color.BLACK
-                    w.right.color = Color.BLACK
-                    push_step(steps, self, 
-                              f"【Case 4: 兄弟黑，遠姪子紅】\n"
-                              f"兄弟 w ({w.key}) 是黑色，右姪子 (遠) 是紅色。\n"
-                              f"動作：兄弟設為父節點顏色，父節點設黑，右姪子設黑，對父節點 ({x.p.key}) 左旋。\n"
-                              f"目的：消除雙重黑色，修正完成。", 
-                              highlight_node=x.p, canvas_msg="Case 4: 遠姪子紅 -> 左旋", rotation={"type": "left", "id": str(x.p.uid)})
-                    self.left_rotate(x.p, steps)
+                    self.paint(w, x.p.color)
+                    self.paint(x.p, BLACK)
+                    self.paint(w.right, BLACK)
+                    if tracer.enabled:
+                        tracer.step(self, 
+                                    f"【Case 4: 兄弟黑，遠姪子紅】\n"
+                                    f"兄弟 w ({w.key}) 是黑色，右姪子 (遠) 是紅色。\n"
+                                    f"動作：兄弟設為父節點顏色，父節點設黑，右姪子設黑，對父節點 ({x.p.key}) 左旋。\n"
+                                    f"目的：消除雙重黑色，修正完成。", 
+                                    highlight_node=x.p, canvas_msg="Case 4: 遠姪子紅 -> 左旋", rotation={"type": "left", "id": str(x.p.uid)})
+                    self.left_rotate(x.p, tracer)
                     x = self.root
             else:
                 # Mirror
                 w = x.p.left
-                if w.color == Color.RED:
+                if w.color == RED:
                     # Case 1
-                    w.color = Color.BLACK
-                    x.p.color = Color.RED
-                    push_step(steps, self, 
-                              f"【Case 1: 兄弟是紅色】\n"
-                              f"兄弟節點 w ({w.key}) 是紅色。\n"
-                              f"動作：兄弟設黑，父設紅，對父節點 ({x.p.key}) 右旋。\n"
-                              f"目的：將情況轉為兄弟是黑色的 Case 2, 3, 或 4。", 
-                              highlight_node=w, canvas_msg="Case 1: 兄弟紅 -> 右旋", rotation={"type": "right", "id": str(x.p.uid)})
-                    self.right_rotate(x.p, steps)
+                    self.paint(w, BLACK)
+                    self.paint(x.p, RED)
+                    if tracer.enabled:
+                        tracer.step(self, 
+                                    f"【Case 1: 兄弟是紅色】\n"
+                                    f"兄弟節點 w ({w.key}) 是紅色。\n"
+                                    f"動作：兄弟設黑，父設紅，對父節點 ({x.p.key}) 右旋。\n"
+                                    f"目的：將情況轉為兄弟是黑色的 Case 2, 3, 或 4。", 
+                                    highlight_node=w, canvas_msg="Case 1: 兄弟紅 -> 右旋", rotation={"type": "right", "id": str(x.p.uid)})
+                    self.right_rotate(x.p, tracer)
                     w = x.p.left
                 
-                if w.right.color == Color.BLACK and w.left.color == Color.BLACK:
+                if w.right.color == BLACK and w.left.color == BLACK:
                     # Case 2
-                    w.color = Color.RED
+                    self.paint(w, RED)
                     x = x.p
-                    push_step(steps, self, 
-                              f"【Case 2: 兄弟黑，姪子全黑】\n"
-                              f"兄弟 w ({w.key}) 是黑色，且兩個姪子都是黑色。\n"
-                              f"動作：將兄弟設為紅色，將雙重黑色 (Double Black) 上移給父節點。\n"
-                              f"關注點上移至父節點 ({x.key})。", 
-                              highlight_node=x, canvas_msg="Case 2: 姪子全黑 -> 兄弟變紅")
+                    if tracer.enabled:
+                        tracer.step(self, 
+                                    f"【Case 2: 兄弟黑，姪子全黑】\n"
+                                    f"兄弟 w ({w.key}) 是黑色，且兩個姪子都是黑色。\n"
+                                    f"動作：將兄弟設為紅色，將雙重黑色 (Double Black) 上移給父節點。\n"
+                                    f"關注點上移至父節點 ({x.key})。", 
+                                    highlight_node=x, canvas_msg="Case 2: 姪子全黑 -> 兄弟變紅")
                 else:
-                    if w.left.color == Color.BLACK:
+                    if w.left.color == BLACK:
                         # Case 3
-                        w.right.color = Color.BLACK
-                        w.color = Color.RED
-                        push_step(steps, self, 
-                                  f"【Case 3: 兄弟黑，近姪子紅】\n"
-                                  f"兄弟 w ({w.key}) 是黑色，右姪子 (近) 是紅色，左姪子 (遠) 是黑色。\n"
-                                  f"動作：右姪子設黑，兄弟設紅，對兄弟 ({w.key}) 左旋。\n"
-                                  f"目的：轉成 Case 4。", 
-                                  highlight_node=w, canvas_msg="Case 3: 近姪子紅 -> 左旋", rotation={"type": "left", "id": str(w.uid)})
-                        self.left_rotate(w, steps)
+                        self.paint(w.right, BLACK)
+                        self.paint(w, RED)
+                        if tracer.enabled:
+                            tracer.step(self, 
+                                        f"【Case 3: 兄弟黑，近姪子紅】\n"
+                                        f"兄弟 w ({w.key}) 是黑色，右姪子 (近) 是紅色，左姪子 (遠) 是黑色。\n"
+                                        f"動作：右姪子設黑，兄弟設紅，對兄弟 ({w.key}) 左旋。\n"
+                                        f"目的：轉成 Case 4。", 
+                                        highlight_node=w, canvas_msg="Case 3: 近姪子紅 -> 左旋", rotation={"type": "left", "id": str(w.uid)})
+                        self.left_rotate(w, tracer)
                         w = x.p.left
                     
                     # Case 4
-                    w.color = x.p.color
-                    x.p.color = Color.BLACK
-                    w.left.color = Color.BLACK
-                    push_step(steps, self, 
-                              f"【Case 4: 兄弟黑，遠姪子紅】\n"
-                              f"兄弟 w ({w.key}) 是黑色，左姪子 (遠) 是紅色。\n"
-                              f"動作：兄弟設為父節點顏色，父節點設黑，左姪子設黑，對父節點 ({x.p.key}) 右旋。\n"
-                              f"目的：消除雙重黑色，修正完成。", 
-                              highlight_node=x.p, canvas_msg="Case 4: 遠姪子紅 -> 右旋", rotation={"type": "right", "id": str(x.p.uid)})
-                    self.right_rotate(x.p, steps)
+                    self.paint(w, x.p.color)
+                    self.paint(x.p, BLACK)
+                    self.paint(w.left, BLACK)
+                    if tracer.enabled:
+                        tracer.step(self, 
+                                    f"【Case 4: 兄弟黑，遠姪子紅】\n"
+                                    f"兄弟 w ({w.key}) 是黑色，左姪子 (遠) 是紅色。\n"
+                                    f"動作：兄弟設為父節點顏色，父節點設黑，左姪子設黑，對父節點 ({x.p.key}) 右旋。\n"
+                                    f"目的：消除雙重黑色，修正完成。", 
+                                    highlight_node=x.p, canvas_msg="Case 4: 遠姪子紅 -> 右旋", rotation={"type": "right", "id": str(x.p.uid)})
+                    self.right_rotate(x.p, tracer)
                     x = self.root
                     
-        x.color = Color.BLACK
-        push_step(steps, self, "修正結束，將 x 設為黑色。", highlight_node=x, canvas_msg="修正結束")
+        self.paint(x, BLACK)
+        if tracer.enabled:
+            tracer.step(self, "修正結束，將 x 設為黑色。", highlight_node=x, canvas_msg="修正結束")
+
+# ------------- 陣列版紅黑樹 (大量資料用) -------------
+
+class RBArrayTree:
+    """不產生視覺化步驟的紅黑樹，節點存在平行陣列裡 (node pool)。
+
+    節點是陣列索引，0 是 nil。key 放在 list，left / right / p 放在 array('i')，
+    color 放在 bytearray，每個節點約 21 bytes (不含 key 本身)，
+    適合存放上百萬個鍵值。刪除後空出的索引會被重複使用。
+    """
+
+    def __init__(self):
+        self.key = [None]
+        self.left = array("i", [0])
+        self.right = array("i", [0])
+        self.p = array("i", [0])
+        self.color = bytearray([BLACK])
+        self.root = 0
+        self.size = 0
+        self.free = []
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, key):
+        return self.find(key) != 0
+
+    def find(self, key):
+        x = self.root
+        keys, left, right = self.key, self.left, self.right
+        while x:
+            k = keys[x]
+            if key == k:
+                return x
+            x = left[x] if key < k else right[x]
+        return 0
+
+    def _alloc(self, key):
+        if self.free:
+            z = self.free.pop()
+            self.key[z] = key
+            self.left[z] = self.right[z] = self.p[z] = 0
+            self.color[z] = RED
+            return z
+        self.key.append(key)
+        self.left.append(0)
+        self.right.append(0)
+        self.p.append(0)
+        self.color.append(RED)
+        return len(self.key) - 1
+
+    def left_rotate(self, x):
+        left, right, p = self.left, self.right, self.p
+        y = right[x]
+        right[x] = left[y]
+        if left[y]:
+            p[left[y]] = x
+        p[y] = p[x]
+        if not p[x]:
+            self.root = y
+        elif x == left[p[x]]:
+            left[p[x]] = y
+        else:
+            right[p[x]] = y
+        left[y] = x
+        p[x] = y
+
+    def right_rotate(self, y):
+        left, right, p = self.left, self.right, self.p
+        x = left[y]
+        left[y] = right[x]
+        if right[x]:
+            p[right[x]] = y
+        p[x] = p[y]
+        if not p[y]:
+            self.root = x
+        elif y == right[p[y]]:
+            right[p[y]] = x
+        else:
+            left[p[y]] = x
+        right[x] = y
+        p[y] = x
+
+    def insert(self, key):
+        """插入 key，已存在時回傳 False。"""
+        keys, left, right = self.key, self.left, self.right
+        y = 0
+        x = self.root
+        while x:
+            y = x
+            k = keys[x]
+            if key == k:
+                return False
+            x = left[x] if key < k else right[x]
+        z = self._alloc(key)
+        self.p[z] = y
+        if not y:
+            self.root = z
+        elif key < keys[y]:
+            left[y] = z
+        else:
+            right[y] = z
+        self.size += 1
+        self._insert_fixup(z)
+        return True
+
+    def _insert_fixup(self, z):
+        left, right, p, color = self.left, self.right, self.p, self.color
+        while color[p[z]] == RED:
+            zp = p[z]
+            g = p[zp]
+            if zp == left[g]:
+                y = right[g]
+                if color[y] == RED:
+                    color[zp] = color[y] = BLACK
+                    color[g] = RED
+                    z = g
+                else:
+                    if z == right[zp]:
+                        z = zp
+                        self.left_rotate(z)
+                        zp = p[z]
+                        g = p[zp]
+                    color[zp] = BLACK
+                    color[g] = RED
+                    self.right_rotate(g)
+            else:
+                y = left[g]
+                if color[y] == RED:
+                    color[zp] = color[y] = BLACK
+                    color[g] = RED
+                    z = g
+                else:
+                    if z == left[zp]:
+                        z = zp
+                        self.right_rotate(z)
+                        zp = p[z]
+                        g = p[zp]
+                    color[zp] = BLACK
+                    color[g] = RED
+                    self.left_rotate(g)
+        color[self.root] = BLACK
+
+    def _transplant(self, u, v):
+        p = self.p
+        if not p[u]:
+            self.root = v
+        elif u == self.left[p[u]]:
+            self.left[p[u]] = v
+        else:
+            self.right[p[u]] = v
+        p[v] = p[u]
+
+    def delete(self, key):
+        """刪除 key，不存在時回傳 False。"""
+        z = self.find(key)
+        if not z:
+            return False
+        left, right, p, color = self.left, self.right, self.p, self.color
+        y = z
+        y_color = color[y]
+        if not left[z]:
+            x = right[z]
+            self._transplant(z, x)
+        elif not right[z]:
+            x = left[z]
+            self._transplant(z, x)
+        else:
+            y = right[z]
+            while left[y]:
+                y = left[y]
+            y_color = color[y]
+            x = right[y]
+            if p[y] == z:
+                p[x] = y
+            else:
+                self._transplant(y, x)
+                right[y] = right[z]
+                p[right[y]] = y
+            self._transplant(z, y)
+            left[y] = left[z]
+            p[left[y]] = y
+            color[y] = color[z]
+        if y_color == BLACK:
+            self._delete_fixup(x)
+        self.key[z] = None
+        self.free.append(z)
+        self.size -= 1
+        return True
+
+    def _delete_fixup(self, x):
+        left, right, p, color = self.left, self.right, self.p, self.color
+        while x != self.root and color[x] == BLACK:
+            xp = p[x]
+            if x == left[xp]:
+                w = right[xp]
+                if color[w] == RED:
+                    color[w] = BLACK
+                    color[xp] = RED
+                    self.left_rotate(xp)
+                    w = right[xp]
+                if color[left[w]] == BLACK and color[right[w]] == BLACK:
+                    color[w] = RED
+                    x = xp
+                else:
+                    if color[right[w]] == BLACK:
+                        color[left[w]] = BLACK
+                        color[w] = RED
+                        self.right_rotate(w)
+                        w = right[xp]
+                    color[w] = color[xp]
+                    color[xp] = BLACK
+                    color[right[w]] = BLACK
+                    self.left_rotate(xp)
+                    x = self.root
+            else:
+                w = left[xp]
+                if color[w] == RED:
+                    color[w] = BLACK
+                    color[xp] = RED
+                    self.right_rotate(xp)
+                    w = left[xp]
+                if color[right[w]] == BLACK and color[left[w]] == BLACK:
+                    color[w] = RED
+                    x = xp
+                else:
+                    if color[left[w]] == BLACK:
+                        color[right[w]] = BLACK
+                        color[w] = RED
+                        self.left_rotate(w)
+                        w = left[xp]
+                    color[w] = color[xp]
+                    color[xp] = BLACK
+                    color[left[w]] = BLACK
+                    self.right_rotate(xp)
+                    x = self.root
+        color[x] = BLACK
+
+    def validate(self):
+        """檢查紅黑樹性質、BST 順序、父指標、size 與空出的索引，回傳發現的問題 (空串列 = 正確)。"""
+        keys, left, right, p, color = self.key, self.left, self.right, self.p, self.color
+        errors = []
+        if color[0] != BLACK:
+            errors.append("nil (索引 0) 必須是黑色")
+        if color[self.root] != BLACK:
+            errors.append("根節點不是黑色")
+        if self.root and p[self.root]:
+            errors.append("根節點的父指標不是 nil")
+        # Post-order: a node is checked once both children have their black height
+        bh = {0: 0}
+        count = 0
+        stack = [(self.root, None, None, False)] if self.root else []
+        while stack:
+            x, lo, hi, expanded = stack.pop()
+            if not expanded:
+                count += 1
+                if count > len(keys):
+                    errors.append("走訪的節點數超過陣列大小 (有環)")
+                    break
+                if (lo is not None and not lo < keys[x]) or (hi is not None and not keys[x] < hi):
+                    errors.append(f"節點 {keys[x]} 違反 BST 順序")
+                stack.append((x, lo, hi, True))
+                for c, clo, chi in ((left[x], lo, keys[x]), (right[x], keys[x], hi)):
+                    if c:
+                        if p[c] != x:
+                            errors.append(f"節點 {keys[c]} 的父指標沒有指向 {keys[x]}")
+                        stack.append((c, clo, chi, False))
+                continue
+            if color[x] == RED and (color[left[x]] == RED or color[right[x]] == RED):
+                errors.append(f"紅色節點 {keys[x]} 有紅色子節點")
+            if bh[left[x]] != bh[right[x]]:
+                errors.append(f"節點 {keys[x]} 左右的黑高度不同 ({bh[left[x]]} / {bh[right[x]]})")
+            bh[x] = bh[left[x]] + (color[x] == BLACK)
+        if count != self.size:
+            errors.append(f"樹的 size ({self.size}) 與走訪到的節點數 ({count}) 不同")
+        if count + len(self.free) != len(keys) - 1:
+            errors.append("有索引既不在樹中也不在 free 串列裡")
+        if any(z in bh for z in self.free):
+            errors.append("free 串列中的索引還在樹中")
+        return errors
+
+    def keys(self):
+        """依序列出所有鍵值 (迭代式中序走訪)。"""
+        keys, left, right = self.key, self.left, self.right
+        stack = []
+        x = self.root
+        while stack or x:
+            while x:
+                stack.append(x)
+                x = left[x]
+            x = stack.pop()
+            yield keys[x]
+            x = right[x]
@@ -1,4 +1,4 @@
-def solve_rod_cutting(n, prices):
+def iter_rod_cutting(n, prices):
     # prices: list of integers where prices[i] is the price of a rod of length i+1
     # n: total length of the rod
     
@@ -8,10 +8,8 @@ def solve_rod_cutting(n, prices):
     r = [0] * (n + 1)
     s = [0] * (n + 1)
     
-    steps = []
-    
     # Step 0: Initialization
-    steps.append({
+    yield {
         "prices": list(prices), # Add prices to step
         "r": list(r),
         "s": list(s),
@@ -20,14 +18,14 @@ def solve_rod_cutting(n, prices):
         "q": -1,
         "msg": "初始化 r 和 s 陣列。r[0] = 0。",
         "highlight": []
-    })
+    }
     
     # Outer loop: solve for length j = 1 to n
     for j in range(1, n + 1):
         q = -1
         best_cut = 0
         
-        steps.append({
+        yield {
             "prices": list(prices),
             "r": list(r),
             "s": list(s),
@@ -36,7 +34,7 @@ def solve_rod_cutting(n, prices):
             "q": q,
             "msg": f"開始計算長度 j = {j} 的最佳解。",
             "highlight": [{"index": j, "type": "target"}]
-        })
+        }
         
         # Inner loop: try first cut at position i = 1 to j
         for i in range(1, j + 1):
@@ -65,7 +63,7 @@ def solve_rod_cutting(n, prices):
             else:
                 msg += f"。\n比當前 q={q} 小或相等，不更新。"
                 
-            steps.append({
+            yield {
                 "prices": list(prices),
                 "r": list(r),
                 "s": list(s),
@@ -79,12 +77,12 @@ def solve_rod_cutting(n, prices):
                 "updated": updated,
                 "msg": msg,
                 "highlight": highlight
-            })
+            }
             
         r[j] = q
         s[j] = best_cut
         
-        steps.append({
+        yield {
             "prices": list(prices),
             "r": list(r),
             "s": list(s),
@@ -93,10 +91,10 @@ def solve_rod_cutting(n, prices):
             "q": q,
             "msg": f"長度 j={j} 計算完成。最大收益 r[{j}] = {q}，最佳第一刀 s[{j}] = {best_cut}。",
             "highlight": [{"index": j, "type": "final"}]
-        })
+        }
         
     # Final step
-    steps.append({
+    yield {
         "prices": list(prices),
         "r": list(r),
         "s": list(s),
@@ -105,6 +103,8 @@ def solve_rod_cutting(n, prices):
         "q": r[n],
         "msg": f"計算完成。長度 {n} 的最大收益為 {r[n]}。",
         "highlight": [{"index": n, "type": "final"}]
-    })
+    }
     
-    return steps
+
+def solve_rod_cutting(n, prices):
+    return list(iter_rod_cutting(n, prices))
@@ -1,6 +1,6 @@
 import random
 
-def solve_seam_carving():
+def iter_seam_carving():
     # Define a small grid of disruption values d[i][j]
     # m rows, n columns
     m = 6
@@ -11,16 +11,14 @@ def solve_seam_carving():
     random.seed(42)
     d = [[random.randint(1, 9) for _ in range(n)] for _ in range(m)]
     
-    steps = []
-    
     # Step 1: Initialization
-    steps.append({
+    yield {
         "type": "init",
         "m": m,
         "n": n,
         "d": [row[:] for row in d],
         "msg": f"初始化: 建立一個 {m}x{n} 的像素網格。每個格子內的數字代表該像素的破壞度 $d[i,j]$。"
-    })
+    }
     
     # DP Table C[i][j]
     C = [[0] * n for _ in range(m)]
@@ -30,21 +28,21 @@ def solve_seam_carving():
     for j in range(n):
         C[0][j] = d[0][j]
         
-    steps.append({
+    yield {
         "type": "row_init",
         "row": 0,
         "C": [row[:] for row in C],
         "msg": "邊界條件: 第一列 (Row 0) 的累積破壞度 $C[0,j]$ 等於該像素本身的破壞度 $d[0,j]$。"
-    })
+    }
     
     # DP Calculation
     for i in range(1, m):
-        steps.append({
+        yield {
             "type": "start_row",
             "row": i,
             "C": [row[:] for row in C],
             "msg": f"<strong>開始計算第 {i} 列</strong><br>根據公式: $C[i,j] = d[i,j] + \\min(C[i-1, j-1], C[i-1, j], C[i-1, j+1])$"
-        })
+        }
         
         for j in range(n):
             # Find min from previous row neighbors
@@ -76,7 +74,7 @@ def solve_seam_carving():
             calc_msg += f"最小值為 {min_val} (來自 {direction})<br>"
             calc_msg += f"→ $C[{i},{j}] = {d[i][j]} + {min_val} = {C[i][j]}$"
             
-            steps.append({
+            yield {
                 "type": "calc_cell",
                 "row": i,
                 "col": j,
@@ -85,7 +83,7 @@ def solve_seam_carving():
                 "candidates": [{"val": c[0], "col": c[1]} for c in candidates],
                 "C": [row[:] for row in C],
                 "msg": calc_msg
-            })
+            }
 
     # Find min in last row
     min_last_val = float('inf')
@@ -98,13 +96,13 @@ def solve_seam_carving():
             min_last_val = C[m-1][j]
             min_last_col = j
             
-    steps.append({
+    yield {
         "type": "find_min",
         "min_val": min_last_val,
         "min_col": min_last_col,
         "C": [row[:] for row in C],
         "msg": f"計算完成。檢查最後一列 ({m-1}):<br>" + ", ".join(last_row_candidates) + f"<br>最小值為 {min_last_val}，位於行 {min_last_col}。"
-    })
+    }
     
     # Backtrack
     seam_path = []
@@ -116,11 +114,13 @@ def solve_seam_carving():
             
     seam_path.reverse() # Top to bottom
     
-    steps.append({
+    yield {
         "type": "result",
         "path": seam_path,
         "C": [row[:] for row in C],
         "msg": f"回溯找出最小破壞度 Seam (路徑):<br>" + " → ".join([f"({r},{c})" for r, c in seam_path])
-    })
+    }
     
-    return steps
+
+def solve_seam_carving():
+    return list(iter_seam_carving())
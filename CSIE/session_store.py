@@ -0,0 +1,247 @@
+# Per-user state for the interactive data structures (Patricia / RB-tree).
+#
+# Each browser gets its own tree, keyed by a random session id. Trees live in
+# an in-process LRU with a TTL and a cap on the total number of nodes across
+# all sessions. When state_dir is set, every session is also pickled to disk
+# (guarded by a file lock) so several gunicorn workers see the same tree.
+
+import os
+import pickle
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, in-process store only
+    fcntl = None
+
+SID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+
+
+def new_sid():
+    return secrets.token_urlsafe(16)
+
+
+def _file_version(path):
+    # os.replace() gives every save a new inode, so (inode, mtime) changes on each write
+    st = os.stat(path)
+    return (st.st_ino, st.st_mtime_ns)
+
+
+def valid_sid(sid):
+    # The id is also used as a file name, so only accept what new_sid() makes
+    return bool(sid) and SID_PATTERN.match(sid) is not None
+
+
+class SessionSlot:
+    __slots__ = ("value", "lock", "last_used", "weight", "disk_version", "pins")
+
+    def __init__(self, value):
+        self.value = value
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self.weight = 0
+        self.disk_version = None
+        self.pins = 0  # requests holding or waiting for the slot; _evict skips it
+
+
+class SessionStore:
+    """session id -> 狀態 (例如 patricia 的 head 或 RBTree)。
+
+    factory():   建立新 session 的初始狀態
+    weigher(v):  估計狀態大小 (節點數)，所有 session 加總超過 max_weight 時
+                 從最久沒用的開始淘汰
+    ttl:         幾秒沒使用就淘汰
+    state_dir:   設定後會把狀態存到磁碟，讓多個 worker 共用
+    """
+
+    def __init__(self, factory, weigher=None, max_sessions=500, max_weight=None,
+                 ttl=1800, state_dir=None):
+        self.factory = factory
+        self.weigher = weigher
+        self.max_sessions = max_sessions
+        self.max_weight = max_weight
+        self.ttl = ttl
+        self.state_dir = state_dir
+        self.total_weight = 0
+        self._slots = OrderedDict()  # sid -> SessionSlot, least recently used first
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+
+    def __len__(self):
+        return len(self._slots)
+
+    @contextmanager
+    def session(self, sid, read_only=False):
+        """取得 sid 的狀態並鎖住它；在 with 區塊內可以讀寫 slot.value。
+
+        read_only=True 表示不會改變狀態，結束時不必再寫回磁碟，
+        大小也沒變 (除非剛從磁碟重新載入)，不必重新估計。
+        """
+        slot = self._get_slot(sid)
+        try:
+            with slot.lock, self._file_lock(sid):
+                reloaded = self.state_dir and self._load(sid, slot)
+                yield slot
+                slot.last_used = time.monotonic()
+                if self.state_dir and not read_only:
+                    self._save(sid, slot)
+                if reloaded or not read_only:
+                    self._reweigh(slot)
+        finally:
+            with self._lock:
+                slot.pins -= 1
+        self._evict()
+
+    def _get_slot(self, sid):
+        # Pinned under the store lock, so _evict can't drop the slot before
+        # the caller has taken slot.lock
+        with self._lock:
+            slot = self._slots.get(sid)
+            if slot is None:
+                slot = SessionSlot(self.factory())
+                self._slots[sid] = slot
+            else:
+                self._slots.move_to_end(sid)
+            slot.pins += 1
+            slot.last_used = time.monotonic()
+            return slot
+
+    def _reweigh(self, slot):
+        if self.weigher is None:
+            return
+        weight = self.weigher(slot.value)
+        with self._lock:
+            self.total_weight += weight - slot.weight
+            slot.weight = weight
+
+    def _evict(self):
+        now = time.monotonic()
+        with self._lock:
+            for sid in list(self._slots):
+                slot = self._slots[sid]
+                over = (len(self._slots) > self.max_sessions or
+                        (self.max_weight is not None and self.total_weight > self.max_weight))
+                expired = now - slot.last_used > self.ttl
+                if not over and not expired:
+                    break
+                if slot.pins:
+                    continue  # in use by another request, keep it
+                del self._slots[sid]
+                self.total_weight -= slot.weight
+        if self.state_dir and now >= self._next_sweep:
+            # Sessions that only live on disk are dropped by TTL too
+            self._next_sweep = now + self.ttl / 10
+            self._evict_files()
+
+    # ------------- 跨 worker 共用 (state_dir) -------------
+
+    def _path(self, sid, ext):
+        return os.path.join(self.state_dir, sid + ext)
+
+    @contextmanager
+    def _file_lock(self, sid):
+        if not self.state_dir or fcntl is None:
+            yield
+            return
+        f = self._open_lock(sid, fcntl.LOCK_EX)
+        with f:
+            # Every access, reads included, marks the session as used (see _stale)
+            os.utime(f.fileno())
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _open_lock(self, sid, flags):
+        """開啟並鎖住 sid 的 .lock 檔；LOCK_NB 拿不到鎖時回傳 None。
+
+        _evict_files 會在持有鎖時刪掉 .lock，所以拿到鎖後要確認鎖住的還是
+        目前路徑上的那個檔案，否則改鎖新的檔案 (不然兩個 worker 會各鎖一個)。
+        """
+        path = self._path(sid, ".lock")
+        while True:
+            f = open(path, "a")
+            try:
+                fcntl.flock(f, flags)
+            except OSError:
+                f.close()
+                return None
+            try:
+                if os.stat(path).st_ino == os.fstat(f.fileno()).st_ino:
+                    return f
+            except FileNotFoundError:
+                pass
+            f.close()  # closing drops the lock on the removed file
+
+    def _load(self, sid, slot):
+        # Returns True when slot.value was replaced by the copy on disk
+        path = self._path(sid, ".pkl")
+        try:
+            version = _file_version(path)
+        except FileNotFoundError:
+            return False
+        if version == slot.disk_version:
+            return False  # our copy is already the latest one
+        with open(path, "rb") as f:
+            slot.value = pickle.load(f)
+        slot.disk_version = version
+        return True
+
+    def _save(self, sid, slot):
+        path = self._path(sid, ".pkl")
+        tmp = path + ".%d.tmp" % os.getpid()
+        with open(tmp, "wb") as f:
+            pickle.dump(slot.value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        slot.disk_version = _file_version(path)
+
+    def _stale(self, sid, cutoff):
+        # A session is stale when neither its .lock (touched on every access)
+        # nor its .pkl changed since cutoff
+        found = False
+        for ext in (".lock", ".pkl"):
+            try:
+                if os.stat(self._path(sid, ext)).st_mtime >= cutoff:
+                    return False
+                found = True
+            except FileNotFoundError:
+                pass
+        return found
+
+    def _evict_files(self):
+        cutoff = time.time() - self.ttl
+        try:
+            names = os.listdir(self.state_dir)
+        except FileNotFoundError:
+            return
+        sids = {sid for sid, ext in map(os.path.splitext, names) if ext in (".pkl", ".lock")}
+        for sid in sids:
+            if not self._stale(sid, cutoff):
+                continue
+            if fcntl is None:
+                self._remove(sid, ".pkl")
+                continue
+            f = self._open_lock(sid, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            if f is None:
+                continue  # a request is using the session right now
+            with f:
+                try:
+                    # Check again under the lock: the session may have been used meanwhile
+                    if self._stale(sid, cutoff):
+                        self._remove(sid, ".pkl")
+                        self._remove(sid, ".lock")
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _remove(self, sid, ext):
+        try:
+            os.remove(self._path(sid, ext))
+        except FileNotFoundError:
+            pass
@@ -1,6 +1,6 @@
 import networkx as nx
 
-def solve_spanning_tree_proof():
+def iter_spanning_tree_proof():
     # Define Graph G
     # Nodes: 0, 1, 2, 3, 4
     # A slightly more complex graph to make it interesting
@@ -35,26 +35,24 @@ def solve_spanning_tree_proof():
     # Let's pick a = (0,1)
     a = (0, 1)
     
-    steps = []
-    
     # Initial State
-    steps.append({
+    yield {
         "type": "init",
         "nodes": nodes,
         "edges": [list(e) for e in all_edges],
         "t1": [list(e) for e in t1_set],
         "t2": [list(e) for e in t2_set],
         "msg": "初始化: 給定圖 G 以及兩棵生成樹 \\(T_1\\) (紅色) 與 \\(T_2\\) (藍色)。"
-    })
+    }
     
     # Step 0: Select a
-    steps.append({
+    yield {
         "type": "select_a",
         "a": list(a),
         "t1": [list(e) for e in t1_set],
         "t2": [list(e) for e in t2_set],
         "msg": f"選擇邊 \\(a = {a}\\)，它在 \\(T_1\\) 中但不在 \\(T_2\\) 中。"
-    })
+    }
     
     # Step 1: Find cycle in T2 + {a}
     # Build T2 graph
@@ -71,14 +69,14 @@ def solve_spanning_tree_proof():
         
     cycle_edges = path_edges + [a]
     
-    steps.append({
+    yield {
         "type": "show_cycle",
         "a": list(a),
         "path": path,
         "cycle_edges": [list(e) for e in cycle_edges],
         "t2": [list(e) for e in t2_set],
         "msg": f"第一步: 在 \\(T_2\\) 中加入 \\(a\\) 會形成唯一的 Cycle \\(C\\)。<br>路徑 \\(P\\) (在 \\(T_2\\) 中): {path}。"
-    })
+    }
     
     # Step 2: Find b in Cycle - {a} such that b not in T1
     candidates = []
@@ -109,33 +107,35 @@ def solve_spanning_tree_proof():
         # Should not happen by theorem
         valid_b = candidates[0] 
         
-    steps.append({
+    yield {
         "type": "select_b",
         "a": list(a),
         "b": list(valid_b),
         "cycle_edges": [list(e) for e in cycle_edges],
         "candidates": [list(e) for e in candidates],
         "msg": f"在 Cycle \\(C \\setminus \\{{a\\}}\\) 中尋找不在 \\(T_1\\) 的邊。<br>候選邊: {[list(e) for e in candidates]}。<br>選擇 \\(b = {valid_b}\\)。"
-    })
+    }
     
     # Step 3: Verify T2' = T2 - {b} + {a}
     t2_prime = (t2_set - {valid_b}) | {a}
-    steps.append({
+    yield {
         "type": "verify_t2_prime",
         "t2_prime": [list(e) for e in t2_prime],
         "removed": list(valid_b),
         "added": list(a),
         "msg": f"第二步: 證明 \\(T_2' = (T_2 - \\{{b\\}}) \\cup \\{{a\\}}\\) 是生成樹。<br>移除 \\(b\\) 打斷了 Cycle，加入 \\(a\\) 重新連接。<br>邊數不變，無環且連通。"
-    })
+    }
     
     # Step 4: Verify T1' = T1 - {a} + {b}
     t1_prime = (t1_set - {a}) | {valid_b}
-    steps.append({
+    yield {
         "type": "verify_t1_prime",
         "t1_prime": [list(e) for e in t1_prime],
         "removed": list(a),
         "added": list(valid_b),
         "msg": f"第三步: 證明 \\(T_1' = (T_1 - \\{{a\\}}) \\cup \\{{b\\}}\\) 是生成樹。<br>移除 \\(a\\) 將 \\(T_1\\) 分為兩個連通分量。<br>邊 \\(b\\) 恰好連接這兩個分量 (因為 \\(b\\) 在 \\(T_2\\) 的路徑上，且該路徑連接 \\(a\\) 的兩端)。"
-    })
+    }
     
-    return steps
+
+def solve_spanning_tree_proof():
+    return list(iter_spanning_tree_proof())
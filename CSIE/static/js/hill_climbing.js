@@ -46,6 +46,7 @@ document.addEventListener('DOMContentLoaded', function() {
     document.getElementById('btn-play-simple').addEventListener('click', () => togglePlay('simple'));
     
     // 8-Puzzle
+    document.getElementById('size-puzzle').addEventListener('change', initPuzzleInputs);
     document.getElementById('btn-random-puzzle').addEventListener('click', randomizePuzzle);
     document.getElementById('btn-solve-puzzle').addEventListener('click', solvePuzzle);
     document.getElementById('btn-prev-puzzle').addEventListener('click', () => stepPuzzle(-1));
@@ -183,7 +184,7 @@ document.addEventListener('DOMContentLoaded', function() {
     }
     
     function stepSimple(direction) {
-        if (!currentSteps.length) return;
+        if (!currentSteps.length || currentSteps.frame) return;
         
         currentStepIndex += direction;
         if (currentStepIndex < 0) currentStepIndex = 0;
@@ -200,42 +201,57 @@ document.addEventListener('DOMContentLoaded', function() {
 
     // --- 8-Puzzle Functions ---
     
+    function puzzleSize() {
+        return parseInt(document.getElementById('size-puzzle').value);
+    }
+    
     function initPuzzleInputs() {
+        const n = puzzleSize();
         const startGrid = document.getElementById('start-grid');
         const goalGrid = document.getElementById('goal-grid');
+        startGrid.innerHTML = '';
+        goalGrid.innerHTML = '';
+        [startGrid, goalGrid].forEach(grid => grid.style.setProperty('--puzzle-size', n));
         
-        for (let i = 0; i < 9; i++) {
+        for (let i = 0; i < n * n; i++) {
             startGrid.appendChild(createInput(i));
             goalGrid.appendChild(createInput(i, true));
         }
         
-        // Default Goal: 1 2 3 8 0 4 7 6 5 (Spiral)
-        const defaultGoal = [1, 2, 3, 8, 0, 4, 7, 6, 5];
-        const inputs = goalGrid.querySelectorAll('input');
-        inputs.forEach((inp, idx) => inp.value = defaultGoal[idx]);
-        
-        // Default Start: Random solvable or specific
-        const defaultStart = [2, 8, 3, 1, 6, 4, 7, 0, 5];
-        const startInputs = startGrid.querySelectorAll('input');
-        startInputs.forEach((inp, idx) => inp.value = defaultStart[idx]);
+        if (n === 3) {
+            // Default Goal: 1 2 3 8 0 4 7 6 5 (Spiral)
+            const defaultGoal = [1, 2, 3, 8, 0, 4, 7, 6, 5];
+            const inputs = goalGrid.querySelectorAll('input');
+            inputs.forEach((inp, idx) => inp.value = defaultGoal[idx]);
+            
+            // Default Start: Random solvable or specific
+            const defaultStart = [2, 8, 3, 1, 6, 4, 7, 0, 5];
+            const startInputs = startGrid.querySelectorAll('input');
+            startInputs.forEach((inp, idx) => inp.value = defaultStart[idx]);
+        } else {
+            // 15-Puzzle: 1..15 in order, blank last; start is a random walk from it
+            goalGrid.querySelectorAll('input').forEach((inp, idx) => inp.value = (idx + 1) % (n * n));
+            randomizePuzzle();
+        }
     }
     
     function createInput(idx, isGoal=false) {
         const input = document.createElement('input');
         input.type = 'number';
         input.min = 0;
-        input.max = 8;
+        input.max = puzzleSize() * puzzleSize() - 1;
         input.className = 'form-control p-1';
         return input;
     }
     
     function getBoardFromInputs(gridId) {
+        const n = puzzleSize();
         const inputs = document.querySelectorAll(`#${gridId} input`);
         const board = [];
         let row = [];
         inputs.forEach((inp, idx) => {
             row.push(parseInt(inp.value) || 0);
-            if ((idx + 1) % 3 === 0) {
+            if ((idx + 1) % n === 0) {
                 board.push(row);
                 row = [];
             }
@@ -244,10 +260,11 @@ document.addEventListener('DOMContentLoaded', function() {
     }
     
     function setBoardToInputs(gridId, board) {
+        const n = puzzleSize();
         const inputs = document.querySelectorAll(`#${gridId} input`);
         let idx = 0;
-        for (let r = 0; r < 3; r++) {
-            for (let c = 0; c < 3; c++) {
+        for (let r = 0; r < n; r++) {
+            for (let c = 0; c < n; c++) {
                 inputs[idx].value = board[r][c];
                 idx++;
             }
@@ -257,22 +274,23 @@ document.addEventListener('DOMContentLoaded', function() {
     function randomizePuzzle() {
         // Simple shuffle (might be unsolvable, but for hill climbing it's fine to fail)
         // Better: Start from goal and make random moves
+        const n = puzzleSize();
         let board = getBoardFromInputs('goal-grid');
         // Flatten
         let flat = [];
         board.forEach(r => flat.push(...r));
         
         // Random moves
-        for (let i = 0; i < 20; i++) {
+        for (let i = 0; i < (n === 3 ? 20 : 40); i++) {
             // Find 0
             let z = flat.indexOf(0);
-            let r = Math.floor(z / 3);
-            let c = z % 3;
+            let r = Math.floor(z / n);
+            let c = z % n;
             let neighbors = [];
-            if (r > 0) neighbors.push(z - 3);
-            if (r < 2) neighbors.push(z + 3);
+            if (r > 0) neighbors.push(z - n);
+            if (r < n - 1) neighbors.push(z + n);
             if (c > 0) neighbors.push(z - 1);
-            if (c < 2) neighbors.push(z + 1);
+            if (c < n - 1) neighbors.push(z + 1);
             
             let swap = neighbors[Math.floor(Math.random() * neighbors.length)];
             [flat[z], flat[swap]] = [flat[swap], flat[z]];
@@ -280,8 +298,8 @@ document.addEventListener('DOMContentLoaded', function() {
         
         // Reconstruct
         let newBoard = [];
-        for (let i = 0; i < 9; i += 3) {
-            newBoard.push(flat.slice(i, i+3));
+        for (let i = 0; i < n * n; i += n) {
+            newBoard.push(flat.slice(i, i+n));
         }
         setBoardToInputs('start-grid', newBoard);
     }
@@ -289,15 +307,23 @@ document.addEventListener('DOMContentLoaded', function() {
     function solvePuzzle() {
         const start = getBoardFromInputs('start-grid');
         const goal = getBoardFromInputs('goal-grid');
+        const engine = document.getElementById('engine-puzzle').value;
+        // Hill climbing sends its search tree as a delta stream (step_codec.js);
+        // the other engines send sampled search steps
+        const body = engine === 'hill_climbing' ? { start, goal, encoding: 'delta' } : { start, goal, engine };
         
         fetch('/api/hill_climbing/puzzle', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ start, goal })
+            body: JSON.stringify(body)
         })
         .then(response => response.json())
         .then(data => {
-            currentSteps = data;
+            if (data.error) {
+                alert(data.error);
+                return;
+            }
+            currentSteps = engine === 'hill_climbing' ? new StepPlayer(data) : data;
             currentStepIndex = -1;
             stepPuzzle(1);
         });
@@ -313,13 +339,73 @@ document.addEventListener('DOMContentLoaded', function() {
             stopPlay();
         }
         
-        const step = currentSteps[currentStepIndex];
+        const step = currentSteps.frame ? currentSteps.frame(currentStepIndex) : currentSteps[currentStepIndex];
         document.getElementById('status-puzzle').innerText = step.msg;
-        updateStackList('stack-list-puzzle', step.stack);
-        drawPuzzleTree(step.tree_nodes, step.current_node, step.stack);
+        updateStackList('stack-list-puzzle', step.stack || []);
+        if (step.tree_nodes) {
+            drawPuzzleTree(step.tree_nodes, step.current_node, step.stack, new Set(step.visited));
+        } else {
+            drawSearchStep(step);
+        }
+    }
+    
+    // Best-First / A* / IDA*: the current board and counters, or the solution path
+    function drawSearchStep(step) {
+        ctxPuzzle.clearRect(0, 0, canvasPuzzle.width, canvasPuzzle.height);
+        ctxPuzzle.textAlign = 'left';
+        ctxPuzzle.textBaseline = 'top';
+        ctxPuzzle.fillStyle = 'black';
+        ctxPuzzle.font = '16px Arial';
+        
+        if (step.path) {
+            ctxPuzzle.fillText(`解答路徑：${step.moves} 步，展開 ${step.expanded} 個狀態`, 20, 20);
+            const size = 60;
+            const perRow = Math.floor((canvasPuzzle.width - 20) / (size + 20));
+            step.path.forEach((board, i) => {
+                const x = 20 + (i % perRow) * (size + 20);
+                const y = 60 + Math.floor(i / perRow) * (size + 30);
+                drawBoard(board, x, y, size, i === step.path.length - 1 ? '#c8e6c9' : 'white');
+                ctxPuzzle.fillStyle = 'blue';
+                ctxPuzzle.font = '10px Arial';
+                ctxPuzzle.textAlign = 'center';
+                ctxPuzzle.textBaseline = 'middle';
+                ctxPuzzle.fillText(i, x + size / 2, y + size + 10);
+            });
+            return;
+        }
+        
+        const info = [];
+        if (step.g !== undefined) info.push(`g = ${step.g}`);
+        if (step.h !== undefined) info.push(`h = ${step.h}`);
+        if (step.f !== undefined) info.push(`f = ${step.f}`);
+        if (step.bound !== undefined) info.push(`f 上限 = ${step.bound}`);
+        if (step.expanded !== undefined) info.push(`已展開 ${step.expanded} 個狀態`);
+        if (step.open_size !== undefined) info.push(`Open set ${step.open_size} 個`);
+        info.forEach((line, i) => ctxPuzzle.fillText(line, 320, 40 + i * 26));
+        if (step.board) drawBoard(step.board, 40, 40, 240, step.phase === 'search' ? '#ffeb3b' : 'white');
+    }
+    
+    function drawBoard(board, x, y, size, fill) {
+        const n = board.length;
+        const cellSize = size / n;
+        ctxPuzzle.fillStyle = fill;
+        ctxPuzzle.fillRect(x, y, size, size);
+        ctxPuzzle.strokeStyle = '#333';
+        ctxPuzzle.strokeRect(x, y, size, size);
+        ctxPuzzle.fillStyle = 'black';
+        ctxPuzzle.font = `${Math.max(10, Math.floor(cellSize / 2))}px Arial`;
+        ctxPuzzle.textAlign = 'center';
+        ctxPuzzle.textBaseline = 'middle';
+        for (let r = 0; r < n; r++) {
+            for (let c = 0; c < n; c++) {
+                if (board[r][c] !== 0) {
+                    ctxPuzzle.fillText(board[r][c], x + c * cellSize + cellSize / 2, y + r * cellSize + cellSize / 2);
+                }
+            }
+        }
     }
     
-    function drawPuzzleTree(nodes, currentId, stackIds) {
+    function drawPuzzleTree(nodes, currentId, stackIds, visitedIds) {
         ctxPuzzle.clearRect(0, 0, canvasPuzzle.width, canvasPuzzle.height);
         
         if (!nodes || nodes.length === 0) return;
@@ -407,11 +493,11 @@ document.addEventListener('DOMContentLoaded', function() {
         
         // Draw Nodes
         nodes.forEach(n => {
-            drawPuzzleNode(n, currentId, stackIds);
+            drawPuzzleNode(n, currentId, stackIds, visitedIds);
         });
     }
     
-    function drawPuzzleNode(node, currentId, stackIds) {
+    function drawPuzzleNode(node, currentId, stackIds, visitedIds) {
         const x = node.x - 30;
         const y = node.y - 30;
         const size = 60;
@@ -421,7 +507,7 @@ document.addEventListener('DOMContentLoaded', function() {
             ctxPuzzle.fillStyle = '#ffeb3b';
         } else if (stackIds.includes(node.id)) {
             ctxPuzzle.fillStyle = '#bbdefb';
-        } else if (node.status === 'visited') {
+        } else if (visitedIds.has(node.id)) {
             ctxPuzzle.fillStyle = '#e0e0e0';
         } else {
             ctxPuzzle.fillStyle = 'white';
@@ -4,6 +4,12 @@ let currentSteps = [];
 let currentStepIdx = -1;
 let isPlaying = false;
 let playTimer = null;
+let streamDone = true; // false while steps are still arriving from the server
+// Tables with more cells than this are played one item row per step
+const ROW_DETAIL_CELLS = 400;
+// Same limit as TABLE_MAX_CELLS in knapsack_logic.py: above it the server
+// answers with (weight, value) frontiers instead of a table
+const TABLE_MAX_CELLS = 250000;
 const canvas = document.getElementById('dpCanvas');
 const ctx = canvas.getContext('2d');
 
@@ -43,6 +49,13 @@ function updatePreview() {
     // Create dummy table
     const rows = items.length + 1;
     const cols = capacity + 1;
+    if (rows * cols > TABLE_MAX_CELLS) {
+        canvas.width = 600;
+        canvas.height = 120;
+        ctx.clearRect(0, 0, canvas.width, canvas.height);
+        document.getElementById('msgContent').innerText = "容量太大，不畫 DP 表格：執行後改為顯示每一步的 (重量, 價值) Pareto 前緣。";
+        return;
+    }
     const dummyTable = Array(rows).fill().map(() => Array(cols).fill("")); // Empty strings or 0
     
     // Initialize first row/col with 0 if we want to look like init state, 
@@ -115,25 +128,36 @@ function runKnapsack() {
         return;
     }
 
-    fetch('/api/knapsack/run', {
+    const player = new StepPlayer([]);
+    currentSteps = player;
+    currentStepIdx = -1;
+    streamDone = false;
+
+    // 串流 + delta：伺服器每算完一格就送出該格的變動，收到第一步就開始播放
+    // 表格太大時改成每個物品一步 (整列一次算完)
+    const detail = items.length * (parseInt(capacity) + 1) > ROW_DETAIL_CELLS ? 'row' : 'cell';
+    fetchStepStream('/api/knapsack/run', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ capacity: parseInt(capacity), items: items })
+        body: JSON.stringify({ capacity: parseInt(capacity), items: items, encoding: 'delta', detail: detail })
+    }, (step, idx) => {
+        if (currentSteps !== player) return; // inputs changed, drop the old run
+        player.push([step]);
+        if (idx === 0) {
+            currentStepIdx = 0;
+            drawStep(player.frame(0));
+            startAutoPlay();
+        }
     })
-    .then(res => res.json())
-    .then(data => {
-        currentSteps = data;
-        currentStepIdx = 0;
-        drawStep(currentSteps[0]);
-        startAutoPlay();
-    });
+    .then(() => { if (currentSteps === player) streamDone = true; })
+    .catch(() => { streamDone = true; });
 }
 
 function prevStep() {
     stopAutoPlay();
     if (currentStepIdx > 0) {
         currentStepIdx--;
-        drawStep(currentSteps[currentStepIdx]);
+        drawStep(currentSteps.frame(currentStepIdx));
     }
 }
 
@@ -141,7 +165,7 @@ function nextStep() {
     stopAutoPlay();
     if (currentStepIdx < currentSteps.length - 1) {
         currentStepIdx++;
-        drawStep(currentSteps[currentStepIdx]);
+        drawStep(currentSteps.frame(currentStepIdx));
     }
 }
 
@@ -169,10 +193,13 @@ function playNext() {
     if (!isPlaying) return;
     if (currentStepIdx < currentSteps.length - 1) {
         currentStepIdx++;
-        drawStep(currentSteps[currentStepIdx]);
+        drawStep(currentSteps.frame(currentStepIdx));
         const val = parseInt(document.getElementById('speedRange').value);
         const delay = 5100 - val;
         playTimer = setTimeout(playNext, delay);
+    } else if (!streamDone) {
+        // Caught up with the stream, wait for more steps
+        playTimer = setTimeout(playNext, 50);
     } else {
         stopAutoPlay();
     }
@@ -184,11 +211,18 @@ function drawStep(step) {
     document.getElementById('msgContent').innerText = step.msg;
     document.getElementById('statusText').innerText = `步驟 ${currentStepIdx + 1} / ${currentSteps.length}`;
 
+    if (!step.table) {
+        drawFrontier(step);
+        return;
+    }
+
     const table = step.table;
     const items = step.items;
-    const capacity = step.capacity;
-    const rows = items.length + 1;
-    const cols = capacity + 1;
+    // Variant steps (bounded / volume) label their own rows and columns
+    const rowLabels = step.row_labels;
+    const colLabels = step.col_labels;
+    const rows = table.length;
+    const cols = table[0].length;
     
     const cellWidth = 60;
     const cellHeight = 40;
@@ -218,18 +252,18 @@ function drawStep(step) {
     ctx.font = "14px Arial";
 
     // Draw Column Headers (Capacity)
-    for (let j = 0; j <= capacity; j++) {
+    for (let j = 0; j < cols; j++) {
         const x = headerWidth + j * cellWidth;
         const y = 0;
         ctx.fillStyle = "#f0f0f0";
         ctx.fillRect(x, y, cellWidth, headerHeight);
         ctx.strokeRect(x, y, cellWidth, headerHeight);
         ctx.fillStyle = "#333";
-        ctx.fillText(j, x + cellWidth/2, y + headerHeight/2);
+        ctx.fillText(colLabels ? colLabels[j] : j, x + cellWidth/2, y + headerHeight/2);
     }
     
     // Draw Row Headers (Items)
-    for (let i = 0; i <= items.length; i++) {
+    for (let i = 0; i < rows; i++) {
         const y = headerHeight + i * cellHeight;
         const x = 0;
         ctx.fillStyle = "#f0f0f0";
@@ -238,15 +272,22 @@ function drawStep(step) {
         ctx.fillStyle = "#333";
         
         let label = `${i}`;
-        if (i > 0) {
+        if (rowLabels) {
+            label = rowLabels[i];
+        } else if (i > 0) {
             label += ` (w:${items[i-1].w}, v:${items[i-1].v})`;
         }
         ctx.fillText(label, x + headerWidth/2, y + cellHeight/2);
     }
     
     // Draw Table Cells
-    for (let i = 0; i <= items.length; i++) {
-        for (let j = 0; j <= capacity; j++) {
+    // Row steps can highlight a whole row, so look highlights up by cell instead of scanning the list
+    const hlColors = new Map();
+    for (const h of (step.highlights || [])) {
+        if (!hlColors.has(h.r + "," + h.c)) hlColors.set(h.r + "," + h.c, h.color);
+    }
+    for (let i = 0; i < rows; i++) {
+        for (let j = 0; j < cols; j++) {
             const x = headerWidth + j * cellWidth;
             const y = headerHeight + i * cellHeight;
             
@@ -254,16 +295,16 @@ function drawStep(step) {
             let bgColor = "white";
             
             // Highlight dependency cells first
-            if (step.highlights) {
-                const hl = step.highlights.find(h => h.r === i && h.c === j);
-                if (hl) {
-                    bgColor = hl.color;
-                }
+            const hl = hlColors.get(i + "," + j);
+            if (hl) {
+                bgColor = hl;
             }
 
             // Highlight current cell (override if needed, or blend?)
             // Usually current cell is the one being filled, so it's most important.
-            if (step.current && step.current.r === i && step.current.c === j) {
+            // Row steps have c === null: the whole row was filled at once, keep its highlights on top
+            if (step.current && step.current.r === i &&
+                (step.current.c === j || (step.current.c === null && !hl))) {
                 bgColor = "#ffff99"; // Yellow
             }
             
@@ -276,3 +317,54 @@ function drawStep(step) {
         }
     }
 }
+
+// Steps from the "value" / "pareto" engines: no table, only the current
+// frontier of (weight, value) pairs (both ends of it when it is long)
+function drawFrontier(step) {
+    const cellWidth = 70;
+    const cellHeight = 36;
+    const headerWidth = 80;
+    const head = step.frontier || [];
+    const tail = step.frontier_tail || [];
+    const columns = head.map(p => p.map(String));
+    if (tail.length > 0) {
+        columns.push(["…", "…"]);
+        tail.forEach(p => columns.push(p.map(String)));
+    }
+
+    canvas.width = Math.max(600, headerWidth + columns.length * cellWidth + 50);
+    canvas.height = 2 * cellHeight + 80;
+    ctx.clearRect(0, 0, canvas.width, canvas.height);
+    ctx.font = "14px Arial";
+    ctx.textAlign = "center";
+    ctx.textBaseline = "middle";
+
+    ctx.fillStyle = "#000";
+    ctx.textAlign = "left";
+    if (step.chosen) {
+        // Variant summaries list {item, count} instead of plain item numbers
+        const names = step.chosen.map(c => typeof c === "object" ? `${c.item} × ${c.count}` : c);
+        ctx.fillText(`最大價值 ${step.best}，選到的物品：${names.join("、") || "無"}`, 10, 20);
+        return;
+    }
+    ctx.fillText(`Pareto 前緣：${step.frontier_size} 組 (重量, 價值)`, 10, 20);
+    ctx.textAlign = "center";
+
+    ["重量", "價值"].forEach((label, r) => {
+        const y = 40 + r * cellHeight;
+        ctx.fillStyle = "#f0f0f0";
+        ctx.fillRect(0, y, headerWidth, cellHeight);
+        ctx.strokeRect(0, y, headerWidth, cellHeight);
+        ctx.fillStyle = "#333";
+        ctx.fillText(label, headerWidth / 2, y + cellHeight / 2);
+        columns.forEach((col, c) => {
+            const x = headerWidth + c * cellWidth;
+            // The last pair is the best value found so far
+            ctx.fillStyle = c === columns.length - 1 ? "#aaffaa" : "white";
+            ctx.fillRect(x, y, cellWidth, cellHeight);
+            ctx.strokeRect(x, y, cellWidth, cellHeight);
+            ctx.fillStyle = "black";
+            ctx.fillText(col[r], x + cellWidth / 2, y + cellHeight / 2);
+        });
+    });
+}
@@ -72,13 +72,13 @@ function runLCS() {
     fetch('/api/lcs/run', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ text1: text1, text2: text2 })
+        body: JSON.stringify({ text1: text1, text2: text2, encoding: 'delta' }) // see step_codec.js
     })
     .then(res => res.json())
     .then(data => {
-        currentSteps = data;
+        currentSteps = new StepPlayer(data);
         currentStepIdx = 0;
-        drawStep(currentSteps[0]);
+        drawStep(currentSteps.frame(0));
         startAutoPlay();
     });
 }
@@ -87,7 +87,7 @@ function prevStep() {
     stopAutoPlay();
     if (currentStepIdx > 0) {
         currentStepIdx--;
-        drawStep(currentSteps[currentStepIdx]);
+        drawStep(currentSteps.frame(currentStepIdx));
     }
 }
 
@@ -95,7 +95,7 @@ function nextStep() {
     stopAutoPlay();
     if (currentStepIdx < currentSteps.length - 1) {
         currentStepIdx++;
-        drawStep(currentSteps[currentStepIdx]);
+        drawStep(currentSteps.frame(currentStepIdx));
     }
 }
 
@@ -123,7 +123,7 @@ function playNext() {
     if (!isPlaying) return;
     if (currentStepIdx < currentSteps.length - 1) {
         currentStepIdx++;
-        drawStep(currentSteps[currentStepIdx]);
+        drawStep(currentSteps.frame(currentStepIdx));
         const val = parseInt(document.getElementById('speedRange').value);
         const delay = 5100 - val;
         playTimer = setTimeout(playNext, delay);
@@ -186,11 +186,11 @@ function runMatrixChain() {
     fetch('/api/matrix_chain/run', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ dims: dims }),
+        body: JSON.stringify({ dims: dims, encoding: 'delta' }), // see step_codec.js
     })
     .then(response => response.json())
     .then(data => {
-        steps = data;
+        steps = new StepPlayer(data);
         currentStepIndex = 0;
         stopAutoPlay();
         updateUI();
@@ -204,7 +204,7 @@ function runMatrixChain() {
 function updateUI() {
     if (steps.length === 0) return;
     
-    const step = steps[currentStepIndex];
+    const step = steps.frame(currentStepIndex);
     document.getElementById('msgContent').textContent = step.msg;
     document.getElementById('statusText').textContent = `步驟 ${currentStepIndex + 1} / ${steps.length}`;
     document.getElementById('parensDisplay').textContent = step.parens;
@@ -31,11 +31,11 @@ document.addEventListener('DOMContentLoaded', function() {
             headers: {
                 'Content-Type': 'application/json',
             },
-            body: JSON.stringify({ s1: s1, s2: s2 }),
+            body: JSON.stringify({ s1: s1, s2: s2, encoding: 'delta' }), // see step_codec.js
         })
         .then(response => response.json())
         .then(data => {
-            steps = data;
+            steps = new StepPlayer(data);
             currentStep = 0;
             
             // Initialize UI
@@ -44,7 +44,7 @@ document.addEventListener('DOMContentLoaded', function() {
             nextBtn.disabled = false;
             autoBtn.disabled = false;
             
-            showStep(steps[0]);
+            showStep(steps.frame(0));
             currentStep++;
         })
         .catch(error => {
@@ -56,7 +56,7 @@ document.addEventListener('DOMContentLoaded', function() {
     function prevStep() {
         if (currentStep > 1) {
             currentStep--;
-            showStep(steps[currentStep - 1]);
+            showStep(steps.frame(currentStep - 1));
             nextBtn.disabled = false;
             autoBtn.disabled = false;
         }
@@ -67,7 +67,7 @@ document.addEventListener('DOMContentLoaded', function() {
 
     function nextStep() {
         if (currentStep < steps.length) {
-            showStep(steps[currentStep]);
+            showStep(steps.frame(currentStep));
             currentStep++;
             prevBtn.disabled = false;
         } 
@@ -128,6 +128,75 @@ function playNext() {
     }
 }
 
+// Snapshots are a keyframe ("key", the whole tree) followed by deltas that only
+// carry the nodes whose color / children changed. Rebuild the tree for a step
+// from the nearest keyframe, or from the previous decoded step when moving forward.
+let decoded = { steps: null, idx: -1, records: null, highlightId: null };
+
+function applySnap(records, snap) {
+    if ((snap.kind || 'key') === 'key') {
+        records = {};
+        let highlightId = null;
+        snap.nodes.forEach(n => {
+            records[n.id] = n;
+            if (n.is_highlight) highlightId = n.id;
+        });
+        return { records, highlightId };
+    }
+    snap.removed.forEach(id => { delete records[id]; });
+    snap.nodes.forEach(n => { records[n.id] = n; });
+    return { records, highlightId: snap.highlight_id };
+}
+
+function decodeSnap(steps, idx) {
+    let start = idx;
+    while (start > 0 && (steps[start].snap.kind || 'key') !== 'key') start--;
+
+    let records = null;
+    let highlightId = null;
+    if (decoded.steps === steps && decoded.idx >= start && decoded.idx <= idx) {
+        records = decoded.records;
+        highlightId = decoded.highlightId;
+        start = decoded.idx + 1;
+    }
+    for (let i = start; i <= idx; i++) {
+        ({ records, highlightId } = applySnap(records, steps[i].snap));
+    }
+    decoded = { steps, idx, records, highlightId };
+    return layoutSnap(records, steps[idx].snap.root_id, highlightId);
+}
+
+// Same layout as export_tree: in-order rank gives x, depth gives y
+function layoutSnap(records, rootId, highlightId) {
+    const nodes = [];
+    const edges = [];
+    const stack = [];
+    let rank = 0;
+    let cur = rootId;
+    let depth = 0;
+    while (stack.length || (cur !== null && cur !== undefined)) {
+        while (cur !== null && cur !== undefined) {
+            stack.push([cur, depth]);
+            cur = records[cur].left;
+            depth++;
+        }
+        [cur, depth] = stack.pop();
+        const r = records[cur];
+        nodes.push({
+            id: cur, key: r.key, color: r.color,
+            x: rank * 50 + 50, y: depth * 60 + 150,
+            is_highlight: cur === highlightId
+        });
+        [r.left, r.right].forEach(c => {
+            if (c !== null && c !== undefined) edges.push({ u: cur, v: c });
+        });
+        rank++;
+        cur = r.right;
+        depth++;
+    }
+    return { root_id: rootId, nodes, edges };
+}
+
 function drawStep(step) {
     if (!step) return;
     
@@ -135,7 +204,7 @@ function drawStep(step) {
     document.getElementById('msgContent').innerText = step.msg;
     document.getElementById('statusText').innerText = `步驟 ${currentStepIdx + 1} / ${currentSteps.length}`;
     
-    const snap = step.snap;
+    const snap = decodeSnap(currentSteps, currentStepIdx);
     const nodes = snap.nodes;
     const edges = snap.edges;
     
@@ -2,7 +2,7 @@
 let nodes = [];
 let edges = [];
 let terminals = new Set();
-let currentSteps = [];
+let currentSteps = new StepPlayer([]);
 let currentStepIdx = -1;
 let isPlaying = false;
 let playTimer = null;
@@ -211,7 +211,7 @@ function clearGraph() {
     nodes = [];
     edges = [];
     terminals = new Set();
-    currentSteps = [];
+    currentSteps = new StepPlayer([]);
     currentStepIdx = -1;
     stopAutoPlay();
     draw();
@@ -226,7 +226,9 @@ function runSteiner() {
     const payload = {
         nodes: nodes,
         edges: edges,
-        terminals: Array.from(terminals)
+        terminals: Array.from(terminals),
+        engine: document.getElementById('engineSelect').value,
+        encoding: 'delta' // graph sent once, edge lists as appends (step_codec.js)
     };
     
     fetch('/api/steiner/run', {
@@ -236,9 +238,9 @@ function runSteiner() {
     })
     .then(res => res.json())
     .then(data => {
-        currentSteps = data;
+        currentSteps = new StepPlayer(data);
         currentStepIdx = 0;
-        drawStep(currentSteps[0]);
+        drawStep(currentSteps.frame(0));
         startAutoPlay();
     });
 }
@@ -248,7 +250,7 @@ function prevStep() {
     stopAutoPlay();
     if (currentStepIdx > 0) {
         currentStepIdx--;
-        drawStep(currentSteps[currentStepIdx]);
+        drawStep(currentSteps.frame(currentStepIdx));
     }
 }
 
@@ -256,7 +258,7 @@ function nextStep() {
     stopAutoPlay();
     if (currentStepIdx < currentSteps.length - 1) {
         currentStepIdx++;
-        drawStep(currentSteps[currentStepIdx]);
+        drawStep(currentSteps.frame(currentStepIdx));
     }
 }
 
@@ -281,7 +283,7 @@ function playNext() {
     if (!isPlaying) return;
     if (currentStepIdx < currentSteps.length - 1) {
         currentStepIdx++;
-        drawStep(currentSteps[currentStepIdx]);
+        drawStep(currentSteps.frame(currentStepIdx));
         const val = parseInt(document.getElementById('speedRange').value);
         const delay = 5100 - val;
         playTimer = setTimeout(playNext, delay);
@@ -377,13 +379,24 @@ function draw(step = null) {
         });
     }
 
+    // Voronoi engine: colour every node by the terminal its region belongs to
+    // (step.regions is a list of [node, terminal] pairs, hidden once the tree is drawn)
+    const regionOf = {};
+    const regionColor = {};
+    if (step && step.regions && !showFinal) {
+        step.regions.forEach(([id, t]) => { regionOf[id] = t; });
+        const owners = [...new Set(Object.values(regionOf))];
+        owners.forEach((t, i) => { regionColor[t] = `hsl(${Math.round(360 * i / owners.length)}, 70%, 80%)`; });
+    }
+
     // Draw Nodes
     nodes.forEach(n => {
         ctx.beginPath();
         ctx.arc(n.x, n.y, 20, 0, 2 * Math.PI);
         
         const isTerminal = terminals.has(n.id);
-        ctx.fillStyle = isTerminal ? "#dc3545" : "#fff"; // Red for terminal
+        const region = regionOf[n.id];
+        ctx.fillStyle = isTerminal ? "#dc3545" : (region !== undefined ? regionColor[region] : "#fff"); // Red for terminal
         ctx.fill();
         
         ctx.lineWidth = 2;
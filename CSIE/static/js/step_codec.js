@@ -0,0 +1,119 @@
+// Client side of the DP step contract (see dp_steps.py).
+// A delta stream is one keyframe followed by steps that only carry the
+// changed cells. StepPlayer keeps a single copy of every table and moves it
+// forward / backward, so memory stays at one table no matter how many steps.
+// Lists (keyframe "lists", delta "pop" / "append") work the same way: one
+// array per list, grown and shrunk in place. Frames share these arrays, so
+// callers must not modify them.
+// Keyframe fields carry over to later frames only when listed in the
+// keyframe's "static" (all of them when it has none), as in dp_steps.delta_decode.
+
+const STEP_FORMAT_VERSION = 1;
+
+class StepPlayer {
+    constructor(steps) {
+        this.steps = [];
+        this.tables = {};
+        this.lists = {};
+        this.static = {};
+        this.idx = -1;
+        this.undo = []; // undo[k] = cells overwritten when applying step k
+        this.push(steps || []);
+    }
+
+    get length() {
+        return this.steps.length;
+    }
+
+    // Accept more steps (e.g. from the next page or a streamed chunk)
+    push(steps) {
+        steps.forEach(s => this.steps.push(s));
+    }
+
+    // Returns the full frame at index k: {table..., items, ..., msg}
+    frame(k) {
+        if (k < 0 || k >= this.steps.length) return null;
+        while (this.idx < k) this._forward();
+        while (this.idx > k) this._backward();
+
+        const step = this.steps[k];
+        const frame = Object.assign({}, this.static);
+        Object.keys(step).forEach(key => {
+            if (key !== 'kind' && key !== 'cells' && key !== 'tables' && key !== 'v' &&
+                key !== 'lists' && key !== 'pop' && key !== 'append' && key !== 'static') {
+                frame[key] = step[key];
+            }
+        });
+        Object.keys(this.tables).forEach(name => { frame[name] = this.tables[name]; });
+        Object.keys(this.lists).forEach(name => { frame[name] = this.lists[name]; });
+        return frame;
+    }
+
+    _forward() {
+        const k = this.idx + 1;
+        const step = this.steps[k];
+        if (step.kind === 'key') {
+            if (step.v !== STEP_FORMAT_VERSION) {
+                throw new Error(`unsupported step format version: ${step.v}`);
+            }
+            this.undo[k] = { tables: this.tables, lists: this.lists, static: this.static };
+            this.tables = {};
+            Object.keys(step.tables).forEach(name => {
+                this.tables[name] = step.tables[name].map(row => row.slice());
+            });
+            this.lists = {};
+            Object.keys(step.lists || {}).forEach(name => {
+                this.lists[name] = step.lists[name].slice();
+            });
+            this.static = {};
+            const keys = step.static || Object.keys(step).filter(key =>
+                key !== 'kind' && key !== 'tables' && key !== 'lists' && key !== 'v');
+            keys.forEach(key => {
+                if (key in step) this.static[key] = step[key];
+            });
+        } else {
+            const old = [];
+            Object.keys(step.cells).forEach(name => {
+                const t = this.tables[name];
+                step.cells[name].forEach(([r, c, val]) => {
+                    old.push([name, r, c, t[r][c]]);
+                    t[r][c] = val;
+                });
+            });
+            const popped = {};
+            Object.keys(step.pop || {}).forEach(name => {
+                const list = this.lists[name];
+                popped[name] = list.splice(list.length - step.pop[name], step.pop[name]);
+            });
+            const appended = {};
+            Object.keys(step.append || {}).forEach(name => {
+                step.append[name].forEach(item => this.lists[name].push(item));
+                appended[name] = step.append[name].length;
+            });
+            this.undo[k] = { cells: old, popped: popped, appended: appended };
+        }
+        this.idx = k;
+    }
+
+    _backward() {
+        const k = this.idx;
+        const u = this.undo[k];
+        if (u.cells) {
+            for (let i = u.cells.length - 1; i >= 0; i--) {
+                const [name, r, c, val] = u.cells[i];
+                this.tables[name][r][c] = val;
+            }
+            Object.keys(u.appended).forEach(name => {
+                this.lists[name].length -= u.appended[name];
+            });
+            Object.keys(u.popped).forEach(name => {
+                u.popped[name].forEach(item => this.lists[name].push(item));
+            });
+        } else {
+            this.tables = u.tables;
+            this.lists = u.lists;
+            this.static = u.static;
+        }
+        this.idx = k - 1;
+    }
+}
@@ -0,0 +1,42 @@
+// Read a step stream (application/x-ndjson, see step_stream.py) and hand each
+// step to onStep as soon as its line arrives, so the page can start animating
+// before the server has finished solving.
+// Resolves with the total number of steps once the stream ends.
+
+async function fetchStepStream(url, options, onStep, onMeta) {
+    const opts = Object.assign({}, options);
+    opts.headers = Object.assign({}, opts.headers, { 'Accept': 'application/x-ndjson' });
+
+    const res = await fetch(url, opts);
+    if (!res.ok) throw new Error(`HTTP ${res.status}`);
+
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let count = 0;
+
+    const handleLine = (line) => {
+        if (!line.trim()) return;
+        const obj = JSON.parse(line);
+        if (count === 0 && obj.meta !== undefined && Object.keys(obj).length === 1) {
+            if (onMeta) onMeta(obj.meta);
+            return;
+        }
+        onStep(obj, count);
+        count++;
+    };
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let nl;
+        while ((nl = buffer.indexOf('\n')) >= 0) {
+            handleLine(buffer.slice(0, nl));
+            buffer = buffer.slice(nl + 1);
+        }
+    }
+    buffer += decoder.decode();
+    handleLine(buffer);
+    return count;
+}
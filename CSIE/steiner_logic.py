@@ -1,98 +1,403 @@
 import heapq
-import copy
+from concurrent.futures import ProcessPoolExecutor
 
-def solve_steiner(nodes, edges, terminals):
-    # nodes: list of {id: str, x: int, y: int}
-    # edges: list of {u: str, v: str, w: int}
-    # terminals: list of str (node ids)
-    
-    steps = []
-    
+import dp_steps
+
+INF = float('inf')
+# Below this many searches a process pool costs more than it saves
+POOL_MIN_SEARCHES = 4
+# "closure": metric closure of all terminal pairs (k Dijkstras)
+# "voronoi": Mehlhorn's variant, one multi-source Dijkstra + Voronoi boundary edges
+ENGINES = ("closure", "voronoi")
+
+
+class CSRGraph:
+    """無向圖的 CSR 表示：節點 id 轉成 0..n-1 的整數，鄰接串列攤平成三個 list。
+
+    節點 x 的鄰居是 target[offset[x]:offset[x+1]]，對應的權重在 weight 同樣位置。
+    整數編號依 id 排序，所以 heap 裡同距離時的先後與用字串 id 時相同。
+    """
+
+    def __init__(self, nodes, edges):
+        ids = [n['id'] for n in nodes]
+        try:
+            ids.sort()
+        except TypeError:  # mixed id types: keep the given order
+            pass
+        self.ids = ids
+        self.index = {nid: i for i, nid in enumerate(ids)}
+        n = len(ids)
+        ends = [(self.index[e['u']], self.index[e['v']], e['w']) for e in edges]
+
+        degree = [0] * n
+        for a, b, _ in ends:
+            degree[a] += 1
+            degree[b] += 1
+        offset = [0] * (n + 1)
+        for x in range(n):
+            offset[x + 1] = offset[x] + degree[x]
+        # Fill in edge order, so every node sees its neighbours in the same order as before
+        fill = offset[:-1]
+        target = [0] * offset[n]
+        weight = [0] * offset[n]
+        for a, b, w in ends:
+            target[fill[a]] = b
+            weight[fill[a]] = w
+            fill[a] += 1
+            target[fill[b]] = a
+            weight[fill[b]] = w
+            fill[b] += 1
+        self.offset = offset
+        self.target = target
+        self.weight = weight
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class ShortestPaths:
+    """在同一張 CSRGraph 上重複跑 Dijkstra。
+
+    dist / parent 緩衝區只配置一次，每次搜尋只重設上一次動到的格子；
+    所有目標都確定最短距離後就提早結束。
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.dist = [INF] * len(graph)
+        self.parent = [-1] * len(graph)
+        self.touched = []
+
+    def run(self, source, targets):
+        """從 source 搜尋到 targets (整數編號) 都確定為止，回傳每個目標的 (距離, 路徑)。
+
+        路徑是整數編號的 list (source 在前)；走不到的目標為 (INF, None)。
+        """
+        dist = self.dist
+        parent = self.parent
+        touched = self.touched
+        for x in touched:
+            dist[x] = INF
+            parent[x] = -1
+        touched.clear()
+
+        offset = self.graph.offset
+        target = self.graph.target
+        weight = self.graph.weight
+        remaining = set(targets)
+        dist[source] = 0
+        touched.append(source)
+        heap = [(0, source)]
+        while heap:
+            d, x = heapq.heappop(heap)
+            if d > dist[x]:
+                continue
+            if x in remaining:
+                remaining.discard(x)
+                if not remaining:
+                    break
+            for k in range(offset[x], offset[x + 1]):
+                y = target[k]
+                nd = d + weight[k]
+                if nd < dist[y]:
+                    if dist[y] == INF:
+                        touched.append(y)
+                    dist[y] = nd
+                    parent[y] = x
+                    heapq.heappush(heap, (nd, y))
+
+        results = []
+        for t in targets:
+            if dist[t] == INF:
+                results.append((INF, None))
+                continue
+            path = []
+            x = t
+            while x != -1:
+                path.append(x)
+                x = parent[x]
+            path.reverse()
+            results.append((dist[t], path))
+        return results
+
+
+# Each pool worker keeps one ShortestPaths, built once from the graph sent to the initializer
+POOL_SEARCH = None
+
+
+def pool_init(graph):
+    global POOL_SEARCH
+    POOL_SEARCH = ShortestPaths(graph)
+
+
+def pool_run(job):
+    source, targets = job
+    return POOL_SEARCH.run(source, targets)
+
+
+def terminal_paths(graph, terminals, workers=None):
+    """所有終端節點對 (i < j) 的最短路徑，依 (i, j) 順序 yield (u, v, 距離, 路徑)。
+
+    從第 i 個終端節點出發的搜尋只需要等到第 i+1.. 個終端節點都確定。
+    workers > 1 時每個出發點的搜尋分給 process pool 平行執行。
+    """
+    ids = graph.ids
+    idx = [graph.index[t] for t in terminals]
+    jobs = [(idx[i], idx[i + 1:]) for i in range(len(idx) - 1)]
+    if workers and workers > 1 and len(jobs) >= POOL_MIN_SEARCHES:
+        with ProcessPoolExecutor(max_workers=workers, initializer=pool_init, initargs=(graph,)) as pool:
+            results = list(pool.map(pool_run, jobs, chunksize=max(1, len(jobs) // (4 * workers))))
+    else:
+        search = ShortestPaths(graph)
+        results = (search.run(source, targets) for source, targets in jobs)
+
+    for i, found in enumerate(results):
+        for j, (d, path) in enumerate(found, i + 1):
+            if path is not None:
+                yield terminals[i], terminals[j], d, [ids[x] for x in path]
+
+
+def edge_key(graph, u, v):
+    # Canonical key of the undirected edge u - v: its two integer ids, smaller first
+    a = graph.index[u]
+    b = graph.index[v]
+    return (a, b) if a < b else (b, a)
+
+
+def merge_path(graph, path, t_nodes, t_keys, t_edges):
+    """把一條 MST 邊對應的最短路徑併入 T (t_nodes / t_keys / t_edges 就地更新)。
+
+    路徑上少於 2 個點已在 T 中時加入整條路徑；否則令 p_i、p_j 為第一個與最後一個
+    已在 T 中的點，只加入 u -> p_i 與 p_j -> v 兩段。t_keys 是 T 中邊的 edge_key 集合，
+    用來在 O(1) 內跳過重複的邊。回傳路徑上已在 T 中的點的索引。
+    """
+    indices_in_t = [i for i, node in enumerate(path) if node in t_nodes]
+    if len(indices_in_t) < 2:
+        spans = [(0, len(path) - 1)]
+    else:
+        spans = [(0, indices_in_t[0]), (indices_in_t[-1], len(path) - 1)]
+    for start, stop in spans:
+        for k in range(start, stop):
+            n1, n2 = path[k], path[k + 1]
+            t_nodes.add(n1)
+            t_nodes.add(n2)
+            key = edge_key(graph, n1, n2)
+            if key not in t_keys:
+                t_keys.add(key)
+                t_edges.append({"u": n1, "v": n2})
+    return indices_in_t
+
+
+def tree_weight(graph, edges, tree_edges):
+    """T 的總權重。權重表以 edge_key 為索引只建一次；平行邊取 edges 中第一條，和逐一掃描時相同。"""
+    weights = {}
+    for e in edges:
+        weights.setdefault(edge_key(graph, e['u'], e['v']), e['w'])
+    return sum(weights[edge_key(graph, te['u'], te['v'])] for te in tree_edges)
+
+
+def voronoi_regions(graph, sources):
+    """多源 Dijkstra：回傳 (dist, parent, region)，region[x] 是離 x 最近的來源 (整數編號，走不到為 -1)。
+
+    parent 形成以各來源為根的最短路徑森林。
+    """
+    n = len(graph)
+    dist = [INF] * n
+    parent = [-1] * n
+    region = [-1] * n
+    heap = []
+    for s in sources:
+        if region[s] == -1:
+            dist[s] = 0
+            region[s] = s
+            heap.append((0, s))
+    heapq.heapify(heap)
+    offset = graph.offset
+    target = graph.target
+    weight = graph.weight
+    while heap:
+        d, x = heapq.heappop(heap)
+        if d > dist[x]:
+            continue
+        for k in range(offset[x], offset[x + 1]):
+            y = target[k]
+            nd = d + weight[k]
+            if nd < dist[y]:
+                dist[y] = nd
+                parent[y] = x
+                region[y] = region[x]
+                heapq.heappush(heap, (nd, y))
+    return dist, parent, region
+
+
+# Keyframe fields every later frame keeps; highlight_* / msg / phase belong to "init" only
+STATIC_FIELDS = ("graph", "terminals")
+
+
+def steiner_lists():
+    # Growing collections of a Steiner run, sent as dp_steps lists
+    return {"regions": [], "closure_edges": [], "mst_edges": [], "final_tree_edges": []}
+
+
+def voronoi_steps(nodes, edges, terminals):
+    """Mehlhorn 的 Steiner tree 2-近似：不建完整的 Metric Closure。
+
+    1. 從所有終端節點同時跑一次 Dijkstra，把每個節點分給最近的終端節點 (Voronoi 區域)。
+    2. 兩端在不同區域的邊 (a, b) 代表一條 s_a → a → b → s_b 的路徑，
+       每對區域只留最短的一條，得到 G_L 的子圖 G_L'。
+    3. G_L' 的 MST 也是 G_L 的一棵 MST，把它的邊換回路徑就是 Steiner tree (仍是 2-近似)。
+    """
+    graph = CSRGraph(nodes, edges)
+    ids = graph.ids
+
+    yield dp_steps.keyframe({}, lists=steiner_lists(), static=STATIC_FIELDS, graph={"nodes": nodes, "edges": edges},
+                            terminals=terminals, msg="初始狀態：給定圖 G 與終端節點 (Terminals, 紅色)。",
+                            highlight_edges=[], highlight_nodes=terminals, phase="init")
+
+    yield dp_steps.delta({}, msg="步驟 1：以所有終端節點為起點，同時執行一次 Dijkstra。\n"
+                                 "每個節點歸給距離最近的終端節點，形成 Voronoi 區域。",
+                         highlight_edges=[], highlight_nodes=terminals, phase="voronoi_start")
+
+    dist, parent, region = voronoi_regions(graph, [graph.index[t] for t in terminals])
+    regions = [[ids[x], ids[r]] for x, r in enumerate(region) if r != -1]
+    owners = len({r for r in region if r != -1})
+    yield dp_steps.delta({}, append={"regions": regions},
+                         msg=f"Voronoi 區域完成：{len(regions)} 個節點分給 {owners} 個終端節點。\n"
+                             f"(節點顏色 = 所屬的終端節點)",
+                         phase="voronoi_done")
+
+    # Boundary edges: the shortest crossing edge for every pair of neighbouring regions
+    best = {}
+    offset = graph.offset
+    target = graph.target
+    weight = graph.weight
+    for a in range(len(graph)):
+        ra = region[a]
+        if ra == -1:
+            continue
+        for k in range(offset[a], offset[a + 1]):
+            b = target[k]
+            rb = region[b]
+            if rb == -1 or rb <= ra:
+                continue
+            d = dist[a] + weight[k] + dist[b]
+            if (ra, rb) not in best or d < best[(ra, rb)][0]:
+                best[(ra, rb)] = (d, a, b, weight[k])
+
+    closure_edges = [{"u": ids[ra], "v": ids[rb], "w": d, "bridge": {"u": ids[a], "v": ids[b]}}
+                     for (ra, rb), (d, a, b, _) in best.items()]
+    yield dp_steps.delta({}, append={"closure_edges": closure_edges},
+                         msg=f"步驟 2：兩端屬於不同區域的邊 (a, b) 代表路徑 s_a → a → b → s_b。\n"
+                             f"每對相鄰區域只留最短的一條，得到 {len(closure_edges)} 條邊的 G_L'"
+                             f" (完整的 Metric Closure 需要 {len(set(terminals)) * (len(set(terminals)) - 1) // 2} 條)。",
+                         phase="closure_boundary")
+
+    # Kruskal on the boundary edges
+    order = sorted(range(len(closure_edges)), key=lambda e: closure_edges[e]['w'])
+    keys = list(best.values())
+    group = {}
+
+    def find(x):
+        root = x
+        while group.get(root, root) != root:
+            root = group[root]
+        while x != root:
+            nxt = group.get(x, x)
+            group[x] = root
+            x = nxt
+        return root
+
+    mst_edges = []
+    mst_keys = []
+    for e in order:
+        ce = closure_edges[e]
+        ru, rv = find(ce['u']), find(ce['v'])
+        if ru == rv:
+            continue
+        group[ru] = rv
+        mst_edges.append(ce)
+        mst_keys.append(keys[e])
+        yield dp_steps.delta({}, append={"mst_edges": [ce]},
+                             msg=f"步驟 3：在 G_L' 上尋找 MST。\n加入邊 ({ce['u']}, {ce['v']})，權重 {ce['w']}"
+                                 f" (經過邊 {ce['bridge']['u']} - {ce['bridge']['v']})。",
+                             phase="mst_step")
+
+    yield dp_steps.delta({}, msg="MST on G_L' 尋找完成。", phase="mst_done")
+
+    yield dp_steps.delta({}, msg="步驟 4：把每條 MST 邊換回原圖中的路徑 s_a → a → b → s_b。\n"
+                                 "各區域內的路徑都在同一棵最短路徑樹上，所以合起來就是一棵樹。",
+                         phase="reconstruct_start")
+
+    seen = set()
+    total_weight = 0
+    for ce, (d, a, b, w) in zip(mst_edges, mst_keys):
+        # s_a -> a along the shortest-path forest, the bridge, then b -> s_b
+        left = []
+        x = a
+        while x != -1:
+            left.append(x)
+            x = parent[x]
+        left.reverse()
+        right = []
+        x = b
+        while x != -1:
+            right.append(x)
+            x = parent[x]
+        path = left + right
+        added = []
+        for k in range(len(path) - 1):
+            x, y = path[k], path[k + 1]
+            if (x, y) in seen:
+                continue
+            seen.add((x, y))
+            seen.add((y, x))
+            added.append({"u": ids[x], "v": ids[y]})
+            # Forest edges weigh the difference of their distances
+            total_weight += w if (x, y) == (a, b) else abs(dist[y] - dist[x])
+        path_ids = [ids[x] for x in path]
+        yield dp_steps.delta({}, append={"final_tree_edges": added},
+                             msg=f"處理 MST 邊 ({ce['u']}, {ce['v']})。\n對應路徑: {path_ids}。",
+                             current_path=path_ids, phase="reconstruct_step")
+
+    yield dp_steps.delta({}, msg=f"Steiner Tree 建構完成。\n總權重: {total_weight}。\n"
+                                 f"(Mehlhorn 2-Approximation：只跑了一次 Dijkstra)",
+                         phase="complete")
+
+
+def closure_steps(nodes, edges, terminals, workers=None):
     # 1. Initial State
-    steps.append({
-        "msg": "初始狀態：給定圖 G 與終端節點 (Terminals, 紅色)。",
-        "graph": {
-            "nodes": nodes,
-            "edges": edges
-        },
-        "terminals": terminals,
-        "highlight_edges": [],
-        "highlight_nodes": terminals,
-        "phase": "init"
-    })
+    yield dp_steps.keyframe({}, lists=steiner_lists(), static=STATIC_FIELDS, graph={"nodes": nodes, "edges": edges},
+                            terminals=terminals, msg="初始狀態：給定圖 G 與終端節點 (Terminals, 紅色)。",
+                            highlight_edges=[], highlight_nodes=terminals, phase="init")
     
-    # Build Adjacency List
-    adj = {n['id']: [] for n in nodes}
-    for e in edges:
-        adj[e['u']].append((e['v'], e['w']))
-        adj[e['v']].append((e['u'], e['w']))
-        
+    # Intern the graph once; every terminal search reuses it
+    graph = CSRGraph(nodes, edges)
+
     # 2. Metric Closure (All-pairs shortest paths between terminals)
     # We use Dijkstra for each terminal
     closure_edges = []
     shortest_paths = {} # (u, v) -> [path nodes]
     
-    steps.append({
-        "msg": "步驟 1：建構 Metric Closure G_L。\n計算所有終端節點對之間的最短路徑。",
-        "graph": {"nodes": nodes, "edges": edges},
-        "terminals": terminals,
-        "highlight_edges": [],
-        "highlight_nodes": terminals,
-        "phase": "closure_start"
-    })
-
-    for i in range(len(terminals)):
-        u = terminals[i]
-        # Dijkstra from u
-        dist = {n['id']: float('inf') for n in nodes}
-        parent = {n['id']: None for n in nodes}
-        dist[u] = 0
-        pq = [(0, u)]
-        
-        while pq:
-            d, curr = heapq.heappop(pq)
-            if d > dist[curr]:
-                continue
-            
-            for neighbor, weight in adj[curr]:
-                if dist[curr] + weight < dist[neighbor]:
-                    dist[neighbor] = dist[curr] + weight
-                    parent[neighbor] = curr
-                    heapq.heappush(pq, (dist[neighbor], neighbor))
-        
-        # Record paths to other terminals
-        for j in range(i + 1, len(terminals)):
-            v = terminals[j]
-            if dist[v] != float('inf'):
-                # Reconstruct path
-                path = []
-                curr = v
-                while curr is not None:
-                    path.append(curr)
-                    curr = parent[curr]
-                path.reverse()
-                
-                shortest_paths[(u, v)] = path
-                shortest_paths[(v, u)] = list(reversed(path))
-                
-                closure_edges.append({
-                    "u": u, "v": v, "w": dist[v],
-                    "path": path
-                })
+    yield dp_steps.delta({}, msg="步驟 1：建構 Metric Closure G_L。\n計算所有終端節點對之間的最短路徑。",
+                         highlight_edges=[], highlight_nodes=terminals, phase="closure_start")
+
+    for u, v, d, path in terminal_paths(graph, terminals, workers=workers):
+        shortest_paths[(u, v)] = path
+        shortest_paths[(v, u)] = list(reversed(path))
+
+        closure_edges.append({
+            "u": u, "v": v, "w": d,
+            "path": path
+        })
 
     # Show Metric Closure Graph (Conceptual)
     # We can visualize this by drawing direct lines between terminals
-    steps.append({
-        "msg": f"Metric Closure G_L 建構完成。\n包含 {len(terminals)} 個終端節點與 {len(closure_edges)} 條邊 (代表最短路徑)。",
-        "graph": {"nodes": nodes, "edges": edges},
-        "terminals": terminals,
-        "closure_edges": closure_edges, # Special field for visualization
-        "phase": "closure_done"
-    })
+    yield dp_steps.delta({}, append={"closure_edges": closure_edges},
+                         msg=f"Metric Closure G_L 建構完成。\n包含 {len(terminals)} 個終端節點與 {len(closure_edges)} 條邊 (代表最短路徑)。",
+                         phase="closure_done")
 
     # 3. MST on Metric Closure
-    # Kruskal's Algorithm on closure_edges
-    closure_edges.sort(key=lambda x: x['w'])
+    # Kruskal's Algorithm on closure_edges (sorted copy: the sent list stays as is)
     parent_set = {t: t for t in terminals}
     
     def find(i):
@@ -110,144 +415,96 @@ def solve_steiner(nodes, edges, terminals):
         return False
         
     mst_edges = []
-    mst_steps_msg = []
     
-    for e in closure_edges:
+    for e in sorted(closure_edges, key=lambda x: x['w']):
         if union(e['u'], e['v']):
             mst_edges.append(e)
-            mst_steps_msg.append(f"加入邊 ({e['u']}, {e['v']}) 權重 {e['w']}")
             
-            steps.append({
-                "msg": f"步驟 2：在 G_L 上尋找 MST。\n加入邊 ({e['u']}, {e['v']})，權重 {e['w']}。",
-                "graph": {"nodes": nodes, "edges": edges},
-                "terminals": terminals,
-                "closure_edges": closure_edges,
-                "mst_edges": copy.deepcopy(mst_edges), # Edges in G_L
-                "phase": "mst_step"
-            })
-
-    steps.append({
-        "msg": "MST on G_L 尋找完成。",
-        "graph": {"nodes": nodes, "edges": edges},
-        "terminals": terminals,
-        "closure_edges": closure_edges,
-        "mst_edges": copy.deepcopy(mst_edges),
-        "phase": "mst_done"
-    })
+            yield dp_steps.delta({}, append={"mst_edges": [e]}, # Edges in G_L
+                                 msg=f"步驟 2：在 G_L 上尋找 MST。\n加入邊 ({e['u']}, {e['v']})，權重 {e['w']}。",
+                                 phase="mst_step")
+
+    yield dp_steps.delta({}, msg="MST on G_L 尋找完成。", phase="mst_done")
 
     # 4. Transform back to Steiner Tree on G
-    # T starts empty (or just terminals)
-    # We maintain a set of vertices currently in T
-    
-    # Initially, no vertices are "connected" in T, but conceptually T is being built.
-    # The algorithm says "Let T be empty".
-    # But practically, we are adding paths.
-    
-    t_nodes = set()
-    t_edges = [] # Edges in G
-    
-    # To implement the "vertices already in T" check correctly, we need to track connected components in T?
-    # The algorithm implies T grows.
-    # "Let pi and pj be the first and the last vertices already in T"
-    
-    # Let's follow the algorithm strictly.
-    # T is a subgraph of G.
-    
+    # T starts empty; every MST edge adds the part of its path outside T
+    # ("Let pi and pj be the first and the last vertices already in T")
     current_t_nodes = set()
     current_t_edges = []
+    current_t_keys = set()  # edge_key() of every edge in T
     
-    steps.append({
-        "msg": "步驟 3：將 MST 轉換回 Steiner Tree。\n初始化 T 為空。",
-        "graph": {"nodes": nodes, "edges": edges},
-        "terminals": terminals,
-        "final_tree_edges": [],
-        "phase": "reconstruct_start"
-    })
+    yield dp_steps.delta({}, msg="步驟 3：將 MST 轉換回 Steiner Tree。\n初始化 T 為空。",
+                         phase="reconstruct_start")
     
     for mst_e in mst_edges:
         u, v = mst_e['u'], mst_e['v']
         path = shortest_paths[(u, v)] # List of node IDs
         
-        # Check intersection with current T
-        indices_in_t = [i for i, node in enumerate(path) if node in current_t_nodes]
-        
-        path_edges_to_add = []
-        nodes_to_add = set()
-        
-        explanation = ""
+        before = len(current_t_edges)
+        indices_in_t = merge_path(graph, path, current_t_nodes, current_t_keys, current_t_edges)
         
         if len(indices_in_t) < 2:
-            # Add whole path
             explanation = f"處理 MST 邊 ({u}, {v})。\n對應路徑: {path}。\n路徑上少於 2 個點已在 T 中，加入整條路徑。"
-            for k in range(len(path) - 1):
-                n1, n2 = path[k], path[k+1]
-                path_edges_to_add.append({"u": n1, "v": n2})
-                nodes_to_add.add(n1)
-                nodes_to_add.add(n2)
         else:
-            # Add subpaths
-            first_idx = indices_in_t[0]
-            last_idx = indices_in_t[-1]
-            p_i = path[first_idx]
-            p_j = path[last_idx]
-            
+            p_i = path[indices_in_t[0]]
+            p_j = path[indices_in_t[-1]]
             explanation = f"處理 MST 邊 ({u}, {v})。\n對應路徑: {path}。\n已存在 T 中的點: {[path[i] for i in indices_in_t]}。\n加入 {u}->{p_i} 和 {p_j}->{v} 的路徑段。"
-            
-            # u -> p_i (0 to first_idx)
-            for k in range(first_idx):
-                n1, n2 = path[k], path[k+1]
-                path_edges_to_add.append({"u": n1, "v": n2})
-                nodes_to_add.add(n1)
-                nodes_to_add.add(n2)
                 
-            # p_j -> v (last_idx to end)
-            for k in range(last_idx, len(path) - 1):
-                n1, n2 = path[k], path[k+1]
-                path_edges_to_add.append({"u": n1, "v": n2})
-                nodes_to_add.add(n1)
-                nodes_to_add.add(n2)
-
-        # Update T
-        current_t_nodes.update(nodes_to_add)
-        # Avoid duplicate edges
-        for pe in path_edges_to_add:
-            # Check if edge already exists (undirected)
-            exists = False
-            for existing in current_t_edges:
-                if (existing['u'] == pe['u'] and existing['v'] == pe['v']) or \
-                   (existing['u'] == pe['v'] and existing['v'] == pe['u']):
-                    exists = True
-                    break
-            if not exists:
-                current_t_edges.append(pe)
-                
-        steps.append({
-            "msg": explanation,
-            "graph": {"nodes": nodes, "edges": edges},
-            "terminals": terminals,
-            "final_tree_edges": copy.deepcopy(current_t_edges),
-            "current_path": path, # For highlighting the path being considered
-            "phase": "reconstruct_step"
-        })
+        yield dp_steps.delta({}, append={"final_tree_edges": current_t_edges[before:]},
+                             msg=explanation,
+                             current_path=path, # For highlighting the path being considered
+                             phase="reconstruct_step")
 
     # Final Step
-    total_weight = 0
-    # Calculate weight of T
-    # We need to look up weights from original edges
-    for te in current_t_edges:
-        # Find weight in original edges
-        for oe in edges:
-            if (oe['u'] == te['u'] and oe['v'] == te['v']) or \
-               (oe['u'] == te['v'] and oe['v'] == te['u']):
-                total_weight += oe['w']
-                break
-
-    steps.append({
-        "msg": f"Steiner Tree 建構完成。\n總權重: {total_weight}。\n(這是 2-Approximation 結果)",
-        "graph": {"nodes": nodes, "edges": edges},
-        "terminals": terminals,
-        "final_tree_edges": copy.deepcopy(current_t_edges),
-        "phase": "complete"
-    })
-    
-    return steps
+    total_weight = tree_weight(graph, edges, current_t_edges)
+
+    yield dp_steps.delta({}, msg=f"Steiner Tree 建構完成。\n總權重: {total_weight}。\n(這是 2-Approximation 結果)",
+                         phase="complete")
+
+
+def iter_steiner(nodes, edges, terminals, workers=None, engine="closure", encoding="full"):
+    # nodes: list of {id: str, x: int, y: int}
+    # edges: list of {u: str, v: str, w: int}
+    # terminals: list of str (node ids)
+    # workers: 最短路徑搜尋要用的 process 數 (None = 不開 process pool)
+    # engine: 見 ENGINES
+    # encoding: "delta" 圖只在第一步送一次，closure_edges / mst_edges / final_tree_edges / regions
+    #           之後只送新增的部分 (格式見 dp_steps.py)；"full" 每一步都是完整快照，
+    #           只含該階段用到的欄位，regions 是 {節點: 終端節點}
+    if engine == "voronoi":
+        steps = voronoi_steps(nodes, edges, terminals)
+    else:
+        steps = closure_steps(nodes, edges, terminals, workers=workers)
+    if encoding == "delta":
+        yield from steps
+    else:
+        yield from full_frames(steps)
+
+
+# Lists each phase shows in the "full" encoding (the others are left out)
+FULL_LISTS = {
+    "closure_done": ("closure_edges",),
+    "voronoi_done": ("regions",),
+    "closure_boundary": ("regions", "closure_edges"),
+    "mst_step": ("regions", "closure_edges", "mst_edges"),
+    "mst_done": ("regions", "closure_edges", "mst_edges"),
+    "reconstruct_start": ("final_tree_edges",),
+    "reconstruct_step": ("final_tree_edges",),
+    "complete": ("final_tree_edges",),
+}
+
+
+def full_frames(steps):
+    for frame in dp_steps.delta_decode(steps):
+        shown = FULL_LISTS.get(frame["phase"], ())
+        for name in steiner_lists():
+            # The closure engine has no regions at all
+            if name not in shown or (name == "regions" and not frame[name]):
+                del frame[name]
+        if "regions" in frame:
+            frame["regions"] = dict(frame["regions"])
+        yield frame
+
+
+def solve_steiner(nodes, edges, terminals, workers=None, engine="closure", encoding="full"):
+    return list(iter_steiner(nodes, edges, terminals, workers=workers, engine=engine, encoding=encoding))
@@ -0,0 +1,75 @@
+# Helpers for sending solver steps to the browser without building the whole
+# list first. Every iter_* function in the *_logic modules is a generator, so
+# a page of steps only costs as much work as the steps before it.
+
+import json
+import threading
+from collections import OrderedDict
+from itertools import islice
+
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 5000
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+def ndjson_lines(steps, meta=None):
+    """把步驟逐一轉成 NDJSON (一行一個 JSON)。
+
+    solver 每 yield 一步就送出一行，所以同時只有一個步驟在記憶體裡。
+    meta 不為 None 時，第一行是 {"meta": meta}，用來放 n / p / q 這類非步驟資料。
+    """
+    if meta is not None:
+        yield json.dumps({"meta": meta}, ensure_ascii=False) + "\n"
+    for step in steps:
+        yield json.dumps(step, ensure_ascii=False) + "\n"
+
+
+class StepPager:
+    """以 cursor 分頁讀取步驟產生器。
+
+    每個 key (同一個 API + 同一組輸入) 保留一個已經跑到一半的 generator。
+    下一頁的 cursor 剛好接在後面時直接續跑；否則 (往回翻頁、被 LRU 淘汰、
+    請求落在另一個 worker) 就用 factory 重新產生並跳到 cursor，
+    因為 solver 是決定性的，重播的結果會一樣。
+    """
+
+    def __init__(self, max_runs=64):
+        self.max_runs = max_runs
+        self._runs = OrderedDict()  # key -> (iterator, position, peeked steps)
+        self._lock = threading.Lock()
+
+    def page(self, key, factory, cursor=0, limit=DEFAULT_PAGE_SIZE):
+        """回傳 (steps, next_cursor)；沒有下一頁時 next_cursor 為 None。"""
+        cursor = max(0, cursor)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        # Take the run out while we use it so two requests never share a generator
+        with self._lock:
+            run = self._runs.pop(key, None)
+        if run is None or run[1] > cursor:
+            it, pos, ahead = iter(factory()), 0, []
+        else:
+            it, pos, ahead = run
+
+        # ahead holds steps already pulled from the generator (the one we peeked)
+        skip = cursor - pos
+        if skip < len(ahead):
+            steps = ahead[skip:skip + limit]
+        else:
+            for _ in islice(it, skip - len(ahead)):
+                pass
+            steps = []
+        steps.extend(islice(it, limit - len(steps)))
+        pos = cursor + len(steps)
+
+        # Peek one step to know whether there is a next page
+        ahead = list(islice(it, 1)) if len(steps) == limit else []
+        if not ahead:
+            return steps, None
+
+        with self._lock:
+            self._runs[key] = (it, pos, ahead)
+            while len(self._runs) > self.max_runs:
+                self._runs.popitem(last=False)
+        return steps, pos
@@ -0,0 +1,33 @@
+# Tracers for the step-by-step data structures (rbtree_logic / patricia_logic).
+#
+# Every operation takes a tracer. A recording Tracer turns each step into a
+# snapshot through the module's push_step; QUIET drops them. Call sites check
+# tracer.enabled first, so in quiet mode not even the step message (an
+# f-string) is built and the operation runs as the bare algorithm:
+#
+#     if tracer.enabled:
+#         tracer.step(tree, f"...", highlight_node=x)
+
+
+class Tracer:
+    """把每一步交給 push(steps, *args, **kwargs) 記成快照，結果累積在 steps。"""
+    enabled = True
+
+    def __init__(self, push):
+        self.push = push
+        self.steps = []
+
+    def step(self, *args, **kwargs):
+        self.push(self.steps, *args, **kwargs)
+
+
+class NullTracer:
+    """不記錄任何步驟 (steps 為 None)。"""
+    enabled = False
+    steps = None
+
+    def step(self, *args, **kwargs):
+        pass
+
+
+QUIET = NullTracer()
@@ -1,6 +1,6 @@
 import random
 
-def solve_viterbi():
+def iter_viterbi():
     # Define a graph G = (V, E)
     # V = {v0, v1, v2, v3, v4}
     # Edges with labels (sound) and probabilities
@@ -23,8 +23,6 @@ def solve_viterbi():
     target_sequence = ['a', 'b', 'c']
     k = len(target_sequence)
     
-    steps = []
-    
     # Part (a): Reachability
     # reachable[i][v] = boolean
     # predecessor[i][v] = u
@@ -38,7 +36,7 @@ def solve_viterbi():
     v0_idx = 0 # v0
     reachable[0][v0_idx] = True
     
-    steps.append({
+    yield {
         "type": "init",
         "part": "a",
         "nodes": nodes,
@@ -46,7 +44,7 @@ def solve_viterbi():
         "target": target_sequence,
         "reachable": [row[:] if row is not None else None for row in reachable],
         "msg": f"初始化 (Part A): 設定起點 v0 在時間 t=0 為可達 (True)。目標聲音序列: {target_sequence}"
-    })
+    }
     
     for i in range(1, k + 1):
         target_sound = target_sequence[i-1]
@@ -54,14 +52,14 @@ def solve_viterbi():
         # Initialize current row with False
         reachable[i] = [False] * len(nodes)
         
-        steps.append({
+        yield {
             "type": "start_time",
             "part": "a",
             "i": i,
             "sound": target_sound,
             "reachable": [row[:] if row is not None else None for row in reachable],
             "msg": f"<strong>開始時間 t={i}, 目標聲音: '{target_sound}'</strong><br>準備計算此時間步的可達性。"
-        })
+        }
         
         for edge in edges:
             u_idx = nodes.index(edge['u'])
@@ -69,7 +67,7 @@ def solve_viterbi():
             
             # Only check edges from reachable nodes
             if reachable[i-1][u_idx]:
-                steps.append({
+                yield {
                     "type": "check_edge",
                     "part": "a",
                     "i": i,
@@ -79,13 +77,13 @@ def solve_viterbi():
                     "target": target_sound,
                     "reachable": [row[:] if row is not None else None for row in reachable],
                     "msg": f"檢查邊 {edge['u']} → {edge['v']} (標記: {edge['label']})..."
-                })
+                }
                 
                 if edge['label'] == target_sound:
                     reachable[i][v_idx] = True
                     predecessor_a[i][v_idx] = u_idx
                     
-                    steps.append({
+                    yield {
                         "type": "update",
                         "part": "a",
                         "i": i,
@@ -93,9 +91,9 @@ def solve_viterbi():
                         "v": edge['v'],
                         "reachable": [row[:] if row is not None else None for row in reachable],
                         "msg": f"標記 '{edge['label']}' 符合目標 '{target_sound}'!<br>→ 更新: 節點 {edge['v']} 在 t={i} 變為可達。"
-                    })
+                    }
                 else:
-                     steps.append({
+                     yield {
                         "type": "mismatch",
                         "part": "a",
                         "i": i,
@@ -105,7 +103,7 @@ def solve_viterbi():
                         "target": target_sound,
                         "reachable": [row[:] if row is not None else None for row in reachable],
                         "msg": f"標記 '{edge['label']}' 不符合目標 '{target_sound}'。忽略。"
-                    })
+                    }
 
     # Reconstruct path for (a)
     path_a = []
@@ -128,12 +126,12 @@ def solve_viterbi():
     else:
         msg_a = "NO-SUCH-PATH"
 
-    steps.append({
+    yield {
         "type": "result_a",
         "part": "a",
         "path": path_a,
         "msg": f"Part A 完成。{msg_a}"
-    })
+    }
 
     # Part (b): Viterbi (Max Probability)
     # P[i][v] = max prob
@@ -146,32 +144,32 @@ def solve_viterbi():
     P[0] = [0.0] * len(nodes)
     P[0][v0_idx] = 1.0
     
-    steps.append({
+    yield {
         "type": "init_b",
         "part": "b",
         "P": [row[:] if row is not None else None for row in P],
         "msg": "初始化 (Part B): 設定起點 v0 在時間 t=0 機率為 1.0。其他為 0。"
-    })
+    }
     
     for i in range(1, k + 1):
         target_sound = target_sequence[i-1]
         P[i] = [0.0] * len(nodes)
         
-        steps.append({
+        yield {
             "type": "start_time",
             "part": "b",
             "i": i,
             "sound": target_sound,
             "P": [row[:] if row is not None else None for row in P],
             "msg": f"<strong>開始時間 t={i}, 目標聲音: '{target_sound}'</strong><br>準備計算此時間步的最大機率。"
-        })
+        }
         
         for edge in edges:
             u_idx = nodes.index(edge['u'])
             v_idx = nodes.index(edge['v'])
             
             if P[i-1][u_idx] is not None and P[i-1][u_idx] > 0:
-                steps.append({
+                yield {
                     "type": "check_edge",
                     "part": "b",
                     "i": i,
@@ -181,14 +179,14 @@ def solve_viterbi():
                     "target": target_sound,
                     "P": [row[:] if row is not None else None for row in P],
                     "msg": f"檢查邊 {edge['u']} → {edge['v']} (標記: {edge['label']})..."
-                })
+                }
                 
                 if edge['label'] == target_sound:
                     prev_prob = P[i-1][u_idx]
                     edge_prob = edge['prob']
                     prob = prev_prob * edge_prob
                     
-                    steps.append({
+                    yield {
                         "type": "calc",
                         "part": "b",
                         "i": i,
@@ -196,14 +194,14 @@ def solve_viterbi():
                         "v": edge['v'],
                         "P": [row[:] if row is not None else None for row in P],
                         "msg": f"計算機率: $P[{i-1}][{edge['u']}] \\times p({edge['u']},{edge['v']})$<br>= {prev_prob:.2f} × {edge_prob}<br>= <strong>{prob:.4f}</strong>"
-                    })
+                    }
                     
                     if prob > P[i][v_idx]:
                         old_prob = P[i][v_idx]
                         P[i][v_idx] = prob
                         pred_b[i][v_idx] = u_idx
                         
-                        steps.append({
+                        yield {
                             "type": "update",
                             "part": "b",
                             "i": i,
@@ -211,9 +209,9 @@ def solve_viterbi():
                             "v": edge['v'],
                             "P": [row[:] if row is not None else None for row in P],
                             "msg": f"新機率 {prob:.4f} > 目前 {old_prob:.4f}。<br>→ 更新 $P[{i}][{edge['v']}]$ = {prob:.4f}。"
-                        })
+                        }
                     else:
-                        steps.append({
+                        yield {
                             "type": "no_update",
                             "part": "b",
                             "i": i,
@@ -221,9 +219,9 @@ def solve_viterbi():
                             "v": edge['v'],
                             "P": [row[:] if row is not None else None for row in P],
                             "msg": f"新機率 {prob:.4f} <= 目前 {P[i][v_idx]:.4f}。<br>→ 不更新。"
-                        })
+                        }
                 else:
-                     steps.append({
+                     yield {
                         "type": "mismatch",
                         "part": "b",
                         "i": i,
@@ -233,7 +231,7 @@ def solve_viterbi():
                         "target": target_sound,
                         "P": [row[:] if row is not None else None for row in P],
                         "msg": f"標記 '{edge['label']}' 不符合目標 '{target_sound}'。忽略。"
-                    })
+                    }
 
     # Reconstruct path for (b)
     path_b = []
@@ -260,12 +258,14 @@ def solve_viterbi():
     else:
         msg_b = "無路徑"
         
-    steps.append({
+    yield {
         "type": "result_b",
         "part": "b",
         "path": path_b,
         "prob": max_prob,
         "msg": f"Part B 完成。{msg_b}"
-    })
+    }
     
-    return steps
+
+def solve_viterbi():
+    return list(iter_viterbi())
@@ -0,0 +1,70 @@
+# bench_knapsack.py
+# 0/1 背包的效能比較：逐格產生步驟 vs. 逐列 (NumPy 向量化 / 純 Python 備援)
+#   vs. 不建表格的價值索引 DP / Pareto 清單 (另外跑一次容量上百萬的情況)
+# 用法：python bench_knapsack.py [物品數] [容量]
+#   預設 200 個物品、容量 10000；逐格版本每一格都要組訊息，表格大時會很慢
+
+import os
+import random
+import sys
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "CSIE"))
+
+import knapsack_logic as K
+
+
+def timed(name, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"  {name:<30} {time.perf_counter() - start:.3f}s")
+    return result
+
+
+def drain(steps):
+    # Consume a step generator without keeping the steps
+    deque(steps, maxlen=0)
+
+
+def run(n, capacity, seed=0):
+    rng = random.Random(seed)
+    items = [{"w": rng.randint(1, capacity // 10 or 1), "v": rng.randint(1, 1000)} for _ in range(n)]
+    print(f"{n} 個物品，容量 {capacity} (表格 {(n + 1) * (capacity + 1):,} 格)")
+
+    timed("逐格步驟 (delta)", lambda: drain(K.iter_knapsack(capacity, items, encoding="delta")))
+    timed("逐列步驟 (delta)", lambda: drain(K.iter_knapsack(capacity, items, encoding="delta", detail="row")))
+
+    numpy = K.np
+    results = []
+    if numpy is not None:
+        results.append(timed("knapsack_best (NumPy)", lambda: K.knapsack_best(capacity, items)))
+    K.np = None
+    try:
+        results.append(timed("knapsack_best (純 Python)", lambda: K.knapsack_best(capacity, items)))
+    finally:
+        K.np = numpy
+    for engine in ("value", "pareto"):
+        best, _ = timed(f"knapsack_best_sparse ({engine})", lambda: K.knapsack_best_sparse(capacity, items, engine))
+        assert best == results[0][0]
+    best, chosen = results[0]
+    assert all(r == results[0] for r in results)
+    print(f"  最大價值 {best}，選到 {len(chosen)} 個物品")
+
+
+def run_huge(n, capacity, seed=0):
+    # Capacities in the millions: only the engines without a capacity-wide table
+    rng = random.Random(seed)
+    items = [{"w": rng.randint(1, capacity // 10), "v": rng.randint(1, 100)} for _ in range(n)]
+    print(f"{n} 個物品，容量 {capacity:,} (價值 1~100，pick_engine 選 {K.pick_engine(capacity, items)})")
+    best = {timed(f"knapsack_best_sparse ({engine})", lambda: K.knapsack_best_sparse(capacity, items, engine))[0]
+            for engine in ("value", "pareto")}
+    assert len(best) == 1
+    print(f"  最大價值 {best.pop()}")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    capacity = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    run(n, capacity)
+    run_huge(n, 5000000)
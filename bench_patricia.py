@@ -0,0 +1,140 @@
+# bench_patricia.py
+# Patricia 刪除的效能比較：從搜尋路徑取得父節點 (delete_key) vs. 舊的整棵樹 DFS 掃描
+# 以及 /api/patricia/query 整個端點 (含 session 存取) 的耗時，對照單純的查詢函式與整棵樹走訪
+# 用法：python bench_patricia.py [鍵值數] [刪除數] [查詢數]
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "CSIE"))
+
+import patricia_logic as P
+
+
+def find_physical_parent(root, target):
+    # The parent lookup delete_with_steps used before: DFS over the whole trie
+    stack = [root]
+    visited = {id(root)}
+    while stack:
+        curr = stack.pop()
+        for nxt in (curr.left, curr.right):
+            if nxt is target:
+                return curr
+            if nxt.bit > curr.bit and id(nxt) not in visited:
+                visited.add(id(nxt))
+                stack.append(nxt)
+    return None
+
+
+def scan_delete(head, key):
+    """與 delete_key 相同的刪除，但父節點用 find_physical_parent 掃描取得。"""
+    key = P.as_key(key)
+    p = P.pat_search(head, key)
+    if p.key != key:
+        return False
+    if p is not head and (p.left is p or p.right is p):
+        pp = find_physical_parent(head, p)
+        child = p.right if p.left is p else p.left
+        if pp.left is p:
+            pp.left = child
+        else:
+            pp.right = child
+        return True
+    curr = p
+    while True:
+        nxt = curr.left if P.bit_at(p.key, curr.bit) else curr.right
+        if nxt is p:
+            q = curr
+            break
+        curr = nxt
+    r_path = []
+    P.pat_search(head, q.key, path=r_path)
+    r = r_path[-1]
+    p.key = q.key
+    if r.left is q:
+        r.left = p
+    else:
+        r.right = p
+    qp = find_physical_parent(head, q)
+    q_child = q.right if q.left is p else q.left
+    if qp.left is q:
+        qp.left = q_child
+    else:
+        qp.right = q_child
+    return True
+
+
+def build(keys):
+    head = P.Node(None, -1)
+    for k in keys:
+        P.insert_key(head, k)
+    return head
+
+
+def run(n, deletes, bits=32, seed=0):
+    rng = random.Random(seed)
+    keys = set()
+    while len(keys) < n:
+        keys.add(format(rng.getrandbits(bits), "0%db" % bits))
+    keys = sorted(keys)
+    rng.shuffle(keys)
+    victims = keys[:deletes]
+
+    for name, delete in (("path stack", P.delete_key), ("DFS scan", scan_delete)):
+        head = build(keys)
+        start = time.perf_counter()
+        for k in victims:
+            delete(head, k)
+        elapsed = time.perf_counter() - start
+        assert P.count_keys(head) == n - deletes
+        print(f"{name:<10}  n={n}  刪除 {deletes} 個  {elapsed:.3f}s  "
+              f"({elapsed / deletes * 1e6:.1f} us/次)")
+
+
+def run_query(n, queries, bits=32, seed=0):
+    # The session must fit: n keys in the trie plus the bulk_insert version
+    os.environ.setdefault("SESSION_MAX_NODES", str(4 * n))
+    import app
+
+    rng = random.Random(seed)
+    keys = [format(rng.getrandbits(bits), "0%db" % bits) for _ in range(n)]
+    client = app.app.test_client()
+    client.post("/api/patricia/init")
+    client.post("/api/patricia/bulk_insert", json={"keys": keys})
+    sid = client.get_cookie(app.SESSION_COOKIE).value
+    with app.PATRICIA_SESSIONS.session(sid, read_only=True) as state:
+        head = state.value.head
+
+    probes = [(rng.choice(("prefix", "count", "longest")), rng.choice(keys)[:rng.randint(8, bits)])
+              for _ in range(queries)]
+    bare = {"prefix": P.keys_with_prefix, "count": P.count_prefix, "longest": P.longest_prefix_match}
+
+    start = time.perf_counter()
+    expected = [bare[kind](head, key) for kind, key in probes]
+    func_time = (time.perf_counter() - start) / queries
+
+    start = time.perf_counter()
+    for (kind, key), want in zip(probes, expected):
+        got = client.post("/api/patricia/query", json={"type": kind, "key": key}).get_json()["result"]
+        assert got == want, (kind, key)
+    endpoint_time = (time.perf_counter() - start) / queries
+
+    start = time.perf_counter()
+    P.count_keys(head)
+    walk_time = time.perf_counter() - start
+
+    print(f"查詢函式    n={n}  {func_time * 1e6:.1f} us/次")
+    print(f"查詢端點    n={n}  {endpoint_time * 1e6:.1f} us/次  (含 Flask 與 session)")
+    print(f"整棵樹走訪  n={n}  {walk_time * 1e6:.1f} us/次  (count_keys)")
+    # The endpoint must not pay a full walk per request (e.g. reweighing the session)
+    assert endpoint_time < walk_time, "查詢端點比走訪整棵樹還慢"
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    deletes = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    queries = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+    run(n, deletes)
+    run_query(n, queries)
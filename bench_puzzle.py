@@ -0,0 +1,77 @@
+# bench_puzzle.py
+# 8-puzzle / 15-puzzle 的搜尋引擎比較：
+#   爬山法 (錯位方塊數 + 堆疊，最多 100 步) vs. Best-First / A* / IDA*
+#   (盤面壓成一個 int、Manhattan + 線性衝突、A* 用 heap 當 open set)
+# 用法：python bench_puzzle.py [盤面數] [15-puzzle 打亂步數]
+#   預設 50 個隨機 8-puzzle 盤面，15-puzzle 從目標隨機走 60 步
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "CSIE"))
+
+import hill_climbing_logic as HC
+import puzzle_search_logic as P
+
+GOAL_8 = [[1, 2, 3], [8, 0, 4], [7, 6, 5]]
+GOAL_15 = [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10, 11, 12], [13, 14, 15, 0]]
+
+
+def scramble(goal, moves, rng):
+    # Random walk from the goal (never undoing the previous move), so the board is solvable
+    n = len(goal)
+    heur = P.Heuristic(goal, n)
+    code = heur.goal
+    blank = P.blank_of(code, n)
+    prev = -1
+    for _ in range(moves):
+        to = rng.choice([q for q in heur.moves[blank] if q != prev])
+        code = heur.move(code, 0, blank, to, 0, 0)[0]
+        prev, blank = blank, to
+    return P.unpack(code, n)
+
+
+def run_8(count, seed=0):
+    rng = random.Random(seed)
+    boards = [scramble(GOAL_8, rng.randrange(10, 60), rng) for _ in range(count)]
+    print(f"{count} 個隨機 8-puzzle 盤面")
+
+    start = time.perf_counter()
+    solved = sum(HC.solve_8puzzle(b, GOAL_8)[-1]["phase"] == "goal" for b in boards)
+    print(f"  {'爬山法':<28} {time.perf_counter() - start:.3f}s  解出 {solved}/{count}")
+
+    optimal = None
+    for engine in P.ENGINES:
+        start = time.perf_counter()
+        results = [P.solve_puzzle(b, GOAL_8, engine)[-1] for b in boards]
+        elapsed = time.perf_counter() - start
+        moves = [r["moves"] for r in results]
+        expanded = sum(r["expanded"] for r in results)
+        if engine == "astar":
+            optimal = moves
+        elif engine == "idastar":
+            assert moves == optimal
+        print(f"  {engine:<28} {elapsed:.3f}s  平均 {sum(moves) / count:.1f} 步，共展開 {expanded} 個狀態")
+
+
+def run_15(moves, count=3, seed=0):
+    rng = random.Random(seed)
+    print(f"15-puzzle：{count} 個盤面，各從目標隨機走 {moves} 步")
+    for i in range(count):
+        board = scramble(GOAL_15, moves, rng)
+        line = []
+        for engine in P.ENGINES:
+            start = time.perf_counter()
+            last = P.solve_puzzle(board, GOAL_15, engine)[-1]
+            result = f"{last['moves']} 步" if last["phase"] == "solved" else last["phase"]
+            line.append(f"{engine} {result} ({last['expanded']} 個, {time.perf_counter() - start:.2f}s)")
+        print(f"  #{i}: " + "，".join(line))
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    moves = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    run_8(count)
+    run_15(moves)
@@ -0,0 +1,98 @@
+# bench_rbtree.py
+# 紅黑樹節點的記憶體與速度比較：
+#   舊的 Node (一般物件 + Enum 顏色) vs. RBTree (__slots__ + int 顏色) vs. RBArrayTree (平行陣列)
+# 記憶體用 tracemalloc 量，不含 key 本身 (key 事先建好)；速度是隨機插入再全部刪除
+# 用法：python bench_rbtree.py [節點數]
+
+import enum
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "CSIE"))
+
+import rbtree_logic as R
+
+
+# ------------- 舊的節點 (比較用，照抄改寫前的程式) -------------
+
+class Color(enum.Enum):
+    RED = "RED"
+    BLACK = "BLACK"
+
+class OldNode:
+    def __init__(self, key, color=Color.BLACK, left=None, right=None, p=None):
+        self.key = key
+        self.color = color
+        self.left = left
+        self.right = right
+        self.p = p
+        # Unique ID for frontend tracking
+        self.uid = id(self)
+
+
+def measure(build):
+    # Bytes still allocated after build() returns, i.e. what the structure keeps
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def old_nodes(keys):
+    # Chained through left (like a tree would), so no list of nodes is counted
+    x = OldNode(None)
+    for k in keys:
+        x = OldNode(k, Color.RED, x)
+    return x
+
+
+def rb_tree(keys):
+    tree = R.RBTree()
+    for k in keys:
+        tree.insert(k, R.QUIET)
+    return tree
+
+
+def array_tree(keys):
+    tree = R.RBArrayTree()
+    for k in keys:
+        tree.insert(k)
+    return tree
+
+
+def run(n, seed=0):
+    rng = random.Random(seed)
+    keys = rng.sample(range(n * 10), n)
+
+    print(f"每個節點的記憶體 (n={n}，不含 key)")
+    sizes = {name: measure(lambda: build(keys)) / n
+             for name, build in (("舊的 Node", old_nodes), ("RBTree", rb_tree), ("RBArrayTree", array_tree))}
+    base = sizes["舊的 Node"]
+    for name, size in sizes.items():
+        print(f"  {name:<12} {size:6.1f} bytes  (小 {base / size:.1f} 倍)")
+    assert base / sizes["RBArrayTree"] >= 3, "RBArrayTree 每個節點沒有比舊的 Node 小 3 倍"
+
+    print(f"插入 {n} 個再全部刪除")
+    for name, tree, insert, delete in (
+            ("RBTree", R.RBTree(), lambda t, k: t.insert(k, R.QUIET), lambda t, k: t.delete(k, R.QUIET)),
+            ("RBArrayTree", R.RBArrayTree(), lambda t, k: t.insert(k), lambda t, k: t.delete(k))):
+        start = time.perf_counter()
+        for k in keys:
+            insert(tree, k)
+        mid = time.perf_counter()
+        for k in keys:
+            delete(tree, k)
+        end = time.perf_counter()
+        assert len(tree) == 0 and tree.validate() == []
+        print(f"  {name:<12} 插入 {n / (mid - start):10,.0f} ops/sec  刪除 {n / (end - mid):10,.0f} ops/sec")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    run(n)
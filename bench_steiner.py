@@ -0,0 +1,178 @@
+# bench_steiner.py
+# Steiner tree 的效能比較：
+#   最短路徑階段：舊的 dict 鄰接串列 + 每個終端節點各跑一次完整 Dijkstra
+#     vs. CSR 圖 + 可重複使用緩衝區、目標都確定就停止的 Dijkstra (單一 process / process pool)
+#     另外列出 Voronoi 引擎 (Mehlhorn，只跑一次多源 Dijkstra) 整個演算法的時間
+#   重建階段：舊的逐一掃描 (T 的邊去重、到原圖 edges 找權重) vs. edge_key 索引 + 集合
+#   步驟資料量：每步完整快照 (encoding="full") vs. 圖只送一次、邊只送新增的 (encoding="delta")
+# 用法：python bench_steiner.py [格子邊長] [終端節點數] [process 數]
+#   圖是 邊長 x 邊長 的方格路網 (隨機權重)，預設 224 (約 5 萬個節點、10 萬條邊)
+
+import heapq
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "CSIE"))
+
+import steiner_logic as S
+
+
+# ------------- 舊版本 (比較用，照抄改寫前 iter_steiner 的最短路徑部分) -------------
+
+def closure_dict(nodes, edges, terminals):
+    adj = {n['id']: [] for n in nodes}
+    for e in edges:
+        adj[e['u']].append((e['v'], e['w']))
+        adj[e['v']].append((e['u'], e['w']))
+
+    closure_edges = []
+    for i in range(len(terminals)):
+        u = terminals[i]
+        dist = {n['id']: float('inf') for n in nodes}
+        parent = {n['id']: None for n in nodes}
+        dist[u] = 0
+        pq = [(0, u)]
+
+        while pq:
+            d, curr = heapq.heappop(pq)
+            if d > dist[curr]:
+                continue
+
+            for neighbor, weight in adj[curr]:
+                if dist[curr] + weight < dist[neighbor]:
+                    dist[neighbor] = dist[curr] + weight
+                    parent[neighbor] = curr
+                    heapq.heappush(pq, (dist[neighbor], neighbor))
+
+        for j in range(i + 1, len(terminals)):
+            v = terminals[j]
+            if dist[v] != float('inf'):
+                path = []
+                curr = v
+                while curr is not None:
+                    path.append(curr)
+                    curr = parent[curr]
+                path.reverse()
+                closure_edges.append((u, v, dist[v], path))
+    return closure_edges
+
+
+def reconstruct_scan(mst_edges, edges):
+    # T's edges deduplicated by scanning T, weights found by scanning all of edges
+    current_t_nodes = set()
+    current_t_edges = []
+    for mst_e in mst_edges:
+        path = mst_e['path']
+        indices_in_t = [i for i, node in enumerate(path) if node in current_t_nodes]
+        path_edges_to_add = []
+        nodes_to_add = set()
+        if len(indices_in_t) < 2:
+            spans = [(0, len(path) - 1)]
+        else:
+            spans = [(0, indices_in_t[0]), (indices_in_t[-1], len(path) - 1)]
+        for start, stop in spans:
+            for k in range(start, stop):
+                n1, n2 = path[k], path[k+1]
+                path_edges_to_add.append({"u": n1, "v": n2})
+                nodes_to_add.add(n1)
+                nodes_to_add.add(n2)
+        current_t_nodes.update(nodes_to_add)
+        for pe in path_edges_to_add:
+            exists = False
+            for existing in current_t_edges:
+                if (existing['u'] == pe['u'] and existing['v'] == pe['v']) or \
+                   (existing['u'] == pe['v'] and existing['v'] == pe['u']):
+                    exists = True
+                    break
+            if not exists:
+                current_t_edges.append(pe)
+
+    total_weight = 0
+    for te in current_t_edges:
+        for oe in edges:
+            if (oe['u'] == te['u'] and oe['v'] == te['v']) or \
+               (oe['u'] == te['v'] and oe['v'] == te['u']):
+                total_weight += oe['w']
+                break
+    return current_t_edges, total_weight
+
+
+def reconstruct_indexed(graph, mst_edges, edges):
+    t_nodes = set()
+    t_keys = set()
+    t_edges = []
+    for mst_e in mst_edges:
+        S.merge_path(graph, mst_e['path'], t_nodes, t_keys, t_edges)
+    return t_edges, S.tree_weight(graph, edges, t_edges)
+
+
+def closure_csr(nodes, edges, terminals, workers=None):
+    graph = S.CSRGraph(nodes, edges)
+    return list(S.terminal_paths(graph, terminals, workers=workers))
+
+
+# ------------- 計時 -------------
+
+def road_grid(side, rng):
+    nodes = [{"id": f"{r},{c}", "x": c, "y": r} for r in range(side) for c in range(side)]
+    edges = []
+    for r in range(side):
+        for c in range(side):
+            if c + 1 < side:
+                edges.append({"u": f"{r},{c}", "v": f"{r},{c + 1}", "w": rng.randint(1, 100)})
+            if r + 1 < side:
+                edges.append({"u": f"{r},{c}", "v": f"{r + 1},{c}", "w": rng.randint(1, 100)})
+    return nodes, edges
+
+
+def timed(name, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"  {name:<30} {time.perf_counter() - start:.3f}s")
+    return result
+
+
+def run(side, k, workers, seed=0):
+    rng = random.Random(seed)
+    nodes, edges = road_grid(side, rng)
+    terminals = [n["id"] for n in rng.sample(nodes, k)]
+    print(f"方格路網 {side}x{side} ({len(nodes)} 個節點、{len(edges)} 條邊)，{k} 個終端節點")
+
+    expected = timed("dict 鄰接串列 + 完整 Dijkstra", lambda: closure_dict(nodes, edges, terminals))
+    got = timed("CSR + 提早結束", lambda: closure_csr(nodes, edges, terminals))
+    assert got == expected
+    if workers > 1:
+        got = timed(f"CSR + process pool ({workers})", lambda: closure_csr(nodes, edges, terminals, workers))
+        assert got == expected
+    timed("Voronoi 引擎 (整個演算法)", lambda: S.solve_steiner(nodes, edges, terminals, engine="voronoi"))
+
+    steps = S.solve_steiner(nodes, edges, terminals)
+    mst_edges = next(step["mst_edges"] for step in steps if step["phase"] == "mst_done")
+    print(f"重建階段 (T 有 {len(steps[-1]['final_tree_edges'])} 條邊)")
+    expected = timed("逐一掃描", lambda: reconstruct_scan(mst_edges, edges))
+    graph = S.CSRGraph(nodes, edges)
+    got = timed("edge_key 索引 + 集合", lambda: reconstruct_indexed(graph, mst_edges, edges))
+    assert got == expected
+
+
+def run_payload(side, k, seed=0):
+    # JSON size of the step stream the page downloads
+    rng = random.Random(seed)
+    nodes, edges = road_grid(side, rng)
+    terminals = [n["id"] for n in rng.sample(nodes, k)]
+    print(f"步驟資料量 (方格路網 {side}x{side}，{k} 個終端節點)")
+    for encoding in ("full", "delta"):
+        start = time.perf_counter()
+        size = len(json.dumps(S.solve_steiner(nodes, edges, terminals, encoding=encoding)))
+        print(f"  encoding={encoding:<21} {time.perf_counter() - start:.3f}s  {size / 1e6:.2f} MB")
+
+
+if __name__ == "__main__":
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 224
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else (os.cpu_count() or 1)
+    run(side, k, workers)
+    run_payload(40, k)
@@ -0,0 +1,249 @@
+# bench_traversal.py
+# 快照走訪的效能比較：明確堆疊 (目前的 export_tree / get_draw_data) vs. 舊的遞迴版本
+# 用法：python bench_traversal.py [節點數] [深樹的深度]
+#   節點數：紅黑樹與 Patricia (隨機 32 位元鍵值) 的大小，預設 10^6
+#   深樹：一串共用前綴的長鍵值，Patricia 的深度 = 鍵值數，遞迴版本會超過遞迴上限
+
+import os
+import pickle
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "CSIE"))
+
+import patricia_logic as P
+import rbtree_logic as R
+
+
+# ------------- 舊的遞迴版本 (比較用，照抄改寫前的程式) -------------
+
+def rb_export_recursive(tree, highlight_node=None):
+    if tree.root == tree.nil:
+        return {"root_id": None, "nodes": [], "edges": []}
+    
+    nodes = []
+    edges = []
+    
+    # BFS or DFS to traverse
+    # We need to calculate positions. Simple layout:
+    # Inorder traversal for X, Depth for Y.
+    
+    pos = {}
+    x_counter = [0]
+    
+    def inorder(u, depth):
+        if u == tree.nil:
+            return
+        inorder(u.left, depth + 1)
+        
+        # Assign pos
+        # Shift Y down by 100px to make room for canvas_msg at the top
+        pos[u.uid] = {"x": x_counter[0] * 50 + 50, "y": depth * 60 + 150}
+        x_counter[0] += 1
+        
+        inorder(u.right, depth + 1)
+        
+    inorder(tree.root, 0)
+    
+    # Generate nodes and edges list
+    stack = [tree.root]
+    visited = {tree.root.uid}
+    
+    while stack:
+        u = stack.pop()
+        p = pos[u.uid]
+        
+        nodes.append({
+            "id": str(u.uid),
+            "key": str(u.key),
+            "color": R.COLOR_NAMES[u.color],
+            "x": p["x"],
+            "y": p["y"],
+            "is_highlight": (u == highlight_node),
+            "left": None if u.left == tree.nil else str(u.left.uid),
+            "right": None if u.right == tree.nil else str(u.right.uid)
+        })
+        
+        if u.left != tree.nil:
+            edges.append({"u": str(u.uid), "v": str(u.left.uid)})
+            stack.append(u.left)
+            
+        if u.right != tree.nil:
+            edges.append({"u": str(u.uid), "v": str(u.right.uid)})
+            stack.append(u.right)
+            
+    return {"root_id": str(tree.root.uid) if tree.root != tree.nil else None, "nodes": nodes, "edges": edges}
+
+
+def pat_export_recursive(head, highlight_node=None):
+    """輸出可視樹（只含真子樹）＋每個節點的兩個指標終點，用來畫執行緒弧線。"""
+    if head.key is None:
+        return {"head_has_root": False}
+
+    root = head 
+    
+    id_of = {}
+    rev = {}
+    counter = [0]
+
+    def gid(x):
+        if x in id_of: return id_of[x]
+        i = counter[0]; counter[0] += 1
+        id_of[x] = i; rev[i] = x
+        return i
+
+    def touch(x):
+        gid(x)
+        # Left
+        if x.left and x.left.bit > x.bit:
+            touch(x.left)
+        # Right
+        if x.right and x.right.bit > x.bit:
+            touch(x.right)
+            
+    touch(root)
+
+    def pack(x):
+        d = {"id": gid(x), "key": str(x.key), "bit": x.bit,
+             "ptrL": gid(x.left) if x.left else None, 
+             "ptrR": gid(x.right) if x.right else None,
+             "left": None, "right": None}
+        
+        if x.left and x.left.bit > x.bit:
+            d["left"] = pack(x.left)
+        if x.right and x.right.bit > x.bit:
+            d["right"] = pack(x.right)
+        return d
+
+    hl_id = id_of.get(highlight_node) if highlight_node else None
+
+    return {
+        "head_has_root": True, 
+        "root_id": gid(root), 
+        "nodes": rev, 
+        "tree": pack(root),
+        "highlight_id": hl_id
+    }
+
+def pat_layout_recursive(snap):
+    if not snap["head_has_root"]:
+        return {}, None
+    pos = {}
+    xcur = P.MARGIN_X
+
+    def inorder(n, depth):
+        nonlocal xcur
+        if n["left"]:
+            inorder(n["left"], depth + 1)
+        
+        # Visit
+        pos[n["id"]] = (xcur, P.MARGIN_Y + depth * P.LEVEL_GAP)
+        xcur += P.BASE_HGAP
+        
+        if n["right"]:
+            inorder(n["right"], depth + 1)
+
+    inorder(snap["tree"], 0)
+    return pos, snap["root_id"]
+
+def pat_draw_recursive(snap):
+    if not snap["head_has_root"]:
+        return {"nodes": [], "edges": [], "root_id": None}
+        
+    pos, root_id = pat_layout_recursive(snap)
+    nodes_map = snap["nodes"] # id -> Node object
+    
+    # Build Nodes List
+    nodes_list = []
+    hl_id = snap["highlight_id"]
+    
+    for nid, (x, y) in pos.items():
+        node_obj = nodes_map[nid]
+        nodes_list.append({
+            "id": nid,
+            "x": x,
+            "y": y,
+            "key": str(node_obj.key),
+            "bit": node_obj.bit,
+            "is_highlight": (nid == hl_id)
+        })
+        
+    # Build Edges
+    edges_list = []
+    
+    def traverse_edges(n_struct):
+        nid = n_struct["id"]
+        
+        # Left
+        lid = n_struct["ptrL"]
+        if lid is not None:
+            is_thread = True
+            if n_struct["left"]: is_thread = False # It's a real child
+            edges_list.append({
+                "u": nid, "v": lid, "type": "L", "is_thread": is_thread
+            })
+            if not is_thread: traverse_edges(n_struct["left"])
+            
+        # Right
+        rid = n_struct["ptrR"]
+        if rid is not None:
+            is_thread = True
+            if n_struct["right"]: is_thread = False
+            edges_list.append({
+                "u": nid, "v": rid, "type": "R", "is_thread": is_thread
+            })
+            if not is_thread: traverse_edges(n_struct["right"])
+
+    traverse_edges(snap["tree"])
+    
+    return {
+        "nodes": nodes_list,
+        "edges": edges_list,
+        "root_id": root_id,
+        "highlight_id": hl_id
+    }
+
+
+# ------------- 計時 -------------
+
+def timed(name, fn):
+    start = time.perf_counter()
+    try:
+        fn()
+    except RecursionError:
+        print(f"  {name:<28} RecursionError")
+        return
+    print(f"  {name:<28} {time.perf_counter() - start:.3f}s")
+
+
+def run(n, depth, seed=0):
+    rng = random.Random(seed)
+
+    print(f"紅黑樹 (bulk_load {n} 個鍵值)")
+    tree = R.RBTree()
+    tree.bulk_load(range(n))
+    timed("遞迴 export_tree", lambda: rb_export_recursive(tree))
+    timed("export_tree", lambda: R.export_tree(tree))
+
+    print(f"Patricia (隨機 32 位元鍵值 {n} 個)")
+    head = P.Node(None, -1)
+    for _ in range(n):
+        P.insert_key(head, format(rng.getrandbits(32), "032b"))
+    timed("遞迴 export_tree + get_draw_data", lambda: pat_draw_recursive(pat_export_recursive(head)))
+    timed("export_tree + get_draw_data", lambda: P.get_draw_data(P.export_tree(head)))
+
+    print(f"Patricia (共用前綴的長鍵值，深度 {depth})")
+    deep = P.PatriciaTree()
+    for i in range(depth):
+        P.insert_key(deep.head, "0" * i + "1" + "0" * (depth - 1 - i))
+    timed("遞迴 export_tree + get_draw_data", lambda: pat_draw_recursive(pat_export_recursive(deep.head)))
+    timed("export_tree + get_draw_data", lambda: P.get_draw_data(P.export_tree(deep.head)))
+    timed("p_from_mutable", lambda: P.p_from_mutable(deep.head))
+    timed("pickle (session 存檔)", lambda: pickle.loads(pickle.dumps(deep)))
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    run(n, depth)
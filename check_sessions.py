@@ -0,0 +1,206 @@
+# check_sessions.py
+# session_store.SessionStore 的回歸檢查：LRU (max_sessions)、TTL、總節點數 (max_weight)
+# 的淘汰，state_dir 的檔案清理 (只讀取的 session 不會過期、使用中的不會被刪、
+# 刪掉 .lock 後等待中的 worker 會改鎖新檔)，以及 /api/patricia/bulk_insert
+# 與 /api/rbtree/bulk 不會接受大到讓自己被淘汰的載入。
+# 用法：python check_sessions.py
+# 發現錯誤時印出原因並以 exit code 1 結束。
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "CSIE"))
+
+import session_store as S
+
+
+class CheckFailure(Exception):
+    pass
+
+
+def use(store, sid, items=(), read_only=False):
+    with store.session(sid, read_only=read_only) as slot:
+        slot.value.extend(items)
+        return list(slot.value)
+
+
+def age(path, seconds):
+    t = time.time() - seconds
+    os.utime(path, (t, t))
+
+
+def check_lru():
+    store = S.SessionStore(list, weigher=len, max_sessions=3)
+    sids = [S.new_sid() for _ in range(4)]
+    for sid in sids[:3]:
+        use(store, sid, [sid])
+    use(store, sids[0], read_only=True)  # sids[1] is now the least recently used
+    use(store, sids[3], [sids[3]])
+    if len(store) != 3 or sids[1] in store._slots:
+        raise CheckFailure("[LRU] 超過 max_sessions 時應淘汰最久沒用的 session")
+    if use(store, sids[0], read_only=True) != [sids[0]]:
+        raise CheckFailure("[LRU] 最近用過的 session 不應被淘汰")
+    if store.total_weight != 3:
+        raise CheckFailure(f"[LRU] total_weight 應為 3，實際 {store.total_weight}")
+
+
+def check_ttl():
+    store = S.SessionStore(list, weigher=len, ttl=60)
+    old, new = S.new_sid(), S.new_sid()
+    use(store, old, [1, 2])
+    store._slots[old].last_used -= 120
+    use(store, new, [1])
+    if old in store._slots or store.total_weight != 1:
+        raise CheckFailure("[TTL] 超過 ttl 沒用的 session 應被淘汰")
+    if use(store, old, read_only=True) != []:
+        raise CheckFailure("[TTL] 淘汰後再用應拿到新的狀態")
+
+    # A slot already handed out but not yet locked must not expire under the caller
+    slot = store._get_slot(new)
+    slot.last_used -= 120
+    store._evict()
+    slot.pins -= 1
+    if new not in store._slots:
+        raise CheckFailure("[TTL] 已經交給請求 (還沒上鎖) 的 session 不應被淘汰")
+
+
+def check_weight():
+    store = S.SessionStore(list, weigher=len, max_weight=10)
+    a, b, c = S.new_sid(), S.new_sid(), S.new_sid()
+    use(store, a, range(4))
+    use(store, b, range(4))
+    use(store, c, range(4))
+    if a in store._slots or store.total_weight != 8:
+        raise CheckFailure("[weight] 總節點數超過 max_weight 時應從最久沒用的淘汰")
+
+    # A session in use is never evicted, even when it is the oldest
+    done = threading.Event()
+    held = threading.Event()
+
+    def hold():
+        with store.session(b):
+            held.set()
+            done.wait()
+    t = threading.Thread(target=hold)
+    t.start()
+    held.wait()
+    use(store, c, range(4))
+    if b not in store._slots or c in store._slots:
+        raise CheckFailure("[weight] 使用中的 session 不應被淘汰")
+    done.set()
+    t.join()
+
+    # A single session over the limit evicts itself once released
+    use(store, a, range(11))
+    if a in store._slots:
+        raise CheckFailure("[weight] 單一 session 超過 max_weight 時應被淘汰")
+
+
+def check_files():
+    with tempfile.TemporaryDirectory() as d:
+        store = S.SessionStore(list, weigher=len, ttl=60, state_dir=d)
+        reader, idle, busy = S.new_sid(), S.new_sid(), S.new_sid()
+        for sid in (reader, idle, busy):
+            use(store, sid, [sid])
+            for ext in (".pkl", ".lock"):
+                age(os.path.join(d, sid + ext), 120)
+
+        # Only read since the last save: still in use, must survive
+        use(store, reader, read_only=True)
+        other = S.SessionStore(list, weigher=len, ttl=60, state_dir=d)
+        with other.session(busy, read_only=True):
+            for ext in (".pkl", ".lock"):
+                age(os.path.join(d, busy + ext), 120)
+            store._evict_files()
+            if not os.path.exists(os.path.join(d, busy + ".pkl")):
+                raise CheckFailure("[files] 持有鎖的 session 不應被刪除")
+        names = set(os.listdir(d))
+        if idle + ".pkl" in names or idle + ".lock" in names:
+            raise CheckFailure("[files] 超過 ttl 沒用的 session 檔案應被刪除")
+        if reader + ".pkl" not in names:
+            raise CheckFailure("[files] 只讀取的 session 不應過期")
+        if use(other, reader, read_only=True) != [reader]:
+            raise CheckFailure("[files] 其他 worker 應讀到同一份狀態")
+
+        # A worker waiting on a .lock that gets removed must lock the new file
+        if S.fcntl is not None:
+            sid = S.new_sid()
+            path = os.path.join(d, sid + ".lock")
+            first = store._open_lock(sid, S.fcntl.LOCK_EX)
+            got = []
+
+            def wait():
+                f = other._open_lock(sid, S.fcntl.LOCK_EX)
+                got.append(os.fstat(f.fileno()).st_ino)
+                f.close()
+            t = threading.Thread(target=wait)
+            t.start()
+            time.sleep(0.1)
+            os.remove(path)
+            first.close()
+            t.join()
+            if not os.path.exists(path) or got != [os.stat(path).st_ino]:
+                raise CheckFailure("[files] .lock 被刪掉後等待的 worker 應改鎖新的檔案")
+
+
+def check_patricia_bulk():
+    import app
+    client = app.app.test_client()
+    client.post("/api/patricia/init")
+    limit = app.PATRICIA_BULK_MAX
+    keys = [format(i, "020b") for i in range(limit)]
+    r = client.post("/api/patricia/bulk_insert", json={"keys": keys + ["1" * 21]})
+    if r.status_code != 400:
+        raise CheckFailure(f"[bulk_insert] 超過 PATRICIA_BULK_MAX ({limit}) 應回傳 400")
+    r = client.post("/api/patricia/bulk_insert", json={"keys": keys})
+    if r.status_code != 200 or r.get_json()["stats"]["inserted"] != limit:
+        raise CheckFailure(f"[bulk_insert] {limit} 個鍵值應能插入")
+    count = client.post("/api/patricia/query", json={"type": "count", "key": ""}).get_json()["result"]
+    if count != limit:
+        raise CheckFailure(f"[bulk_insert] 插入後查詢應有 {limit} 個鍵值，實際 {count} (session 被淘汰)")
+    r = client.post("/api/patricia/bulk_insert", json={"keys": ["1" * 21]})
+    if r.status_code != 400:
+        raise CheckFailure("[bulk_insert] 會讓 session 超過 max_weight 的載入應回傳 400")
+    count = client.post("/api/patricia/query", json={"type": "count", "key": ""}).get_json()["result"]
+    if count != limit:
+        raise CheckFailure("[bulk_insert] 被拒絕的載入不應改動樹")
+
+
+def check_rbtree_bulk():
+    import app
+    client = app.app.test_client()
+    client.post("/api/rbtree/init")
+    limit = app.RB_SESSIONS.max_weight
+    r = client.post("/api/rbtree/bulk/load", json={"keys": list(range(limit))})
+    if r.status_code != 200 or r.get_json()["stats"]["size"] != limit:
+        raise CheckFailure(f"[rbtree bulk] {limit} 個鍵值應能載入")
+    r = client.post("/api/rbtree/bulk/union", json={"keys": [limit]})
+    if r.status_code != 400:
+        raise CheckFailure("[rbtree bulk] 會讓 session 超過 max_weight 的 union 應回傳 400")
+    rank = client.post("/api/rbtree/rank", json={"key": limit - 1}).get_json()["rank"]
+    if rank != limit:
+        raise CheckFailure(f"[rbtree bulk] 被拒絕的 union 之後 rank 應為 {limit}，實際 {rank} (session 被淘汰)")
+
+
+def run():
+    ok = True
+    for name, check in (("SessionStore  LRU", check_lru),
+                        ("SessionStore  TTL", check_ttl),
+                        ("SessionStore  max_weight", check_weight),
+                        ("SessionStore  state_dir 檔案", check_files),
+                        ("Patricia      bulk_insert 上限", check_patricia_bulk),
+                        ("RBTree        bulk load / union 上限", check_rbtree_bulk)):
+        try:
+            check()
+            print(f"{name}  OK")
+        except CheckFailure as e:
+            print(e)
+            ok = False
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run() else 1)
@@ -0,0 +1,180 @@
+# check_step_stream.py
+# step_stream.StepPager 與 app.steps_response 的回歸檢查：分頁 (往後續跑、往回翻、
+# 被 LRU 淘汰後重播、跳頁) 拼起來要和一次跑完 list(factory()) 相同，
+# NDJSON 串流的第一行是 meta (有 extra 欄位時)，後面每行一個步驟。
+# 用法：python check_step_stream.py
+# 發現錯誤時印出原因並以 exit code 1 結束。
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "CSIE"))
+
+import step_stream
+
+
+class CheckFailure(Exception):
+    pass
+
+
+def counted(n):
+    # factory() for n steps, counting how many times the solver was started
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return ({"i": i, "msg": f"step {i}"} for i in range(n))
+    return factory, calls
+
+
+def read_pages(pager, key, factory, limit, cursor=0):
+    steps = []
+    while cursor is not None:
+        page, cursor = pager.page(key, factory, cursor, limit)
+        steps.extend(page)
+    return steps
+
+
+def check_pager():
+    n = 103
+    expected = list(counted(n)[0]())
+
+    # Forward: every page resumes the same generator
+    pager = step_stream.StepPager()
+    factory, calls = counted(n)
+    if read_pages(pager, "k", factory, 10) != expected:
+        raise CheckFailure("[StepPager] 往後分頁拼起來和 list(factory()) 不同")
+    if len(calls) != 1:
+        raise CheckFailure(f"[StepPager] 往後分頁應只跑一次 solver，實際 {len(calls)} 次")
+
+    # Backward: a cursor before the saved position replays from the start
+    factory, calls = counted(n)
+    pager.page("b", factory, 0, 50)
+    page, next_cursor = pager.page("b", factory, 20, 10)
+    if page != expected[20:30] or next_cursor != 30 or len(calls) != 2:
+        raise CheckFailure("[StepPager] 往回翻頁的結果不對")
+
+    # Skipping ahead and reading past the end
+    page, next_cursor = pager.page("b", factory, 95, 50)
+    if page != expected[95:] or next_cursor is not None:
+        raise CheckFailure("[StepPager] 跳頁到最後一頁的結果不對")
+    page, next_cursor = pager.page("b", factory, n + 10, 5)
+    if page != [] or next_cursor is not None:
+        raise CheckFailure("[StepPager] cursor 超過結尾應回傳空頁")
+
+    # Evicted: with room for one run, interleaved keys keep replaying
+    pager = step_stream.StepPager(max_runs=1)
+    factories = {key: counted(n) for key in "xy"}
+    cursors = {key: 0 for key in "xy"}
+    pages = {key: [] for key in "xy"}
+    while any(c is not None for c in cursors.values()):
+        for key in "xy":
+            if cursors[key] is not None:
+                page, cursors[key] = pager.page(key, factories[key][0], cursors[key], 7)
+                pages[key].extend(page)
+    for key in "xy":
+        if pages[key] != expected:
+            raise CheckFailure(f"[StepPager] 被淘汰後重播 ({key}) 拼起來和 list(factory()) 不同")
+        if len(factories[key][1]) < 2:
+            raise CheckFailure(f"[StepPager] max_runs=1 時 {key} 應該被淘汰過")
+
+    # limit is clamped to 1..MAX_PAGE_SIZE
+    page, _ = step_stream.StepPager().page("c", counted(n)[0], 0, 0)
+    if len(page) != 1:
+        raise CheckFailure("[StepPager] limit=0 應視為 1")
+
+
+def check_ndjson_lines():
+    steps = [{"i": i} for i in range(3)]
+    lines = list(step_stream.ndjson_lines(iter(steps), {"n": 3}))
+    if json.loads(lines[0]) != {"meta": {"n": 3}} or [json.loads(l) for l in lines[1:]] != steps:
+        raise CheckFailure("[ndjson_lines] 第一行應是 meta，後面每行一個步驟")
+    if not all(l.endswith("\n") and l.count("\n") == 1 for l in lines):
+        raise CheckFailure("[ndjson_lines] 每個步驟應剛好一行")
+    lines = list(step_stream.ndjson_lines(iter(steps)))
+    if [json.loads(l) for l in lines] != steps:
+        raise CheckFailure("[ndjson_lines] 沒有 meta 時不應多出第一行")
+
+
+def page_route(client, method, url, body=None, limit=4):
+    # Reads every page of url; returns (steps, first page response)
+    steps = []
+    cursor = 0
+    first = None
+    sep = "&" if "?" in url else "?"
+    while cursor is not None:
+        r = client.open(f"{url}{sep}cursor={cursor}&limit={limit}", method=method, json=body)
+        data = r.get_json()
+        if first is None:
+            first = data
+            if "seed" in data:
+                url = f"{url}{sep}seed={data['seed']}"
+                sep = "&"
+        if data["cursor"] != cursor:
+            raise CheckFailure(f"[steps_response] {url} 回傳的 cursor 應為 {cursor}")
+        steps.extend(data["steps"])
+        cursor = data["next_cursor"]
+    return steps, first
+
+
+def check_steps_response():
+    import app
+    client = app.app.test_client()
+
+    # Plain list route
+    body = {"p": [0.15, 0.10, 0.05, 0.10, 0.20], "q": [0.05, 0.10, 0.05, 0.05, 0.05, 0.10]}
+    full = client.post("/api/obst", json=body).get_json()
+    paged, first = page_route(client, "POST", "/api/obst", body)
+    if paged != full["steps"]:
+        raise CheckFailure("[steps_response] /api/obst 分頁拼起來和整個 list 不同")
+    if {k: first[k] for k in ("n", "p", "q")} != {k: full[k] for k in ("n", "p", "q")}:
+        raise CheckFailure("[steps_response] /api/obst 分頁回應應帶 n / p / q")
+
+    # NDJSON: meta first when the route has extra fields
+    r = client.post("/api/obst", json=body, headers={"Accept": step_stream.NDJSON_MIMETYPE})
+    if r.mimetype != step_stream.NDJSON_MIMETYPE:
+        raise CheckFailure(f"[steps_response] 要求 NDJSON 卻回傳 {r.mimetype}")
+    lines = [json.loads(l) for l in r.get_data(as_text=True).splitlines()]
+    if lines[0] != {"meta": {k: full[k] for k in ("n", "p", "q")}} or lines[1:] != full["steps"]:
+        raise CheckFailure("[steps_response] /api/obst 的 NDJSON 應是 meta 一行 + 每行一個步驟")
+    body = {"capacity": 6, "items": [{"w": 2, "v": 3}, {"w": 3, "v": 4}, {"w": 4, "v": 5}]}
+    full = client.post("/api/knapsack/run", json=body).get_json()
+    r = client.post("/api/knapsack/run", json=body, headers={"Accept": step_stream.NDJSON_MIMETYPE})
+    if [json.loads(l) for l in r.get_data(as_text=True).splitlines()] != full:
+        raise CheckFailure("[steps_response] /api/knapsack/run 的 NDJSON 不應有 meta 行")
+    paged, _ = page_route(client, "POST", "/api/knapsack/run", body, limit=5)
+    if paged != full:
+        raise CheckFailure("[steps_response] /api/knapsack/run 分頁拼起來和整個 list 不同")
+    # Bad items are rejected before a stream starts, for 0/1 runs too
+    r = client.post("/api/knapsack/run", json={"capacity": 6, "items": [{"w": "x", "v": 1}]},
+                    headers={"Accept": step_stream.NDJSON_MIMETYPE})
+    if r.status_code != 400 or "error" not in r.get_json():
+        raise CheckFailure(f"[steps_response] 物品格式錯誤的 NDJSON 請求應回傳 400，實際 {r.status_code}")
+    # The default Accept (*/*) still gets plain JSON
+    if client.post("/api/knapsack/run", json=body, headers={"Accept": "*/*"}).get_json() != full:
+        raise CheckFailure("[steps_response] Accept: */* 應回傳一般 JSON")
+
+    # Random problems: later pages replay the seed the first page chose
+    paged, first = page_route(client, "GET", "/api/lis_proof", limit=3)
+    full = client.get(f"/api/lis_proof?seed={first['seed']}").get_json()
+    if paged != full:
+        raise CheckFailure("[steps_response] /api/lis_proof 帶 seed 分頁拼起來和整個 list 不同")
+
+
+def run():
+    ok = True
+    for name, check in (("StepPager     分頁 / 重播", check_pager),
+                        ("ndjson_lines  meta 行", check_ndjson_lines),
+                        ("steps_response 分頁 / NDJSON", check_steps_response)):
+        try:
+            check()
+            print(f"{name}  OK")
+        except CheckFailure as e:
+            print(e)
+            ok = False
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run() else 1)
@@ -0,0 +1,224 @@
+# fuzz_trees.py
+# 紅黑樹 (RBTree / RBArrayTree) / Patricia 的隨機測試 + 效能量測：大量隨機插入 / 刪除 (不產生快照)，
+# 每隔一段操作用 validate() 檢查結構，並與 set / 排序串列的標準答案比對，最後印出 ops/sec。
+# 用法：python fuzz_trees.py [操作數] [每幾次檢查一次] [亂數種子] [鍵值範圍]
+#   操作數預設 1000000；鍵值範圍決定樹的大小 (約為一半)，預設 100000
+# 發現錯誤時印出種子與操作編號並以 exit code 1 結束，方便重現。
+
+import bisect
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "CSIE"))
+
+import patricia_logic as P
+import rbtree_logic as R
+
+
+class FuzzFailure(Exception):
+    pass
+
+
+def fail(name, seed, i, op, key, detail):
+    raise FuzzFailure(f"[{name}] seed={seed} 第 {i} 次操作 {op} {key}：{detail}")
+
+
+def fuzz_rbtree(ops, check_every, seed, key_range):
+    rng = random.Random(seed)
+    tree = R.RBTree()
+    oracle = []  # sorted list of the keys that should be in the tree
+    check_time = 0.0
+    start = time.perf_counter()
+    for i in range(1, ops + 1):
+        key = rng.randrange(key_range)
+        pos = bisect.bisect_left(oracle, key)
+        present = pos < len(oracle) and oracle[pos] == key
+        if rng.random() < 0.5:
+            op = "insert"
+            tree.insert(key, R.QUIET)
+            if not present:
+                oracle.insert(pos, key)
+        else:
+            op = "delete"
+            tree.delete(key, R.QUIET)
+            if present:
+                del oracle[pos]
+        if len(tree) != len(oracle):
+            fail("RBTree", seed, i, op, key, f"size {len(tree)}，應為 {len(oracle)}")
+
+        if i % check_every == 0 or i == ops:
+            t0 = time.perf_counter()
+            errors = tree.validate()
+            if errors:
+                fail("RBTree", seed, i, op, key, "; ".join(errors[:5]))
+            if tree.keys() != oracle:
+                fail("RBTree", seed, i, op, key, "中序鍵值與標準答案不同")
+            check_time += time.perf_counter() - t0
+    return time.perf_counter() - start - check_time, check_time, len(oracle)
+
+
+def fuzz_rbarray(ops, check_every, seed, key_range):
+    # Same oracle as fuzz_rbtree, plus the return values, find and __contains__
+    rng = random.Random(seed)
+    tree = R.RBArrayTree()
+    oracle = []
+    check_time = 0.0
+    start = time.perf_counter()
+    for i in range(1, ops + 1):
+        key = rng.randrange(key_range)
+        pos = bisect.bisect_left(oracle, key)
+        present = pos < len(oracle) and oracle[pos] == key
+        if rng.random() < 0.5:
+            op = "insert"
+            if tree.insert(key) == present:
+                fail("RBArray", seed, i, op, key, f"回傳值應為 {not present}")
+            if not present:
+                oracle.insert(pos, key)
+        else:
+            op = "delete"
+            if tree.delete(key) != present:
+                fail("RBArray", seed, i, op, key, f"回傳值應為 {present}")
+            if present:
+                del oracle[pos]
+        probe = rng.randrange(key_range)
+        x = tree.find(probe)
+        j = bisect.bisect_left(oracle, probe)
+        expected = j < len(oracle) and oracle[j] == probe
+        if (probe in tree) != expected or bool(x) != expected or (x and tree.key[x] != probe):
+            fail("RBArray", seed, i, op, key, f"find / in {probe} 與標準答案不同")
+        if len(tree) != len(oracle):
+            fail("RBArray", seed, i, op, key, f"size {len(tree)}，應為 {len(oracle)}")
+
+        if i % check_every == 0 or i == ops:
+            t0 = time.perf_counter()
+            errors = tree.validate()
+            if errors:
+                fail("RBArray", seed, i, op, key, "; ".join(errors[:5]))
+            if list(tree.keys()) != oracle:
+                fail("RBArray", seed, i, op, key, "中序鍵值與標準答案不同")
+            check_time += time.perf_counter() - t0
+    return time.perf_counter() - start - check_time, check_time, len(oracle)
+
+
+def check_rbtree_key_types():
+    # Regression: bulk operations with keys of another type used to detach
+    # subtrees in split_at before the comparison raised, corrupting the tree
+    tree = R.RBTree()
+    tree.bulk_load(range(1, 40))
+    cases = (("bulk_load", lambda: tree.bulk_load(["x"])),
+             ("bulk_delete", lambda: tree.bulk_delete(["x"])),
+             ("split", lambda: tree.split("x")))
+    for op, call in cases:
+        try:
+            call()
+        except TypeError:
+            pass
+        else:
+            raise FuzzFailure(f"[RBTree] {op} ['x']：應丟出 TypeError")
+        errors = tree.validate()
+        if errors or tree.keys() != list(range(1, 40)):
+            raise FuzzFailure(f"[RBTree] {op} ['x'] 之後樹被改動：{'; '.join(errors[:5])}")
+
+
+def check_patricia_queries(seed, rounds=300):
+    # Brute-force check of the prefix queries on keys nested in one another
+    # ("1", "10", "100" ...), which used to collide under zero-padded bit tests
+    rng = random.Random(seed)
+    for r in range(rounds):
+        pool = set()
+        for _ in range(rng.randrange(1, 30)):
+            base = format(rng.randrange(16), "04b")[:rng.randrange(1, 5)]
+            pool.update((base, base + "0" * rng.randrange(4), base + format(rng.randrange(8), "b")))
+        pool = sorted(pool)
+        head = P.Node(None, -1)
+        oracle = set()
+        for _ in range(rng.randrange(1, 60)):
+            key = rng.choice(pool)
+            if rng.random() < 0.65:
+                _, head = P.insert_with_steps(head, key, P.QUIET)
+                oracle.add(key)
+            else:
+                _, head = P.delete_with_steps(head, key, P.QUIET)
+                oracle.discard(key)
+        errors = P.validate(head)
+        if errors:
+            raise FuzzFailure(f"[Patricia] seed={seed} 第 {r} 組巢狀鍵值：{'; '.join(errors[:5])}")
+        if head.key is None:
+            continue
+        for q in pool + ["0", "1", "0000000000"]:
+            longest = max((k for k in oracle if q.startswith(k)), key=len, default=None)
+            if P.longest_prefix_match(head, q) != longest:
+                raise FuzzFailure(f"[Patricia] seed={seed} 第 {r} 組 longest_prefix_match {q}：應為 {longest}")
+            matches = sorted(k for k in oracle if k.startswith(q))
+            if P.keys_with_prefix(head, q) != matches or P.count_prefix(head, q) != len(matches):
+                raise FuzzFailure(f"[Patricia] seed={seed} 第 {r} 組 keys_with_prefix {q}：應為 {matches}")
+
+
+def fuzz_patricia(ops, check_every, seed, key_range):
+    # Variable-length keys, so some are prefixes of others (e.g. "10" and "1000")
+    rng = random.Random(seed)
+    bits = max(1, (key_range - 1).bit_length())
+    head = P.Node(None, -1)
+    oracle = {}
+    check_time = 0.0
+    start = time.perf_counter()
+    for i in range(1, ops + 1):
+        key = format(rng.randrange(key_range), "0%db" % bits)[:rng.randint(1, bits)]
+        if rng.random() < 0.5:
+            op = "insert"
+            _, head = P.insert_with_steps(head, key, P.QUIET)
+            oracle[key] = True
+        else:
+            op = "delete"
+            _, head = P.delete_with_steps(head, key, P.QUIET)
+            oracle.pop(key, None)
+        found = head.key is not None and P.pat_search(head, P.as_key(key)).key == P.as_key(key)
+        if found != (key in oracle):
+            fail("Patricia", seed, i, op, key, "搜尋結果與標準答案不同")
+
+        if i % check_every == 0 or i == ops:
+            t0 = time.perf_counter()
+            errors = P.validate(head)
+            if errors:
+                fail("Patricia", seed, i, op, key, "; ".join(errors[:5]))
+            keys = [] if head.key is None else P.keys_with_prefix(head, "")
+            if keys != sorted(oracle):
+                fail("Patricia", seed, i, op, key, "鍵值集合與標準答案不同")
+            check_time += time.perf_counter() - t0
+    return time.perf_counter() - start - check_time, check_time, len(oracle)
+
+
+def run(ops, check_every, seed, key_range):
+    ok = True
+    try:
+        check_rbtree_key_types()
+        print("RBTree    鍵值型別不同的批次操作  OK")
+    except FuzzFailure as e:
+        print(e)
+        ok = False
+    try:
+        check_patricia_queries(seed)
+        print("Patricia  巢狀前綴鍵值的查詢      OK")
+    except FuzzFailure as e:
+        print(e)
+        ok = False
+    for name, fuzz in (("RBTree", fuzz_rbtree), ("RBArray", fuzz_rbarray), ("Patricia", fuzz_patricia)):
+        try:
+            elapsed, check_time, size = fuzz(ops, check_every, seed, key_range)
+        except FuzzFailure as e:
+            print(e)
+            ok = False
+            continue
+        print(f"{name:<9} {ops} 次操作  {ops / elapsed:,.0f} ops/sec  "
+              f"(操作 {elapsed:.2f}s，檢查 {check_time:.2f}s，最後 {size} 個鍵值)  OK")
+    return ok
+
+
+if __name__ == "__main__":
+    ops = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    check_every = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    key_range = int(sys.argv[4]) if len(sys.argv) > 4 else 100000
+    sys.exit(0 if run(ops, check_every, seed, key_range) else 1)